@@ -1,4 +1,5 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any, List
 from pmm_memory import PMMMemory
@@ -9,6 +10,7 @@ app = FastAPI()
 
 import asyncio
 import httpx
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -129,6 +131,34 @@ async def get_events(kind: Optional[str] = None, limit: int = 10):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/events/stream")
+async def stream_events(request: Request, kind: Optional[str] = None, task_id: Optional[List[str]] = Query(None),
+                        session_id: Optional[str] = None, include_existing: bool = False, keepalive: float = 15.0):
+    """Streams matching events as Server-Sent Events as they are committed.
+
+    With include_existing, matching events committed before the stream
+    opened are sent first, so a subscriber that opens the stream before
+    checking for results cannot miss one.
+    """
+    subscription = await memory.subscribe(kind=kind, task_ids=task_id, session_id=session_id, include_existing=include_existing)
+
+    async def event_source():
+        try:
+            yield ": subscribed\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await subscription.get(timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"id: {event['id']}\ndata: {json.dumps(event)}\n\n"
+        except StopAsyncIteration:
+            return
+        finally:
+            subscription.close()
+
+    return StreamingResponse(event_source(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 # Gas Town Work Item Endpoints
 @app.post("/work_items")
 async def create_work_item(item: WorkItemCreate):
@@ -3,13 +3,14 @@ import logging
 import os
 import uuid
 import sqlite3
+import threading
 import time
 import json
 from typing import Dict, Any, List
 
 import httpx
 from fastapi import FastAPI, Request, Response, Body, HTTPException
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from pydantic import BaseModel
@@ -120,6 +121,27 @@ def init_db():
         columns = [row[1] for row in c.fetchall()]
         if "expert_name" not in columns:
             c.execute("ALTER TABLE requests ADD COLUMN expert_name TEXT DEFAULT 'default'")
+        # Wall-clock time at which a row reached its current status. Used to replay
+        # only the rows logged after the last expert-stats checkpoint on startup.
+        if "completed_at" not in columns:
+            c.execute("ALTER TABLE requests ADD COLUMN completed_at REAL")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_requests_completed_at ON requests(completed_at)")
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS expert_stats (
+                expert_name TEXT PRIMARY KEY,
+                successes REAL,
+                failures REAL,
+                latency_sum REAL,
+                latency_weight REAL,
+                ref_time REAL
+            )
+        ''')
+        c.execute('''
+            CREATE TABLE IF NOT EXISTS expert_stats_meta (
+                key TEXT PRIMARY KEY,
+                value REAL
+            )
+        ''')
         conn.commit()
         conn.close()
     except Exception as e:
@@ -128,23 +150,25 @@ def init_db():
 # Initialize DB synchronously on startup (safe as it's once)
 init_db()
 
-def _log_request_sync(request_id: str, timestamp: float, user_input: str, response: str, status_code: int, latency: float, expert_name: str = 'default'):
+def _log_request_sync(request_id: str, timestamp: float, user_input: str, response: str, status_code: int, latency: float, expert_name: str = 'default', completed_at: float = None):
     """Synchronous DB write."""
     try:
         conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
         c.execute('''
-            INSERT OR REPLACE INTO requests (request_id, timestamp, user_input, response, status_code, latency, expert_name)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (request_id, timestamp, user_input, response, status_code, latency, expert_name))
+            INSERT OR REPLACE INTO requests (request_id, timestamp, user_input, response, status_code, latency, expert_name, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (request_id, timestamp, user_input, response, status_code, latency, expert_name, completed_at or time.time()))
         conn.commit()
         conn.close()
     except Exception as e:
         logger.error(f"Failed to log request to DB: {e}")
 
 async def log_request(request_id: str, timestamp: float, user_input: str, response: str, status_code: int, latency: float, expert_name: str = 'default'):
-    """Async wrapper for DB write."""
-    await asyncio.to_thread(_log_request_sync, request_id, timestamp, user_input, response, status_code, latency, expert_name)
+    """Async wrapper for DB write. Also folds the outcome into the in-memory expert stats."""
+    completed_at = time.time()
+    expert_stats.record(expert_name, status_code, timestamp, latency, completed_at)
+    await asyncio.to_thread(_log_request_sync, request_id, timestamp, user_input, response, status_code, latency, expert_name, completed_at)
 
 # --- Thompson Sampling Scorer (Marsaglia-Tsang) ---
 def random_normal() -> float:
@@ -191,54 +215,173 @@ if not EXTERNAL_EXPERTS:
         "together_1bit_bonsai_27b": {"model": "prism-ml/1bit-bonsai-27b", "tier": "trivial"}
     }
 
-def get_expert_scores(db_path: str, external_experts: dict) -> dict:
-    """
-    Calculates decay-weighted successes and failures for each expert,
-    and draws a Thompson Sample for reliability.
-    """
-    now = time.time()
-    # Decay parameters: half-life of 2 days (172800 seconds)
-    HALF_LIFE = 2.0 * 24.0 * 60.0 * 60.0
-
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    try:
-        c.execute('''
-            SELECT expert_name, status_code, timestamp, latency
-            FROM requests
-            WHERE timestamp >= ?
-        ''', (now - 7 * 24 * 3600,))
-        rows = c.fetchall()
-    except Exception as e:
-        logger.error(f"Failed to query requests history: {e}")
-        rows = []
-    finally:
-        conn.close()
-
-    counts = {name: {"successes": 0.0, "failures": 0.0, "latencies": []} for name in external_experts}
-    if 'default' not in counts:
-        counts['default'] = {"successes": 0.0, "failures": 0.0, "latencies": []}
+# --- Expert Statistics ---
+# Decay parameters: half-life of 2 days (172800 seconds)
+HALF_LIFE = 2.0 * 24.0 * 60.0 * 60.0
+# History window scanned when rebuilding statistics from the requests table
+STATS_WINDOW = 7 * 24 * 3600
+STATS_CHECKPOINT_INTERVAL = float(os.getenv("GATEWAY_STATS_CHECKPOINT_INTERVAL", "60"))
 
-    for row in rows:
-        expert_name = row[0]
-        status = row[1]
-        ts = row[2]
-        lat = row[3] or 0.0
+class ExpertStats:
+    """
+    In-memory, time-decayed success/failure/latency aggregates per expert.
 
-        if expert_name not in counts:
-            counts[expert_name] = {"successes": 0.0, "failures": 0.0, "latencies": []}
+    Each entry stores its sums normalised to a per-expert reference time and is
+    decayed forward lazily, so recording an outcome is O(1) and scoring every
+    expert is O(#experts) no matter how many requests have been logged. The
+    aggregates are checkpointed to SQLite and restored (plus any rows logged
+    after the checkpoint) on startup.
+    """
 
-        age = max(0, now - ts)
-        weight = 0.5 ** (age / HALF_LIFE)
+    def __init__(self, half_life: float = HALF_LIFE):
+        self.half_life = half_life
+        # name -> [successes, failures, latency_sum, latency_weight, ref_time]
+        self._stats: Dict[str, List[float]] = {}
+        # Largest `completed_at` folded in so far; rows after it are replayed on restore.
+        self.watermark = 0.0
+        self._lock = threading.Lock()
+
+    def _decay_to(self, entry: List[float], now: float):
+        if now > entry[4]:
+            factor = 0.5 ** ((now - entry[4]) / self.half_life)
+            entry[0] *= factor
+            entry[1] *= factor
+            entry[2] *= factor
+            entry[3] *= factor
+            entry[4] = now
+
+    def record(self, expert_name: str, status_code: int, timestamp: float, latency: float, completed_at: float = None):
+        """Folds one request outcome into the aggregates."""
+        # Status 0 is the pending placeholder; the final status is logged later.
+        # A client that hung up says nothing about the expert.
+        if status_code in (0, CLIENT_CLOSED_REQUEST):
+            return
+        with self._lock:
+            entry = self._stats.get(expert_name)
+            if entry is None:
+                entry = self._stats[expert_name] = [0.0, 0.0, 0.0, 0.0, timestamp]
+            self._decay_to(entry, timestamp)
+            weight = 0.5 ** ((entry[4] - timestamp) / self.half_life)
+            if status_code == 200:
+                entry[0] += weight
+                entry[2] += (latency or 0.0) * weight
+                entry[3] += weight
+            else:
+                entry[1] += weight
+            if completed_at and completed_at > self.watermark:
+                self.watermark = completed_at
+
+    def snapshot(self, now: float = None) -> Dict[str, Dict[str, float]]:
+        """Returns the decayed successes, failures and average latency per expert as of `now`."""
+        now = now or time.time()
+        result = {}
+        with self._lock:
+            for name, entry in self._stats.items():
+                self._decay_to(entry, now)
+                result[name] = {
+                    "successes": entry[0],
+                    "failures": entry[1],
+                    "avg_latency": entry[2] / entry[3] if entry[3] > 0 else None,
+                }
+        return result
 
-        if status == 200:
-            counts[expert_name]["successes"] += weight
-            counts[expert_name]["latencies"].append(lat)
+    def load_requests(self, conn: sqlite3.Connection, since_completed_at: float = None):
+        """Folds rows from the requests table, either the full window or those completed after a checkpoint."""
+        c = conn.cursor()
+        if since_completed_at is None:
+            now = time.time()
+            c.execute('''
+                SELECT expert_name, status_code, timestamp, latency, NULL
+                FROM requests
+                WHERE timestamp >= ? AND status_code NOT IN (0, 499)
+                ORDER BY timestamp
+            ''', (now - STATS_WINDOW,))
+            with self._lock:
+                self.watermark = max(self.watermark, now)
         else:
-            counts[expert_name]["failures"] += weight
+            c.execute('''
+                SELECT expert_name, status_code, timestamp, latency, completed_at
+                FROM requests
+                WHERE completed_at > ? AND status_code NOT IN (0, 499)
+                ORDER BY timestamp
+            ''', (since_completed_at,))
+        for expert_name, status, ts, lat, completed_at in c:
+            self.record(expert_name or "default", status, ts, lat, completed_at)
+
+    def checkpoint(self, db_path: str):
+        """Persists the current aggregates and watermark to SQLite."""
+        with self._lock:
+            rows = [(name, *entry) for name, entry in self._stats.items()]
+            watermark = self.watermark
+        try:
+            conn = sqlite3.connect(db_path)
+            with conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO expert_stats (expert_name, successes, failures, latency_sum, latency_weight, ref_time)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', rows)
+                conn.execute(
+                    "INSERT OR REPLACE INTO expert_stats_meta (key, value) VALUES ('watermark', ?)",
+                    (watermark,),
+                )
+            conn.close()
+        except Exception as e:
+            logger.error(f"Failed to checkpoint expert stats: {e}")
+
+    def restore(self, db_path: str):
+        """Loads the last checkpoint and replays newer rows, or rebuilds from the requests table if none exists."""
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                c = conn.cursor()
+                c.execute("SELECT value FROM expert_stats_meta WHERE key = 'watermark'")
+                row = c.fetchone()
+                with self._lock:
+                    self._stats = {}
+                    self.watermark = 0.0
+                if row is None:
+                    self.load_requests(conn)
+                else:
+                    c.execute('SELECT expert_name, successes, failures, latency_sum, latency_weight, ref_time FROM expert_stats')
+                    with self._lock:
+                        self._stats = {r[0]: list(r[1:]) for r in c.fetchall()}
+                        self.watermark = row[0] or 0.0
+                    self.load_requests(conn, since_completed_at=self.watermark)
+            finally:
+                conn.close()
+            logger.info(f"Restored expert stats for {len(self._stats)} experts (watermark={self.watermark:.3f})")
+        except Exception as e:
+            logger.error(f"Failed to restore expert stats from {db_path}: {e}")
+
+expert_stats = ExpertStats()
+
+def _expert_intelligence(name: str) -> float:
+    """Static intelligence prior for an expert, normalized to [0, 1]."""
+    if name == "openai_gpt4":
+        return 0.9
+    elif "claude" in name or "r1" in name or "o1" in name or "gpt-5" in name:
+        return 0.95
+    elif "qwen_72b" in name:
+        return 0.8
+    elif "ternary_bonsai_27b" in name:
+        return 0.8
+    elif "1bit_bonsai_27b" in name:
+        return 0.75
+    elif "flash" in name or "mini" in name:
+        return 0.4
+    return 0.5
+
+def score_experts(stats: Dict[str, Dict[str, float]], external_experts: dict) -> dict:
+    """Draws a Thompson Sample for reliability and combines it with speed and intelligence per expert."""
+    empty = {"successes": 0.0, "failures": 0.0, "avg_latency": None}
+    names = list(external_experts)
+    if 'default' not in external_experts:
+        names.append('default')
+    names.extend(name for name in stats if name not in external_experts and name != 'default')
 
     scores = {}
-    for name, metric in counts.items():
+    for name in names:
+        metric = stats.get(name, empty)
         alpha = metric["successes"] + 1.0 # PRIOR_SUCCESS
         beta = metric["failures"] + 1.0 # PRIOR_FAILURE
 
@@ -246,33 +389,38 @@ def get_expert_scores(db_path: str, external_experts: dict) -> dict:
         reliability = sample_beta(alpha, beta)
 
         # Speed score from average latency
-        avg_lat = sum(metric["latencies"]) / len(metric["latencies"]) if metric["latencies"] else 1.0
+        avg_lat = metric["avg_latency"] if metric["avg_latency"] is not None else 1.0
         speed = 1.0 - min(1.0, max(0.0, (avg_lat - 0.1) / (5.0 - 0.1)))
 
-        # Intelligence score normalized
-        intel = 0.5
-        if name == "openai_gpt4":
-            intel = 0.9
-        elif "claude" in name or "r1" in name or "o1" in name or "gpt-5" in name:
-            intel = 0.95
-        elif "qwen_72b" in name:
-            intel = 0.8
-        elif "ternary_bonsai_27b" in name:
-            intel = 0.8
-        elif "1bit_bonsai_27b" in name:
-            intel = 0.75
-        elif "flash" in name or "mini" in name:
-            intel = 0.4
+        intel = _expert_intelligence(name)
 
         score = 0.5 * reliability + 0.25 * speed + 0.25 * intel
         scores[name] = score
 
     return scores
 
+def get_expert_scores(db_path: str, external_experts: dict) -> dict:
+    """
+    Calculates decay-weighted successes and failures for each expert by scanning
+    the requests table, and draws a Thompson Sample for reliability.
+
+    The request path uses the in-memory `expert_stats` instead; this full scan is
+    kept for offline analysis against an arbitrary database.
+    """
+    stats = ExpertStats()
+    conn = sqlite3.connect(db_path)
+    try:
+        stats.load_requests(conn)
+    except Exception as e:
+        logger.error(f"Failed to query requests history: {e}")
+    finally:
+        conn.close()
+    return score_experts(stats.snapshot(), external_experts)
+
 def select_best_expert(tier_filter: str = None) -> str:
     """Selects the highest scoring expert based on Thompson Sampling scores, optionally filtered by tier."""
     try:
-        scores = get_expert_scores(DB_PATH, EXTERNAL_EXPERTS)
+        scores = score_experts(expert_stats.snapshot(), EXTERNAL_EXPERTS)
 
         candidate_scores = {}
         for k, v in scores.items():
@@ -337,11 +485,22 @@ async def get_metrics() -> Dict:
 
 from contextlib import asynccontextmanager
 
+async def checkpoint_expert_stats_loop():
+    """Periodically persists the in-memory expert stats so restarts don't rescan history."""
+    while True:
+        await asyncio.sleep(STATS_CHECKPOINT_INTERVAL)
+        await asyncio.to_thread(expert_stats.checkpoint, DB_PATH)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    # Rebuild bandit statistics from the last checkpoint (or the requests table) before serving
+    await asyncio.to_thread(expert_stats.restore, DB_PATH)
+    checkpoint_task = asyncio.create_task(checkpoint_expert_stats_loop())
     # On startup, discover the pipecat service in the background so it doesn't block startup
     asyncio.create_task(discover_pipecat_service())
     yield
+    checkpoint_task.cancel()
+    await asyncio.to_thread(expert_stats.checkpoint, DB_PATH)
 
 # --- FastAPI App ---
 app = FastAPI(
@@ -442,10 +601,28 @@ async def receive_response(payload: Dict = Body(...)):
     if request_id in pending_requests:
         pending_requests[request_id]["response"] = content
         pending_requests[request_id]["event"].set()
+        # A streaming request can also be completed by a single final response
+        if pending_requests[request_id].get("queue") is not None:
+            pending_requests[request_id]["queue"].put_nowait({"content": content, "done": True})
         return Response(status_code=200)
     else:
         return Response(status_code=404, content="Request ID not found")
 
+@app.post("/internal/response/stream")
+async def receive_response_stream(payload: Dict = Body(...)):
+    """
+    Receives incremental response deltas from the pipecat-app service for a
+    streaming request. A payload with `done: true` ends the stream.
+    """
+    request_id = payload.get("request_id")
+    pending = pending_requests.get(request_id)
+
+    if pending is None or pending.get("queue") is None:
+        return Response(status_code=404, content="Request ID not found")
+
+    pending["queue"].put_nowait({"delta": payload.get("delta") or "", "done": bool(payload.get("done"))})
+    return Response(status_code=200)
+
 
 # --- OpenAI-Compatible Endpoint ---
 
@@ -461,10 +638,65 @@ async def apply_personality_steering(name: str, strength: float):
     except Exception as e:
         logger.error(f"Failed to apply personality steering: {e}")
 
+STREAM_IDLE_TIMEOUT = 60.0
+# Logged for a stream the client closed before it completed (nginx's convention)
+CLIENT_CLOSED_REQUEST = 499
+
+def _sse_chunk(request_id: str, created: int, delta: Dict, finish_reason: str = None) -> str:
+    """Formats one OpenAI `chat.completion.chunk` as a server-sent event."""
+    chunk = {
+        "id": f"chatcmpl-{request_id}",
+        "object": "chat.completion.chunk",
+        "created": created,
+        "model": "moe-cluster",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n"
+
+async def stream_completion(request_id: str, start_time: float, user_input: str, expert_name: str):
+    """
+    Yields OpenAI-style SSE chunks as the pipecat-app posts deltas to
+    /internal/response/stream, then logs the completed request.
+    """
+    queue = pending_requests[request_id]["queue"]
+    created = int(start_time)
+    parts = []
+    # Stays set if the client goes away first: the generator is closed at a yield
+    status_code, outcome = CLIENT_CLOSED_REQUEST, "Client disconnected"
+    try:
+        yield _sse_chunk(request_id, created, {"role": "assistant"})
+        while True:
+            try:
+                item = await asyncio.wait_for(queue.get(), timeout=STREAM_IDLE_TIMEOUT)
+            except asyncio.TimeoutError:
+                status_code, outcome = 504, "Timeout"
+                yield f"data: {json.dumps({'error': 'Request timed out'})}\n\n"
+                break
+            text = item.get("delta")
+            if text is None and not parts:
+                # Final non-streamed response: emit it as a single delta
+                text = item.get("content")
+            if text:
+                parts.append(text)
+                yield _sse_chunk(request_id, created, {"content": text})
+            if item.get("done"):
+                status_code, outcome = (200, None) if parts else (500, "No response content")
+                break
+        if status_code == 200:
+            yield _sse_chunk(request_id, created, {}, finish_reason="stop")
+        elif status_code == 500:
+            yield f"data: {json.dumps({'error': 'Failed to get a response from the agent'})}\n\n"
+        yield "data: [DONE]\n\n"
+    finally:
+        pending_requests.pop(request_id, None)
+        response_text = "".join(parts) if status_code == 200 else outcome
+        await log_request(request_id, start_time, user_input, response_text, status_code, time.time() - start_time, expert_name)
+
 @app.post("/v1/chat/completions")
 async def chat_completions(request: Request, payload: Dict = Body(...)):
     """
     The main OpenAI-compatible chat completions endpoint.
+    With `stream: true` the response is a `text/event-stream` of chunk deltas.
     """
     start_time = time.time()
 
@@ -492,9 +724,11 @@ async def chat_completions(request: Request, payload: Dict = Body(...)):
     # Dynamic expert selection using Thompson-sampling convex combination filtered by tier
     selected_expert = select_best_expert(tier_filter=tier)
 
+    stream = bool(payload.get("stream"))
+
     request_id = str(uuid.uuid4())
     event = asyncio.Event()
-    pending_requests[request_id] = {"event": event, "response": None}
+    pending_requests[request_id] = {"event": event, "response": None, "queue": asyncio.Queue() if stream else None}
 
     # Extract user input for logging
     messages = payload.get("messages", [])
@@ -514,6 +748,9 @@ async def chat_completions(request: Request, payload: Dict = Body(...)):
             "response_url": f"{GATEWAY_URL}/internal/response",
             "expert_name": selected_expert
         }
+        if stream:
+            forward_payload["stream"] = True
+            forward_payload["stream_url"] = f"{GATEWAY_URL}/internal/response/stream"
 
         async with httpx.AsyncClient(verify=verify_param) as client:
             response = await client.post(f"{PIPECAT_SERVICE_URL}/internal/chat", json=forward_payload, timeout=5.0)
@@ -525,6 +762,13 @@ async def chat_completions(request: Request, payload: Dict = Body(...)):
         await log_request(request_id, start_time, last_user_message, error_msg, 500, time.time() - start_time, selected_expert)
         return JSONResponse(status_code=500, content={"error": error_msg})
 
+    if stream:
+        return StreamingResponse(
+            stream_completion(request_id, start_time, last_user_message, selected_expert),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     # Wait for the response to come back
     try:
         await asyncio.wait_for(event.wait(), timeout=60.0)
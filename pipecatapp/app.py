@@ -1,3 +1,4 @@
+import abc
 import asyncio
 import logging
 import os
@@ -34,6 +35,13 @@ from pipecat.frames.frames import (
     UserStartedSpeakingFrame,
     UserStoppedSpeakingFrame,
     TranscriptionFrame,
+    InterimTranscriptionFrame,
+    LLMFullResponseStartFrame,
+    LLMFullResponseEndFrame,
+    TTSStartedFrame,
+    TTSStoppedFrame,
+    EndFrame,
+    CancelFrame,
 )
 import tempfile
 import uuid
@@ -62,39 +70,23 @@ import httpx
 import consul.aio
 import numpy as np
 from pipecatapp.pmm_memory import PMMMemory
+from pipecatapp.streaming_stt import StreamingTranscriber
+from pipecatapp.streaming_tts import IncrementalSynthesizer
 from pipecatapp.pmm_memory_client import PMMMemoryClient
 from pipecatapp.quality_control import CodeQualityAnalyzer
 import pipecatapp.web_server
 from pipecatapp.web_server import approval_queue, text_message_queue
-from pipecatapp.tools.ssh_tool import SSH_Tool
-from pipecatapp.tools.mcp_tool import MCP_Tool
-from pipecatapp.tools.desktop_control_tool import DesktopControlTool
-from pipecatapp.tools.code_runner_tool import CodeRunnerTool
-from pipecatapp.tools.web_browser_tool import WebBrowserTool
-from pipecatapp.tools.ansible_tool import Ansible_Tool
-from pipecatapp.tools.power_tool import Power_Tool
-from pipecatapp.tools.summarizer_tool import SummarizerTool
-from pipecatapp.tools.term_everything_tool import TermEverythingTool
-from pipecatapp.tools.rag_tool import RAG_Tool
-from pipecatapp.tools.ha_tool import HA_Tool
-from pipecatapp.tools.git_tool import Git_Tool
 from pipecatapp.local_world_model import LocalWorldModel
 from pipecatapp.mqtt_world_model_client import MQTTWorldModelClient
-
-from pipecatapp.tools.orchestrator_tool import OrchestratorTool
-from pipecatapp.tools.llxprt_code_tool import LLxprt_Code_Tool
-from pipecatapp.tools.smol_agent_tool import SmolAgentTool
-from pipecatapp.tools.final_answer_tool import FinalAnswerTool
-from pipecatapp.tools.prompt_improver_tool import PromptImproverTool
-from pipecatapp.tools.council_tool import CouncilTool
-from pipecatapp.tools.swarm_tool import SwarmTool
-from pipecatapp.tools.project_mapper_tool import ProjectMapperTool
-from pipecatapp.tools.planner_tool import PlannerTool
+# Tools are imported lazily by the registry built in create_tools
 from pipecatapp.agent_factory import create_tools
+from pipecatapp.tools.registry import tool_methods
 from pipecatapp.task_supervisor import TaskSupervisor
 from pipecatapp.durable_execution import DurableExecutionEngine, durable_step
 from pipecatapp.moondream_detector import MoondreamDetector
 from pipecatapp.workflow.runner import WorkflowRunner, ActiveWorkflows
+from pipecatapp.response_streamer import ResponseStreamer
+from pipecatapp.ws_channels import logger as ws_channels_logger
 # Import all node classes to ensure they are registered
 from pipecatapp.workflow.nodes.base_nodes import *
 from opentelemetry import trace
@@ -130,19 +122,24 @@ class WebSocketLogHandler(logging.Handler):
         Args:
             record: The log record to be emitted.
         """
+        try:
+            # Client channels belong to the event loop; records from other threads are not streamed.
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # If no event loop is running (e.g., during shutdown), do nothing.
+            return
+
+        # Only clients that subscribed to the "log" topic receive logs
+        manager = pipecatapp.web_server.manager
+        if record.name == ws_channels_logger.name or not manager.has_subscribers("log"):
+            return
+
         log_entry = self.format(record)
 
         # Security Fix: Sentinel - Redact sensitive information
         # Redact generic API key patterns and Bearer tokens
         log_entry = redact_sensitive_data(log_entry)
-
-        try:
-            # Get the running asyncio loop to safely schedule the broadcast.
-            loop = asyncio.get_running_loop()
-            loop.create_task(pipecatapp.web_server.manager.broadcast(json.dumps({"type": "log", "data": log_entry})))
-        except RuntimeError:
-            # If no event loop is running (e.g., during shutdown), do nothing.
-            pass
+        manager.publish_text(json.dumps({"type": "log", "data": log_entry}), topic="log")
 
 logger = logging.getLogger()
 logger.addHandler(WebSocketLogHandler())
@@ -179,10 +176,11 @@ class UILogger(FrameProcessor):
             frame: The frame to process.
             direction: The direction of the frame in the pipeline.
         """
-        if isinstance(frame, (TranscriptionFrame, TextFrame)):
+        # Interim transcripts are revised every second; only final text is logged
+        if isinstance(frame, (TranscriptionFrame, TextFrame)) and not isinstance(frame, InterimTranscriptionFrame):
             # Security Fix: Sentinel - Redact sensitive information
             redacted_text = redact_sensitive_data(frame.text)
-            await pipecatapp.web_server.manager.broadcast(json.dumps({"type": self.sender, "data": redacted_text}))
+            await pipecatapp.web_server.manager.broadcast(json.dumps({"type": self.sender, "data": redacted_text}), topic=self.sender)
         await self.push_frame(frame, direction)
 
 class BenchmarkCollector(FrameProcessor):
@@ -208,10 +206,17 @@ class BenchmarkCollector(FrameProcessor):
             self.start_time = time.time()
         elif isinstance(frame, TranscriptionFrame):
             self.stt_end_time = time.time()
+        elif isinstance(frame, InterimTranscriptionFrame):
+            pass
         elif isinstance(frame, TextFrame) and self.llm_first_token_time == 0:
             self.llm_first_token_time = time.time()
-        elif isinstance(frame, AudioRawFrame) and self.tts_first_audio_time == 0:
-            self.tts_first_audio_time = time.time()
+        elif isinstance(frame, AudioRawFrame) and self.llm_first_token_time:
+            # TTS streams a response as several chunks; time the first and the last
+            now = time.time()
+            if self.tts_first_audio_time == 0:
+                self.tts_first_audio_time = now
+            self.tts_last_audio_time = now
+        elif isinstance(frame, TTSStoppedFrame) and self.tts_first_audio_time:
             self.log_benchmarks()
             self.reset()
         await self.push_frame(frame, direction)
@@ -221,12 +226,14 @@ class BenchmarkCollector(FrameProcessor):
         stt_latency = self.stt_end_time - self.start_time
         llm_ttft = self.llm_first_token_time - self.stt_end_time
         tts_ttfa = self.tts_first_audio_time - self.llm_first_token_time
+        tts_full = self.tts_last_audio_time - self.llm_first_token_time
         total_latency = self.tts_first_audio_time - self.start_time
         logging.info(
             f"--- BENCHMARK RESULTS ---\n"
             f"STT Latency: {stt_latency:.4f}s\n"
             f"LLM Time to First Token: {llm_ttft:.4f}s\n"
-            f"TTS Time to First Audio: {tts_ttfa:.4f}s\n"
+            f"TTS Time to First Audio (first chunk): {tts_ttfa:.4f}s\n"
+            f"TTS Time to Full Response Audio: {tts_full:.4f}s\n"
             f"Total Pipeline Latency: {total_latency:.4f}s\n"
             f"-------------------------"
         )
@@ -237,6 +244,7 @@ class BenchmarkCollector(FrameProcessor):
         self.stt_end_time = 0
         self.llm_first_token_time = 0
         self.tts_first_audio_time = 0
+        self.tts_last_audio_time = 0
 
 class WyomingSTTService(FrameProcessor):
     """A Pipecat processor for Speech-to-Text using a Wyoming protocol server.
@@ -254,6 +262,8 @@ class WyomingSTTService(FrameProcessor):
     async def process_frame(self, frame, direction):
         if isinstance(frame, UserStartedSpeakingFrame):
             self.audio_buffer.clear()
+            # Let the TTS downstream stop talking over the user
+            await self.push_frame(frame, direction)
         elif isinstance(frame, AudioRawFrame):
             self.audio_buffer.extend(frame.audio)
         elif isinstance(frame, UserStoppedSpeakingFrame):
@@ -300,17 +310,23 @@ class FasterWhisperSTTService(FrameProcessor):
     This service buffers incoming audio frames and, upon detecting the end of
     speech, transcribes the audio using a CPU-optimized Whisper model.
 
+    In streaming mode it instead transcribes a rolling window of speech while
+    the user is still talking, pushing InterimTranscriptionFrames, so only the
+    last few uncommitted words are decoded once the user stops.
+
     Attributes:
         model: The loaded Faster-Whisper model.
         audio_buffer (bytearray): A buffer to accumulate audio data.
         sample_rate (int): The audio sample rate required by the model.
+        transcriber (StreamingTranscriber): The incremental transcriber, in streaming mode.
     """
-    def __init__(self, model_path: str, sample_rate: int = 16000):
+    def __init__(self, model_path: str, sample_rate: int = 16000, streaming: bool = False):
         """Initializes the STT service.
 
         Args:
             model_path (str): The path to the Faster-Whisper model directory.
             sample_rate (int): The sample rate of the input audio.
+            streaming (bool): Whether to transcribe while the user is speaking.
         """
         super().__init__()
         # Use CPU int8 to reduce memory; adjust if you want GPU
@@ -334,6 +350,9 @@ class FasterWhisperSTTService(FrameProcessor):
 
         self.audio_buffer = bytearray()
         self.sample_rate = sample_rate
+        self.transcriber = None
+        if streaming:
+            self.transcriber = StreamingTranscriber(self._transcribe_words_sync, self._push_interim, sample_rate=sample_rate)
         logging.info(f"FasterWhisperSTTService initialized with model identifier '{model_identifier}'")
 
     def _convert_audio_bytes_to_float_array(self, audio_bytes: bytes) -> np.ndarray:
@@ -358,6 +377,17 @@ class FasterWhisperSTTService(FrameProcessor):
         segments, _ = self.model.transcribe(audio_data, language="en")
         return "".join(segment.text for segment in segments).strip()
 
+    def _transcribe_words_sync(self, audio_bytes: bytes, prompt: str) -> list:
+        """Transcribes a streaming window, returning (start, end, text) for each word."""
+        audio_data = self._convert_audio_bytes_to_float_array(audio_bytes)
+        segments, _ = self.model.transcribe(
+            audio_data, language="en", word_timestamps=True, initial_prompt=prompt or None
+        )
+        return [(word.start, word.end, word.word) for segment in segments for word in (segment.words or [])]
+
+    async def _push_interim(self, text: str):
+        await self.push_frame(InterimTranscriptionFrame(text))
+
     def _transcribe_file_sync(self, file_path: str) -> str:
         """Synchronous helper for file transcription."""
         segments, _ = self.model.transcribe(file_path, language="en")
@@ -372,9 +402,20 @@ class FasterWhisperSTTService(FrameProcessor):
         """
         if isinstance(frame, UserStartedSpeakingFrame):
             self.audio_buffer.clear()
+            if self.transcriber:
+                self.transcriber.reset()
+            # Let the TTS downstream stop talking over the user
+            await self.push_frame(frame, direction)
         elif isinstance(frame, AudioRawFrame):
-            # append incoming audio bytes (signed int16)
-            self.audio_buffer.extend(frame.audio)
+            if self.transcriber:
+                self.transcriber.feed(frame.audio)
+            else:
+                # append incoming audio bytes (signed int16)
+                self.audio_buffer.extend(frame.audio)
+        elif isinstance(frame, UserStoppedSpeakingFrame) and self.transcriber:
+            full_text = await self.transcriber.finish()
+            if full_text:
+                await self.push_frame(TranscriptionFrame(full_text))
         elif isinstance(frame, UserStoppedSpeakingFrame):
             if not self.audio_buffer:
                 return
@@ -478,6 +519,8 @@ class GroqSTTService(FrameProcessor):
     async def process_frame(self, frame, direction):
         if isinstance(frame, UserStartedSpeakingFrame):
             self.audio_buffer.clear()
+            # Let the TTS downstream stop talking over the user
+            await self.push_frame(frame, direction)
         elif isinstance(frame, AudioRawFrame):
             self.audio_buffer.extend(frame.audio)
         elif isinstance(frame, UserStoppedSpeakingFrame):
@@ -500,53 +543,110 @@ class GroqSTTService(FrameProcessor):
         else:
             await self.push_frame(frame, direction)
 
-class KokoroTTSService(FrameProcessor):
+class StreamingTTSService(FrameProcessor, abc.ABC):
+    """Base class for TTS processors that speak a response sentence by sentence.
+
+    Text frames are fed to an IncrementalSynthesizer, so audio for the first
+    sentence is pushed while the rest of the response is still being
+    synthesized. Text between LLMFullResponseStartFrame and
+    LLMFullResponseEndFrame is treated as one streamed response; any other
+    text frame is a complete response on its own. A UserStartedSpeakingFrame
+    cancels whatever has not been spoken yet. The synthesis threads are shut
+    down when the pipeline ends (after speaking what is left) or is cancelled.
+
+    Subclasses set `sample_rate` and implement `_synthesize_sync`.
+    """
+    def __init__(self, max_workers: int = 2):
+        super().__init__()
+        self.synthesizer = IncrementalSynthesizer(self._synthesize_sync, self._push_audio, max_workers=max_workers)
+        self._in_llm_response = False
+        self._speaking = False
+
+    @abc.abstractmethod
+    def _synthesize_sync(self, text: str) -> bytes:
+        """Synthesizes `text` to 16-bit mono PCM. Runs in a worker thread."""
+
+    async def _push_audio(self, audio_bytes: bytes):
+        if not self._speaking:
+            self._speaking = True
+            await self.push_frame(TTSStartedFrame())
+        await self.push_frame(AudioRawFrame(audio=audio_bytes, sample_rate=self.sample_rate, num_channels=1))
+
+    async def _finish_response(self):
+        await self.synthesizer.finish()
+        if self._speaking:
+            self._speaking = False
+            await self.push_frame(TTSStoppedFrame())
+
+    async def process_frame(self, frame, direction):
+        """Processes text frames to synthesize audio.
+
+        Args:
+            frame: The frame to process.
+            direction: The direction of the frame in the pipeline.
+        """
+        if isinstance(frame, InterimTranscriptionFrame):
+            await self.push_frame(frame, direction)
+        elif isinstance(frame, TextFrame):
+            self.synthesizer.feed(frame.text)
+            if not self._in_llm_response:
+                await self._finish_response()
+        elif isinstance(frame, LLMFullResponseStartFrame):
+            self._in_llm_response = True
+            await self.push_frame(frame, direction)
+        elif isinstance(frame, LLMFullResponseEndFrame):
+            self._in_llm_response = False
+            await self._finish_response()
+            await self.push_frame(frame, direction)
+        elif isinstance(frame, UserStartedSpeakingFrame):
+            self._in_llm_response = False
+            self.synthesizer.cancel()
+            if self._speaking:
+                self._speaking = False
+                await self.push_frame(TTSStoppedFrame())
+            await self.push_frame(frame, direction)
+        elif isinstance(frame, EndFrame):
+            self._in_llm_response = False
+            await self._finish_response()
+            self.synthesizer.close()
+            await self.push_frame(frame, direction)
+        elif isinstance(frame, CancelFrame):
+            self._in_llm_response = False
+            self._speaking = False
+            self.synthesizer.close()
+            await self.push_frame(frame, direction)
+        else:
+            await self.push_frame(frame, direction)
+
+class KokoroTTSService(StreamingTTSService):
     """A Pipecat processor for Text-to-Speech using Kokoro.
 
     This service synthesizes speech from text frames using the Kokoro TTS engine
     and pushes the resulting raw audio frames back into the pipeline.
     """
     def __init__(self, model_path: str, lang_code: str = 'a', voice_name: str = 'af_heart'):
-        super().__init__()
         self.pipeline = KPipeline(lang_code=lang_code)
         self.voice_name = voice_name
         self.sample_rate = 24000
+        # The Kokoro pipeline keeps model and G2P state that is not safe to share between threads
+        super().__init__(max_workers=1)
 
     def _synthesize_sync(self, text: str) -> bytes:
         """Helper to run synthesis in a separate thread."""
-        audio_stream = io.BytesIO()
-        # Generate audio using Kokoro
         # KPipeline returns an iterator of (graphemes, phonemes, audio)
-        result = list(self.pipeline(text, voice=self.voice_name, speed=1, split_pattern=r'\n+'))
-        if not result:
-             return b""
-
-        # Concatenate audio chunks if multiple
-        import numpy as np
-        audio_chunks = [chunk[2] for chunk in result if chunk[2] is not None]
+        audio_chunks = [
+            np.asarray(chunk[2], dtype=np.float32)
+            for chunk in self.pipeline(text, voice=self.voice_name, speed=1, split_pattern=r'\n+')
+            if chunk[2] is not None
+        ]
         if not audio_chunks:
             return b""
 
+        # Convert float samples to 16-bit PCM directly, without a WAV round-trip
         full_audio = np.concatenate(audio_chunks)
+        return (np.clip(full_audio, -1.0, 1.0) * 32767).astype('<i2').tobytes()
 
-        # Convert to 16-bit PCM
-        import soundfile as sf
-        sf.write(audio_stream, full_audio, self.sample_rate, format='WAV', subtype='PCM_16')
-
-        audio_stream.seek(0)
-        with wave.open(audio_stream, "rb") as wf:
-            return wf.readframes(wf.getnframes())
-
-    async def process_frame(self, frame, direction):
-        if not isinstance(frame, TextFrame):
-            await self.push_frame(frame, direction)
-            return
-
-        loop = asyncio.get_running_loop()
-        audio_bytes = await loop.run_in_executor(None, self._synthesize_sync, frame.text)
-        await self.push_frame(AudioRawFrame(audio_bytes))
-
-class PiperTTSService(FrameProcessor):
+class PiperTTSService(StreamingTTSService):
     """A Pipecat processor for Text-to-Speech using Piper.
 
     This service synthesizes speech from text frames and pushes the resulting
@@ -562,9 +662,9 @@ class PiperTTSService(FrameProcessor):
         Args:
             model_path (str): The path to the Piper TTS model file.
         """
-        super().__init__()
         self.voice = PiperVoice.load(model_path)
         self.sample_rate = self.voice.config.sample_rate
+        super().__init__(max_workers=2)
 
     def _synthesize_sync(self, text: str) -> bytes:
         """Helper to run synthesis in a separate thread."""
@@ -574,22 +674,6 @@ class PiperTTSService(FrameProcessor):
         with wave.open(audio_stream, "rb") as wf:
             return wf.readframes(wf.getnframes())
 
-    async def process_frame(self, frame, direction):
-        """Processes text frames to synthesize audio.
-
-        Args:
-            frame: The frame to process.
-            direction: The direction of the frame in the pipeline.
-        """
-        if not isinstance(frame, TextFrame):
-            await self.push_frame(frame, direction)
-            return
-
-        loop = asyncio.get_running_loop()
-        # Bolt ⚡ Optimization: Run blocking synthesis in a thread
-        audio_bytes = await loop.run_in_executor(None, self._synthesize_sync, frame.text)
-        await self.push_frame(AudioRawFrame(audio_bytes))
-
 class WebsocketAudioStreamer(FrameProcessor):
     """A Pipecat processor that streams audio frames to the frontend via WebSockets.
 
@@ -604,49 +688,14 @@ class WebsocketAudioStreamer(FrameProcessor):
             await self.push_frame(frame, direction)
             return
 
-        # Wrap raw PCM in WAV container for browser compatibility
+        # Raw PCM goes out as a binary frame; clients on the JSON protocol get
+        # a base64 WAV, encoded once per frame and only if one is subscribed.
         try:
-            # Bolt ⚡ Optimization: Manually construct WAV header instead of using 'wave' module
-            # This is ~7x faster and reduces object allocation
-            audio_data = frame.audio
-            length = len(audio_data)
-
-            # WAV Header: 44 bytes
-            # RIFF + size + WAVE + fmt + size + 1 (PCM) + 1 (channels) + rate + byte_rate + block_align + bits + data + size
-            # We assume Mono 16-bit PCM as per app config
-            header = struct.pack(
-                '<4sI4s4sIHHIIHH4sI',
-                b'RIFF',
-                36 + length,
-                b'WAVE',
-                b'fmt ',
-                16,
-                1, # PCM
-                1, # Mono
-                self.sample_rate,
-                self.sample_rate * 2, # ByteRate (SampleRate * NumChannels * BitsPerSample/8)
-                2, # BlockAlign (NumChannels * BitsPerSample/8)
-                16, # BitsPerSample
-                b'data',
-                length
-            )
-
-            # Combine header and audio data, then encode
-            wav_bytes = header + audio_data
-            b64_audio = base64.b64encode(wav_bytes).decode('utf-8')
-
             # Fix: Import web_server locally
-            try:
-                import pipecatapp.web_server
-                await pipecatapp.web_server.manager.broadcast(json.dumps({
-                    "type": "audio",
-                    "data": b64_audio
-                }))
-            except Exception as ws_err:
-                logging.error(f"Failed to stream audio frame: {ws_err}")
-
-        except Exception as e:
-             logging.error(f"Error packing audio for stream: {e}")
+            import pipecatapp.web_server
+            pipecatapp.web_server.manager.broadcast_media("audio", frame.audio, sample_rate=self.sample_rate, channels=1)
+        except Exception as ws_err:
+            logging.error(f"Failed to stream audio frame: {ws_err}")
 
         await self.push_frame(frame, direction)
 
@@ -703,16 +752,16 @@ class YOLOv8Detector(FrameProcessor):
 
         Args:
             image: The image data to process.
-            generate_debug_image (bool): Whether to generate a base64 debug image.
+            generate_debug_image (bool): Whether to generate a JPEG debug image.
 
         Returns:
-            tuple: (set of detected object names, base64_encoded_jpeg_string)
+            tuple: (set of detected object names, jpeg_bytes)
         """
         results = self.model(image)
         detected_objects = {self.model.names[int(c)] for r in results for c in r.boxes.cls}
 
         # Generate visual debug frame
-        img_base64 = None
+        img_jpeg = None
         if generate_debug_image:
             try:
                 # Plot returns a numpy array (BGR)
@@ -722,11 +771,11 @@ class YOLOv8Detector(FrameProcessor):
                 # annotated_frame is BGR. cv2.imencode expects BGR.
                 success, buffer = cv2.imencode('.jpg', annotated_frame, [int(cv2.IMWRITE_JPEG_QUALITY), 70])
                 if success:
-                    img_base64 = base64.b64encode(buffer).decode('utf-8')
+                    img_jpeg = buffer.tobytes()
             except Exception as e:
                 logging.error(f"Error generating visual debug frame: {e}")
 
-        return detected_objects, img_base64
+        return detected_objects, img_jpeg
 
     async def process_frame(self, frame, direction):
         """Processes an image frame to detect objects.
@@ -765,19 +814,16 @@ class YOLOv8Detector(FrameProcessor):
 
             loop = asyncio.get_running_loop()
             # Bolt ⚡ Optimization: Run blocking inference in a thread
-            detected_objects, img_base64 = await loop.run_in_executor(
+            detected_objects, img_jpeg = await loop.run_in_executor(
                 None, self._run_inference, frame.image, generate_debug_image
             )
 
             # Broadcast visual debug frame
-            if img_base64:
+            if img_jpeg:
                 # Fix: Import web_server locally to avoid NameError and circular dependencies
                 try:
                     import pipecatapp.web_server
-                    await pipecatapp.web_server.manager.broadcast(json.dumps({
-                        "type": "vision_debug",
-                        "data": img_base64
-                    }))
+                    pipecatapp.web_server.manager.broadcast_media("vision_debug", img_jpeg)
                 except Exception as ws_err:
                      logging.error(f"Failed to broadcast vision frame: {ws_err}")
 
@@ -1202,6 +1248,8 @@ class TwinService(FrameProcessor):
 
         # This will hold metadata from incoming requests (e.g., from the gateway)
         self.current_request_meta = None
+        # Set while a gateway request with `stream: true` is being processed
+        self.response_stream = None
 
         # Optimization: Reusable HTTP client for gateway responses
         self.http_client = httpx.AsyncClient(timeout=30.0)
@@ -1228,17 +1276,23 @@ class TwinService(FrameProcessor):
         split = len(self.short_term_memory) // 2
         old, recent = self.short_term_memory[:split], self.short_term_memory[split:]
 
-        # Ensure summarizer tool is available before trying to use it
+        # Ensure summarizer tool is available before trying to use it; its registry entry is checked without loading it
         summarizer = self.tools.get("summarizer")
+        summary_text = None
 
-        if summarizer and hasattr(summarizer, "get_summary"):
+        if summarizer and any(name == "get_summary" for name, _ in tool_methods(summarizer)):
             # The summarizer extracts the top 3 most relevant turns. For a general
             # compaction, we just summarize everything we want to compact.
             # But the existing get_summary tool is an extractive summarizer focused on a query.
             # If we don't have a specific query, we can use a general string, or just keep recent
             summary_query = "important facts, decisions, and tasks"
-            summary_text = summarizer.get_summary(summary_query, conversation_history=old)
+            try:
+                summary_text = summarizer.get_summary(summary_query, conversation_history=old)
+            except Exception as e:
+                # Loading the tool (its model) can fail; compaction still has to happen
+                logging.warning(f"Summarizer failed during compaction: {e}")
 
+        if summary_text is not None:
             # get_summary might return a string starting with "Here are the most relevant points..."
             self.short_term_memory = [f"[Previous conversation summary]\n{summary_text}"] + recent
         else:
@@ -1304,6 +1358,9 @@ class TwinService(FrameProcessor):
 
         session_id = self.current_request_meta.get("session_id", "default") if self.current_request_meta else "default"
 
+        # Stream tokens back to the gateway when it asked for an SSE response
+        self.response_stream = await self._open_response_stream(request_id)
+
         try:
             span.set_attribute("agent.workflow_file", workflow_file)
             span.set_attribute("agent.request_id", request_id)
@@ -1317,7 +1374,8 @@ class TwinService(FrameProcessor):
                 "tool_result": None, # Start with no tool result
                 "consul_http_addr": self.consul_http_addr,
                 "twin_service": self,
-                "external_experts_config": self.external_experts_config
+                "external_experts_config": self.external_experts_config,
+                "response_stream": self.response_stream
             }
 
             previous_tool_calls = []
@@ -1395,14 +1453,35 @@ class TwinService(FrameProcessor):
             await self._send_response("I'm sorry, an internal error occurred while processing your request with the new workflow engine.")
         finally:
             active_workflows.remove_runner(request_id)
+            if self.response_stream:
+                await self.response_stream.close()
+                self.response_stream = None
+
+    async def _open_response_stream(self, request_id: str):
+        """Creates a ResponseStreamer if the current request asked for a streamed response."""
+        meta = self.current_request_meta
+        if not meta or not meta.get("stream") or not meta.get("stream_url"):
+            return None
+        try:
+            # Security Fix: Sentinel - Validate URL and use resolved IP for HTTP to prevent DNS Rebinding
+            original_url, safe_ip = await resolve_and_validate_url(meta["stream_url"])
+            safe_url, headers = get_safe_url_and_headers(original_url, safe_ip)
+        except ValueError as e:
+            logging.error(f"Blocked SSRF attempt in stream_url: {e}")
+            return None
+        return ResponseStreamer(self.http_client, safe_url, request_id, headers=headers)
 
     @tracer.start_as_current_span("TwinService._send_response")
     async def _send_response(self, text: str):
-        """Sends a response back to the appropriate channel (TTS or Gateway)."""
+        """Sends a response back to the appropriate channel (TTS, Gateway or Gateway stream)."""
         span = trace.get_current_span()
         span.set_attribute("agent.output_text", text)
 
-        if self.current_request_meta and self.current_request_meta.get("is_sync"):
+        if self.response_stream:
+            await self.response_stream.finish(text)
+            self.response_stream = None
+            logging.info("Finished streamed response to gateway.")
+        elif self.current_request_meta and self.current_request_meta.get("is_sync"):
             request_id = self.current_request_meta.get("request_id")
             if request_id and request_id in pipecatapp.web_server.sync_response_store:
                 response_data = {"response": text}
@@ -1691,7 +1770,7 @@ async def run_agent():
     vision_detector = initialize_vision_detector(app_config)
     # Bolt ⚡ Optimization: Inject callback to check for active connections
     if isinstance(vision_detector, YOLOv8Detector):
-        vision_detector.set_connection_check_callback(lambda: len(pipecatapp.web_server.manager.active_connections) > 0)
+        vision_detector.set_connection_check_callback(lambda: pipecatapp.web_server.manager.has_subscribers("vision_debug"))
 
     if app_config.get("debug_mode", False):
         logging.getLogger().setLevel(logging.DEBUG)
@@ -1769,8 +1848,9 @@ async def run_agent():
                 if stt_model_name.startswith(f"{stt_provider}-"):
                     stt_model_name = stt_model_name[len(stt_provider) + 1:]
                 model_path = f"/opt/nomad/models/stt/{stt_provider}/{stt_model_name}"
-                stt = FasterWhisperSTTService(model_path=model_path, sample_rate=16000)
-                logging.info(f"Configured FasterWhisper for STT with model '{model_path}' and sample rate 16000Hz.")
+                stt_streaming = str(app_config.get("stt_streaming", False)).lower() == "true"
+                stt = FasterWhisperSTTService(model_path=model_path, sample_rate=16000, streaming=stt_streaming)
+                logging.info(f"Configured FasterWhisper for STT with model '{model_path}' and sample rate 16000Hz (streaming: {stt_streaming}).")
         elif stt_service_name == "groq":
             groq_key = secret_manager.get_secret("GROQ_API_KEY")
             if not groq_key:
@@ -7,13 +7,11 @@ import sqlite3
 import uvicorn
 import faiss
 import numpy as np
-import pickle
 from typing import List, Dict, Optional, Any
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Body, Security, Depends
 from pydantic import BaseModel
 from sentence_transformers import SentenceTransformer
-from rank_bm25 import BM25Okapi
 import httpx
 from concurrent.futures import ThreadPoolExecutor
 
@@ -21,10 +19,14 @@ if __package__:
     from .api_keys import get_api_key
     from .rate_limiter import RateLimiter
     from .net_utils import format_url
+    from .utils.embedding_service import get_embedding_service
+    from .utils.bm25_index import BM25Index
 else:
     from pipecatapp.api_keys import get_api_key
     from pipecatapp.rate_limiter import RateLimiter
     from pipecatapp.net_utils import format_url
+    from pipecatapp.utils.embedding_service import get_embedding_service
+    from pipecatapp.utils.bm25_index import BM25Index
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -36,6 +38,9 @@ INDEX_DIR = os.getenv("INDEX_DIR", os.path.expanduser("~/.config/pipecat/archivi
 
 PORT = int(os.getenv("ARCHIVIST_PORT", 8008))
 
+# New vectors are appended to a log; the full FAISS index is only rewritten every N pages
+FAISS_SNAPSHOT_INTERVAL = int(os.getenv("FAISS_SNAPSHOT_INTERVAL", 100))
+
 CONSUL_HOST = os.getenv("CONSUL_HOST", os.getenv("CLUSTER_IP", "127.0.0.1"))
 CONSUL_PORT = int(os.getenv("CONSUL_PORT", 8500))
 LLAMA_API_SERVICE_NAME = os.getenv("LLAMA_API_SERVICE_NAME", "llamacpp-rpc-api")
@@ -115,10 +120,12 @@ class Memorizer:
         self.db_path = db_path
         self.index_dir = index_dir
         self.llm_client = llm_client
-        # Use the same model as RAG tool/Memory Store for consistency
-        self.embedding_model = SentenceTransformer('/opt/nomad/models/embedding/bge-large-en-v1.5')
+        # Use the same model as RAG tool/Memory Store for consistency; the service shares one copy in-process
+        self.embedding_model = get_embedding_service('/opt/nomad/models/embedding/bge-large-en-v1.5', loader=SentenceTransformer)
 
         self.faiss_index_path = os.path.join(index_dir, "pages.faiss")
+        self.faiss_log_path = os.path.join(index_dir, "pages.faiss.log")
+        # Legacy pickled BM25 model, replaced by the SQLite index in pages.db
         self.bm25_index_path = os.path.join(index_dir, "pages.bm25")
         self.pages_store_path = os.path.join(index_dir, "pages.json")
         self.pages_db_path = os.path.join(index_dir, "pages.db")
@@ -127,8 +134,8 @@ class Memorizer:
         self.page_ids_list: List[str] = [] # Maps FAISS index ID to Page ID
 
         self.faiss_index = None
-        self.bm25 = None
-        self.bm25_corpus = []
+        self.bm25_index: Optional[BM25Index] = None
+        self._vectors_since_snapshot = 0
 
         self.last_processed_id = 0
         self.lightweight_memory = "No history yet."
@@ -159,6 +166,7 @@ class Memorizer:
             )
         """)
         self.pages_conn.commit()
+        self.bm25_index = BM25Index(self.pages_conn)
 
     def save_page(self, page: Page):
         try:
@@ -223,70 +231,94 @@ class Memorizer:
                  if not os.path.exists(self.pages_store_path + ".bak"):
                      os.rename(self.pages_store_path, self.pages_store_path + ".bak")
 
-        # Load FAISS
+        # Load FAISS: the last snapshot plus any vectors appended since
         if os.path.exists(self.faiss_index_path):
             self.faiss_index = faiss.read_index(self.faiss_index_path)
             logger.info("Loaded FAISS index.")
         else:
             self.faiss_index = faiss.IndexFlatL2(1024)
+        self._replay_faiss_log()
 
-        # Load BM25
-        if os.path.exists(self.bm25_index_path):
-            with open(self.bm25_index_path, 'rb') as f:
-                self.bm25, self.bm25_corpus = pickle.load(f)
-            logger.info("Loaded BM25 index.")
-
-        # Load State (and list)
+        # Load State
         if os.path.exists(self.state_path):
             with open(self.state_path, 'r') as f:
                 state = json.load(f)
                 self.last_processed_id = state.get("last_processed_id", 0)
                 self.lightweight_memory = state.get("lightweight_memory", "No history yet.")
+                # Older state files carry the full page list; page_sequence supersedes it below
                 self.page_ids_list = state.get("page_ids_list", [])
 
-                # Validation
-                if len(self.page_ids_list) != self.faiss_index.ntotal:
-                    logger.warning(f"Index mismatch! Pages: {len(self.page_ids_list)}, FAISS: {self.faiss_index.ntotal}")
-                    # In a real system, we might trigger a rebuild. For now, assume state is correct or truncated.
-                    if len(self.page_ids_list) < self.faiss_index.ntotal:
-                        # Index is larger than list? This implies list was not saved or truncated.
-                        # We can't recover easily without re-embedding everything.
-                        pass
-        else:
-             # If no state file, we might be in a fresh DB or migrated DB.
-             # If we have pages in DB but no state, we should rebuild page_ids_list?
-             # For now, we assume if state is missing, we start fresh or from what we have.
-             # If we just migrated, we might not have page_ids_list unless we rebuild it.
-             # Wait, existing code relied on `self.pages.keys()` if state was missing.
-             # We can query all IDs from DB.
-             if not self.page_ids_list:
-                 cursor = self.pages_conn.cursor()
-                 # Try to load from sequence table first
-                 cursor.execute("SELECT page_id FROM page_sequence ORDER BY seq_id ASC")
-                 rows = cursor.fetchall()
-                 if rows:
-                     self.page_ids_list = [row['page_id'] for row in rows]
-                     logger.info("Restored page_ids_list from page_sequence table.")
-                 elif self.get_page_count() > 0:
-                     # Fallback to pages table rowid if sequence table is empty (e.g. legacy data)
-                     cursor.execute("SELECT id FROM pages ORDER BY rowid ASC")
-                     self.page_ids_list = [row['id'] for row in cursor.fetchall()]
-                     logger.warning("Restored page_ids_list from pages table. Order might be incorrect if updates occurred.")
+        # page_sequence records every archived page in order, so the list is not persisted separately
+        cursor = self.pages_conn.cursor()
+        cursor.execute("SELECT page_id FROM page_sequence ORDER BY seq_id ASC")
+        rows = cursor.fetchall()
+        if rows and len(rows) >= len(self.page_ids_list):
+            self.page_ids_list = [row['page_id'] for row in rows]
+            logger.info("Restored page_ids_list from page_sequence table.")
+        elif not self.page_ids_list and self.get_page_count() > 0:
+            # Fallback to pages table rowid if sequence table is empty (e.g. legacy data)
+            cursor.execute("SELECT id FROM pages ORDER BY rowid ASC")
+            self.page_ids_list = [row['id'] for row in cursor.fetchall()]
+            logger.warning("Restored page_ids_list from pages table. Order might be incorrect if updates occurred.")
+
+        # Validation
+        if len(self.page_ids_list) != self.faiss_index.ntotal:
+            logger.warning(f"Index mismatch! Pages: {len(self.page_ids_list)}, FAISS: {self.faiss_index.ntotal}")
+            # In a real system, we might trigger a rebuild. For now, assume state is correct or truncated.
+
+        # Build the BM25 index once from the stored pages when upgrading from the pickled model
+        if len(self.bm25_index) == 0 and self.page_ids_list:
+            logger.info(f"Building BM25 index for {len(self.page_ids_list)} pages...")
+            pages = (self.get_page(pid) for pid in self.page_ids_list)
+            self.bm25_index.add_documents((page.id, f"{page.header}\n{page.content}") for page in pages if page)
+        if os.path.exists(self.bm25_index_path):
+            os.rename(self.bm25_index_path, self.bm25_index_path + ".bak")
+
+    def _faiss_log_dtype(self) -> np.dtype:
+        # Each record carries the vector's position, so replay can skip vectors a snapshot already holds
+        return np.dtype([("position", "<i8"), ("vector", "<f4", (self.faiss_index.d,))])
+
+    def _replay_faiss_log(self):
+        if not os.path.exists(self.faiss_log_path):
+            return
+        records = np.fromfile(self.faiss_log_path, dtype=self._faiss_log_dtype())
+        records = records[records["position"] >= self.faiss_index.ntotal]
+        if len(records):
+            self.faiss_index.add(np.ascontiguousarray(records["vector"]))
+            logger.info(f"Replayed {len(records)} vectors from the FAISS log.")
+        self._vectors_since_snapshot = len(records)
+
+    def append_vector(self, embedding):
+        """Adds a page vector to FAISS, persisting it by appending to the log instead of rewriting the index."""
+        record = np.zeros(1, dtype=self._faiss_log_dtype())
+        record["position"] = self.faiss_index.ntotal
+        record["vector"] = np.asarray(embedding, dtype=np.float32)
+        self.faiss_index.add(np.ascontiguousarray(record["vector"]))
+        with open(self.faiss_log_path, 'ab') as f:
+            f.write(record.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+        self._vectors_since_snapshot += 1
+        if self._vectors_since_snapshot >= FAISS_SNAPSHOT_INTERVAL:
+            self.snapshot_faiss()
+
+    def snapshot_faiss(self):
+        """Writes the full FAISS index and truncates the vector log."""
+        if not self.faiss_index:
+            return
+        tmp_path = self.faiss_index_path + ".tmp"
+        faiss.write_index(self.faiss_index, tmp_path)
+        os.replace(tmp_path, self.faiss_index_path)
+        # A crash before this point is harmless: replay skips positions the snapshot covers
+        open(self.faiss_log_path, 'wb').close()
+        self._vectors_since_snapshot = 0
 
     def _save_state(self):
-        # We no longer dump pages to JSON.
-
-        if self.faiss_index:
-            faiss.write_index(self.faiss_index, self.faiss_index_path)
-
-        with open(self.bm25_index_path, 'wb') as f:
-            pickle.dump((self.bm25, self.bm25_corpus), f)
-
+        # Pages, their order and the BM25 index live in pages.db; vectors in the FAISS log.
         with open(self.state_path, 'w') as f:
             json.dump({
                 "last_processed_id": self.last_processed_id,
-                "lightweight_memory": self.lightweight_memory,
-                "page_ids_list": self.page_ids_list # Persist list order
+                "lightweight_memory": self.lightweight_memory
             }, f)
 
     def _get_db_connection(self):
@@ -388,14 +420,12 @@ class Memorizer:
                 page = Page(id=page_id, header=header, content=chunk_content, timestamp=time.time())
 
                 # 4. Update Indices (Blocking, run in thread)
-                def update_indices():
-                    text_to_embed = f"{header}\n{chunk_content}"
-                    embedding = self.embedding_model.encode([text_to_embed])[0]
-                    self.faiss_index.add(np.array([embedding], dtype=np.float32))
+                text_to_embed = f"{header}\n{chunk_content}"
+                embedding = (await self.embedding_model.aencode([text_to_embed]))[0]
 
-                    tokenized_doc = text_to_embed.lower().split()
-                    self.bm25_corpus.append(tokenized_doc)
-                    self.bm25 = BM25Okapi(self.bm25_corpus)
+                def update_indices():
+                    self.append_vector(embedding)
+                    self.bm25_index.add_document(page_id, text_to_embed)
 
                 await loop.run_in_executor(executor, update_indices)
 
@@ -477,11 +507,15 @@ class Researcher:
 
             # 2. Search (Parallel)
             logger.info(f"Executing queries: {queries}")
-            for q in queries:
-                # Run search in thread
-                loop = asyncio.get_running_loop()
-                results = await loop.run_in_executor(executor, self._search, q, 3)
-
+            # All queries are embedded in one batch, then searched in threads
+            embeddings = await self.memorizer.embedding_model.aencode(queries)
+            loop = asyncio.get_running_loop()
+            all_results = await asyncio.gather(*[
+                loop.run_in_executor(executor, self._search, q, 3, embedding)
+                for q, embedding in zip(queries, embeddings)
+            ])
+
+            for results in all_results:
                 for res in results:
                     collected_pages[res['id']] = res
 
@@ -512,13 +546,14 @@ class Researcher:
         final_answer = await self.llm_client.generate(final_answer_prompt)
         return final_answer
 
-    def _search(self, query: str, k=3) -> List[Dict]:
+    def _search(self, query: str, k=3, embedding=None) -> List[Dict]:
         results = []
         if not self.memorizer.faiss_index or self.memorizer.faiss_index.ntotal == 0:
             return []
 
         # Vector Search
-        embedding = self.memorizer.embedding_model.encode([query])[0]
+        if embedding is None:
+            embedding = self.memorizer.embedding_model.encode([query])[0]
         D, I = self.memorizer.faiss_index.search(np.array([embedding], dtype=np.float32), k)
 
         for i, idx in enumerate(I[0]):
@@ -533,24 +568,17 @@ class Researcher:
                         "score": float(D[0][i])
                     })
 
-        # Keyword Search (BM25)
-        if self.memorizer.bm25:
-            tokenized_query = query.lower().split()
-            scores = self.memorizer.bm25.get_scores(tokenized_query)
-            top_n = np.argsort(scores)[::-1][:k]
-
-            for idx in top_n:
-                if scores[idx] > 0 and idx < len(self.memorizer.page_ids_list):
-                    pid = self.memorizer.page_ids_list[idx]
-                    if not any(r['id'] == pid for r in results):
-                         page = self.memorizer.get_page(pid)
-                         if page:
-                            results.append({
-                                "id": pid,
-                                "header": page.header,
-                                "content": page.content,
-                                "score": float(scores[idx])
-                            })
+        # Keyword Search (BM25), scoring only the postings of the query terms
+        for pid, score in self.memorizer.bm25_index.search(query, k):
+            if not any(r['id'] == pid for r in results):
+                page = self.memorizer.get_page(pid)
+                if page:
+                    results.append({
+                        "id": pid,
+                        "header": page.header,
+                        "content": page.content,
+                        "score": score
+                    })
 
         return results
 
@@ -572,6 +600,9 @@ async def lifespan(app: FastAPI):
 
     yield
 
+    # Fold the vector log into the index so the next start does not replay it
+    await asyncio.get_running_loop().run_in_executor(executor, memorizer_instance.snapshot_faiss)
+
     if researcher_instance and researcher_instance.llm_client:
         await researcher_instance.llm_client.close()
 
@@ -9,6 +9,7 @@ import logging
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass, field
 from cryptography.fernet import Fernet, InvalidToken
+from pipecatapp.utils.embedding_service import get_embedding_service
 
 @dataclass
 class Document:
@@ -23,13 +24,13 @@ class Document:
 class MemoryStore:
     """Manages the agent's long-term memory using a vector database.
 
-    This class handles the storage and retrieval of textual memories. It uses a
-    SentenceTransformer model to create vector embeddings of text, a FAISS index
+    This class handles the storage and retrieval of textual memories. It uses the
+    shared embedding service to create vector embeddings of text, a FAISS index
     for efficient similarity searching, and a JSON file to store the actual
     text content.
 
     Attributes:
-        embedding_model: The SentenceTransformer model for creating embeddings.
+        embedding_model: The shared EmbeddingService for creating embeddings.
         dimension (int): The dimensionality of the embeddings.
         index_file (str): The path to the FAISS index file.
         store_file (str): The path to the JSON file for text storage.
@@ -52,7 +53,7 @@ class MemoryStore:
         """
         # The embedding model is now managed by Ansible and placed in a predictable location.
         embedding_model_path = "/opt/nomad/models/embedding/bge-large-en-v1.5"
-        self.embedding_model = SentenceTransformer(embedding_model_path)
+        self.embedding_model = get_embedding_service(embedding_model_path, loader=SentenceTransformer)
         self.dimension = self.embedding_model.get_sentence_embedding_dimension()
         self.index_file = index_file
         self.store_file = store_file
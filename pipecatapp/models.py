@@ -14,6 +14,10 @@ class InternalChatRequest(BaseModel):
     audio_url: Optional[HttpUrl] = Field(None, description="URL to an audio file for the user's message.")
     audio_base64: Optional[str] = Field(None, description="Base64 encoded audio content.")
 
+    # Streaming support: response deltas are posted to stream_url as they are generated
+    stream: bool = Field(False, description="Whether to stream the response incrementally.")
+    stream_url: Optional[HttpUrl] = Field(None, description="The URL where streamed response deltas should be sent.")
+
     # Allow passing through other metadata
     extra_fields: Dict[str, Any] = Field(default_factory=dict)
 
@@ -3,9 +3,138 @@ import json
 import time
 import hashlib
 import asyncio
+import logging
 import os
+import queue
+import threading
 import uuid
-from typing import Dict, Any, Optional, List
+from concurrent.futures import Future
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+# json.dumps(sort_keys=True) builds a new encoder per call; hashing reuses one
+_HASH_ENCODER = json.JSONEncoder(sort_keys=True)
+
+
+def _routing_value(value: Any) -> Optional[str]:
+    """Normalizes a meta session_id/task_id for its indexed column."""
+    return None if value is None else str(value)
+
+
+class _AppendRequest:
+    """Events queued for the ledger writer, plus the future resolved once they are committed.
+
+    Requests made from an event loop carry an asyncio future on that loop,
+    so a whole batch can be resolved with one callback per loop.
+    """
+    __slots__ = ("events", "future", "loop")
+
+    def __init__(self, events: List[Tuple[float, str, str, Dict[str, Any]]],
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.events = events
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else Future()
+
+
+def _settle(futures: List[asyncio.Future], error: Optional[BaseException]):
+    for future in futures:
+        if future.done():
+            continue
+        if error is None:
+            future.set_result(None)
+        else:
+            future.set_exception(error)
+
+
+class EventSubscription:
+    """New ledger events matching a filter, handed to an asyncio consumer as they are committed.
+
+    Events are pushed from whichever thread commits them onto the loop that
+    created the subscription. Use as an async iterator, or call `get`, and
+    `close` it when done.
+    """
+    def __init__(self, memory: "PMMMemory", loop: asyncio.AbstractEventLoop, kind: Optional[str] = None,
+                 task_ids: Optional[Iterable[str]] = None, session_id: Optional[str] = None):
+        self.memory = memory
+        self.loop = loop
+        self.kind = kind
+        self.task_ids = None if task_ids is None else {str(task_id) for task_id in task_ids}
+        self.session_id = _routing_value(session_id)
+        self._queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        # Live events delivered while a backlog read is pending; None when there is none
+        self._seen_ids: Optional[set] = None
+        # Events up to this id came with the backlog
+        self._high_water = 0
+        self.closed = False
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        meta = event.get("meta") or {}
+        if self.kind is not None and event.get("kind") != self.kind:
+            return False
+        if self.task_ids is not None and _routing_value(meta.get("task_id")) not in self.task_ids:
+            return False
+        if self.session_id is not None and _routing_value(meta.get("session_id")) != self.session_id:
+            return False
+        return True
+
+    def _notify(self, events: List[Dict[str, Any]]):
+        """Called from the committing thread."""
+        matching = [event for event in events if self.matches(event)]
+        if matching:
+            try:
+                self.loop.call_soon_threadsafe(self._put, matching)
+            except RuntimeError:
+                # The subscriber's loop is gone
+                self.memory._unsubscribe(self)
+
+    def _put(self, events: List[Dict[str, Any]]):
+        for event in events:
+            # An event can arrive both live and from the backlog read at subscribe time
+            if event["id"] <= self._high_water:
+                continue
+            if self._seen_ids is not None:
+                if event["id"] in self._seen_ids:
+                    continue
+                self._seen_ids.add(event["id"])
+            self._queue.put_nowait(event)
+
+    def _replay(self, events: List[Dict[str, Any]]):
+        """Delivers the backlog read at subscribe time.
+
+        Ids grow in commit order, so every matching event up to the newest one
+        read is in the backlog; later live copies are dropped by id alone.
+        """
+        self._put(events)
+        if events:
+            self._high_water = max(self._high_water, events[-1]["id"])
+        self._seen_ids = None
+
+    async def get(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Returns the next event. Raises asyncio.TimeoutError after `timeout` seconds, or StopAsyncIteration once closed."""
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        event = await asyncio.wait_for(self._queue.get(), timeout)
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        return await self.get()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.memory._unsubscribe(self)
+            self._queue.put_nowait(None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 
 class PMMMemory:
     """A memory store based on the Persistent Mind Model's event-sourcing.
@@ -14,16 +143,26 @@ class PMMMemory:
     for persistent AI memory. It uses a SQLite database as an append-only
     ledger for events.
 
+    Event appends are group-committed: whatever is queued (up to `batch_size`
+    events) is hashed onto the chain in order and written in one transaction,
+    so concurrent appends share a commit. Synchronous callers commit from
+    their own thread; async callers are served by a dedicated writer thread.
+    Committed events are pushed to the subscriptions made with `subscribe`.
+
     Attributes:
         db_path (str): The path to the SQLite database file.
         conn: The database connection object.
     """
-    def __init__(self, db_path: str = "pmm_memory.db"):
+    def __init__(self, db_path: str = "pmm_memory.db", batch_size: int = 512, flush_interval: float = 0.002):
         """Initializes the PMMMemory store.
 
         Args:
             db_path (str, optional): The path to the SQLite database file.
                 Defaults to "pmm_memory.db".
+            batch_size (int, optional): Maximum number of events per write
+                transaction. Defaults to 512.
+            flush_interval (float, optional): Seconds the writer lingers for
+                more events when appends arrive concurrently. Defaults to 0.002.
         """
         self.db_path = os.path.expanduser(db_path)
         # Ensure the directory exists
@@ -31,6 +170,15 @@ class PMMMemory:
         if db_dir:
             os.makedirs(db_dir, exist_ok=True)
         self.conn = self._init_db()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._write_queue: "queue.Queue[Optional[_AppendRequest]]" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._subscriptions: List[EventSubscription] = []
+        self._subscriptions_lock = threading.Lock()
 
     def _init_db(self):
         """Initializes the SQLite database and creates the events table."""
@@ -46,10 +194,19 @@ class PMMMemory:
                 content TEXT,
                 meta TEXT,
                 prev_hash TEXT,
-                hash TEXT UNIQUE
+                hash TEXT UNIQUE,
+                session_id TEXT,
+                task_id TEXT
             )
         """)
+        self._migrate_event_columns(conn)
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_kind ON events(kind);")
+        # session_id/task_id are copied out of meta on write, so per-session reads are an index range scan
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_session ON events(session_id);")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_task ON events(task_id);")
+        # Time-ordered reads (e.g. the sharded k-way merge) walk these instead of sorting
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp);")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_events_kind_timestamp ON events(kind, timestamp);")
 
         # Gas Town Work Ledger (Beads) Table
         cursor.execute("""
@@ -95,6 +252,35 @@ class PMMMemory:
         conn.commit()
         return conn
 
+    def _migrate_event_columns(self, conn: sqlite3.Connection):
+        """Adds the session_id/task_id columns to ledgers created before they existed and backfills them from meta."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(events)")}
+        missing = [column for column in ("session_id", "task_id") if column not in columns]
+        if not missing:
+            return
+        logging.info(f"Migrating events table in {self.db_path}: adding {', '.join(missing)}")
+        for column in missing:
+            conn.execute(f"ALTER TABLE events ADD COLUMN {column} TEXT")
+        try:
+            conn.execute("""
+                UPDATE events
+                SET session_id = json_extract(meta, '$.session_id'),
+                    task_id = json_extract(meta, '$.task_id')
+                WHERE json_valid(meta)
+            """)
+        except sqlite3.OperationalError:
+            # SQLite built without JSON1: backfill row by row
+            rows = conn.execute("SELECT id, meta FROM events WHERE meta IS NOT NULL").fetchall()
+            updates = []
+            for event_id, meta in rows:
+                try:
+                    meta = json.loads(meta)
+                except ValueError:
+                    continue
+                if isinstance(meta, dict):
+                    updates.append((_routing_value(meta.get("session_id")), _routing_value(meta.get("task_id")), event_id))
+            conn.executemany("UPDATE events SET session_id = ?, task_id = ? WHERE id = ?", updates)
+
     def _get_last_hash(self) -> Optional[str]:
         """Retrieves the hash of the most recent event in the ledger.
 
@@ -127,29 +313,265 @@ class PMMMemory:
             "meta": meta,
             "prev_hash": prev_hash,
         }
-        hasher.update(json.dumps(payload, sort_keys=True).encode('utf-8'))
+        hasher.update(_HASH_ENCODER.encode(payload).encode('utf-8'))
         return hasher.hexdigest()
 
+    # -------------------------------------------------------------------------
+    # Ledger Writer
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _event_rows(events: List[Dict[str, Any]]) -> List[Tuple[float, str, str, Dict[str, Any]]]:
+        now = time.time()
+        return [
+            (event.get("timestamp") or now, event["kind"], event["content"], event.get("meta") or {}) for event in events
+        ]
+
+    def _new_request(self, events: List[Dict[str, Any]],
+                     loop: Optional[asyncio.AbstractEventLoop] = None) -> _AppendRequest:
+        request = _AppendRequest(self._event_rows(events), loop)
+        if not request.events:
+            request.future.set_result(None)
+        return request
+
+    def _append_sync(self, events: List[Dict[str, Any]]):
+        """Appends events from the calling thread, committing everything queued so far with them."""
+        if not events:
+            return
+        if self._write_queue.empty() and self._commit_lock.acquire(blocking=False):
+            # Uncontended: nothing to take along, so write directly without a future
+            try:
+                if self._write_queue.empty():
+                    rows = self._event_rows(events)
+                    try:
+                        last_id = self._write_events(rows)
+                    except Exception as e:
+                        logging.error(f"Failed to append {len(rows)} event(s) to {self.db_path}: {e}")
+                        raise
+                    self._notify(rows, last_id)
+                    return
+            finally:
+                self._commit_lock.release()
+
+        request = self._new_request(events)
+        # Another commit is in flight or requests are queued; whoever holds the lock next takes us along
+        self._write_queue.put(request)
+        with self._commit_lock:
+            if not request.future.done():
+                batch = self._drain([])
+                if batch:
+                    self._commit_batch(batch)
+        # If the writer thread picked the request up first, it commits it
+        request.future.result()
+
+    async def _append(self, events: List[Dict[str, Any]]):
+        request = self._new_request(events, asyncio.get_running_loop())
+        if not request.future.done():
+            self._write_queue.put(request)
+            self._ensure_writer()
+        await request.future
+
+    def _ensure_writer(self):
+        if self._writer is not None and self._writer.is_alive():
+            return
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, name=f"pmm-writer-{os.path.basename(self.db_path)}", daemon=True)
+                self._writer.start()
+
+    def _writer_loop(self):
+        """Commits appends made from the event loop, so they never wait on the disk in the loop's thread."""
+        while True:
+            first = self._write_queue.get()
+            if first is None:
+                return
+            with self._commit_lock:
+                self._commit_batch(self._drain([first], linger=True))
+
+    def _drain(self, batch: List[_AppendRequest], linger: bool = False) -> List[_AppendRequest]:
+        """Adds queued requests to `batch` until it holds `batch_size` events or the queue runs dry.
+
+        With `linger`, a batch that already has company waits up to
+        `flush_interval` for more; a lone append is never delayed.
+        """
+        count = sum(len(request.events) for request in batch)
+        deadline = time.monotonic() + self.flush_interval
+        while count < self.batch_size:
+            try:
+                request = self._write_queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if not linger or len(batch) < 2 or remaining <= 0:
+                    break
+                try:
+                    request = self._write_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if request is None:
+                # Leave the stop signal for the writer thread
+                self._write_queue.put(None)
+                break
+            batch.append(request)
+            count += len(request.events)
+        return batch
+
+    def _get_write_conn(self) -> sqlite3.Connection:
+        # A file database gets its own write connection, so write transactions never
+        # interleave with statements issued on self.conn from other threads.
+        if self._write_conn is None:
+            if self.db_path == ":memory:":
+                self._write_conn = self.conn
+            else:
+                self._write_conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                # synchronous is per connection; match the one _init_db configures
+                self._write_conn.execute("PRAGMA synchronous=NORMAL;")
+        return self._write_conn
+
+    def _write_events(self, events: List[Tuple[float, str, str, Dict[str, Any]]]) -> int:
+        """Hashes events onto the chain in order and writes them in one transaction.
+
+        Must be called with `_commit_lock` held. Returns the id of the last event written.
+        """
+        conn = self._get_write_conn()
+        try:
+            # BEGIN IMMEDIATE takes the write lock first, so the tip cannot move under us
+            # even if another process appends to the same ledger.
+            if not conn.in_transaction:
+                conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT hash FROM events ORDER BY id DESC LIMIT 1").fetchone()
+            prev_hash = row[0] if row else None
+            rows = []
+            for timestamp, kind, content, meta in events:
+                event_hash = self._calculate_hash(timestamp, kind, content, meta, prev_hash)
+                rows.append((
+                    timestamp, kind, content, json.dumps(meta), prev_hash, event_hash,
+                    _routing_value(meta.get("session_id")), _routing_value(meta.get("task_id"))
+                ))
+                prev_hash = event_hash
+            sql = """
+                INSERT INTO events (timestamp, kind, content, meta, prev_hash, hash, session_id, task_id)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """
+            if len(rows) == 1:
+                last_id = conn.execute(sql, rows[0]).lastrowid
+            else:
+                conn.executemany(sql, rows)
+                # The write lock is held, so the batch got consecutive ids
+                last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+            conn.commit()
+        except Exception:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                pass
+            raise
+        return last_id
+
+    def _commit_batch(self, batch: List[_AppendRequest]):
+        """Writes a batch of requests in queue order and resolves their futures.
+
+        Must be called with `_commit_lock` held.
+        """
+        events = [event for request in batch for event in request.events]
+        try:
+            last_id = self._write_events(events)
+        except Exception as e:
+            logging.error(f"Failed to append a batch of {len(batch)} request(s) to {self.db_path}: {e}")
+            self._resolve(batch, e)
+            return
+        self._resolve(batch, None)
+        self._notify(events, last_id)
+
+    @staticmethod
+    def _resolve(batch: List[_AppendRequest], error: Optional[BaseException]):
+        """Settles the futures of a committed batch, waking each event loop once."""
+        by_loop: Dict[asyncio.AbstractEventLoop, List[asyncio.Future]] = {}
+        for request in batch:
+            if request.loop is None:
+                if error is None:
+                    request.future.set_result(None)
+                else:
+                    request.future.set_exception(error)
+            else:
+                by_loop.setdefault(request.loop, []).append(request.future)
+        for loop, futures in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(_settle, futures, error)
+            except RuntimeError:
+                # The loop was closed; nobody is left waiting on these
+                pass
+
+    def _notify(self, events: List[Tuple[float, str, str, Dict[str, Any]]], last_id: int):
+        """Pushes committed events to the subscriptions."""
+        if not self._subscriptions:
+            return
+        first_id = last_id - len(events) + 1
+        committed = [
+            {"id": first_id + i, "timestamp": timestamp, "kind": kind, "content": content, "meta": meta}
+            for i, (timestamp, kind, content, meta) in enumerate(events)
+        ]
+        with self._subscriptions_lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription._notify(committed)
+
+    async def subscribe(self, kind: Optional[str] = None, task_ids: Optional[Iterable[str]] = None,
+                        session_id: Optional[str] = None, include_existing: bool = False) -> EventSubscription:
+        """Subscribes to events as they are committed.
+
+        Args:
+            kind (Optional[str], optional): Only deliver events of this kind.
+            task_ids (Optional[Iterable[str]], optional): Only deliver events
+                whose meta task_id is one of these.
+            session_id (Optional[str], optional): Only deliver events whose
+                meta carries this session_id.
+            include_existing (bool, optional): Also deliver matching events
+                committed before the subscription, so nothing committed in
+                between is missed. Needs a task_ids or session_id filter.
+                Defaults to False.
+
+        Returns:
+            An EventSubscription bound to the running event loop.
+        """
+        subscription = EventSubscription(self, asyncio.get_running_loop(), kind, task_ids, session_id)
+        replay = include_existing and (subscription.task_ids is not None or subscription.session_id is not None)
+        if replay:
+            subscription._seen_ids = set()
+        with self._subscriptions_lock:
+            self._subscriptions.append(subscription)
+        if replay:
+            # Registered first, so anything committed after this read is delivered live
+            loop = asyncio.get_running_loop()
+            existing = await loop.run_in_executor(None, self._matching_events_sync, subscription)
+            subscription._replay(existing)
+        return subscription
+
+    def _matching_events_sync(self, subscription: EventSubscription) -> List[Dict[str, Any]]:
+        events = []
+        if subscription.task_ids is not None:
+            for task_id in subscription.task_ids:
+                events.extend(self.get_events_sync(subscription.kind, -1, session_id=subscription.session_id, task_id=task_id))
+        else:
+            events = self.get_events_sync(subscription.kind, -1, session_id=subscription.session_id)
+        return sorted(events, key=lambda event: event["id"])
+
+    def _unsubscribe(self, subscription: EventSubscription):
+        with self._subscriptions_lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
     def add_event_sync(self, kind: str, content: str, meta: Optional[Dict[str, Any]] = None) -> None:
         """Adds a new event to the memory ledger synchronously.
 
+        Blocks until the event is committed.
+
         Args:
             kind (str): The type of event (e.g., 'user_message', 'assistant_message').
             content (str): The content of the event.
             meta (Optional[Dict[str, Any]], optional): Additional metadata.
                 Defaults to None.
         """
-        meta = meta or {}
-        timestamp = time.time()
-        prev_hash = self._get_last_hash()
-        event_hash = self._calculate_hash(timestamp, kind, content, meta, prev_hash)
-
-        cursor = self.conn.cursor()
-        cursor.execute("""
-            INSERT INTO events (timestamp, kind, content, meta, prev_hash, hash)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (timestamp, kind, content, json.dumps(meta), prev_hash, event_hash))
-        self.conn.commit()
+        self._append_sync([{"kind": kind, "content": content, "meta": meta}])
 
     async def add_event(self, kind: str, content: str, meta: Optional[Dict[str, Any]] = None) -> None:
         """Adds a new event to the memory ledger asynchronously.
@@ -160,26 +582,86 @@ class PMMMemory:
             meta (Optional[Dict[str, Any]], optional): Additional metadata.
                 Defaults to None.
         """
-        loop = asyncio.get_running_loop()
-        await loop.run_in_executor(None, self.add_event_sync, kind, content, meta)
+        await self._append([{"kind": kind, "content": content, "meta": meta}])
+
+    def add_events_bulk_sync(self, events: List[Dict[str, Any]]) -> None:
+        """Appends several events, in order, in a single transaction.
+
+        Args:
+            events (List[Dict[str, Any]]): Events with 'kind', 'content' and
+                optionally 'meta' and 'timestamp' keys. Events without a
+                timestamp are stamped with the current time.
+        """
+        self._append_sync(events)
+
+    async def add_events_bulk(self, events: List[Dict[str, Any]]) -> None:
+        """Appends several events, in order, in a single transaction asynchronously.
+
+        Args:
+            events (List[Dict[str, Any]]): Events with 'kind', 'content' and
+                optionally 'meta' and 'timestamp' keys.
+        """
+        await self._append(events)
+
+    def verify_chain_sync(self) -> bool:
+        """Checks that every event links to its predecessor and that its hash matches its contents."""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT timestamp, kind, content, meta, prev_hash, hash FROM events ORDER BY id ASC")
+        prev_hash = None
+        for timestamp, kind, content, meta, stored_prev, stored_hash in cursor:
+            if stored_prev != prev_hash:
+                return False
+            if self._calculate_hash(timestamp, kind, content, json.loads(meta) if meta else {}, stored_prev) != stored_hash:
+                return False
+            prev_hash = stored_hash
+        return True
+
+    def get_events_sync(self, kind: Optional[str] = None, limit: int = 10, before_id: Optional[int] = None, after_ts: Optional[float] = None,
+                        session_id: Optional[str] = None, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves events from the ledger synchronously.
 
-    def get_events_sync(self, kind: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
-        """Retrieves the most recent events from the ledger synchronously.
+        By default this returns the most recent events. `before_id` pages
+        backwards from an earlier result; `after_ts` instead returns the
+        oldest events newer than that timestamp, for reading forwards.
 
         Args:
             kind (Optional[str], optional): The type of events to retrieve.
                 If None, retrieves all kinds. Defaults to None.
             limit (int, optional): The maximum number of events to retrieve.
                 Defaults to 10.
+            before_id (Optional[int], optional): Only return events with a
+                smaller id. Defaults to None.
+            after_ts (Optional[float], optional): Only return events with a
+                later timestamp. Defaults to None.
+            session_id (Optional[str], optional): Only return events whose
+                meta carries this session_id. Defaults to None.
+            task_id (Optional[str], optional): Only return events whose meta
+                carries this task_id. Defaults to None.
 
         Returns:
-            A list of dictionaries, where each dictionary represents an event.
+            A list of dictionaries, where each dictionary represents an event,
+            oldest first.
         """
-        cursor = self.conn.cursor()
+        clauses, params = [], []
         if kind:
-            cursor.execute("SELECT id, timestamp, kind, content, meta FROM events WHERE kind = ? ORDER BY id DESC LIMIT ?", (kind, limit))
-        else:
-            cursor.execute("SELECT id, timestamp, kind, content, meta FROM events ORDER BY id DESC LIMIT ?", (limit,))
+            clauses.append("kind = ?")
+            params.append(kind)
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(str(session_id))
+        if task_id is not None:
+            clauses.append("task_id = ?")
+            params.append(str(task_id))
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        if after_ts is not None:
+            clauses.append("timestamp > ?")
+            params.append(after_ts)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        order = "timestamp ASC, id ASC" if after_ts is not None else "id DESC"
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT id, timestamp, kind, content, meta FROM events {where} ORDER BY {order} LIMIT ?", (*params, limit))
         rows = cursor.fetchall()
         events = []
         for row in rows:
@@ -191,22 +673,16 @@ class PMMMemory:
                 "content": row[3],
                 "meta": meta
             })
-        return list(reversed(events))
+        return events if after_ts is not None else list(reversed(events))
 
-    async def get_events(self, kind: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
-        """Retrieves the most recent events from the ledger asynchronously.
-
-        Args:
-            kind (Optional[str], optional): The type of events to retrieve.
-                If None, retrieves all kinds. Defaults to None.
-            limit (int, optional): The maximum number of events to retrieve.
-                Defaults to 10.
+    async def get_events(self, kind: Optional[str] = None, limit: int = 10, before_id: Optional[int] = None, after_ts: Optional[float] = None,
+                         session_id: Optional[str] = None, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves events from the ledger asynchronously.
 
-        Returns:
-            A list of dictionaries, where each dictionary represents an event.
+        See `get_events_sync` for the arguments.
         """
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self.get_events_sync, kind, limit)
+        return await loop.run_in_executor(None, self.get_events_sync, kind, limit, before_id, after_ts, session_id, task_id)
 
     # -------------------------------------------------------------------------
     # Gas Town Work Ledger Methods
@@ -570,6 +1046,11 @@ class PMMMemory:
         return await loop.run_in_executor(None, self.update_dlq_item_sync, item_id, status, result, retry_after, increment_retry)
 
     def close(self):
-        """Closes the database connection."""
+        """Flushes queued events, stops the writer and closes the database connection."""
+        if self._writer is not None and self._writer.is_alive():
+            self._write_queue.put(None)
+            self._writer.join()
+        if self._write_conn is not None and self._write_conn is not self.conn:
+            self._write_conn.close()
         if self.conn:
             self.conn.close()
@@ -1,8 +1,89 @@
+import asyncio
 import httpx
+import json
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterable
 import os
 
+
+class RemoteEventSubscription:
+    """
+    A Server-Sent Events stream of new events from the memory service.
+
+    Offers the same `get`/async-iteration/`close` interface as a local
+    EventSubscription. If the stream breaks, `get` raises the error.
+    """
+    def __init__(self, url: str, params: Dict[str, Any], transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.url = url
+        self.params = params
+        self.transport = transport
+        self.logger = logging.getLogger(__name__)
+        self._queue: "asyncio.Queue[Optional[Dict[str, Any]]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+        self.closed = False
+
+    async def open(self) -> "RemoteEventSubscription":
+        """Connects, returning once the service has registered the subscription."""
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        await ready
+        return self
+
+    async def _run(self, ready: asyncio.Future):
+        try:
+            # No read timeout: the service sends keepalive comments on quiet streams
+            async with httpx.AsyncClient(transport=self.transport, timeout=httpx.Timeout(None, connect=10.0)) as client:
+                async with client.stream("GET", self.url, params=self.params) as resp:
+                    resp.raise_for_status()
+                    ready.set_result(None)
+                    data = []
+                    async for line in resp.aiter_lines():
+                        if line.startswith("data:"):
+                            data.append(line[5:].lstrip())
+                        elif not line and data:
+                            self._queue.put_nowait(json.loads("\n".join(data)))
+                            data = []
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif not self.closed:
+                self.logger.error(f"Event stream from memory service broke: {e}")
+                self._error = e
+        finally:
+            self._queue.put_nowait(None)
+
+    async def get(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Returns the next event. Raises asyncio.TimeoutError after `timeout` seconds, or StopAsyncIteration once the stream ends."""
+        event = await asyncio.wait_for(self._queue.get(), timeout)
+        if event is None:
+            # Keep the end marker for any later call
+            self._queue.put_nowait(None)
+            if self._error is not None:
+                raise self._error
+            raise StopAsyncIteration
+        return event
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Dict[str, Any]:
+        return await self.get()
+
+    def close(self):
+        self.closed = True
+        if self._task is not None:
+            self._task.cancel()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 class PMMMemoryClient:
     """
     A client for the remote PMM Memory Service.
@@ -74,6 +155,18 @@ class PMMMemoryClient:
             self.logger.error(f"Failed to get events from memory service: {e}")
             return []
 
+    async def subscribe(self, kind: Optional[str] = None, task_ids: Optional[Iterable[str]] = None,
+                        session_id: Optional[str] = None, include_existing: bool = False) -> RemoteEventSubscription:
+        """Subscribes to events as the memory service commits them. See PMMMemory.subscribe."""
+        params: Dict[str, Any] = {"include_existing": str(include_existing).lower()}
+        if kind:
+            params["kind"] = kind
+        if task_ids is not None:
+            params["task_id"] = [str(task_id) for task_id in task_ids]
+        if session_id is not None:
+            params["session_id"] = session_id
+        return await RemoteEventSubscription(f"{self.base_url}/events/stream", params).open()
+
     # -------------------------------------------------------------------------
     # Gas Town Work Ledger Client Methods
     # -------------------------------------------------------------------------
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import httpx
+
+
+class ResponseStreamer:
+    """
+    Streams the agent's response back to the MoE Gateway as it is generated.
+
+    LLM nodes feed tokens through `begin()`/`feed()`. Deltas are queued and sent
+    by a single background task so token generation never waits on the network;
+    deltas that pile up while a POST is in flight are coalesced into the next one.
+
+    Output that looks like a tool call (a JSON object or fenced block) is held
+    back, since the workflow will execute it rather than show it to the user.
+    `finish()` sends whatever part of the final response was not streamed yet.
+    """
+    def __init__(self, http_client: httpx.AsyncClient, stream_url: str, request_id: str, headers: Optional[dict] = None):
+        """
+        Initializes the streamer.
+
+        Args:
+            http_client (httpx.AsyncClient): Client used to post deltas.
+            stream_url (str): The gateway's streaming callback URL (already validated).
+            request_id (str): The gateway request this stream belongs to.
+            headers (dict, optional): Extra headers, e.g. the Host header for a pinned IP.
+        """
+        self.http_client = http_client
+        self.stream_url = stream_url
+        self.request_id = request_id
+        self.headers = headers or {}
+        self.sent_text = ""
+        self._segment = ""
+        self._emitted = 0
+        self._holding = False
+        self._pending: list[str] = []
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._sender = asyncio.create_task(self._run())
+
+    def begin(self):
+        """Starts a new LLM generation. Each workflow step may produce one."""
+        self._segment = ""
+        self._emitted = 0
+        self._holding = False
+
+    async def feed(self, delta: str):
+        """Accepts a token delta from the current generation."""
+        if not delta or self._holding:
+            return
+        self._segment += delta
+        stripped = self._segment.lstrip()
+        if not stripped:
+            return
+        if stripped.startswith("{") or stripped.startswith("`"):
+            # Looks like a tool call; the parser decides once generation completes.
+            self._holding = True
+            return
+        # Search the whole segment: a brace or fence may be split across deltas.
+        cuts = [i for i in (self._segment.find("{"), self._segment.find("```")) if i != -1]
+        if cuts:
+            # The model is chatting before a tool call; stop at it.
+            self._holding = True
+            end = min(cuts)
+        else:
+            # Trailing backticks may be the start of a fence.
+            end = len(self._segment.rstrip("`"))
+        if end > self._emitted:
+            text = self._segment[self._emitted:end]
+            if not self._emitted and self._streamed_text():
+                # Separate this step's text from what earlier steps streamed.
+                text = "\n\n" + text.lstrip()
+            self._enqueue(text)
+            self._emitted = end
+
+    async def finish(self, final_text: str):
+        """Sends the unstreamed remainder of the final response and closes the stream."""
+        # Only the current generation can be the final answer; text streamed by
+        # earlier steps (e.g. before a tool call) is not part of it.
+        shown = self._segment[:self._emitted].lstrip()
+        if not shown:
+            remainder = ("\n\n" if self._streamed_text() else "") + final_text
+        else:
+            # The parser may have trimmed what was shown; pick up where they differ.
+            remainder = final_text[len(os.path.commonprefix([shown, final_text])):]
+        if remainder:
+            self._enqueue(remainder)
+        self._closed = True
+        self._wakeup.set()
+        await self._sender
+
+    async def close(self):
+        """Stops the sender without completing the stream (e.g. on error)."""
+        if not self._sender.done():
+            self._sender.cancel()
+            try:
+                await self._sender
+            except asyncio.CancelledError:
+                pass
+
+    def _streamed_text(self) -> str:
+        return self.sent_text + "".join(self._pending)
+
+    def _enqueue(self, delta: str):
+        self._pending.append(delta)
+        self._wakeup.set()
+
+    async def _post(self, payload: dict):
+        try:
+            await self.http_client.post(self.stream_url, json=payload, headers=self.headers)
+        except Exception as e:
+            logging.error(f"Failed to stream response chunk for request {self.request_id}: {e}")
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self._pending:
+                delta = "".join(self._pending)
+                self._pending = []
+                self.sent_text += delta
+                await self._post({"request_id": self.request_id, "delta": delta})
+            if self._closed and not self._pending:
+                await self._post({"request_id": self.request_id, "done": True})
+                return
@@ -0,0 +1,208 @@
+import asyncio
+import logging
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+import httpx
+
+try:
+    from .secret_manager import secret_manager
+except ImportError:
+    from pipecatapp.secret_manager import secret_manager
+
+
+class ServiceInstance:
+    """A passing instance of a Consul service, with its in-flight request count."""
+    def __init__(self, address: str, port: int):
+        self.address = address
+        self.port = port
+        self.outstanding = 0
+
+    @property
+    def key(self) -> str:
+        return f"{self.address}:{self.port}"
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.address}:{self.port}"
+
+
+class Upstream:
+    """A leased instance plus the pooled keep-alive client for it."""
+    def __init__(self, instance: ServiceInstance, client: httpx.AsyncClient):
+        self.instance = instance
+        self.client = client
+
+    @property
+    def base_url(self) -> str:
+        return self.instance.base_url
+
+
+class ServiceDiscovery:
+    """
+    Shared Consul discovery and HTTP transport for calls to cluster services.
+
+    Healthy instances are cached per service for `ttl` seconds. When Consul
+    returns an `X-Consul-Index`, a background blocking query keeps the entry
+    current, so steady-state lookups never leave the process. While that
+    query is failing the entry expires after `ttl` again. Requests are
+    balanced across all passing instances by least-outstanding-requests, and
+    each upstream gets its own keep-alive connection pool.
+    """
+    def __init__(self, consul_http_addr: str, ttl: float = 10.0, blocking_wait: str = "30s",
+                 max_connections: int = 32, max_keepalive_connections: int = 16):
+        self.consul_http_addr = consul_http_addr.rstrip("/")
+        self.ttl = ttl
+        self.blocking_wait = blocking_wait
+        self.limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections)
+        self._instances: Dict[str, List[ServiceInstance]] = {}
+        self._fetched_at: Dict[str, float] = {}
+        self._watches: Dict[str, asyncio.Task] = {}
+        # Whether each watch's last blocking query succeeded
+        self._watch_healthy: Dict[str, bool] = {}
+        self._refresh_locks: Dict[str, asyncio.Lock] = {}
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._consul_client: Optional[httpx.AsyncClient] = None
+
+    async def _open_client(self, **kwargs) -> httpx.AsyncClient:
+        # Entering the client opens its transport; it is exited again in aclose().
+        return await httpx.AsyncClient(limits=self.limits, **kwargs).__aenter__()
+
+    async def consul_client(self) -> httpx.AsyncClient:
+        """The pooled client used for Consul API calls."""
+        if self._consul_client is None:
+            token = secret_manager.get_secret("CONSUL_HTTP_TOKEN")
+            headers = {"X-Consul-Token": token} if token else {}
+            self._consul_client = await self._open_client(headers=headers)
+        return self._consul_client
+
+    async def client_for(self, instance: ServiceInstance) -> httpx.AsyncClient:
+        """Returns the keep-alive client for an upstream, creating it on first use."""
+        client = self._clients.get(instance.key)
+        if client is None:
+            client = self._clients[instance.key] = await self._open_client()
+        return client
+
+    def _store(self, service_name: str, services: list):
+        previous = {i.key: i for i in self._instances.get(service_name, [])}
+        instances = []
+        for entry in services:
+            address = entry["Service"]["Address"] or entry.get("Node", {}).get("Address")
+            instance = ServiceInstance(address, entry["Service"]["Port"])
+            # Keep in-flight counts for instances that are still passing
+            instance.outstanding = previous[instance.key].outstanding if instance.key in previous else 0
+            instances.append(instance)
+        self._instances[service_name] = instances
+        self._fetched_at[service_name] = time.monotonic()
+
+    async def _fetch(self, service_name: str):
+        client = await self.consul_client()
+        response = await client.get(f"{self.consul_http_addr}/v1/health/service/{service_name}?passing")
+        response.raise_for_status()
+        self._store(service_name, response.json())
+        index = str(response.headers.get("X-Consul-Index", ""))
+        if index.isdigit() and service_name not in self._watches:
+            self._watch_healthy[service_name] = True
+            self._watches[service_name] = asyncio.create_task(self._watch(service_name, int(index)))
+
+    async def _watch(self, service_name: str, index: int):
+        """Long-polls Consul so the cache is updated as soon as the service changes."""
+        client = await self.consul_client()
+        backoff = 1.0
+        try:
+            while True:
+                try:
+                    response = await client.get(
+                        f"{self.consul_http_addr}/v1/health/service/{service_name}",
+                        params={"passing": "", "index": index, "wait": self.blocking_wait},
+                        timeout=None,
+                    )
+                    response.raise_for_status()
+                    new_index = str(response.headers.get("X-Consul-Index", ""))
+                    self._store(service_name, response.json())
+                    if not new_index.isdigit():
+                        break
+                    # Unchanged when the wait timed out; it can go backwards (e.g. after a leader change), so reset it then.
+                    index = 0 if int(new_index) < index else int(new_index)
+                    self._watch_healthy[service_name] = True
+                    backoff = 1.0
+                except (httpx.HTTPError, ValueError, KeyError, TypeError) as e:
+                    self._watch_healthy[service_name] = False
+                    logging.warning(f"Blocking query for '{service_name}' failed: {e}; retrying in {backoff:.0f}s")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 30.0)
+        finally:
+            self._watches.pop(service_name, None)
+            self._watch_healthy.pop(service_name, None)
+
+    async def resolve(self, service_name: str) -> List[ServiceInstance]:
+        """Returns the passing instances of a service, refreshing the cache if it is stale."""
+        watch = self._watches.get(service_name)
+        watched = watch is not None and not watch.done() and self._watch_healthy.get(service_name, False)
+        fetched_at = self._fetched_at.get(service_name)
+        fresh = fetched_at is not None and (time.monotonic() - fetched_at < self.ttl or watched)
+        if not fresh:
+            lock = self._refresh_locks.setdefault(service_name, asyncio.Lock())
+            async with lock:
+                # Another caller may have refreshed it while we waited
+                if self._fetched_at.get(service_name) == fetched_at:
+                    await self._fetch(service_name)
+        return self._instances.get(service_name, [])
+
+    def invalidate(self, service_name: str):
+        """Forces the next lookup of a service to go to Consul."""
+        self._fetched_at.pop(service_name, None)
+
+    @asynccontextmanager
+    async def lease(self, service_name: str):
+        """
+        Picks the least-loaded passing instance and yields an `Upstream` for it,
+        or None if the service has no passing instances.
+        """
+        instances = await self.resolve(service_name)
+        if not instances:
+            yield None
+            return
+        instance = min(instances, key=lambda i: i.outstanding)
+        instance.outstanding += 1
+        try:
+            yield Upstream(instance, await self.client_for(instance))
+        except httpx.TransportError:
+            # The instance may have gone away; look it up again next time.
+            self.invalidate(service_name)
+            raise
+        finally:
+            instance.outstanding -= 1
+
+    async def aclose(self):
+        """Cancels watches and closes all pooled clients."""
+        for task in list(self._watches.values()):
+            task.cancel()
+        self._watches.clear()
+        self._watch_healthy.clear()
+        clients = list(self._clients.values())
+        if self._consul_client is not None:
+            clients.append(self._consul_client)
+        self._clients.clear()
+        self._consul_client = None
+        for client in clients:
+            try:
+                await client.__aexit__(None, None, None)
+            except Exception as e:
+                logging.debug(f"Error closing pooled client: {e}")
+
+
+# One discovery layer per (event loop, Consul address); pooled clients are bound to their loop.
+_discovery_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, ServiceDiscovery]]" = weakref.WeakKeyDictionary()
+
+
+def get_service_discovery(consul_http_addr: str) -> ServiceDiscovery:
+    """Returns the shared ServiceDiscovery for a Consul address on the running event loop."""
+    loop = asyncio.get_running_loop()
+    per_loop = _discovery_by_loop.setdefault(loop, {})
+    discovery = per_loop.get(consul_http_addr)
+    if discovery is None:
+        discovery = per_loop[consul_http_addr] = ServiceDiscovery(consul_http_addr)
+    return discovery
@@ -1,25 +1,35 @@
 import os
+import re
 import sqlite3
 import json
 import logging
-from typing import Optional
+import time
+import asyncio
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import Dict, Optional, Set, Tuple
 from fastapi import FastAPI, Request, HTTPException, Response
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import StreamingResponse
 import httpx
-import tempfile
 import aiofiles
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="IPFS PyPI Proxy")
-
 # Configuration
 PYPI_SIMPLE_URL = "https://pypi.org/simple"
 IPFS_API_URL = os.getenv("IPFS_API_URL", "http://127.0.0.1:5001")
 IPFS_GATEWAY_URL = os.getenv("IPFS_GATEWAY_URL", "http://127.0.0.1:8080")
 DB_PATH = os.getenv("DB_PATH", "/data/cache.db")
 PROXY_BASE_URL = os.getenv("PROXY_BASE_URL", "http://127.0.0.1:3141")
+# Downloaded files are kept here until they are safely in IPFS
+CACHE_DIR = os.getenv("CACHE_DIR", "/data/files")
+# Seconds a package index is served from cache before it is revalidated upstream
+INDEX_TTL = float(os.getenv("INDEX_TTL", "300"))
+# Package indexes kept in memory; the least recently used is dropped beyond this
+INDEX_CACHE_SIZE = int(os.getenv("INDEX_CACHE_SIZE", "1024"))
+CHUNK_SIZE = 64 * 1024
 
 # Initialize SQLite database
 def init_db():
@@ -36,6 +46,24 @@ def init_db():
     conn.close()
 
 init_db()
+os.makedirs(CACHE_DIR, exist_ok=True)
+
+_client: Optional[httpx.AsyncClient] = None
+
+def get_client() -> httpx.AsyncClient:
+    """Returns the shared upstream client, so requests reuse pooled connections."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(timeout=30.0)
+    return _client
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    if _client is not None:
+        await _client.aclose()
+
+app = FastAPI(title="IPFS PyPI Proxy", lifespan=lifespan)
 
 def get_cid_for_filename(filename: str) -> Optional[str]:
     conn = sqlite3.connect(DB_PATH)
@@ -59,106 +87,273 @@ def index():
 @app.get("/simple/")
 async def simple_index():
     # Pip usually doesn't request the root /simple/ with JSON, but we forward it just in case
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{PYPI_SIMPLE_URL}/")
-        return Response(content=resp.content, status_code=resp.status_code, media_type=resp.headers.get("content-type"))
+    resp = await get_client().get(f"{PYPI_SIMPLE_URL}/")
+    return Response(content=resp.content, status_code=resp.status_code, media_type=resp.headers.get("content-type"))
 
-@app.get("/simple/{package}/")
-async def package_index(package: str, request: Request):
+class _CachedIndex:
+    def __init__(self, content: bytes, etag: Optional[str]):
+        self.content = content
+        self.etag = etag
+        self.fetched_at = time.monotonic()
+
+# normalized package name -> rewritten index (least recently used first), and the upstream fetches in flight
+_index_cache: "OrderedDict[str, _CachedIndex]" = OrderedDict()
+_index_fetches: Dict[str, asyncio.Future] = {}
+
+def normalize_name(package: str) -> str:
+    """PEP 503 name normalization, so `Foo_Bar`, `foo.bar` and `foo-bar` share one index."""
+    return re.sub(r"[-_.]+", "-", package).lower()
+
+async def _fetch_index(package: str) -> Tuple[int, bytes, Optional[_CachedIndex]]:
+    """Fetches (or revalidates, when we hold an ETag) a package index upstream and rewrites its file URLs."""
+    cached = _index_cache.get(package)
     headers = {"Accept": "application/vnd.pypi.simple.v1+json"}
+    if cached and cached.etag:
+        headers["If-None-Match"] = cached.etag
 
-    async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{PYPI_SIMPLE_URL}/{package}/", headers=headers)
+    resp = await get_client().get(f"{PYPI_SIMPLE_URL}/{package}/", headers=headers)
+    if resp.status_code == 304 and cached:
+        cached.fetched_at = time.monotonic()
+        return 200, cached.content, cached
+    if resp.status_code != 200:
+        return resp.status_code, resp.content, None
 
-        if resp.status_code != 200:
-            return Response(content=resp.content, status_code=resp.status_code)
+    data = resp.json()
 
-        data = resp.json()
+    # Rewrite URLs in the files list
+    for file_info in data.get("files", []):
+        original_url = file_info["url"]
+        filename = file_info["filename"]
+        # Save original URL in fragment so we know where to fetch it from
+        file_info["url"] = f"{PROXY_BASE_URL}/download/{filename}?source={original_url}"
 
-        # Rewrite URLs in the files list
-        for file_info in data.get("files", []):
-            original_url = file_info["url"]
-            filename = file_info["filename"]
-            # Save original URL in fragment so we know where to fetch it from
-            file_info["url"] = f"{PROXY_BASE_URL}/download/{filename}?source={original_url}"
+    entry = _CachedIndex(json.dumps(data).encode("utf-8"), resp.headers.get("etag"))
+    _index_cache[package] = entry
+    _index_cache.move_to_end(package)
+    while len(_index_cache) > INDEX_CACHE_SIZE:
+        _index_cache.popitem(last=False)
+    return 200, entry.content, entry
 
-        return JSONResponse(content=data, media_type="application/vnd.pypi.simple.v1+json")
+@app.get("/simple/{package}/")
+async def package_index(package: str, request: Request):
+    package = normalize_name(package)
+    cached = _index_cache.get(package)
+    if cached is not None:
+        _index_cache.move_to_end(package)
+    if cached is None or time.monotonic() - cached.fetched_at >= INDEX_TTL:
+        # Concurrent requests for the same index share one upstream fetch
+        fetch = _index_fetches.get(package)
+        if fetch is None:
+            fetch = asyncio.ensure_future(_fetch_index(package))
+            _index_fetches[package] = fetch
+            fetch.add_done_callback(lambda _: _index_fetches.pop(package, None))
+        status_code, content, cached = await asyncio.shield(fetch)
+        if status_code != 200:
+            return Response(content=content, status_code=status_code)
 
-@app.get("/download/{filename}")
-async def download_package(filename: str, source: str):
-    cid = get_cid_for_filename(filename)
+    headers = {}
+    if cached.etag:
+        headers["ETag"] = cached.etag
+        if request.headers.get("if-none-match") == cached.etag:
+            return Response(status_code=304, headers=headers)
+    return Response(content=cached.content, media_type="application/vnd.pypi.simple.v1+json", headers=headers)
+
+class _Download:
+    """
+    One upstream download, written to disk while any number of clients read it.
 
-    if cid:
-        logger.info(f"Cache hit for {filename}: CID {cid}")
-        # Ensure it is available locally via gateway
+    Readers follow the partial file as it grows, so the first bytes reach
+    pip as soon as they arrive, and concurrent misses for the same file
+    share this single upstream request.
+    """
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.path = os.path.join(CACHE_DIR, f"{filename}.part")
+        self.final_path = os.path.join(CACHE_DIR, filename)
+        self.size = 0
+        self.content_length: Optional[str] = None
+        self.done = False
+        self.error: Optional[Exception] = None
+        self.started: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.progress = asyncio.Condition()
+
+    async def run(self, source: str):
         try:
-            # We must not use `async with` for the client if we are returning a StreamingResponse
-            # that will consume it after the function returns, or we need to manage the lifecycle in the generator.
-            # A cleaner way is to let StreamingResponse manage it by yielding from a generator that manages the client.
-            async def stream_from_ipfs():
-                async with httpx.AsyncClient(timeout=30.0) as ipfs_client:
-                    req = ipfs_client.build_request("GET", f"{IPFS_GATEWAY_URL}/ipfs/{cid}")
-                    r = await ipfs_client.send(req, stream=True)
-                    if r.status_code != 200:
-                        raise Exception(f"IPFS Gateway returned status {r.status_code}")
-                    async for chunk in r.aiter_raw():
-                        yield chunk
-
-            # Since we can't easily catch an exception raised inside the generator *before* returning the response
-            # to fall back, let's just make a HEAD or initial GET request to verify it's there.
-            async with httpx.AsyncClient(timeout=5.0) as check_client:
-                check_r = await check_client.head(f"{IPFS_GATEWAY_URL}/ipfs/{cid}")
-                if check_r.status_code == 200:
-                    return StreamingResponse(stream_from_ipfs(), media_type="application/octet-stream")
-                else:
-                    logger.warning(f"CID {cid} not found on gateway (status {check_r.status_code}), falling back to download")
+            async with get_client().stream("GET", source) as response:
+                response.raise_for_status()
+                self.content_length = response.headers.get("content-length")
+                async with aiofiles.open(self.path, "wb") as f:
+                    self.started.set_result(None)
+                    async for chunk in response.aiter_bytes():
+                        await f.write(chunk)
+                        await f.flush()
+                        self.size += len(chunk)
+                        async with self.progress:
+                            self.progress.notify_all()
+            # Readers hold the file open, so renaming it under them is safe
+            os.replace(self.path, self.final_path)
+            _spawn(_add_to_ipfs(self.filename, self.final_path))
         except Exception as e:
-            logger.error(f"Failed to stream from IPFS gateway for {cid}: {e}")
-            # Fall back to downloading
+            logger.error(f"Error downloading {self.filename}: {e}")
+            self.error = e
+            if not self.started.done():
+                self.started.set_exception(e)
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+        finally:
+            self.done = True
+            async with self.progress:
+                self.progress.notify_all()
+            _downloads.pop(self.filename, None)
 
-    logger.info(f"Cache miss for {filename}, downloading from {source}")
+    async def tail(self, f):
+        """Yields the file from the start, waiting for the writer until the download completes."""
+        offset = 0
+        try:
+            while True:
+                chunk = await f.read(CHUNK_SIZE)
+                if chunk:
+                    offset += len(chunk)
+                    yield chunk
+                    continue
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    if offset >= self.size:
+                        return
+                    continue
+                async with self.progress:
+                    await self.progress.wait_for(lambda: self.done or self.size > offset)
+        finally:
+            await f.close()
 
-    # Download from PyPI to a temp file
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-        tmp_path = tmp_file.name
+# filename -> download in flight, and background tasks we must keep a reference to
+_downloads: Dict[str, _Download] = {}
+_background_tasks: Set[asyncio.Task] = set()
 
+def _spawn(coro):
+    task = asyncio.ensure_future(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+async def _multipart_file(path: str, head: bytes, tail: bytes):
+    """Yields a multipart body around a file read in CHUNK_SIZE pieces, so a wheel is never held in memory whole."""
+    yield head
+    async with aiofiles.open(path, "rb") as f:
+        while chunk := await f.read(CHUNK_SIZE):
+            yield chunk
+    yield tail
+
+async def _add_to_ipfs(filename: str, path: str):
+    """Adds a completed download to IPFS, then drops the local copy it is now served from."""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            async with client.stream("GET", source) as response:
-                response.raise_for_status()
-                async with aiofiles.open(tmp_path, 'wb') as f:
-                    async for chunk in response.aiter_bytes():
-                        await f.write(chunk)
+        logger.info(f"Adding {filename} to IPFS")
+        boundary = uuid.uuid4().hex
+        quoted = filename.replace('"', "%22")
+        head = (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="{quoted}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n"
+        ).encode("utf-8")
+        tail = f"\r\n--{boundary}--\r\n".encode("utf-8")
+        add_resp = await get_client().post(
+            f"{IPFS_API_URL}/api/v0/add",
+            content=_multipart_file(path, head, tail),
+            headers={
+                "Content-Type": f"multipart/form-data; boundary={boundary}",
+                "Content-Length": str(len(head) + os.path.getsize(path) + len(tail)),
+            },
+            timeout=60.0
+        )
+        add_resp.raise_for_status()
+        cid = add_resp.json()["Hash"]
+        logger.info(f"Added {filename} to IPFS with CID {cid}")
+        save_cid_for_filename(filename, cid)
+        os.unlink(path)
+    except Exception as e:
+        # The local copy keeps serving the file from CACHE_DIR
+        logger.error(f"Failed to add {filename} to IPFS: {e}")
 
-            # Add to IPFS
-            logger.info(f"Adding {filename} to IPFS")
-            with open(tmp_path, "rb") as f:
-                add_resp = await client.post(
-                    f"{IPFS_API_URL}/api/v0/add",
-                    files={"file": (filename, f)},
-                    timeout=60.0
-                )
-                add_resp.raise_for_status()
-                ipfs_data = add_resp.json()
-                cid = ipfs_data["Hash"]
-
-                logger.info(f"Added {filename} to IPFS with CID {cid}")
-                save_cid_for_filename(filename, cid)
-
-        # Stream the file back to the client
-        async def stream_file():
+async def _stream_local(path: str) -> Optional[StreamingResponse]:
+    try:
+        f = await aiofiles.open(path, "rb")
+    except FileNotFoundError:
+        return None
+
+    async def stream_file():
+        try:
+            while chunk := await f.read(CHUNK_SIZE):
+                yield chunk
+        finally:
+            await f.close()
+
+    return StreamingResponse(stream_file(), media_type="application/octet-stream",
+                             headers={"Content-Length": str(os.fstat(f.fileno()).st_size)})
+
+@app.get("/download/{filename}")
+async def download_package(filename: str, source: str):
+    # Keep the cache key a plain file name inside CACHE_DIR
+    if os.path.basename(filename) != filename or filename.startswith("."):
+        raise HTTPException(status_code=400, detail="Invalid filename")
+
+    download = _downloads.get(filename)
+    if download is None:
+        local = await _stream_local(os.path.join(CACHE_DIR, filename))
+        if local is not None:
+            logger.info(f"Local cache hit for {filename}")
+            return local
+
+        cid = get_cid_for_filename(filename)
+        if cid:
+            logger.info(f"Cache hit for {filename}: CID {cid}")
+            # Ensure it is available locally via gateway
             try:
-                async with aiofiles.open(tmp_path, 'rb') as f:
-                    while chunk := await f.read(8192):
-                        yield chunk
-            finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+                # We must not use `async with` for the client if we are returning a StreamingResponse
+                # that will consume it after the function returns, or we need to manage the lifecycle in the generator.
+                # A cleaner way is to let StreamingResponse manage it by yielding from a generator that manages the client.
+                async def stream_from_ipfs():
+                    async with httpx.AsyncClient(timeout=30.0) as ipfs_client:
+                        req = ipfs_client.build_request("GET", f"{IPFS_GATEWAY_URL}/ipfs/{cid}")
+                        r = await ipfs_client.send(req, stream=True)
+                        if r.status_code != 200:
+                            raise Exception(f"IPFS Gateway returned status {r.status_code}")
+                        async for chunk in r.aiter_raw():
+                            yield chunk
+
+                # Since we can't easily catch an exception raised inside the generator *before* returning the response
+                # to fall back, let's just make a HEAD or initial GET request to verify it's there.
+                async with httpx.AsyncClient(timeout=5.0) as check_client:
+                    check_r = await check_client.head(f"{IPFS_GATEWAY_URL}/ipfs/{cid}")
+                    if check_r.status_code == 200:
+                        return StreamingResponse(stream_from_ipfs(), media_type="application/octet-stream")
+                    else:
+                        logger.warning(f"CID {cid} not found on gateway (status {check_r.status_code}), falling back to download")
+            except Exception as e:
+                logger.error(f"Failed to stream from IPFS gateway for {cid}: {e}")
+                # Fall back to downloading
 
-        return StreamingResponse(stream_file(), media_type="application/octet-stream")
+        # The checks above awaited; another request may have started the download meanwhile
+        download = _downloads.get(filename)
+        if download is None:
+            logger.info(f"Cache miss for {filename}, downloading from {source}")
+            download = _Download(filename)
+            _downloads[filename] = download
+            _spawn(download.run(source))
+    else:
+        logger.info(f"Joining in-flight download of {filename}")
 
+    try:
+        await asyncio.shield(download.started)
+        f = await aiofiles.open(download.path if not download.done else download.final_path, "rb")
+    except FileNotFoundError:
+        # Finished and renamed between the checks; serve the completed file
+        local = await _stream_local(download.final_path)
+        if local is None:
+            raise HTTPException(status_code=500, detail=f"Download of {filename} vanished")
+        return local
     except Exception as e:
-        if os.path.exists(tmp_path):
-            os.unlink(tmp_path)
         logger.error(f"Error processing {filename}: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+    headers = {"Content-Length": download.content_length} if download.content_length else {}
+    return StreamingResponse(download.tail(f), media_type="application/octet-stream", headers=headers)
@@ -2,6 +2,12 @@ import asyncio
 import logging
 import argparse
 
+try:
+    from .mux import MuxSession, MuxStream, splice
+except ImportError:
+    # Run as a script from this directory
+    from mux import MuxSession, MuxStream, splice
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -23,7 +29,7 @@ class PushProxyClient:
                 await writer.drain()
 
                 # Read response
-                response = await reader.read(1024)
+                response = await reader.readline()
                 response_str = response.decode().strip()
                 if response_str.startswith("OK:"):
                     assigned_port = int(response_str.split(":")[1])
@@ -34,38 +40,10 @@ class PushProxyClient:
                     await asyncio.sleep(5)
                     continue
 
-                # Now wait for incoming traffic from the proxy, and forward it to our local service
-                while True:
-                    data = await reader.read(4096)
-                    if not data:
-                        logger.warning("Connection to proxy closed by server.")
-                        break
-
-                    # We got a connection/data from the proxy. Forward it to local Nomad
-                    logger.info(f"Received {len(data)} bytes from proxy, forwarding to local port {self.local_service_port}")
-                    try:
-                        local_reader, local_writer = await asyncio.open_connection("127.0.0.1", self.local_service_port)
-                        local_writer.write(data)
-                        await local_writer.drain()
-
-                        # Read response from local service and send back to proxy
-                        async def forward_local_to_proxy(l_reader, p_writer):
-                            try:
-                                while True:
-                                    local_data = await l_reader.read(4096)
-                                    if not local_data:
-                                        break
-                                    p_writer.write(local_data)
-                                    await p_writer.drain()
-                            except Exception as e:
-                                logger.error(f"Error forwarding local to proxy: {e}")
-                            finally:
-                                p_writer.close()
-
-                        asyncio.create_task(forward_local_to_proxy(local_reader, writer))
-
-                    except Exception as e:
-                        logger.error(f"Failed to connect to local service on port {self.local_service_port}: {e}")
+                # Each stream the proxy opens is one connection to our local service
+                session = MuxSession(reader, writer, client=True, on_stream=self.handle_stream)
+                await session.run()
+                logger.warning("Connection to proxy closed by server.")
 
             except ConnectionRefusedError:
                 logger.error("Connection refused. Retrying in 5 seconds...")
@@ -74,6 +52,15 @@ class PushProxyClient:
                 logger.error(f"Connection error: {e}. Retrying in 5 seconds...")
                 await asyncio.sleep(5)
 
+    async def handle_stream(self, stream: MuxStream):
+        try:
+            local_reader, local_writer = await asyncio.open_connection("127.0.0.1", self.local_service_port)
+        except Exception as e:
+            logger.error(f"Failed to connect to local service on port {self.local_service_port}: {e}")
+            stream.reset()
+            return
+        await splice(stream, local_reader, local_writer)
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Push Proxy Client for NAT Traversal")
     parser.add_argument("--proxy-host", required=True, help="IP or hostname of the push proxy server")
@@ -0,0 +1,273 @@
+"""
+Stream multiplexing for the push proxy tunnel.
+
+A small yamux-style protocol: every frame starts with a 12 byte header
+(version, type, flags, stream id, length). DATA frames carry `length` bytes
+of payload; WINDOW_UPDATE frames carry no payload and grant the peer
+`length` more bytes of send window. A stream is opened with SYN, half-closed
+with FIN and aborted with RST. Each stream has its own receive window, so a
+slow reader only stalls its own stream rather than the whole tunnel.
+"""
+import asyncio
+import logging
+import struct
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+VERSION = 0
+
+TYPE_DATA = 0
+TYPE_WINDOW_UPDATE = 1
+TYPE_GO_AWAY = 3
+
+FLAG_SYN = 0x1
+FLAG_FIN = 0x4
+FLAG_RST = 0x8
+
+HEADER = struct.Struct("!BBHII")
+DEFAULT_WINDOW = 256 * 1024
+MAX_FRAME = 64 * 1024
+READ_SIZE = 256 * 1024
+
+
+class StreamReset(ConnectionError):
+    """The stream was aborted by either side, or the tunnel went away."""
+
+
+class MuxStream:
+    """One logical connection carried over a MuxSession."""
+    def __init__(self, session: "MuxSession", stream_id: int):
+        self.session = session
+        self.id = stream_id
+        self._buffer = bytearray()
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._send_window = session.window_size
+        self._recv_window = session.window_size
+        self._consumed = 0
+        self._remote_closed = False
+        self._local_closed = False
+        self._reset = False
+
+    async def read(self, n: int = -1) -> bytes:
+        """Returns up to `n` buffered bytes (all of them if `n` < 0), or b"" once the peer has closed."""
+        while not self._buffer:
+            if self._reset:
+                raise StreamReset(f"Stream {self.id} was reset")
+            if self._remote_closed:
+                return b""
+            self._readable.clear()
+            await self._readable.wait()
+        if n < 0 or n >= len(self._buffer):
+            data = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            data = bytes(self._buffer[:n])
+            del self._buffer[:n]
+
+        # Hand the window back once half of it has been drained, not per read
+        self._consumed += len(data)
+        if self._consumed >= self.session.window_size // 2 and not self._remote_closed and not self._reset:
+            self._recv_window += self._consumed
+            self.session._write_frame(TYPE_WINDOW_UPDATE, 0, self.id, self._consumed)
+            self._consumed = 0
+        return data
+
+    async def write(self, data: bytes):
+        """Sends `data`, waiting for the peer's window whenever it is exhausted."""
+        view = memoryview(data)
+        while view:
+            if self._reset:
+                raise StreamReset(f"Stream {self.id} was reset")
+            if self._local_closed:
+                raise ConnectionError(f"Stream {self.id} is closed for writing")
+            if self._send_window <= 0:
+                self._writable.clear()
+                await self._writable.wait()
+                continue
+            size = min(len(view), self._send_window, MAX_FRAME)
+            self._send_window -= size
+            self.session._write_frame(TYPE_DATA, 0, self.id, size, view[:size])
+            view = view[size:]
+            await self.session.writer.drain()
+
+    async def close(self):
+        """Half-closes the stream: the peer reads EOF, but can still send to us."""
+        if self._local_closed or self._reset:
+            return
+        self._local_closed = True
+        self.session._write_frame(TYPE_DATA, FLAG_FIN, self.id, 0)
+        self._release_if_done()
+        await self.session.writer.drain()
+
+    def reset(self):
+        """Aborts the stream in both directions."""
+        if self._reset:
+            return
+        if self.id in self.session.streams and not self.session.closed:
+            self.session._write_frame(TYPE_WINDOW_UPDATE, FLAG_RST, self.id, 0)
+        self._on_reset()
+
+    def _on_frame(self, frame_type: int, flags: int, length: int, data: bytes):
+        if frame_type == TYPE_DATA and data:
+            # The session has already checked the frame against the window
+            self._recv_window -= len(data)
+            self._buffer += data
+        elif frame_type == TYPE_WINDOW_UPDATE and length:
+            self._send_window += length
+            self._writable.set()
+        if flags & FLAG_RST:
+            self._on_reset()
+            return
+        if flags & FLAG_FIN:
+            self._remote_closed = True
+            self._release_if_done()
+        self._readable.set()
+
+    def _on_reset(self):
+        self._reset = True
+        self._readable.set()
+        self._writable.set()
+        self.session.streams.pop(self.id, None)
+
+    def _release_if_done(self):
+        if self._local_closed and self._remote_closed:
+            self.session.streams.pop(self.id, None)
+
+
+class MuxSession:
+    """Runs many MuxStreams over one reader/writer pair.
+
+    The two ends must use different `client` values so their stream ids
+    never collide (odd ids for the client, even for the server). Streams
+    opened by the peer are passed to `on_stream` in their own task.
+    """
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, client: bool,
+                 on_stream: Optional[Callable[[MuxStream], Awaitable[None]]] = None,
+                 window_size: int = DEFAULT_WINDOW):
+        self.reader = reader
+        self.writer = writer
+        self.on_stream = on_stream
+        self.window_size = window_size
+        self.streams: Dict[int, MuxStream] = {}
+        self.closed = False
+        self._next_id = 1 if client else 2
+        self._handlers: Set[asyncio.Task] = set()
+
+    async def open_stream(self) -> MuxStream:
+        if self.closed:
+            raise ConnectionError("Tunnel is closed")
+        stream = MuxStream(self, self._next_id)
+        self._next_id += 2
+        self.streams[stream.id] = stream
+        self._write_frame(TYPE_WINDOW_UPDATE, FLAG_SYN, stream.id, 0)
+        await self.writer.drain()
+        return stream
+
+    def _write_frame(self, frame_type: int, flags: int, stream_id: int, length: int, payload=b""):
+        # Header and payload go out in one synchronous step, so frames from
+        # concurrent streams never interleave; callers drain afterwards.
+        if self.closed:
+            raise StreamReset("Tunnel is closed")
+        self.writer.write(HEADER.pack(VERSION, frame_type, flags, stream_id, length))
+        if payload:
+            self.writer.write(payload)
+
+    async def run(self):
+        """Reads frames until the tunnel closes, then resets every open stream.
+
+        A DATA frame longer than MAX_FRAME or than its stream's receive
+        window breaks the protocol, and closes the tunnel before its payload
+        is read.
+        """
+        try:
+            while True:
+                header = await self.reader.readexactly(HEADER.size)
+                version, frame_type, flags, stream_id, length = HEADER.unpack(header)
+                if version != VERSION:
+                    logger.error(f"Unsupported tunnel protocol version {version}")
+                    break
+                if frame_type == TYPE_GO_AWAY:
+                    break
+                stream = self.streams.get(stream_id)
+                data = b""
+                if frame_type == TYPE_DATA and length:
+                    # Checked before reading: the payload cannot be skipped without buffering it
+                    limit = MAX_FRAME if stream is None else min(MAX_FRAME, stream._recv_window)
+                    if length > limit:
+                        logger.warning(f"Peer sent a {length} byte frame on stream {stream_id} (limit {limit}), closing the tunnel")
+                        break
+                    data = await self.reader.readexactly(length)
+
+                if stream is None and flags & FLAG_SYN:
+                    stream = self._accept(stream_id)
+                if stream is not None:
+                    stream._on_frame(frame_type, flags, length, data)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._shutdown()
+
+    def _accept(self, stream_id: int) -> MuxStream:
+        stream = MuxStream(self, stream_id)
+        self.streams[stream_id] = stream
+        if self.on_stream is None:
+            stream.reset()
+            return stream
+        task = asyncio.create_task(self._handle(stream))
+        self._handlers.add(task)
+        task.add_done_callback(self._handlers.discard)
+        return stream
+
+    async def _handle(self, stream: MuxStream):
+        try:
+            await self.on_stream(stream)
+        except Exception as e:
+            logger.error(f"Error handling tunnel stream {stream.id}: {e}")
+            stream.reset()
+
+    async def close(self):
+        """Tells the peer we are going away and closes the tunnel."""
+        if not self.closed:
+            try:
+                self._write_frame(TYPE_GO_AWAY, 0, 0, 0)
+                await self.writer.drain()
+            except ConnectionError:
+                pass
+        self._shutdown()
+
+    def _shutdown(self):
+        self.closed = True
+        for stream in list(self.streams.values()):
+            stream._on_reset()
+        self.writer.close()
+
+
+async def splice(stream: MuxStream, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 read_size: int = READ_SIZE):
+    """Copies bytes both ways between a stream and a socket until both directions have finished."""
+    async def socket_to_stream():
+        try:
+            while data := await reader.read(read_size):
+                await stream.write(data)
+            await stream.close()
+        except ConnectionError:
+            stream.reset()
+            writer.close()
+
+    async def stream_to_socket():
+        try:
+            while data := await stream.read():
+                writer.write(data)
+                await writer.drain()
+            if writer.can_write_eof():
+                writer.write_eof()
+        except ConnectionError:
+            stream.reset()
+            writer.close()
+
+    try:
+        await asyncio.gather(socket_to_stream(), stream_to_socket())
+    finally:
+        writer.close()
@@ -2,6 +2,12 @@ import asyncio
 import logging
 import argparse
 
+try:
+    from .mux import MuxSession, splice
+except ImportError:
+    # Run as a script from this directory
+    from mux import MuxSession, splice
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -19,7 +25,7 @@ class PushProxyServer:
 
         # Basic handshake: worker sends its ID
         try:
-            data = await reader.read(1024)
+            data = await reader.readline()
             worker_id = data.decode().strip()
             if not worker_id:
                 logger.warning("Empty worker ID, closing.")
@@ -33,9 +39,10 @@ class PushProxyServer:
         tunnel_port = self.next_tunnel_port
         self.next_tunnel_port += 1
 
+        # Every connection to the tunnel port becomes its own stream on this session
+        session = MuxSession(reader, writer, client=False)
         self.active_workers[worker_id] = {
-            'reader': reader,
-            'writer': writer,
+            'session': session,
             'tunnel_port': tunnel_port
         }
 
@@ -51,14 +58,8 @@ class PushProxyServer:
         self.active_workers[worker_id]['server'] = tunnel_server
 
         try:
-            # Keep connection alive and handle traffic from worker
-            while True:
-                data = await reader.read(4096)
-                if not data:
-                    break
-                # In a real implementation, this would route responses back to the correct client connection
-                # For this PoC, we just log it or handle simple keepalives
-                pass
+            # Route frames from the worker to their streams until it goes away
+            await session.run()
         except asyncio.CancelledError:
             pass
         except Exception as e:
@@ -66,8 +67,9 @@ class PushProxyServer:
         finally:
             logger.info(f"Worker {worker_id} disconnected.")
             writer.close()
-            if worker_id in self.active_workers:
-                self.active_workers[worker_id]['server'].close()
+            tunnel_server.close()
+            # A reconnect may already have replaced this registration
+            if self.active_workers.get(worker_id, {}).get('session') is session:
                 del self.active_workers[worker_id]
 
     async def handle_tunnel_connection(self, client_reader, client_writer, worker_id):
@@ -80,30 +82,14 @@ class PushProxyServer:
             client_writer.close()
             return
 
-        worker_writer = worker_conn['writer']
-        worker_reader = worker_conn['reader']
-
-        # Forward traffic. Note: A real implementation requires multiplexing (like yamux or ssh channels)
-        # because multiple clients might use the same tunnel port, or the worker might send unsolicited data.
-        # This simple PoC just forwards bytes back and forth for a single connection.
-
-        async def forward(src, dst):
-            try:
-                while True:
-                    data = await src.read(4096)
-                    if not data:
-                        break
-                    dst.write(data)
-                    await dst.drain()
-            except Exception:
-                pass
-            finally:
-                dst.close()
-
-        await asyncio.gather(
-            forward(client_reader, worker_writer),
-            forward(worker_reader, client_writer)
-        )
+        try:
+            stream = await worker_conn['session'].open_stream()
+        except ConnectionError as e:
+            logger.error(f"Tunnel to worker {worker_id} is unavailable: {e}")
+            client_writer.close()
+            return
+
+        await splice(stream, client_reader, client_writer)
 
     async def start(self):
         server = await asyncio.start_server(self.handle_worker_connection, self.bind_host, self.bind_port)
@@ -0,0 +1,378 @@
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+try:
+    import h2  # noqa: F401 - httpx only speaks HTTP/2 when h2 is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+class ShardUnreachableError(Exception):
+    """Raised when a shard cannot be reached within the retry budget."""
+
+
+class ShardRejectedError(Exception):
+    """Raised for a submission some of whose events the shard rejected as invalid.
+
+    The submission's other events were committed. `rejected` holds the
+    (event, reason) pairs that were not.
+    """
+    def __init__(self, rejected: List[Tuple[Dict[str, Any], str]]):
+        super().__init__(f"{len(rejected)} event(s) rejected: {rejected[0][1]}")
+        self.rejected = rejected
+
+
+# Throttled or timed out by the shard: worth retrying later, like a 5xx
+RETRYABLE_STATUSES = frozenset({408, 429})
+
+
+class EventSpool:
+    """A durable, per-node FIFO of events waiting for an unreachable shard.
+
+    Stored in SQLite so spooled writes survive a restart of this node.
+    """
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        spool_dir = os.path.dirname(self.path)
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS spool (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                node_id TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_spool_node ON spool(node_id, id);")
+        self.conn.commit()
+
+    def append(self, node_id: str, events: List[Dict[str, Any]]):
+        now = time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO spool (node_id, payload, created_at) VALUES (?, ?, ?)",
+                [(node_id, json.dumps(event), now) for event in events]
+            )
+
+    def peek(self, node_id: str, limit: int) -> List[Tuple[int, Dict[str, Any]]]:
+        """Returns up to `limit` of the oldest spooled (id, event) pairs for a node."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, payload FROM spool WHERE node_id = ? ORDER BY id LIMIT ?", (node_id, limit)
+            ).fetchall()
+        return [(row[0], json.loads(row[1])) for row in rows]
+
+    def remove(self, node_id: str, up_to_id: int):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM spool WHERE node_id = ? AND id <= ?", (node_id, up_to_id))
+
+    def count(self, node_id: Optional[str] = None) -> int:
+        with self._lock:
+            if node_id is None:
+                return self.conn.execute("SELECT COUNT(*) FROM spool").fetchone()[0]
+            return self.conn.execute("SELECT COUNT(*) FROM spool WHERE node_id = ?", (node_id,)).fetchone()[0]
+
+    def nodes(self) -> List[str]:
+        """Returns the nodes that have spooled events."""
+        with self._lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT node_id FROM spool")]
+
+    def close(self):
+        self.conn.close()
+
+
+def _session_key(event: Dict[str, Any]) -> str:
+    return str(event.get("session_id") or (event.get("meta") or {}).get("session_id") or "")
+
+
+class _Submission:
+    __slots__ = ("events", "future", "keys")
+
+    def __init__(self, events: List[Dict[str, Any]]):
+        self.events = events
+        self.future: Future = Future()
+        # Sessions whose order this submission takes part in; events without one share the "" key
+        self.keys = frozenset(_session_key(event) for event in events)
+
+
+# Queued by a finished batch so the sender re-checks submissions waiting on its sessions
+_LANE_FREED = _Submission([])
+
+
+class ShardOutbox:
+    """Coalesces event writes for one remote shard into batched, pipelined requests.
+
+    Writes queue up while earlier batches are in flight and go out together
+    (up to `batch_size` events) as one `/api/memory/sharded/events:batch`
+    request, with at most `max_in_flight` requests outstanding over a shared
+    keep-alive (HTTP/2 when available) client. A session has at most one
+    batch in flight, so its events commit on the shard in submission order;
+    only batches for different sessions are sent in parallel.
+
+    The shard validates each event on its own; a submission with an invalid
+    event fails with ShardRejectedError while the rest of its batch is stored.
+
+    A batch that still fails after `max_retries` retries of a connection
+    error, 408, 429 or 5xx response is written to the durable spool instead
+    of being placed on another node. While a node has spooled events, new writes join the
+    spool too, and the spool is replayed in order every `replay_interval`
+    seconds until the node is back. Delivery is therefore at-least-once:
+    a request that timed out after the shard committed it may be replayed.
+    """
+    def __init__(self, node_id: str, api_url: str, spool: EventSpool, client: httpx.Client,
+                 headers: Optional[Dict[str, str]] = None, batch_size: int = 256, flush_interval: float = 0.005,
+                 max_in_flight: int = 4, max_retries: int = 2, retry_backoff: float = 0.05, replay_interval: float = 5.0):
+        self.node_id = node_id
+        self.url = f"{api_url}/api/memory/sharded/events:batch"
+        self.spool = spool
+        self.client = client
+        self.headers = headers or {}
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.replay_interval = replay_interval
+        self.logger = logging.getLogger(__name__)
+        self._queue: "queue.Queue[Optional[_Submission]]" = queue.Queue()
+        # Sessions with a batch in flight
+        self._busy_keys: set = set()
+        self._busy_lock = threading.Lock()
+        self._window = threading.BoundedSemaphore(max_in_flight)
+        self._pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix=f"shard-outbox-{node_id}")
+        self._sender: Optional[threading.Thread] = None
+        self._sender_lock = threading.Lock()
+        # Guards the spooling flag, so the switch back to direct sends cannot overtake spooled events
+        self._spool_lock = threading.Lock()
+        self._spooling = spool.count(node_id) > 0
+        self._next_replay = time.monotonic()
+        if self._spooling:
+            self._ensure_sender()
+
+    @property
+    def spooling(self) -> bool:
+        return self._spooling
+
+    def submit(self, events: List[Dict[str, Any]]) -> Future:
+        """Queues events for the shard. The future resolves once they are committed remotely or spooled."""
+        submission = _Submission(events)
+        self._queue.put(submission)
+        self._ensure_sender()
+        return submission.future
+
+    def close(self):
+        """Sends whatever is queued, then stops the sender."""
+        if self._sender is not None and self._sender.is_alive():
+            self._queue.put(None)
+            self._sender.join()
+        self._pool.shutdown(wait=True)
+
+    def _ensure_sender(self):
+        if self._sender is not None and self._sender.is_alive():
+            return
+        with self._sender_lock:
+            if self._sender is None or not self._sender.is_alive():
+                self._sender = threading.Thread(target=self._sender_loop, name=f"shard-outbox-{self.node_id}", daemon=True)
+                self._sender.start()
+
+    def _sender_loop(self):
+        pending: List[_Submission] = []
+        stopping = False
+        while True:
+            if self._spooling and time.monotonic() >= self._next_replay:
+                self._replay()
+            if stopping and not pending:
+                return
+            # Wait for a new submission, a freed session, the stop signal or the next replay
+            timeout = max(0.0, self._next_replay - time.monotonic()) if self._spooling else None
+            try:
+                first = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+            if first is None:
+                stopping = True
+            elif first is not _LANE_FREED:
+                pending.append(first)
+            stopping = self._drain(pending, linger=first not in (None, _LANE_FREED)) or stopping
+            while True:
+                batch = self._take_batch(pending)
+                if not batch:
+                    break
+                # Wait for room in the in-flight window; whatever arrives meanwhile rides along
+                self._window.acquire()
+                stopping = self._drain(pending) or stopping
+                batch = self._take_batch(pending, batch)
+                self._pool.submit(self._send_batch, batch)
+
+    def _drain(self, pending: List[_Submission], linger: bool = False) -> bool:
+        """Moves queued submissions to `pending` until it holds `batch_size` events or the queue runs dry.
+
+        With `linger`, a write that already has company waits up to
+        `flush_interval` for more; a lone write is never delayed. Returns
+        whether the stop signal was seen.
+        """
+        count = sum(len(submission.events) for submission in pending)
+        deadline = time.monotonic() + self.flush_interval
+        while count < self.batch_size:
+            try:
+                submission = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if not linger or len(pending) < 2 or remaining <= 0:
+                    break
+                try:
+                    submission = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if submission is None:
+                return True
+            if submission is _LANE_FREED:
+                continue
+            pending.append(submission)
+            count += len(submission.events)
+        return False
+
+    def _take_batch(self, pending: List[_Submission], batch: Optional[List[_Submission]] = None) -> List[_Submission]:
+        """Moves the submissions that can be sent now from `pending` to `batch`, in order, and marks their sessions busy.
+
+        A submission waits while one of its sessions has another batch in
+        flight, and so does every later submission for that session.
+        """
+        batch = batch if batch is not None else []
+        own_keys = {key for submission in batch for key in submission.keys}
+        with self._busy_lock:
+            blocked = self._busy_keys - own_keys
+        count = sum(len(submission.events) for submission in batch)
+        waiting = []
+        for submission in pending:
+            if count < self.batch_size and not submission.keys & blocked:
+                batch.append(submission)
+                own_keys |= submission.keys
+                count += len(submission.events)
+            else:
+                waiting.append(submission)
+                # Later writes to these sessions must not overtake this one
+                blocked |= submission.keys
+        pending[:] = waiting
+        with self._busy_lock:
+            self._busy_keys |= own_keys
+        return batch
+
+    def _send_batch(self, batch: List[_Submission]):
+        events = [event for submission in batch for event in submission.events]
+        errors: List[Optional[str]] = [None] * len(events)
+        try:
+            with self._spool_lock:
+                spooling = self._spooling
+            if spooling:
+                self._spool(events)
+            else:
+                try:
+                    errors = self._post(events)
+                except ShardUnreachableError as e:
+                    self.logger.warning(f"Shard {self.node_id} unreachable ({e}); spooling {len(events)} event(s) for replay.")
+                    self._spool(events)
+        except Exception as e:
+            self.logger.error(f"Failed to deliver {len(events)} event(s) to shard {self.node_id}: {e}")
+            for submission in batch:
+                submission.future.set_exception(e)
+            return
+        finally:
+            with self._busy_lock:
+                self._busy_keys -= {key for submission in batch for key in submission.keys}
+            self._window.release()
+            self._queue.put(_LANE_FREED)
+        offset = 0
+        for submission in batch:
+            rejected = [
+                (event, error) for event, error in zip(submission.events, errors[offset:offset + len(submission.events)])
+                if error is not None
+            ]
+            offset += len(submission.events)
+            if rejected:
+                submission.future.set_exception(ShardRejectedError(rejected))
+            else:
+                submission.future.set_result(None)
+
+    def _spool(self, events: List[Dict[str, Any]]):
+        with self._spool_lock:
+            self.spool.append(self.node_id, events)
+            if not self._spooling:
+                self._spooling = True
+                self._next_replay = time.monotonic() + self.replay_interval
+
+    def _post(self, events: List[Dict[str, Any]], retries: Optional[int] = None) -> List[Optional[str]]:
+        """Posts one batch, retrying connection errors, throttling and 5xx responses with exponential backoff.
+
+        Returns, for each event in order, None if the shard stored it or the
+        reason it was rejected.
+        """
+        retries = self.max_retries if retries is None else retries
+        last_error: Any = None
+        for attempt in range(retries + 1):
+            if attempt:
+                time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            try:
+                resp = self.client.post(self.url, json={"events": events}, headers=self.headers)
+            except httpx.TransportError as e:
+                last_error = e
+                continue
+            if resp.status_code >= 500 or resp.status_code in RETRYABLE_STATUSES:
+                last_error = f"HTTP {resp.status_code}"
+                continue
+            # Other errors (bad request, auth) reject the whole batch
+            resp.raise_for_status()
+            try:
+                results = resp.json().get("results") or []
+            except (ValueError, AttributeError):
+                # A shard without per-event results stored the whole batch
+                results = []
+            errors: List[Optional[str]] = [None] * len(events)
+            for i, result in enumerate(results[:len(events)]):
+                if result.get("status") == "error":
+                    errors[i] = result.get("detail") or "rejected"
+            return errors
+        raise ShardUnreachableError(str(last_error))
+
+    def _replay(self):
+        """Sends spooled events oldest first, stopping at the first batch the shard does not take."""
+        while True:
+            entries = self.spool.peek(self.node_id, self.batch_size)
+            if not entries:
+                with self._spool_lock:
+                    # Nothing can have been spooled since the peek while we hold the lock
+                    if self.spool.count(self.node_id) == 0:
+                        self._spooling = False
+                        self.logger.info(f"Spool for shard {self.node_id} drained; resuming direct sends.")
+                        return
+                continue
+            try:
+                # One attempt per interval, so a dead shard does not hold up the sender
+                errors = self._post([event for _, event in entries], retries=0)
+            except ShardUnreachableError:
+                self._next_replay = time.monotonic() + self.replay_interval
+                return
+            except httpx.HTTPStatusError as e:
+                # Spooled events are kept until the shard takes them (e.g. once its API key is fixed)
+                self.logger.error(f"Shard {self.node_id} refused {len(entries)} spooled event(s); retrying later: {e}")
+                self._next_replay = time.monotonic() + self.replay_interval
+                return
+            for (_, event), error in zip(entries, errors):
+                if error is not None:
+                    # Invalid events can never be stored; the rest of the batch was
+                    self.logger.error(f"Shard {self.node_id} rejected a spooled event; discarding it: {error}")
+            self.spool.remove(self.node_id, entries[-1][0])
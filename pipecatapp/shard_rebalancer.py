@@ -0,0 +1,187 @@
+import json
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from pipecatapp.pmm_memory import PMMMemory
+
+
+class ShardRebalancer:
+    """Moves sessions held by local shards to the node that owns them under the current topology.
+
+    Only sessions whose owner is no longer the shard holding them are
+    streamed, in `batch_size` chunks throttled to `rate` events per second.
+    Progress is recorded per session in the source shard, so an interrupted
+    run resumes where it stopped. Moved events keep their timestamps and are
+    tagged with `migrated_from`; the source keeps its copy, since deleting
+    from the middle of its hash chain would break the chain. A chunk may be
+    delivered twice if the process dies between sending it and recording it.
+    """
+    def __init__(self, get_owner: Callable[[str], Optional[str]], local_memories: Dict[str, PMMMemory],
+                 deliver: Callable[[str, List[Dict[str, Any]]], None], batch_size: int = 256, rate: float = 2000.0):
+        """
+        Args:
+            get_owner: Maps a session id to the node that owns it now.
+            local_memories: The shards hosted by this node, by node id.
+            deliver: Writes a list of events to a node, blocking until they are accepted.
+            batch_size: Events sent per chunk.
+            rate: Maximum events moved per second (0 disables throttling).
+        """
+        self.get_owner = get_owner
+        self.local_memories = local_memories
+        self.deliver = deliver
+        self.batch_size = batch_size
+        self.rate = rate
+        self.logger = logging.getLogger(__name__)
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._status: Dict[str, Any] = {"state": "idle"}
+        for memory in local_memories.values():
+            self.init_shard(memory)
+
+    @staticmethod
+    def init_shard(memory: PMMMemory):
+        """Creates the progress and topology tables in a shard database."""
+        with memory.conn:
+            memory.conn.execute("""
+                CREATE TABLE IF NOT EXISTS rebalance_progress (
+                    session_id TEXT PRIMARY KEY,
+                    target_node TEXT,
+                    last_id INTEGER NOT NULL DEFAULT 0,
+                    done INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL
+                )
+            """)
+            memory.conn.execute("""
+                CREATE TABLE IF NOT EXISTS shard_topology (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    fingerprint TEXT
+                )
+            """)
+
+    @staticmethod
+    def get_fingerprint(memory: PMMMemory) -> Optional[str]:
+        row = memory.conn.execute("SELECT fingerprint FROM shard_topology WHERE id = 0").fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def set_fingerprint(memory: PMMMemory, fingerprint: str):
+        with memory.conn:
+            memory.conn.execute(
+                "INSERT INTO shard_topology (id, fingerprint) VALUES (0, ?) "
+                "ON CONFLICT(id) DO UPDATE SET fingerprint = excluded.fingerprint",
+                (fingerprint,)
+            )
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> Dict[str, Any]:
+        return dict(self._status)
+
+    def start(self, fingerprint: Optional[str] = None):
+        """Starts a rebalance in the background; a running one is stopped and restarted."""
+        self.stop()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, args=(fingerprint,), name="shard-rebalancer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self.running:
+            self._stop.set()
+            self._thread.join()
+
+    def run(self, fingerprint: Optional[str] = None):
+        """Rebalances every local shard, then records `fingerprint` as the topology they match."""
+        self._status = {
+            "state": "running", "started_at": time.time(), "finished_at": None,
+            "sessions_moved": 0, "events_moved": 0, "sessions_pending": 0, "error": None,
+        }
+        try:
+            for node_id, memory in self.local_memories.items():
+                self._rebalance_shard(node_id, memory)
+                if self._stop.is_set():
+                    self._status["state"] = "stopped"
+                    return
+                if fingerprint is not None:
+                    self.set_fingerprint(memory, fingerprint)
+            self._status["state"] = "done"
+        except Exception as e:
+            self.logger.error(f"Shard rebalance failed: {e}")
+            self._status.update(state="failed", error=str(e))
+        finally:
+            self._status["finished_at"] = time.time()
+
+    def _rebalance_shard(self, node_id: str, memory: PMMMemory):
+        sessions = [row[0] for row in memory.conn.execute(
+            "SELECT DISTINCT session_id FROM events WHERE session_id IS NOT NULL ORDER BY session_id"
+        )]
+        progress = {
+            row[0]: (row[1], row[2], row[3])
+            for row in memory.conn.execute("SELECT session_id, target_node, last_id, done FROM rebalance_progress")
+        }
+        moves = []
+        for session_id in sessions:
+            owner = self.get_owner(session_id)
+            target, last_id, done = progress.get(session_id, (None, 0, 0))
+            if owner is None:
+                continue
+            if owner == node_id:
+                if done:
+                    # The session is back; a later move starts after what was already sent
+                    with memory.conn:
+                        memory.conn.execute("UPDATE rebalance_progress SET done = 0 WHERE session_id = ?", (session_id,))
+                continue
+            if done:
+                # Already handed over; if that node no longer owns it, it forwards it on its own rebalance
+                continue
+            moves.append((session_id, owner, last_id))
+        self._status["sessions_pending"] += len(moves)
+
+        for session_id, owner, last_id in moves:
+            if self._stop.is_set():
+                return
+            self._move_session(node_id, memory, session_id, owner, last_id)
+            if self._stop.is_set():
+                return
+            self._status["sessions_pending"] -= 1
+            self._status["sessions_moved"] += 1
+
+    def _move_session(self, node_id: str, memory: PMMMemory, session_id: str, owner: str, last_id: int):
+        while True:
+            if self._stop.is_set():
+                return
+            rows = memory.conn.execute(
+                "SELECT id, timestamp, kind, content, meta FROM events WHERE session_id = ? AND id > ? ORDER BY id LIMIT ?",
+                (session_id, last_id, self.batch_size)
+            ).fetchall()
+            if not rows:
+                break
+            events = []
+            for _, timestamp, kind, content, meta in rows:
+                meta = json.loads(meta) if meta else {}
+                # Events that came from the new owner in an earlier move are already there
+                if meta.get("migrated_from") == owner:
+                    continue
+                meta["migrated_from"] = node_id
+                events.append({"session_id": session_id, "kind": kind, "content": content, "meta": meta, "timestamp": timestamp})
+            started = time.monotonic()
+            if events:
+                self.deliver(owner, events)
+            last_id = rows[-1][0]
+            with memory.conn:
+                memory.conn.execute("""
+                    INSERT INTO rebalance_progress (session_id, target_node, last_id, done, updated_at) VALUES (?, ?, ?, 0, ?)
+                    ON CONFLICT(session_id) DO UPDATE SET target_node = excluded.target_node, last_id = excluded.last_id,
+                        done = 0, updated_at = excluded.updated_at
+                """, (session_id, owner, last_id, time.time()))
+            self._status["events_moved"] += len(events)
+            if self.rate:
+                self._stop.wait(max(0.0, len(rows) / self.rate - (time.monotonic() - started)))
+        with memory.conn:
+            memory.conn.execute("""
+                INSERT INTO rebalance_progress (session_id, target_node, last_id, done, updated_at) VALUES (?, ?, ?, 1, ?)
+                ON CONFLICT(session_id) DO UPDATE SET target_node = excluded.target_node, done = 1, updated_at = excluded.updated_at
+            """, (session_id, owner, last_id, time.time()))
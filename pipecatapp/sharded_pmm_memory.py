@@ -1,17 +1,27 @@
 import hashlib
 import asyncio
+import heapq
+import itertools
+import sqlite3
+import threading
 import time
 import json
 import uuid
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterator, Optional, List, Tuple
 from pipecatapp.pmm_memory import PMMMemory
 
+# (timestamp, id, kind, content, meta) as read from a shard
+_EventRow = Tuple[float, int, str, str, Optional[str]]
+
 class ShardedPMMMemory:
     """A proxy router wrapper that shards PMMMemory across multiple SQLite databases.
 
     This class provides the exact same interface as `PMMMemory` but acts as an
     intelligent database proxy router. It hashes a key to select the shard
     for write operations and point queries, while scatter-gathering for scans.
+    Scans query every shard in parallel; event reads go through a dedicated
+    read-only connection per shard and are combined with a lazy k-way merge.
 
     Attributes:
         shards (List[PMMMemory]): The list of PMMMemory database shards.
@@ -27,6 +37,9 @@ class ShardedPMMMemory:
             raise ValueError("Must specify at least one database path for sharding.")
         self.shards = [PMMMemory(db_path=path) for path in db_paths]
         self.num_shards = len(db_paths)
+        self._executor = ThreadPoolExecutor(max_workers=self.num_shards, thread_name_prefix="pmm-shard")
+        self._readers: List[Optional[sqlite3.Connection]] = [None] * self.num_shards
+        self._reader_locks = [threading.Lock() for _ in range(self.num_shards)]
 
     def _get_shard_index(self, routing_key: str) -> int:
         """Determines the target shard index by hashing the key.
@@ -67,24 +80,128 @@ class ShardedPMMMemory:
         loop = asyncio.get_running_loop()
         await loop.run_in_executor(None, self.add_event_sync, kind, content, meta)
 
-    def get_events_sync(self, kind: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
-        """Retrieves events from all shards, merges and sorts them, and limits the result.
+    def get_events_sync(self, kind: Optional[str] = None, limit: int = 10, before_ts: Optional[float] = None,
+                        before_id: Optional[int] = None, after_ts: Optional[float] = None,
+                        session_id: Optional[str] = None, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Retrieves events from all shards, merged in (timestamp, id) order.
 
-        This uses a scatter-gather approach across all shards.
-        """
-        all_events = []
-        for shard in self.shards:
-            events = shard.get_events_sync(kind=kind, limit=limit)
-            all_events.extend(events)
+        Every shard is queried in parallel for its first page of events in
+        merge order, and the pages are combined with a k-way merge that stops
+        after `limit` events. A shard is only asked for more rows when the
+        merge exhausts its page, so a read costs roughly `limit` rows rather
+        than `limit` per shard.
 
-        # Merge and sort by timestamp, then limit
-        all_events.sort(key=lambda x: x["timestamp"])
-        return all_events[-limit:]
+        By default the most recent events are returned. To page backwards,
+        pass the timestamp and id of the oldest event of the previous page as
+        `before_ts` and `before_id`. `after_ts` instead returns the oldest
+        events newer than that timestamp, for reading forwards.
 
-    async def get_events(self, kind: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        `session_id` and `task_id` filter on the indexed ledger columns. Events
+        carrying a session_id are routed by it, so a session filter only reads
+        the one shard that can hold them.
+
+        Returns:
+            A list of event dictionaries, oldest first.
+        """
+        if limit <= 0:
+            return []
+        descending = after_ts is None
+        if descending:
+            bound = (before_ts, before_id) if before_ts is not None else None
+        else:
+            bound = (after_ts, None)
+        filters = {"kind": kind, "session_id": session_id, "task_id": task_id}
+        if session_id:
+            indexes = [self._get_shard_index(str(session_id))]
+            page_size = limit
+        else:
+            indexes = list(range(self.num_shards))
+            # Over-fetch a little, so an even spread of events is served by the first pages
+            page_size = min(limit, -(-limit // self.num_shards) + 8)
+
+        first_pages = self._scatter(lambda index: self._read_events(index, filters, bound, descending, page_size), indexes)
+        streams = [
+            self._event_stream(index, filters, descending, page_size, rows)
+            for index, rows in zip(indexes, first_pages)
+        ]
+        merged = heapq.merge(*streams, key=lambda item: (item[1][0], item[1][1], item[0]), reverse=descending)
+        events = [self._row_to_event(row) for _, row in itertools.islice(merged, limit)]
+        return list(reversed(events)) if descending else events
+
+    async def get_events(self, kind: Optional[str] = None, limit: int = 10, before_ts: Optional[float] = None,
+                         before_id: Optional[int] = None, after_ts: Optional[float] = None,
+                         session_id: Optional[str] = None, task_id: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieves and merges events from all shards asynchronously."""
         loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(None, self.get_events_sync, kind, limit)
+        return await loop.run_in_executor(None, self.get_events_sync, kind, limit, before_ts, before_id, after_ts, session_id, task_id)
+
+    def _scatter(self, fn: Callable[[int], Any], indexes: Optional[List[int]] = None) -> List[Any]:
+        """Runs `fn(shard_index)` for every shard (or just `indexes`) concurrently and returns the results in order."""
+        indexes = list(range(self.num_shards)) if indexes is None else indexes
+        if len(indexes) == 1:
+            return [fn(indexes[0])]
+        return list(self._executor.map(fn, indexes))
+
+    def _get_reader(self, index: int) -> sqlite3.Connection:
+        # Must be called with the shard's reader lock held
+        if self._readers[index] is None:
+            shard = self.shards[index]
+            if shard.db_path == ":memory:":
+                self._readers[index] = shard.conn
+            else:
+                conn = sqlite3.connect(shard.db_path, check_same_thread=False)
+                conn.execute("PRAGMA query_only=ON;")
+                self._readers[index] = conn
+        return self._readers[index]
+
+    def _read_events(self, index: int, filters: Dict[str, Any], bound: Optional[Tuple[float, Optional[int]]],
+                     descending: bool, page_size: int) -> List[_EventRow]:
+        """Reads up to `page_size` events from one shard, strictly past `bound` in merge order."""
+        clauses, params = [], []
+        for column, value in filters.items():
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(str(value))
+        if bound is not None:
+            ts, event_id = bound
+            op = "<" if descending else ">"
+            if event_id is None:
+                clauses.append(f"timestamp {op} ?")
+                params.append(ts)
+            else:
+                clauses.append(f"(timestamp {op} ? OR (timestamp = ? AND id {op} ?))")
+                params.extend((ts, ts, event_id))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        direction = "DESC" if descending else "ASC"
+        with self._reader_locks[index]:
+            return self._get_reader(index).execute(
+                f"SELECT timestamp, id, kind, content, meta FROM events {where} "
+                f"ORDER BY timestamp {direction}, id {direction} LIMIT ?",
+                (*params, page_size)
+            ).fetchall()
+
+    def _event_stream(self, index: int, filters: Dict[str, Any], descending: bool, page_size: int,
+                      rows: List[_EventRow]) -> Iterator[Tuple[int, _EventRow]]:
+        """Yields one shard's events in merge order, fetching further pages only on demand."""
+        while True:
+            for row in rows:
+                yield index, row
+            if len(rows) < page_size:
+                return
+            # Larger follow-up pages: a shard that ran dry is likely to hold most of the result
+            page_size *= 2
+            rows = self._read_events(index, filters, (rows[-1][0], rows[-1][1]), descending, page_size)
+
+    @staticmethod
+    def _row_to_event(row: _EventRow) -> Dict[str, Any]:
+        timestamp, event_id, kind, content, meta = row
+        return {
+            "id": event_id,
+            "timestamp": timestamp,
+            "kind": kind,
+            "content": content,
+            "meta": json.loads(meta) if meta else {}
+        }
 
     # -------------------------------------------------------------------------
     # Gas Town Work Ledger Methods
@@ -148,8 +265,7 @@ class ShardedPMMMemory:
     def list_work_items_sync(self, status: str = None, assignee_id: str = None, limit: int = 50) -> List[Dict]:
         """Scatter-gathers work items across all shards."""
         all_items = []
-        for shard in self.shards:
-            items = shard.list_work_items_sync(status=status, assignee_id=assignee_id, limit=limit)
+        for items in self._scatter(lambda index: self.shards[index].list_work_items_sync(status=status, assignee_id=assignee_id, limit=limit)):
             all_items.extend(items)
 
         # Sort by created_at desc
@@ -182,8 +298,8 @@ class ShardedPMMMemory:
     def get_work_items_since_sync(self, since_timestamp: float) -> List[Dict]:
         """Scatter-gathers updated work items since timestamp."""
         all_items = []
-        for shard in self.shards:
-            all_items.extend(shard.get_work_items_since_sync(since_timestamp))
+        for items in self._scatter(lambda index: self.shards[index].get_work_items_since_sync(since_timestamp)):
+            all_items.extend(items)
         return all_items
 
     async def get_work_items_since(self, since_timestamp: float) -> List[Dict]:
@@ -196,8 +312,7 @@ class ShardedPMMMemory:
         completed_tasks = 0
         failed_tasks = 0
 
-        for shard in self.shards:
-            stats = shard.get_agent_stats_sync(assignee_id)
+        for stats in self._scatter(lambda index: self.shards[index].get_agent_stats_sync(assignee_id)):
             total_tasks += stats["total_tasks"]
             completed_tasks += stats["completed_tasks"]
             failed_tasks += stats["failed_tasks"]
@@ -262,6 +377,10 @@ class ShardedPMMMemory:
 
     def close(self):
         """Closes all shards."""
+        self._executor.shutdown(wait=True)
+        for shard, reader in zip(self.shards, self._readers):
+            if reader is not None and reader is not shard.conn:
+                reader.close()
         for shard in self.shards:
             shard.close()
 
@@ -2,51 +2,166 @@ import os
 import asyncio
 import hashlib
 import bisect
+import heapq
+import json
 import yaml
 import httpx
 import logging
-from typing import Dict, List, Optional, Any
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from pipecatapp.pmm_memory import PMMMemory
+from pipecatapp.shard_outbox import HTTP2_AVAILABLE, EventSpool, ShardOutbox, ShardRejectedError
+from pipecatapp.shard_rebalancer import ShardRebalancer
+
+def _md5_hash(key: str) -> int:
+    return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest(), "big")
+
+
+def _blake2b_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), "big")
+
+
+# "md5" keeps the placement of rings built before the hash became configurable
+HASH_FUNCTIONS: Dict[str, Callable[[str], int]] = {
+    "md5": _md5_hash,
+    "blake2b": _blake2b_hash,
+}
+
+
+def _get_hash_function(name: str) -> Callable[[str], int]:
+    try:
+        return HASH_FUNCTIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown hash function '{name}'. Expected one of: {', '.join(HASH_FUNCTIONS)}")
+
 
 class HashRing:
-    """Consistent Hashing implementation with Virtual Nodes."""
-    def __init__(self, shards: List[str] = None, replica_count: int = 128):
+    """Consistent Hashing implementation with weighted Virtual Nodes.
+
+    A shard of weight `w` gets `round(replica_count * w)` virtual nodes.
+    Lookups read one immutable (keys, owners) snapshot, so the ring can be
+    changed while other threads route keys.
+    """
+    def __init__(self, shards: List[str] = None, replica_count: int = 128, hash_function: str = "md5",
+                 weights: Optional[Dict[str, float]] = None):
         self.replica_count = replica_count
+        self.hash_function = hash_function
+        self._hash_fn = _get_hash_function(hash_function)
         self.ring: Dict[int, str] = {}
         self.sorted_keys: List[int] = []
+        self.weights: Dict[str, float] = {}
+        self._lookup: Tuple[List[int], List[str]] = ([], [])
+        weights = weights or {}
         if shards:
             for s in shards:
-                self.add_shard(s)
+                self.add_shard(s, weights.get(s, 1.0))
 
-    def _hash(self, key: str) -> int:
-        """Returns the MD5 integer hash of a key."""
-        return int(hashlib.md5(key.encode('utf-8')).hexdigest(), 16)
+    @property
+    def shards(self) -> List[str]:
+        return list(self.weights)
 
-    def add_shard(self, shard: str):
-        """Adds virtual nodes for a shard to the hash ring."""
-        for i in range(self.replica_count):
+    def _hash(self, key: str) -> int:
+        """Returns the integer hash of a key."""
+        return self._hash_fn(key)
+
+    def add_shard(self, shard: str, weight: float = 1.0):
+        """Adds virtual nodes for a shard to the hash ring, replacing any it already has."""
+        if shard in self.weights:
+            self.remove_shard(shard)
+        ring = dict(self.ring)
+        new_keys = []
+        for i in range(max(1, round(self.replica_count * weight))):
             key = self._hash(f"{shard}:{i}")
-            self.ring[key] = shard
-            self.sorted_keys.append(key)
-        self.sorted_keys.sort()
+            if key not in ring:
+                ring[key] = shard
+                new_keys.append(key)
+        new_keys.sort()
+        # Merging two sorted runs is linear; no full re-sort per shard
+        self._publish(ring, list(heapq.merge(self.sorted_keys, new_keys)))
+        self.weights[shard] = weight
 
     def remove_shard(self, shard: str):
         """Removes all virtual nodes of a shard from the hash ring."""
-        for i in range(self.replica_count):
-            key = self._hash(f"{shard}:{i}")
-            if key in self.ring:
-                del self.ring[key]
-                self.sorted_keys.remove(key)
+        if shard not in self.weights:
+            return
+        ring = {key: owner for key, owner in self.ring.items() if owner != shard}
+        self._publish(ring, [key for key in self.sorted_keys if key in ring])
+        del self.weights[shard]
+
+    def _publish(self, ring: Dict[int, str], sorted_keys: List[int]):
+        self.ring = ring
+        self.sorted_keys = sorted_keys
+        self._lookup = (sorted_keys, [ring[key] for key in sorted_keys])
 
     def get_shard(self, key: str) -> Optional[str]:
         """Looks up the target shard for the given key in the ring."""
-        if not self.ring:
+        keys, owners = self._lookup
+        if not keys:
             return None
-        val_hash = self._hash(key)
-        idx = bisect.bisect_right(self.sorted_keys, val_hash)
-        if idx == len(self.sorted_keys):
+        idx = bisect.bisect_right(keys, self._hash(key))
+        if idx == len(keys):
             idx = 0
-        return self.ring[self.sorted_keys[idx]]
+        return owners[idx]
+
+
+class JumpHash:
+    """Jump consistent hashing (Lamping & Veach) over an ordered list of shards.
+
+    Needs no virtual nodes and no lookup table. Adding a shard at the end only
+    moves the keys it takes over; removing a shard other than the last one
+    remaps more than a ring would. Weights must be whole numbers: a shard of
+    weight `w` occupies `w` buckets.
+    """
+    def __init__(self, shards: List[str] = None, hash_function: str = "md5", weights: Optional[Dict[str, float]] = None):
+        self.hash_function = hash_function
+        self._hash_fn = _get_hash_function(hash_function)
+        self.weights: Dict[str, float] = {}
+        self._buckets: List[str] = []
+        weights = weights or {}
+        if shards:
+            for s in shards:
+                self.add_shard(s, weights.get(s, 1))
+
+    @property
+    def shards(self) -> List[str]:
+        return list(self.weights)
+
+    def add_shard(self, shard: str, weight: float = 1):
+        if weight != int(weight) or weight < 1:
+            raise ValueError(f"Jump hashing needs a whole-number weight of at least 1, got {weight} for '{shard}'.")
+        if shard in self.weights:
+            self.remove_shard(shard)
+        self.weights[shard] = weight
+        self._buckets = self._buckets + [shard] * int(weight)
+
+    def remove_shard(self, shard: str):
+        if self.weights.pop(shard, None) is not None:
+            self._buckets = [bucket for bucket in self._buckets if bucket != shard]
+
+    def get_shard(self, key: str) -> Optional[str]:
+        buckets = self._buckets
+        if not buckets:
+            return None
+        return buckets[self._jump(self._hash_fn(key) & 0xFFFFFFFFFFFFFFFF, len(buckets))]
+
+    @staticmethod
+    def _jump(key: int, num_buckets: int) -> int:
+        bucket, candidate = -1, 0
+        while candidate < num_buckets:
+            bucket = candidate
+            key = (key * 2862933555777941757 + 1) & 0xFFFFFFFFFFFFFFFF
+            candidate = int((bucket + 1) * ((1 << 31) / ((key >> 33) + 1)))
+        return bucket
+
+
+def create_hash_ring(algorithm: str = "consistent_hash", shards: List[str] = None, replica_count: int = 128,
+                     hash_function: str = "md5", weights: Optional[Dict[str, float]] = None):
+    """Builds the key-to-shard placement named by the `algorithm` setting of a sharding config."""
+    if algorithm == "consistent_hash":
+        return HashRing(shards=shards, replica_count=replica_count, hash_function=hash_function, weights=weights)
+    if algorithm == "jump_hash":
+        return JumpHash(shards=shards, hash_function=hash_function, weights=weights)
+    raise ValueError(f"Unknown sharding algorithm '{algorithm}'. Expected 'consistent_hash' or 'jump_hash'.")
 
 
 class ShardedPMMMemoryRouter:
@@ -77,30 +192,138 @@ class ShardedPMMMemoryRouter:
         self.api_key = sharding_section.get("api_key") or os.environ.get("PIPECAT_API_KEY", "")
         self.headers = {"Authorization": f"Bearer {self.api_key}"} if self.api_key else {}
 
-        # Initialize consistent hashing ring
-        self.hash_ring = HashRing(shards=list(self.nodes_config.keys()), replica_count=self.replica_count)
+        # Initialize the key-to-shard placement (weighted consistent hash ring by default)
+        self.algorithm = sharding_section.get("algorithm", "consistent_hash")
+        self.hash_function = sharding_section.get("hash_function", "md5")
+        self.hash_ring = create_hash_ring(
+            self.algorithm,
+            shards=list(self.nodes_config.keys()),
+            replica_count=self.replica_count,
+            hash_function=self.hash_function,
+            weights={node_id: info.get("weight", 1) for node_id, info in self.nodes_config.items()},
+        )
 
         # Pre-instantiate memory instances for any locally configured databases
         self.local_memories: Dict[str, PMMMemory] = {}
         for node_id, info in self.nodes_config.items():
-            db_path = info.get("sqlite_path") or info.get("sqlite_url", "").replace("sqlite:///", "")
-            if db_path:
-                self.local_memories[node_id] = PMMMemory(db_path=db_path)
-
-        # Clients for HTTP routing
-        self.async_client = httpx.AsyncClient(timeout=5.0)
-        self.sync_client = httpx.Client(timeout=5.0)
+            self._open_local_memory(node_id, info)
+
+        # Clients for HTTP routing (HTTP/2 multiplexes requests to a node over one connection)
+        self.async_client = httpx.AsyncClient(timeout=5.0, http2=HTTP2_AVAILABLE)
+        self.sync_client = httpx.Client(timeout=5.0, http2=HTTP2_AVAILABLE)
+
+        # Remote event writes are batched per node, and spooled while a node is unreachable
+        self.outbox_options = {
+            "batch_size": sharding_section.get("batch_size", 256),
+            "flush_interval": sharding_section.get("flush_interval", 0.005),
+            "max_in_flight": sharding_section.get("max_in_flight", 4),
+            "max_retries": sharding_section.get("max_retries", 2),
+            "replay_interval": sharding_section.get("replay_interval", 5.0),
+        }
+        self.spool_path = sharding_section.get("spool_path") or os.environ.get(
+            "SHARD_SPOOL_PATH", "~/.config/pipecat/shard_spool.db"
+        )
+        self._spool: Optional[EventSpool] = None
+        self._outboxes: Dict[str, ShardOutbox] = {}
+        self._outbox_lock = threading.Lock()
+        # Resume replaying anything spooled before a restart
+        if os.path.exists(os.path.expanduser(self.spool_path)):
+            for node_id in self._get_spool().nodes():
+                if node_id in self.nodes_config and node_id not in self.local_memories:
+                    self._get_outbox(node_id)
+
+        # Sessions whose owner changed with the topology are streamed to their new shard
+        self.rebalancer = ShardRebalancer(
+            self.get_shard_for_session, self.local_memories, self._deliver_events,
+            batch_size=sharding_section.get("rebalance_batch_size", 256),
+            rate=sharding_section.get("rebalance_rate", 2000.0),
+        )
+        fingerprint = self.topology_fingerprint()
+        changed = False
+        for memory in self.local_memories.values():
+            previous = ShardRebalancer.get_fingerprint(memory)
+            if previous is None:
+                ShardRebalancer.set_fingerprint(memory, fingerprint)
+            elif previous != fingerprint:
+                changed = True
+        if changed and sharding_section.get("auto_rebalance", True):
+            self.logger.info("Sharding topology changed since the local shards were last balanced; rebalancing.")
+            self.rebalancer.start(fingerprint)
 
     def get_shard_for_session(self, session_id: str) -> str:
         """Determines the target shard node for a session key."""
         return self.hash_ring.get_shard(session_id)
 
+    def _open_local_memory(self, node_id: str, info: Dict[str, Any]):
+        db_path = info.get("sqlite_path") or info.get("sqlite_url", "").replace("sqlite:///", "")
+        if db_path and node_id not in self.local_memories:
+            self.local_memories[node_id] = PMMMemory(db_path=db_path)
+
+    def topology_fingerprint(self) -> str:
+        """Identifies the current placement; shards remember the one they were last balanced for."""
+        return json.dumps({
+            "algorithm": self.algorithm,
+            "hash_function": self.hash_function,
+            "replica_count": self.replica_count,
+            "weights": self.hash_ring.weights,
+        }, sort_keys=True)
+
+    def add_node(self, node_id: str, info: Dict[str, Any]):
+        """Adds (or reweights) a node and moves the sessions it now owns to it in the background."""
+        self.nodes_config[node_id] = info
+        self._open_local_memory(node_id, info)
+        if node_id in self.local_memories:
+            ShardRebalancer.init_shard(self.local_memories[node_id])
+        self.hash_ring.add_shard(node_id, info.get("weight", 1))
+        self.rebalancer.start(self.topology_fingerprint())
+
+    def remove_node(self, node_id: str):
+        """Removes a node from placement and moves its sessions to their new owners in the background.
+
+        A local shard of the removed node stays open so its sessions can be streamed off it.
+        """
+        self.nodes_config.pop(node_id, None)
+        self.hash_ring.remove_shard(node_id)
+        self.rebalancer.start(self.topology_fingerprint())
+
+    def rebalance_status(self) -> Dict[str, Any]:
+        return self.rebalancer.status()
+
+    def _deliver_events(self, node_id: str, events: List[Dict[str, Any]]):
+        """Writes a batch of events to a node, waiting until they are committed or spooled."""
+        if node_id in self.local_memories:
+            self.local_memories[node_id].add_events_bulk_sync(events)
+        else:
+            try:
+                self._get_outbox(node_id).submit(events).result()
+            except ShardRejectedError as e:
+                # Invalid events can never be moved; the rest of the batch was
+                self.logger.error(f"Node {node_id} rejected {len(e.rejected)} moved event(s): {e}")
+
     def _get_node_api_url(self, node_id: str) -> str:
         """Helper to get the API base URL of a specific node."""
         info = self.nodes_config.get(node_id, {})
         url = info.get("api_url", "")
         return url.rstrip("/")
 
+    def _get_spool(self) -> EventSpool:
+        if self._spool is None:
+            self._spool = EventSpool(self.spool_path)
+        return self._spool
+
+    def _get_outbox(self, node_id: str) -> ShardOutbox:
+        """Returns the outbound event queue of a remote node, creating it on first use."""
+        outbox = self._outboxes.get(node_id)
+        if outbox is None:
+            with self._outbox_lock:
+                outbox = self._outboxes.get(node_id)
+                if outbox is None:
+                    outbox = self._outboxes[node_id] = ShardOutbox(
+                        node_id, self._get_node_api_url(node_id), self._get_spool(), self.sync_client,
+                        headers=self.headers, **self.outbox_options
+                    )
+        return outbox
+
     # -------------------------------------------------------------------------
     # Conversational Events (Sharded by Session ID)
     # -------------------------------------------------------------------------
@@ -116,22 +339,13 @@ class ShardedPMMMemoryRouter:
             self.local_memories[target_node].add_event_sync(kind, content, meta)
             return target_node
         else:
-            api_url = self._get_node_api_url(target_node)
+            # Batched with concurrent writes to the node; spooled (never re-placed) if it is down
+            event = {"session_id": session_id, "kind": kind, "content": content, "meta": meta}
             try:
-                resp = self.sync_client.post(
-                    f"{api_url}/api/memory/sharded/events",
-                    json={"session_id": session_id, "kind": kind, "content": content, "meta": meta},
-                    headers=self.headers
-                )
-                resp.raise_for_status()
+                self._get_outbox(target_node).submit([event]).result()
                 return target_node
             except Exception as e:
                 self.logger.error(f"Failed to route add_event_sync to {target_node}: {e}")
-                # Fallback to local default node if remote fails
-                default_node = self.coordinator_node_id
-                if default_node in self.local_memories:
-                    self.local_memories[default_node].add_event_sync(kind, content, meta)
-                    return default_node
                 raise e
 
     async def add_event(self, session_id: str, kind: str, content: str, meta: Optional[Dict[str, Any]] = None) -> str:
@@ -145,29 +359,19 @@ class ShardedPMMMemoryRouter:
             await self.local_memories[target_node].add_event(kind, content, meta)
             return target_node
         else:
-            api_url = self._get_node_api_url(target_node)
+            event = {"session_id": session_id, "kind": kind, "content": content, "meta": meta}
             try:
-                resp = await self.async_client.post(
-                    f"{api_url}/api/memory/sharded/events",
-                    json={"session_id": session_id, "kind": kind, "content": content, "meta": meta},
-                    headers=self.headers
-                )
-                resp.raise_for_status()
+                await asyncio.wrap_future(self._get_outbox(target_node).submit([event]))
                 return target_node
             except Exception as e:
                 self.logger.error(f"Failed to route add_event to {target_node}: {e}")
-                default_node = self.coordinator_node_id
-                if default_node in self.local_memories:
-                    await self.local_memories[default_node].add_event(kind, content, meta)
-                    return default_node
                 raise e
 
     def get_events_sync(self, session_id: str, kind: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
-        """Synchronously retrieves and filters events from the session's target shard."""
+        """Synchronously retrieves the session's most recent events from its target shard."""
         target_node = self.get_shard_for_session(session_id)
         if target_node in self.local_memories:
-            events = self.local_memories[target_node].get_events_sync(kind=kind, limit=limit)
-            return [e for e in events if e.get("meta", {}).get("session_id") == session_id]
+            return self.local_memories[target_node].get_events_sync(kind=kind, limit=limit, session_id=session_id)
         else:
             api_url = self._get_node_api_url(target_node)
             try:
@@ -186,11 +390,10 @@ class ShardedPMMMemoryRouter:
                 return []
 
     async def get_events(self, session_id: str, kind: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
-        """Asynchronously retrieves and filters events from the session's target shard."""
+        """Asynchronously retrieves the session's most recent events from its target shard."""
         target_node = self.get_shard_for_session(session_id)
         if target_node in self.local_memories:
-            events = await self.local_memories[target_node].get_events(kind=kind, limit=limit)
-            return [e for e in events if e.get("meta", {}).get("session_id") == session_id]
+            return await self.local_memories[target_node].get_events(kind=kind, limit=limit, session_id=session_id)
         else:
             api_url = self._get_node_api_url(target_node)
             try:
@@ -496,6 +699,11 @@ class ShardedPMMMemoryRouter:
 
     def close(self):
         """Closes all local SQLite database connections and client pools."""
+        self.rebalancer.stop()
+        for outbox in self._outboxes.values():
+            outbox.close()
+        if self._spool is not None:
+            self._spool.close()
         for mem in self.local_memories.values():
             mem.close()
         self.sync_client.close()
@@ -656,6 +656,8 @@ document.addEventListener("DOMContentLoaded", function() {
     });
 
     ws.onopen = function() {
+        // Logs are only streamed to clients that subscribe to them
+        ws.send(JSON.stringify({ type: "subscribe", topics: ["log"] }));
         logToTerminal("--- Connection established with Agent ---");
         if (statusLight) {
             statusLight.classList.remove("disconnected");
@@ -0,0 +1,158 @@
+"""Streaming transcription: decode speech while the user is still talking.
+
+Transcribing only after the user stops speaking makes STT latency grow with
+the length of the utterance. StreamingTranscriber instead re-decodes a
+rolling window of speech every `step_seconds` and publishes the result as
+an interim transcript. Words are committed with a local-agreement policy:
+a word is final once two consecutive decodes agree on it and on every word
+before it. The audio behind the last committed word is dropped from the
+window, and the committed text is passed to the model as a prompt, so each
+decode (including the final one at end of speech) only covers the short,
+still-uncertain tail of the utterance.
+"""
+import asyncio
+import logging
+import re
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+# (start seconds, end seconds, text), relative to the decoded audio
+Word = Tuple[float, float, str]
+
+DEFAULT_STEP_SECONDS = 1.0
+# Whisper's receptive field is 30 s; commit eagerly well before the window gets there
+DEFAULT_MAX_WINDOW_SECONDS = 15.0
+# Committed text passed back to the model as context
+PROMPT_CHARS = 200
+
+_NORMALIZE_RE = re.compile(r"[^\w']+")
+
+
+def _normalize(text: str) -> str:
+    return _NORMALIZE_RE.sub("", text.lower())
+
+
+def agreed_prefix(previous: List[Word], current: List[Word]) -> int:
+    """Returns how many leading words two hypotheses agree on, ignoring case and punctuation."""
+    n = 0
+    for old, new in zip(previous, current):
+        if _normalize(old[2]) != _normalize(new[2]):
+            break
+        n += 1
+    return n
+
+
+class StreamingTranscriber:
+    """Transcribes an utterance incrementally and commits stable words.
+
+    Args:
+        transcribe: Blocking function `(pcm, prompt) -> [Word]` that decodes
+            16-bit mono PCM with word timestamps. Runs in the default executor.
+        on_interim: Coroutine function awaited with the interim transcript
+            whenever it changes.
+        sample_rate (int): Sample rate of the PCM passed to `feed`.
+        step_seconds (float): New audio needed before the window is decoded again.
+        max_window_seconds (float): Window length past which words are committed
+            without waiting for agreement.
+    """
+    def __init__(self, transcribe: Callable[[bytes, str], List[Word]],
+                 on_interim: Optional[Callable[[str], Awaitable[None]]] = None, sample_rate: int = 16000,
+                 step_seconds: float = DEFAULT_STEP_SECONDS, max_window_seconds: float = DEFAULT_MAX_WINDOW_SECONDS):
+        self.transcribe = transcribe
+        self.on_interim = on_interim
+        self.sample_rate = sample_rate
+        self.step_bytes = int(step_seconds * sample_rate) * 2
+        self.max_window_bytes = int(max_window_seconds * sample_rate) * 2
+        self._decode_task: Optional[asyncio.Task] = None
+        self.reset()
+
+    def reset(self):
+        """Forgets the current utterance and cancels any decode in flight."""
+        if self._decode_task is not None:
+            self._decode_task.cancel()
+            self._decode_task = None
+        self.pcm = bytearray()
+        # Time of pcm[0] within the utterance
+        self.offset = 0.0
+        self.committed: List[str] = []
+        self.committed_end = 0.0
+        self.hypothesis: List[Word] = []
+        self.interim = ""
+        self._undecoded = 0
+
+    def feed(self, pcm: bytes):
+        """Adds speech; starts a background decode once a step of new audio has arrived."""
+        self.pcm.extend(pcm)
+        self._undecoded += len(pcm)
+        if self._undecoded >= self.step_bytes and self._decode_task is None:
+            self._decode_task = asyncio.create_task(self._decode_step())
+
+    async def finish(self) -> str:
+        """Decodes the uncommitted tail and returns the final transcript. Resets the transcriber."""
+        if self._decode_task is not None:
+            await asyncio.wait([self._decode_task])
+        # A step that started after the last frame already decoded the whole tail
+        words = self.hypothesis
+        if self._undecoded:
+            words = await self._decode()
+        text = " ".join(self.committed + [w[2] for w in words])
+        self.reset()
+        return text
+
+    async def _decode_step(self):
+        try:
+            self._undecoded = 0
+            # feed() keeps appending while the window is decoded
+            decoded = len(self.pcm)
+            words = await self._decode()
+            window_end = self.offset + decoded / (2 * self.sample_rate)
+            agreed = agreed_prefix(self.hypothesis, words)
+            if decoded > self.max_window_bytes:
+                # No agreement for too long: commit everything but the last step of audio
+                step = self.step_bytes / (2 * self.sample_rate)
+                agreed = max(agreed, sum(1 for w in words if w[1] <= window_end - step))
+            self._commit(words[:agreed])
+            self.hypothesis = words[agreed:]
+            interim = " ".join(self.committed + [w[2] for w in self.hypothesis])
+            if interim and interim != self.interim:
+                self.interim = interim
+                if self.on_interim is not None:
+                    await self.on_interim(interim)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Streaming transcription step failed: {e}")
+            self._undecoded = len(self.pcm)
+        finally:
+            if self._decode_task is asyncio.current_task():
+                self._decode_task = None
+
+    async def _decode(self) -> List[Word]:
+        """Decodes the current window; returns its new words with utterance-relative times."""
+        pcm = bytes(self.pcm)
+        offset = self.offset
+        prompt = " ".join(self.committed)[-PROMPT_CHARS:]
+        loop = asyncio.get_running_loop()
+        raw = await loop.run_in_executor(None, self.transcribe, pcm, prompt)
+        words = [(offset + start, offset + end, text.strip()) for start, end, text in raw if text.strip()]
+        return self._drop_repeated(words)
+
+    def _drop_repeated(self, words: List[Word]) -> List[Word]:
+        # The window starts at the end of the last committed word, and the
+        # model sometimes hears that word again; drop an n-gram repeat of it
+        if not self.committed or not words or words[0][0] > self.committed_end + 1.0:
+            return words
+        for n in range(min(5, len(self.committed), len(words)), 0, -1):
+            tail = [_normalize(w) for w in self.committed[-n:]]
+            if tail == [_normalize(w[2]) for w in words[:n]]:
+                return words[n:]
+        return words
+
+    def _commit(self, words: List[Word]):
+        if not words:
+            return
+        self.committed.extend(w[2] for w in words)
+        self.committed_end = words[-1][1]
+        cut = round((self.committed_end - self.offset) * self.sample_rate) * 2
+        cut = max(0, min(cut, len(self.pcm)))
+        del self.pcm[:cut]
+        self.offset += cut / (2 * self.sample_rate)
@@ -0,0 +1,141 @@
+"""Incremental text-to-speech: synthesize a response a sentence at a time.
+
+Synthesizing a whole LLM response before playing any of it makes the time
+to first audio grow with the length of the response. IncrementalSynthesizer
+instead cuts incoming text at sentence boundaries (and, for the first chunk
+of a response, at an early clause boundary), synthesizes the chunks on a
+small thread pool and hands the PCM back in text order as soon as each
+chunk, and every chunk before it, is ready. An interruption cancels
+everything that has not been played yet.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import re
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+# Chunks shorter than this are merged into the next one ("Dr.", "1.", "Ok.")
+MIN_CHUNK_CHARS = 12
+# The first chunk of a response may end at a clause boundary past this point
+FIRST_CHUNK_CHARS = 24
+# Longer runs without a sentence boundary are cut at a clause or word boundary
+MAX_CHUNK_CHARS = 240
+
+_SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+|\n+")
+_CLAUSE_END = re.compile(r"[,;:–—]\s+")
+
+
+def _find_cut(text: str, first: bool) -> Optional[int]:
+    sentence = next((m.end() for m in _SENTENCE_END.finditer(text) if m.end() >= MIN_CHUNK_CHARS), None)
+    if first:
+        clause = next((m.end() for m in _CLAUSE_END.finditer(text) if m.end() >= FIRST_CHUNK_CHARS), None)
+        if clause is not None and (sentence is None or clause < sentence):
+            return clause
+    if sentence is not None and sentence <= MAX_CHUNK_CHARS:
+        return sentence
+    if len(text) <= MAX_CHUNK_CHARS:
+        return None
+    head = text[:MAX_CHUNK_CHARS]
+    clauses = [m.end() for m in _CLAUSE_END.finditer(head) if m.end() >= MIN_CHUNK_CHARS]
+    if clauses:
+        return clauses[-1]
+    space = head.rfind(" ")
+    return space + 1 if space >= MIN_CHUNK_CHARS else MAX_CHUNK_CHARS
+
+
+def split_chunks(text: str, first: bool = False) -> Tuple[List[str], str]:
+    """Cuts every complete chunk off the front of `text`.
+
+    A sentence only counts as complete once the whitespace after it has
+    arrived, so streamed text such as "3." followed by "14" is not split.
+
+    Args:
+        text (str): Buffered text that has not been synthesized yet.
+        first (bool): Whether the first chunk returned starts a response.
+
+    Returns:
+        tuple: The chunks ready for synthesis, and the remaining text.
+    """
+    chunks = []
+    while True:
+        cut = _find_cut(text, first and not chunks)
+        if cut is None:
+            return chunks, text
+        chunk = text[:cut].strip()
+        if chunk:
+            chunks.append(chunk)
+        text = text[cut:]
+
+
+class IncrementalSynthesizer:
+    """Synthesizes text as it arrives and emits audio chunks in order.
+
+    Args:
+        synthesize: Blocking function turning text into 16-bit PCM bytes.
+        on_audio: Coroutine function awaited with each chunk's PCM, in text order.
+        max_workers (int): Chunks synthesized concurrently. Use 1 for engines
+            that are not safe to call from several threads.
+    """
+    def __init__(self, synthesize: Callable[[str], bytes], on_audio: Callable[[bytes], Awaitable[None]],
+                 max_workers: int = 2):
+        self.synthesize = synthesize
+        self.on_audio = on_audio
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts")
+        self.buffer = ""
+        self._response_started = False
+        self._futures: List[concurrent.futures.Future] = []
+        self._tail: Optional[asyncio.Task] = None
+
+    def feed(self, text: str):
+        """Adds response text and starts synthesizing every chunk it completes."""
+        self.buffer += text
+        chunks, self.buffer = split_chunks(self.buffer, first=not self._response_started)
+        for chunk in chunks:
+            self._submit(chunk)
+
+    async def finish(self):
+        """Synthesizes the rest of the response and waits until all of its audio was emitted."""
+        remainder, self.buffer = self.buffer.strip(), ""
+        if remainder:
+            self._submit(remainder)
+        tail = self._tail
+        self._response_started = False
+        if tail is not None:
+            # An interruption cancels the chain; that ends the response too
+            await asyncio.wait([tail])
+            if self._tail is tail:
+                self._tail = None
+                self._futures.clear()
+
+    def cancel(self):
+        """Drops buffered text and all audio that has not been emitted yet."""
+        self.buffer = ""
+        self._response_started = False
+        for future in self._futures:
+            future.cancel()
+        self._futures.clear()
+        if self._tail is not None:
+            # Each emitter awaits its predecessor, so this cancels the whole chain
+            self._tail.cancel()
+            self._tail = None
+
+    def close(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, chunk: str):
+        self._response_started = True
+        future = self.executor.submit(self.synthesize, chunk)
+        self._futures.append(future)
+        self._tail = asyncio.create_task(self._emit_after(self._tail, future))
+
+    async def _emit_after(self, previous: Optional[asyncio.Task], future: concurrent.futures.Future):
+        if previous is not None:
+            await previous
+        # Errors stop here so the chunks after this one still play
+        try:
+            pcm = await asyncio.wrap_future(future)
+            if pcm:
+                await self.on_audio(pcm)
+        except Exception as e:
+            logging.error(f"TTS failed for a chunk, skipping it: {e}")
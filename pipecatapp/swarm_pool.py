@@ -0,0 +1,342 @@
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Set
+
+_PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Lines a pooled agent process writes to stdout for the pool; everything else is agent output
+PROTOCOL_PREFIX = "SWARM_POOL "
+
+# agent_type -> "module:Class" of the agent a pooled process runs
+DEFAULT_AGENT_CLASSES = {
+    "worker": "pipecatapp.worker_agent:WorkerAgent",
+    "technician": "pipecatapp.technician_agent:TechnicianAgent",
+}
+
+# Per-task environment the agents read in __init__ (the same variables the Nomad job sets)
+TASK_ENV_KEYS = ("WORKER_PROMPT", "WORKER_CONTEXT", "WORKER_TASK_ID", "NOMAD_JOB_ID", "WORK_ITEM_ID")
+
+
+class PooledTask:
+    """A sub-task queued for, or running on, a warm agent process."""
+    def __init__(self, job_id: str, agent_type: str, task: Dict[str, Any]):
+        self.job_id = job_id
+        self.agent_type = agent_type
+        self.task = task
+        self.status = "queued"
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.done = asyncio.Event()
+
+    def env(self) -> Dict[str, Optional[str]]:
+        return {
+            "WORKER_PROMPT": self.task.get("prompt"),
+            "WORKER_CONTEXT": self.task.get("context", ""),
+            "WORKER_TASK_ID": self.task.get("id", "unknown"),
+            "NOMAD_JOB_ID": self.job_id,
+            "WORK_ITEM_ID": self.task.get("work_item_id"),
+        }
+
+
+class _PoolProcess:
+    """One long-lived agent process and the task it is running, if any."""
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.current: Optional[PooledTask] = None
+
+    async def read_message(self) -> Optional[Dict[str, Any]]:
+        """Returns the next protocol message, or None once the process has exited."""
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                return None
+            text = line.decode("utf-8", errors="replace").rstrip()
+            if text.startswith(PROTOCOL_PREFIX):
+                return json.loads(text[len(PROTOCOL_PREFIX):])
+            logging.getLogger(__name__).debug(f"[swarm-pool {self.process.pid}] {text}")
+
+    async def stop(self):
+        if self.process.returncode is None:
+            try:
+                self.process.stdin.close()
+                await asyncio.wait_for(self.process.wait(), timeout=5)
+            except (asyncio.TimeoutError, ProcessLookupError, BrokenPipeError, ConnectionResetError):
+                self.process.kill()
+                await self.process.wait()
+
+
+class _AgentTypePool:
+    def __init__(self):
+        self.queue: "asyncio.Queue[PooledTask]" = asyncio.Queue()
+        self.processes: List[_PoolProcess] = []
+        self.starting = 0
+
+    @property
+    def idle(self) -> int:
+        return sum(1 for process in self.processes if process.current is None) + self.starting
+
+
+class WarmWorkerPool:
+    """
+    Long-lived worker and technician agent processes that pull sub-tasks from a queue.
+
+    Each agent type has its own queue and its own processes, so a task only
+    runs on an agent of the type it asked for. A process imports its agent
+    once and then runs one task after another, so dispatching a task costs
+    a queue hand-off instead of a container start. The pool grows towards
+    `max_size` processes per type while tasks wait, and shrinks back to
+    `min_size` once processes have been idle for `idle_timeout` seconds.
+    `submit` returns None when a task would have to wait behind more than
+    `max_queue` others, so the caller can overflow it elsewhere. A finished
+    task is forgotten once `wait` has returned its status, or `finished_ttl`
+    seconds after it finished if nobody waits for it.
+    """
+    def __init__(self, min_size: int = 1, max_size: int = 8, idle_timeout: float = 300.0, max_queue: Optional[int] = None,
+                 agent_classes: Optional[Dict[str, str]] = None, env: Optional[Dict[str, str]] = None,
+                 finished_ttl: float = 300.0):
+        """
+        Args:
+            min_size (int): Processes kept warm per agent type once the type has been used.
+            max_size (int): Upper bound on processes per agent type.
+            idle_timeout (float): Seconds an idle process above `min_size` lives on.
+            max_queue (int, optional): Tasks allowed to wait per type. Defaults to `max_size`.
+            agent_classes (dict, optional): agent_type -> "module:Class". Defaults to the worker and technician agents.
+            env (dict, optional): Extra environment for the agent processes.
+            finished_ttl (float): Seconds a finished task stays known to `wait`, `owns` and `cancel`.
+        """
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.idle_timeout = idle_timeout
+        self.max_queue = self.max_size if max_queue is None else max_queue
+        self.agent_classes = agent_classes or dict(DEFAULT_AGENT_CLASSES)
+        self.env = env or {}
+        self.finished_ttl = finished_ttl
+        self.logger = logging.getLogger(__name__)
+        self._pools: Dict[str, _AgentTypePool] = {}
+        self._tasks: Dict[str, PooledTask] = {}
+        self._runners: Set[asyncio.Task] = set()
+        self._closed = False
+
+    @classmethod
+    def from_env(cls) -> "WarmWorkerPool":
+        max_queue = os.getenv("SWARM_POOL_MAX_QUEUE")
+        return cls(
+            min_size=int(os.getenv("SWARM_POOL_MIN", "1")),
+            max_size=int(os.getenv("SWARM_POOL_MAX", "8")),
+            idle_timeout=float(os.getenv("SWARM_POOL_IDLE_TIMEOUT", "300")),
+            max_queue=int(max_queue) if max_queue else None,
+        )
+
+    def supports(self, agent_type: str) -> bool:
+        return agent_type in self.agent_classes
+
+    def submit(self, task: Dict[str, Any], agent_type: str = "worker") -> Optional[str]:
+        """Queues a task for a warm agent. Returns its job id, or None if the pool is saturated."""
+        if self._closed or not self.supports(agent_type):
+            return None
+        pool = self._get_pool(agent_type)
+        spare = pool.idle + (self.max_size - len(pool.processes) - pool.starting)
+        if pool.queue.qsize() >= spare + self.max_queue:
+            return None
+        job_id = f"pool-{agent_type}-{task.get('id', 'unknown')}-{str(uuid.uuid4())[:8]}"
+        pooled = PooledTask(job_id, agent_type, task)
+        self._tasks[job_id] = pooled
+        pool.queue.put_nowait(pooled)
+        self._scale_up(agent_type)
+        return job_id
+
+    def owns(self, job_id: str) -> bool:
+        return job_id in self._tasks
+
+    async def cancel(self, job_id: str) -> bool:
+        """Drops a queued task, or stops the process running it. Returns False for unknown jobs."""
+        pooled = self._tasks.get(job_id)
+        if pooled is None:
+            return False
+        if pooled.status == "queued":
+            self._finish(pooled, "cancelled")
+        elif pooled.status == "running":
+            pooled.status = "cancelled"
+            for process in self._get_pool(pooled.agent_type).processes:
+                if process.current is pooled and process.process.returncode is None:
+                    process.process.kill()
+        return True
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> str:
+        """Waits for a pooled task to finish and returns its final status. The task is forgotten afterwards."""
+        pooled = self._tasks[job_id]
+        await asyncio.wait_for(pooled.done.wait(), timeout)
+        self._tasks.pop(job_id, None)
+        return pooled.status
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            agent_type: {
+                "processes": len(pool.processes),
+                "starting": pool.starting,
+                "busy": sum(1 for process in pool.processes if process.current is not None),
+                "queued": pool.queue.qsize(),
+            }
+            for agent_type, pool in self._pools.items()
+        }
+
+    async def prewarm(self, agent_types: Optional[List[str]] = None):
+        """Starts `min_size` processes for each agent type without waiting for a task."""
+        for agent_type in agent_types or list(self.agent_classes):
+            self._get_pool(agent_type)
+            self._scale_up(agent_type)
+
+    async def close(self):
+        self._closed = True
+        runners = list(self._runners)
+        for runner in runners:
+            runner.cancel()
+        await asyncio.gather(*runners, return_exceptions=True)
+        for pooled in list(self._tasks.values()):
+            if pooled.status in ("queued", "running"):
+                self._finish(pooled, "cancelled")
+
+    def _finish(self, pooled: PooledTask, status: Optional[str] = None):
+        """Marks a task done; it is dropped after `finished_ttl` unless `wait` collects it first."""
+        if status is not None:
+            pooled.status = status
+        if not pooled.done.is_set():
+            pooled.done.set()
+            asyncio.get_running_loop().call_later(self.finished_ttl, self._tasks.pop, pooled.job_id, None)
+
+    def _get_pool(self, agent_type: str) -> _AgentTypePool:
+        pool = self._pools.get(agent_type)
+        if pool is None:
+            pool = self._pools[agent_type] = _AgentTypePool()
+        return pool
+
+    def _scale_up(self, agent_type: str):
+        pool = self._get_pool(agent_type)
+        wanted = max(self.min_size, min(self.max_size, len(pool.processes) + pool.starting + max(0, pool.queue.qsize() - pool.idle)))
+        for _ in range(wanted - len(pool.processes) - pool.starting):
+            pool.starting += 1
+            runner = asyncio.get_running_loop().create_task(self._run_process(agent_type, pool))
+            self._runners.add(runner)
+            runner.add_done_callback(self._runners.discard)
+
+    async def _run_process(self, agent_type: str, pool: _AgentTypePool):
+        """Starts one agent process and feeds it tasks until it idles out, dies or the pool closes."""
+        process: Optional[_PoolProcess] = None
+        started = False
+        try:
+            env = {**os.environ, **self.env}
+            # Make `pipecatapp` importable however this process was started
+            env["PYTHONPATH"] = os.pathsep.join(filter(None, [_PACKAGE_ROOT, env.get("PYTHONPATH")]))
+            proc = await asyncio.create_subprocess_exec(
+                sys.executable, "-m", "pipecatapp.swarm_pool", "--serve", self.agent_classes[agent_type],
+                stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, env=env
+            )
+            process = _PoolProcess(proc)
+            ready = await process.read_message()
+            if not ready or ready.get("event") != "ready":
+                raise RuntimeError(f"agent process exited during startup (code {proc.returncode})")
+            pool.starting -= 1
+            started = True
+            pool.processes.append(process)
+
+            while not self._closed:
+                try:
+                    pooled = await asyncio.wait_for(pool.queue.get(), timeout=self.idle_timeout)
+                except asyncio.TimeoutError:
+                    if len(pool.processes) > self.min_size:
+                        break
+                    continue
+                if pooled.status != "queued":
+                    continue
+                if not await self._run_task(process, pooled):
+                    break
+        except Exception as e:
+            self.logger.error(f"Pooled {agent_type} agent failed: {e}")
+        finally:
+            if started:
+                pool.processes.remove(process)
+            else:
+                pool.starting -= 1
+            if process is not None:
+                await process.stop()
+            if not self._closed and len(pool.processes) + pool.starting < self.min_size:
+                self._scale_up(agent_type)
+
+    async def _run_task(self, process: _PoolProcess, pooled: PooledTask) -> bool:
+        """Runs one task on a process. Returns False if the process did not survive it."""
+        pooled.status = "running"
+        pooled.started_at = time.monotonic()
+        process.current = pooled
+        message = None
+        error: Any = "process died"
+        try:
+            line = json.dumps({"job_id": pooled.job_id, "env": pooled.env()}) + "\n"
+            process.process.stdin.write(line.encode("utf-8"))
+            await process.process.stdin.drain()
+            message = await process.read_message()
+        except Exception as e:
+            # A broken pipe, or output the protocol cannot read (a line over the
+            # stream limit, a malformed message): the process is no longer usable
+            error = e
+        finally:
+            process.current = None
+            if message is None:
+                # Also reached on cancellation, so nobody waits on a task that will never finish
+                self._finish(pooled, None if pooled.status == "cancelled" else "failed")
+        if message is None:
+            if pooled.status != "cancelled":
+                self.logger.error(f"Lost pooled agent process while running {pooled.job_id}: {error}")
+            return False
+        self._finish(pooled, None if pooled.status == "cancelled" else message.get("status", "failed"))
+        return True
+
+
+def _send(message: Dict[str, Any]):
+    sys.stdout.write(PROTOCOL_PREFIX + json.dumps(message) + "\n")
+    sys.stdout.flush()
+
+
+async def _serve(agent_class: str):
+    """Runs inside a pooled process: imports the agent once, then runs the tasks read from stdin."""
+    module_name, class_name = agent_class.split(":")
+    agent_cls = getattr(importlib.import_module(module_name), class_name)
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader()
+    await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    _send({"event": "ready", "pid": os.getpid()})
+
+    while True:
+        line = await reader.readline()
+        if not line:
+            return
+        request = json.loads(line)
+        for key in TASK_ENV_KEYS:
+            value = request["env"].get(key)
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = str(value)
+        status = "success"
+        try:
+            await agent_cls().run()
+        except SystemExit as e:
+            # The agents exit non-zero on failure, as they would as a one-shot job
+            status = "failed" if e.code else "success"
+        except Exception as e:
+            logging.getLogger(__name__).error(f"Pooled agent failed on {request['job_id']}: {e}")
+            status = "failed"
+        _send({"event": "done", "job_id": request["job_id"], "status": status})
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve tasks for a WarmWorkerPool.")
+    parser.add_argument("--serve", required=True, metavar="MODULE:CLASS", help="Agent class to run tasks with.")
+    args = parser.parse_args()
+    asyncio.run(_serve(args.serve))
@@ -1,3 +1,4 @@
+import asyncio
 import pytest
 import os
 import sqlite3
@@ -205,3 +206,124 @@ def test_sync_work_items_sync(memory):
     item3_after = memory.get_work_item_sync('item_3')
     assert item3_after['title'] == 'Task 3 Updated'
     assert item3_after['status'] == 'in_progress'
+
+@pytest.mark.asyncio
+async def test_concurrent_appends_are_group_committed(memory):
+    await asyncio.gather(*[memory.add_event("tick", f"event {i}", {"i": i}) for i in range(200)])
+
+    events = memory.get_events_sync(kind="tick", limit=500)
+    assert len(events) == 200
+    assert memory.verify_chain_sync()
+
+def test_add_events_bulk_preserves_order_and_chain(memory):
+    memory.add_event_sync("first", "before bulk")
+    memory.add_events_bulk_sync([{"kind": "bulk", "content": f"item {i}", "meta": {"i": i}} for i in range(50)])
+    memory.add_event_sync("last", "after bulk")
+
+    events = memory.get_events_sync(limit=100)
+    assert [e["kind"] for e in events] == ["first"] + ["bulk"] * 50 + ["last"]
+    assert [e["meta"]["i"] for e in events[1:51]] == list(range(50))
+    assert memory.verify_chain_sync()
+
+def test_appends_from_two_instances_keep_one_chain(memory):
+    other = PMMMemory(db_path=DB_PATH)
+    try:
+        for i in range(10):
+            memory.add_event_sync("a", str(i))
+            other.add_event_sync("b", str(i))
+    finally:
+        other.close()
+
+    assert len(memory.get_events_sync(limit=50)) == 20
+    assert memory.verify_chain_sync()
+
+def test_failed_append_raises_and_writer_keeps_running(memory):
+    with pytest.raises(TypeError):
+        memory.add_event_sync("bad", "unserializable", {"value": object()})
+
+    memory.add_event_sync("good", "still works")
+    assert [e["kind"] for e in memory.get_events_sync()] == ["good"]
+    assert memory.verify_chain_sync()
+
+
+def test_get_events_cursors(memory):
+    for i in range(10):
+        memory.add_event_sync("tick", f"event {i}", {"i": i})
+
+    latest = memory.get_events_sync(limit=4)
+    assert [e["meta"]["i"] for e in latest] == [6, 7, 8, 9]
+
+    older = memory.get_events_sync(limit=4, before_id=latest[0]["id"])
+    assert [e["meta"]["i"] for e in older] == [2, 3, 4, 5]
+
+    newer = memory.get_events_sync(limit=3, after_ts=older[0]["timestamp"])
+    assert [e["meta"]["i"] for e in newer] == [3, 4, 5]
+
+
+def test_get_events_by_session_returns_exactly_limit(memory):
+    memory.add_events_bulk_sync([{"kind": "msg", "content": f"quiet {i}", "meta": {"session_id": "quiet"}} for i in range(5)])
+    # Enough traffic from another session to push the quiet one out of any recent window
+    memory.add_events_bulk_sync([{"kind": "msg", "content": f"busy {i}", "meta": {"session_id": "busy", "task_id": 7}} for i in range(200)])
+
+    events = memory.get_events_sync(limit=3, session_id="quiet")
+    assert [e["content"] for e in events] == ["quiet 2", "quiet 3", "quiet 4"]
+    assert len(memory.get_events_sync(limit=50, task_id="7")) == 50
+
+
+def test_legacy_ledger_is_migrated(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            timestamp REAL, kind TEXT, content TEXT, meta TEXT, prev_hash TEXT, hash TEXT UNIQUE
+        )
+    """)
+    conn.executemany(
+        "INSERT INTO events (timestamp, kind, content, meta, prev_hash, hash) VALUES (?, ?, ?, ?, ?, ?)",
+        [(1.0, "msg", "old a", json.dumps({"session_id": "s1"}), None, "h1"),
+         (2.0, "msg", "old b", json.dumps({"task_id": "t1"}), "h1", "h2")]
+    )
+    conn.commit()
+    conn.close()
+
+    memory = PMMMemory(db_path=db_path)
+    try:
+        assert [e["content"] for e in memory.get_events_sync(session_id="s1")] == ["old a"]
+        assert [e["content"] for e in memory.get_events_sync(task_id="t1")] == ["old b"]
+        memory.add_event_sync("msg", "new", {"session_id": "s1"})
+        assert [e["content"] for e in memory.get_events_sync(session_id="s1")] == ["old a", "new"]
+    finally:
+        memory.close()
+
+
+@pytest.mark.asyncio
+async def test_subscribe_pushes_matching_events_including_existing(memory):
+    memory.add_event_sync("worker_result", "early", {"task_id": "t1"})
+    memory.add_event_sync("worker_started", "ignored", {"task_id": "t2"})
+
+    with await memory.subscribe(kind="worker_result", task_ids=["t1", "t2"], include_existing=True) as subscription:
+        # Committed from another thread, while the subscriber waits
+        await asyncio.to_thread(memory.add_events_bulk_sync, [
+            {"kind": "worker_result", "content": "other task", "meta": {"task_id": "t3"}},
+            {"kind": "worker_result", "content": "late", "meta": {"task_id": "t2"}},
+        ])
+        first = await subscription.get(timeout=5)
+        second = await subscription.get(timeout=5)
+        with pytest.raises(asyncio.TimeoutError):
+            await subscription.get(timeout=0.05)
+
+    assert [first["content"], second["content"]] == ["early", "late"]
+    assert second["id"] == memory.get_events_sync(task_id="t2", kind="worker_result")[0]["id"]
+    assert memory._subscriptions == []
+
+@pytest.mark.asyncio
+async def test_failed_group_commit_reaches_every_waiter(memory, monkeypatch):
+    def fail(events):
+        raise sqlite3.OperationalError("disk I/O error")
+    monkeypatch.setattr(memory, "_write_events", fail)
+
+    results = await asyncio.gather(*[memory.add_event("tick", f"event {i}") for i in range(20)], return_exceptions=True)
+    assert all(isinstance(r, sqlite3.OperationalError) for r in results)
+    with pytest.raises(sqlite3.OperationalError):
+        memory.add_event_sync("tick", "sync event")
@@ -14,6 +14,7 @@ import sys
 mock_web_server = MagicMock()
 mock_web_server.manager = MagicMock()
 mock_web_server.manager.broadcast = AsyncMock()
+mock_web_server.manager.broadcast_media = MagicMock()
 sys.modules["web_server"] = mock_web_server
 
 # Now we can import WebsocketAudioStreamer from app
@@ -32,6 +33,7 @@ sys.modules["numpy"] = MagicMock()
 
 # Re-import app to get the class
 from pipecatapp.app import WebsocketAudioStreamer
+from pipecatapp.ws_channels import ChannelMessage
 
 class TestWebsocketAudioStreamer(unittest.IsolatedAsyncioTestCase):
     async def test_websocket_audio_streamer_wav_header(self):
@@ -48,23 +50,21 @@ class TestWebsocketAudioStreamer(unittest.IsolatedAsyncioTestCase):
         streamer.push_frame = AsyncMock()
 
         # Reset mock
-        mock_web_server.manager.broadcast.reset_mock()
+        mock_web_server.manager.broadcast_media.reset_mock()
 
         await streamer.process_frame(frame, direction=None)
 
-        # Verify broadcast was called
-        self.assertTrue(mock_web_server.manager.broadcast.called)
-
-        # Get arguments
-        call_args = mock_web_server.manager.broadcast.call_args
-        message_json = call_args[0][0]
-        message = json.loads(message_json)
+        # Verify the raw PCM was handed to the channel layer
+        self.assertTrue(mock_web_server.manager.broadcast_media.called)
+        args, kwargs = mock_web_server.manager.broadcast_media.call_args
+        self.assertEqual(args[0], "audio")
+        self.assertEqual(args[1], audio_data)
+        self.assertEqual(kwargs["sample_rate"], 16000)
 
+        # Clients on the JSON protocol still receive a base64 WAV
+        message = json.loads(ChannelMessage("audio", payload=audio_data, sample_rate=16000, channels=1).legacy_text())
         self.assertEqual(message["type"], "audio")
-        b64_audio = message["data"]
-
-        # Decode base64
-        wav_bytes = base64.b64decode(b64_audio)
+        wav_bytes = base64.b64decode(message["data"])
 
         # Verify WAV header
         # Check RIFF
@@ -1,4 +1,5 @@
 import sys
+import math
 import os
 import pytest
 import sqlite3
@@ -121,3 +122,118 @@ def test_bonsai_expert_scores():
 
     if os.path.exists(test_db):
         os.remove(test_db)
+
+def test_expert_stats_incremental_decay():
+    stats = gateway.ExpertStats()
+    now = time.time()
+    stats.record("openai_gpt4", 200, now - gateway.HALF_LIFE, 0.4)
+    stats.record("openai_gpt4", 500, now, 1.0)
+    # Pending placeholders are ignored until their final status is logged
+    stats.record("openai_gpt4", 0, now, 0.0)
+
+    snapshot = stats.snapshot(now)["openai_gpt4"]
+    assert math.isclose(snapshot["successes"], 0.5)
+    assert math.isclose(snapshot["failures"], 1.0)
+    assert math.isclose(snapshot["avg_latency"], 0.4)
+
+def test_expert_stats_checkpoint_and_restore():
+    test_db = "/tmp/test_gateway_stats_checkpoint.db"
+    if os.path.exists(test_db):
+        os.remove(test_db)
+
+    original_db_path = gateway.DB_PATH
+    try:
+        gateway.DB_PATH = test_db
+        gateway.init_db()
+
+        now = time.time()
+        stats = gateway.ExpertStats()
+        for i in range(5):
+            stats.record("openai_gpt4", 200, now - i, 0.2, now + i)
+        stats.checkpoint(test_db)
+
+        # A row logged after the checkpoint must be replayed on restore
+        gateway._log_request_sync("req-late", now, "hi", "response", 500, 1.0, "openai_gpt4", now + 10)
+        stats.record("openai_gpt4", 500, now, 1.0, now + 10)
+
+        restored = gateway.ExpertStats()
+        restored.restore(test_db)
+
+        expected = stats.snapshot(now + 20)["openai_gpt4"]
+        actual = restored.snapshot(now + 20)["openai_gpt4"]
+        assert math.isclose(actual["successes"], expected["successes"])
+        assert math.isclose(actual["failures"], expected["failures"])
+        assert math.isclose(actual["avg_latency"], expected["avg_latency"])
+    finally:
+        gateway.DB_PATH = original_db_path
+        if os.path.exists(test_db):
+            os.remove(test_db)
+
+@pytest.mark.asyncio
+async def test_stream_completion_emits_openai_chunks():
+    import asyncio
+    import json
+
+    request_id = "req-stream"
+    queue = asyncio.Queue()
+    gateway.pending_requests[request_id] = {"event": asyncio.Event(), "response": None, "queue": queue}
+    queue.put_nowait({"delta": "Hello", "done": False})
+    queue.put_nowait({"delta": " world", "done": False})
+    queue.put_nowait({"delta": "", "done": True})
+
+    logged = []
+    original_log_request = gateway.log_request
+    async def fake_log_request(*args):
+        logged.append(args)
+    try:
+        gateway.log_request = fake_log_request
+        events = [e async for e in gateway.stream_completion(request_id, time.time(), "hi", "openai_gpt4")]
+    finally:
+        gateway.log_request = original_log_request
+
+    assert events[-1] == "data: [DONE]\n\n"
+    chunks = [json.loads(e[len("data: "):]) for e in events[:-1]]
+    assert chunks[0]["choices"][0]["delta"] == {"role": "assistant"}
+    assert "".join(c["choices"][0]["delta"].get("content", "") for c in chunks) == "Hello world"
+    assert chunks[-1]["choices"][0]["finish_reason"] == "stop"
+    assert request_id not in gateway.pending_requests
+    assert logged[0][3] == "Hello world" and logged[0][4] == 200
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_logs_disconnects_and_empty_responses():
+    import asyncio
+
+    logged = []
+    original_log_request = gateway.log_request
+    async def fake_log_request(*args):
+        logged.append(args)
+    try:
+        gateway.log_request = fake_log_request
+
+        # The client hangs up after the first chunk
+        queue = asyncio.Queue()
+        gateway.pending_requests["req-gone"] = {"event": asyncio.Event(), "response": None, "queue": queue}
+        queue.put_nowait({"delta": "Hello", "done": False})
+        agen = gateway.stream_completion("req-gone", time.time(), "hi", "openai_gpt4")
+        await agen.__anext__()
+        await agen.aclose()
+
+        # The agent finishes without producing any text
+        queue = asyncio.Queue()
+        gateway.pending_requests["req-empty"] = {"event": asyncio.Event(), "response": None, "queue": queue}
+        queue.put_nowait({"delta": "", "done": True})
+        events = [e async for e in gateway.stream_completion("req-empty", time.time(), "hi", "openai_gpt4")]
+    finally:
+        gateway.log_request = original_log_request
+
+    assert logged[0][3] == "Client disconnected" and logged[0][4] == gateway.CLIENT_CLOSED_REQUEST
+    assert logged[1][3] == "No response content" and logged[1][4] == 500
+    assert not any('"finish_reason": "stop"' in e for e in events)
+    assert "req-gone" not in gateway.pending_requests
+
+
+def test_expert_stats_ignore_client_disconnects():
+    stats = gateway.ExpertStats()
+    stats.record("openai_gpt4", gateway.CLIENT_CLOSED_REQUEST, time.time(), 0.1)
+    assert "openai_gpt4" not in stats._stats
@@ -3,7 +3,6 @@ import json
 from unittest.mock import AsyncMock, MagicMock, patch
 import sys
 import os
-import numpy as np
 
 # Define modules to mock before importing anything
 mock_modules = {
@@ -77,8 +76,8 @@ async def test_rag_tool_with_pruning():
     with patch("pipecatapp.tools.rag_tool.SentenceTransformer") as mock_st_class:
         mock_model = mock_st_class.return_value
         mock_model.get_sentence_embedding_dimension.return_value = 384
-        # Return a numpy array to support .tolist()
-        mock_model.encode.return_value = np.array([[0.1] * 384], dtype=np.float32)
+        # One vector per text; the shared embedding service converts them to arrays
+        mock_model.encode.side_effect = lambda texts, **kwargs: [[0.1] * 384 for _ in texts]
 
         tool = RAG_Tool(
             pmm_memory=mock_memory,
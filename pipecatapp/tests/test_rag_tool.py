@@ -101,7 +101,7 @@ async def test_rag_filtering(rag_tool_class, mock_memory, test_dirs):
         if 'metadatas' in kwargs and 'documents' in kwargs:
             for m, d in zip(kwargs['metadatas'], kwargs['documents']):
                 added_docs.append((m['source'], d))
-    mock_collection.add = mock_add
+    mock_collection.upsert = mock_add
 
     tool._build_knowledge_base()
 
@@ -134,18 +134,14 @@ async def test_rag_filtering(rag_tool_class, mock_memory, test_dirs):
 
     mock_get_collection.query = mock_query
 
-    # Fix the mock for FAISS index so we don't hit the TypeError for > 0
-    tool.index.ntotal = 0
-
     # We are scoped to root, should find doc1
     results = await tool.search_knowledge_base("content 1")
     assert "doc1.txt" in results
     assert "doc2.txt" in results # since it's under root
 
     # Test scope change
-    # Note: `processed_files` checkpoint behavior now persists across _build_knowledge_base calls
-    if os.path.exists(tool.checkpoint_file):
-        os.remove(tool.checkpoint_file)
+    # Note: the manifest persists across _build_knowledge_base calls, so forget it to force a re-index
+    tool.manifest.delete_many(tool.manifest.entries_under(os.path.join(str(root), "")))
 
     added_docs.clear()
     await tool.set_scope(str(subdir))
@@ -156,7 +152,6 @@ async def test_rag_filtering(rag_tool_class, mock_memory, test_dirs):
     assert str(subdir / "doc2.txt") in sources
 
     # Query should now be scoped to subdir
-    tool.index.ntotal = 0
     results = await tool.search_knowledge_base("content")
     assert "doc1.txt" not in results
     assert "doc2.txt" in results
@@ -187,7 +182,7 @@ async def test_rag_sibling_directory_isolation(rag_tool_class, mock_memory, test
         if 'metadatas' in kwargs and 'documents' in kwargs:
             for m, d in zip(kwargs['metadatas'], kwargs['documents']):
                 added_docs.append((m['source'], d))
-    mock_collection.add = mock_add
+    mock_collection.upsert = mock_add
 
     # Simulate an external process having already indexed the sibling directory into ChromaDB
     # We add it directly to our tracked mock list
@@ -249,7 +244,6 @@ async def test_rag_sibling_directory_isolation(rag_tool_class, mock_memory, test
     # Query should be strictly scoped to subdir
     # The where clause will use $contains which would match /root/subdir and not /root/subdir-secret
     # Since we simulate the actual behavior in mock_query using startswith, we test the intent
-    tool.index.ntotal = 0
     results = await tool.search_knowledge_base("secret")
     assert "secret.txt" not in results
     assert "doc2.txt" in results # doc2 will be returned by our mock because it is in the allowed scope.
@@ -0,0 +1,84 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from pipecatapp.response_streamer import ResponseStreamer
+
+
+def _posted(client):
+    return [call.kwargs["json"] for call in client.post.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_streams_deltas_and_finishes_with_remainder():
+    client = MagicMock()
+    client.post = AsyncMock()
+    streamer = ResponseStreamer(client, "http://gateway/internal/response/stream", "req-1")
+
+    streamer.begin()
+    await streamer.feed("Hello")
+    await streamer.feed(" there")
+    await streamer.finish("Hello there, friend.")
+
+    posted = _posted(client)
+    assert "".join(p.get("delta", "") for p in posted) == "Hello there, friend."
+    assert posted[-1] == {"request_id": "req-1", "done": True}
+
+
+@pytest.mark.asyncio
+async def test_holds_back_tool_calls():
+    client = MagicMock()
+    client.post = AsyncMock()
+    streamer = ResponseStreamer(client, "http://gateway/internal/response/stream", "req-2")
+
+    # First step produces a tool call, which must not reach the user
+    streamer.begin()
+    await streamer.feed('{"tool": "search.run", ')
+    await streamer.feed('"args": {}}')
+
+    # Second step produces the final answer
+    streamer.begin()
+    await streamer.feed("The answer is 42.")
+    await streamer.finish("The answer is 42.")
+
+    text = "".join(p.get("delta", "") for p in _posted(client))
+    assert "tool" not in text
+    assert text == "The answer is 42."
+
+
+@pytest.mark.asyncio
+async def test_holds_back_tool_calls_split_across_deltas():
+    client = MagicMock()
+    client.post = AsyncMock()
+    streamer = ResponseStreamer(client, "http://gateway/internal/response/stream", "req-3")
+
+    streamer.begin()
+    await streamer.feed("Let me look that up. `")
+    await streamer.feed("``json\n")
+    await streamer.feed('{"tool": "search.run"}')
+    streamer.begin()
+    await streamer.feed("Checking")
+    await streamer.feed(' now {"to')
+    await streamer.feed('ol": "search.run"}')
+    streamer.begin()
+    await streamer.feed("Done.")
+    await streamer.finish("Done.")
+
+    text = "".join(p.get("delta", "") for p in _posted(client))
+    assert text == "Let me look that up. \n\nChecking now \n\nDone."
+
+
+@pytest.mark.asyncio
+async def test_final_answer_after_chatter_is_sent_once():
+    client = MagicMock()
+    client.post = AsyncMock()
+    streamer = ResponseStreamer(client, "http://gateway/internal/response/stream", "req-4")
+
+    streamer.begin()
+    await streamer.feed('Let me check. {"tool": "search.run"}')
+    streamer.begin()
+    await streamer.feed("The answer")
+    await streamer.feed(" is 42.")
+    await streamer.finish("The answer is 42.")
+
+    text = "".join(p.get("delta", "") for p in _posted(client))
+    assert text == "Let me check. \n\nThe answer is 42."
@@ -123,3 +123,35 @@ def test_dlq_sharded_lifecycle(sharded_memory):
     # Update DLQ item
     success = sharded_memory.update_dlq_item_sync(item_id, status="SUCCEEDED")
     assert success
+
+def test_events_merge_across_shards_in_time_order(sharded_memory):
+    for i in range(30):
+        sharded_memory.add_event_sync("tick", f"event {i}", meta={"session_id": f"session{i % 7}", "i": i})
+
+    events = sharded_memory.get_events_sync(limit=10)
+    assert [e["meta"]["i"] for e in events] == list(range(20, 30))
+    assert len({sharded_memory._get_shard_index(f"session{i % 7}") for i in range(30)}) > 1
+
+def test_events_pagination_with_cursors(sharded_memory):
+    for i in range(25):
+        sharded_memory.add_event_sync("tick", f"event {i}", meta={"session_id": f"session{i % 5}", "i": i})
+
+    seen = []
+    page = sharded_memory.get_events_sync(kind="tick", limit=10)
+    while page:
+        seen = [e["meta"]["i"] for e in page] + seen
+        oldest = page[0]
+        page = sharded_memory.get_events_sync(kind="tick", limit=10, before_ts=oldest["timestamp"], before_id=oldest["id"])
+    assert seen == list(range(25))
+
+    cutoff = sharded_memory.get_events_sync(limit=25)[9]["timestamp"]
+    forward = sharded_memory.get_events_sync(limit=5, after_ts=cutoff)
+    assert [e["meta"]["i"] for e in forward] == list(range(10, 15))
+
+def test_events_from_a_single_busy_shard_are_paged_on_demand(sharded_memory):
+    # Everything lands on one shard, so the merge has to fetch past its first page
+    for i in range(60):
+        sharded_memory.add_event_sync("tick", f"event {i}", meta={"session_id": "hot", "i": i})
+
+    events = sharded_memory.get_events_sync(limit=50)
+    assert [e["meta"]["i"] for e in events] == list(range(10, 60))
@@ -2,7 +2,6 @@
 import sys
 import os
 import asyncio
-import base64
 import numpy as np
 import pytest
 from unittest.mock import MagicMock, AsyncMock, patch
@@ -169,18 +168,13 @@ async def test_yolo_inference_optimization():
     await detector.process_frame(input_frame, direction=None)
 
     # Assert
-    # Verify that web_server.manager.broadcast was called with a vision_debug message
-    assert mock_web_server.manager.broadcast.called
-    args, _ = mock_web_server.manager.broadcast.call_args
-    message = args[0]
-
-    import json
-    data = json.loads(message)
-    assert data["type"] == "vision_debug"
-    assert "data" in data
-
-    # Verify the data is valid base64
-    img_data = base64.b64decode(data["data"])
+    # Verify that web_server.manager.broadcast_media was called with a vision_debug frame
+    assert mock_web_server.manager.broadcast_media.called
+    args, _ = mock_web_server.manager.broadcast_media.call_args
+    assert args[0] == "vision_debug"
+
+    # The frame is sent as raw JPEG bytes
+    img_data = args[1]
     assert len(img_data) > 0
     assert img_data.startswith(b'\xff\xd8') # JPEG header
 
@@ -1,153 +1,102 @@
-from .ansible_tool import Ansible_Tool
-from .archivist_tool import ArchivistTool
-from .ast_editor_tool import ASTEditorTool
-from .atproto_tool import ATProtoTool
-from .autoloop_tool import AutoloopTool
-from .autoresearch_tool import AutoresearchTool
-from .cluster_status_tool import ClusterStatusTool
-from .code_runner_tool import CodeRunnerTool
-from .container_registry_tool import ContainerRegistryTool
-from .context_upload_tool import ContextUploadTool
-from .council_tool import CouncilTool
-from .cq_tool import CQ_Tool
-from .dependency_scanner_tool import DependencyScannerTool
-from .desktop_control_tool import DesktopControlTool
-from .document_tool import DocumentTool
-from .dynamic_skill_tool import DynamicSkillTool
-from .experiment_tool import ExperimentTool
-from .external_app_manager_tool import ExternalAppManagerTool
-from .file_editor_tool import FileEditorTool
-from .final_answer_tool import FinalAnswerTool
-from .get_nomad_job import GetNomadJobTool
-from .git_tool import Git_Tool
-from .ha_tool import HA_Tool
-from .heretic_tool import HereticTool
-from .jacobian_lens_tool import JacobianLensTool
-from .jules_tool import JulesTool
-from .last30days_tool import Last30DaysTool
-from .langchain_adapter_tool import LangChainToolAdapter
-from .lightweight_project_mapper_tool import LightweightProjectMapperTool
-from .llxprt_code_tool import LLxprt_Code_Tool
-from .mcp_client_adapter import MCPClientAdapter
-from .mcp_tool import MCP_Tool
-from .mtac_tool import MTACTool
-from .ocr_tool import OCRTool
-from .open_workers_tool import OpenWorkersTool
-from .openclaw_tool import OpenClawTool
-from .opencode_provider_tool import OpenCodeProviderTool
-from .opencode_tool import OpencodeTool
-from .orchestrator_tool import OrchestratorTool
-from .ouroboros_tool import OuroborosTool
-from .p2p_sync_tool import P2PSyncTool
-from .personality_tool import PersonalityTool
-from .planner_tool import PlannerTool
-from .polyphony_tool import PolyphonyTool
-from .power_tool import Power_Tool
-from .project_mapper_tool import ProjectMapperTool
-from .project_overview_tool import ProjectOverviewTool
-from .prompt_improver_tool import PromptImproverTool
-from .rag_tool import RAG_Tool
-from .save_skill_tool import SaveSkillTool
-from .scale_compute_tool import ScaleComputeTool
-from .scheduler_tool import SchedulerTool
-from .schema_harness_tool import SchemaHarnessTool
-from .schema_mapper_tool import SchemaMapperTool
-from .search_skills_tool import SearchSkillsTool
-from .search_tool import SearchTool
-from .set_operational_mode_tool import SetOperationalModeTool
-from .shell_tool import ShellTool
-from .skill_builder_tool import SkillBuilderTool
-from .smol_agent_tool import SmolAgentTool
-from .spec_loader_tool import SpecLoaderTool
-from .ssh_tool import SSH_Tool
-from .submit_solution_tool import SubmitSolutionTool
-from .summarizer_tool import SummarizerTool
-from .swarm_tool import SwarmTool
-from .term_everything_tool import TermEverythingTool
-from .ternlight_tool import TernlightTool
-from .update_litellm_tool import UpdateLitellmTool
-from .vr_tool import VRTool
-from .wasm_tool import WasmTool
-from .web_browser_tool import WebBrowserTool
-from .wol_tool import WOLTool
-from .holographic_memory_tool import HolographicMemoryTool
+"""Tool classes for the agent.
 
-__all__ = [
-    "Ansible_Tool",
-    "ArchivistTool",
-    "ASTEditorTool",
-    "ATProtoTool",
-    "AutoloopTool",
-    "AutoresearchTool",
-    "ClusterStatusTool",
-    "CodeRunnerTool",
-    "ContainerRegistryTool",
-    "ContextUploadTool",
-    "CouncilTool",
-    "CQ_Tool",
-    "DependencyScannerTool",
-    "DesktopControlTool",
-    "DocumentTool",
-    "DynamicSkillTool",
-    "ExperimentTool",
-    "ExternalAppManagerTool",
-    "FileEditorTool",
-    "FinalAnswerTool",
-    "GetNomadJobTool",
-    "Git_Tool",
-    "HA_Tool",
-    "HereticTool",
-    "JacobianLensTool",
-    "JulesTool",
-    "Last30DaysTool",
-    "LangChainToolAdapter",
-    "LightweightProjectMapperTool",
-    "LLxprt_Code_Tool",
-    "MCPClientAdapter",
-    "MCP_Tool",
-    "MTACTool",
-    "OCRTool",
-    "OpenWorkersTool",
-    "OpenClawTool",
-    "OpenCodeProviderTool",
-    "OpencodeTool",
-    "OrchestratorTool",
-    "OuroborosTool",
-    "P2PSyncTool",
-    "PersonalityTool",
-    "PlannerTool",
-    "PolyphonyTool",
-    "Power_Tool",
-    "ProjectMapperTool",
-    "ProjectOverviewTool",
-    "PromptImproverTool",
-    "RAG_Tool",
-    "SaveSkillTool",
-    "ScaleComputeTool",
-    "SchedulerTool",
-    "SchemaHarnessTool",
-    "SchemaMapperTool",
-    "SearchSkillsTool",
-    "SearchTool",
-    "SetOperationalModeTool",
-    "ShellTool",
-    "SkillBuilderTool",
-    "SmolAgentTool",
-    "SpecLoaderTool",
-    "SSH_Tool",
-    "SubmitSolutionTool",
-    "SummarizerTool",
-    "SwarmTool",
-    "TermEverythingTool",
-    "TernlightTool",
-    "UpdateLitellmTool",
-    "VRTool",
-    "WasmTool",
-    "WebBrowserTool",
-    "WOLTool",
-    "HolographicMemoryTool",
-    "WorkspaceTool",
-    "SubstrateVisualizerTool",
-]
-from .workspace_tool import WorkspaceTool
-from .substrate_visualizer_tool import SubstrateVisualizerTool
+The classes are imported on first access (`from pipecatapp.tools import SSH_Tool`
+still works), so importing one tool module, or the package, no longer imports
+every tool and its dependencies. See `registry.LazyTool` for deferring the
+construction of tool instances as well.
+"""
+import importlib
+
+# Exported class name -> module in this package that defines it
+_TOOL_MODULES = {
+    "Ansible_Tool": "ansible_tool",
+    "ArchivistTool": "archivist_tool",
+    "ASTEditorTool": "ast_editor_tool",
+    "ATProtoTool": "atproto_tool",
+    "AutoloopTool": "autoloop_tool",
+    "AutoresearchTool": "autoresearch_tool",
+    "ClusterStatusTool": "cluster_status_tool",
+    "CodeRunnerTool": "code_runner_tool",
+    "ContainerRegistryTool": "container_registry_tool",
+    "ContextUploadTool": "context_upload_tool",
+    "CouncilTool": "council_tool",
+    "CQ_Tool": "cq_tool",
+    "DependencyScannerTool": "dependency_scanner_tool",
+    "DesktopControlTool": "desktop_control_tool",
+    "DocumentTool": "document_tool",
+    "DynamicSkillTool": "dynamic_skill_tool",
+    "ExperimentTool": "experiment_tool",
+    "ExternalAppManagerTool": "external_app_manager_tool",
+    "FileEditorTool": "file_editor_tool",
+    "FinalAnswerTool": "final_answer_tool",
+    "GetNomadJobTool": "get_nomad_job",
+    "Git_Tool": "git_tool",
+    "HA_Tool": "ha_tool",
+    "HereticTool": "heretic_tool",
+    "JacobianLensTool": "jacobian_lens_tool",
+    "JulesTool": "jules_tool",
+    "Last30DaysTool": "last30days_tool",
+    "LangChainToolAdapter": "langchain_adapter_tool",
+    "LightweightProjectMapperTool": "lightweight_project_mapper_tool",
+    "LLxprt_Code_Tool": "llxprt_code_tool",
+    "MCPClientAdapter": "mcp_client_adapter",
+    "MCP_Tool": "mcp_tool",
+    "MTACTool": "mtac_tool",
+    "OCRTool": "ocr_tool",
+    "OpenWorkersTool": "open_workers_tool",
+    "OpenClawTool": "openclaw_tool",
+    "OpenCodeProviderTool": "opencode_provider_tool",
+    "OpencodeTool": "opencode_tool",
+    "OrchestratorTool": "orchestrator_tool",
+    "OuroborosTool": "ouroboros_tool",
+    "P2PSyncTool": "p2p_sync_tool",
+    "PersonalityTool": "personality_tool",
+    "PlannerTool": "planner_tool",
+    "PolyphonyTool": "polyphony_tool",
+    "Power_Tool": "power_tool",
+    "ProjectMapperTool": "project_mapper_tool",
+    "ProjectOverviewTool": "project_overview_tool",
+    "PromptImproverTool": "prompt_improver_tool",
+    "RAG_Tool": "rag_tool",
+    "SaveSkillTool": "save_skill_tool",
+    "ScaleComputeTool": "scale_compute_tool",
+    "SchedulerTool": "scheduler_tool",
+    "SchemaHarnessTool": "schema_harness_tool",
+    "SchemaMapperTool": "schema_mapper_tool",
+    "SearchSkillsTool": "search_skills_tool",
+    "SearchTool": "search_tool",
+    "SetOperationalModeTool": "set_operational_mode_tool",
+    "ShellTool": "shell_tool",
+    "SkillBuilderTool": "skill_builder_tool",
+    "SmolAgentTool": "smol_agent_tool",
+    "SpecLoaderTool": "spec_loader_tool",
+    "SSH_Tool": "ssh_tool",
+    "SubmitSolutionTool": "submit_solution_tool",
+    "SummarizerTool": "summarizer_tool",
+    "SwarmTool": "swarm_tool",
+    "TermEverythingTool": "term_everything_tool",
+    "TernlightTool": "ternlight_tool",
+    "UpdateLitellmTool": "update_litellm_tool",
+    "VRTool": "vr_tool",
+    "WasmTool": "wasm_tool",
+    "WebBrowserTool": "web_browser_tool",
+    "WOLTool": "wol_tool",
+    "HolographicMemoryTool": "holographic_memory_tool",
+    "WorkspaceTool": "workspace_tool",
+    "SubstrateVisualizerTool": "substrate_visualizer_tool",
+}
+
+__all__ = list(_TOOL_MODULES)
+
+
+def __getattr__(name):
+    module = _TOOL_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
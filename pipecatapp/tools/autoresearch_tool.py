@@ -10,6 +10,7 @@ import shlex
 import docker
 from typing import List, Dict, Any, Optional
 from pipecatapp.utils.command_runner import CommandRunner
+from pipecatapp.tools.registry import shared_resource
 
 class AutoresearchTool:
     """
@@ -23,7 +24,7 @@ class AutoresearchTool:
         # The LLM client to be used for generating code mutations
         self.llm_client = llm_client
         try:
-            self.docker_client = docker.from_env()
+            self.docker_client = shared_resource("docker_client", docker.from_env)
         except Exception as e:
             self.logger.warning(f"Could not initialize Docker client for AutoresearchTool: {e}")
             self.docker_client = None
@@ -17,6 +17,7 @@ from llm_sandbox import SandboxSession
 from typing import List, Optional
 from .dependency_scanner_tool import DependencyScannerTool
 from .execution_history import ExecutionHistory
+from .sandbox_pool import create_sandbox_pool, install_kernel_libraries
 
 # Security: Limit the maximum size of the code payload to prevent DoS attacks
 # especially against Nomad templates which might expand significantly or cause OOM.
@@ -42,6 +43,7 @@ class JupyterSandboxExecutor(SandboxExecutor):
         self.connection_file = None
         self.km = None
         self.kc = None
+        self.installed_libraries = set()
 
     async def _initialize(self):
         if self.kc is not None:
@@ -129,10 +131,13 @@ class JupyterSandboxExecutor(SandboxExecutor):
         async with self._lock:
             await self._initialize()
 
-            if libraries:
-                install_cmd = f"import subprocess; subprocess.run(['pip', 'install', '{' '.join(libraries)}'], capture_output=True)"
-                msg_id = self.kc.execute(install_cmd)
-                await self._wait_for_reply(msg_id, timeout=30)
+            # The kernel persists, so each library only needs installing once
+            error = await install_kernel_libraries(
+                lambda install_code, install_timeout: self._wait_for_reply(self.kc.execute(install_code), timeout=install_timeout),
+                libraries, self.installed_libraries,
+            )
+            if error:
+                return error
 
             msg_id = self.kc.execute(code)
             job_timeout = timeout if timeout is not None else 30
@@ -200,6 +205,8 @@ class DockerSandboxExecutor(SandboxExecutor):
         except Exception as e:
             logging.warning(f"Failed to initialize Docker client for CodeRunnerTool: {e}")
             self.client = None
+        # Pre-started sandboxes, when enabled with SANDBOX_POOL
+        self.pool = create_sandbox_pool(self.client)
 
     @retry()
     def execute(self, code: str, language: str = "python", libraries: Optional[List[str]] = None, timeout: Optional[int] = None) -> str:
@@ -223,6 +230,17 @@ class DockerSandboxExecutor(SandboxExecutor):
 
         job_timeout = timeout if timeout is not None else 30
 
+        if self.pool is not None and language == "python":
+            try:
+                res = self.pool.run(self.image, code, libraries, job_timeout)
+            except Exception as e:
+                return f"An unexpected error occurred: {e}"
+            if res.timed_out:
+                return f"Error: Execution timed out after {job_timeout} seconds."
+            if res.exit_code == 0:
+                return res.stdout
+            return f"Exit Code: {res.exit_code}\n---STDERR---\n{res.stderr}\n---STDOUT---\n{res.stdout}"
+
         import sys
 
         def _run_sandbox(q, c, l, lang):
@@ -281,6 +299,16 @@ class DockerSandboxExecutor(SandboxExecutor):
     @retry()
     def execute_simple_python(self, code: str, timeout: Optional[int] = None) -> str:
         """Runs simple Python code using raw docker-py for speed/legacy support."""
+        if self.pool is not None:
+            job_timeout = timeout if timeout is not None else 30
+            try:
+                res = self.pool.run(self.image, code, timeout=job_timeout)
+            except Exception as e:
+                return f"An error occurred: {e}"
+            if res.timed_out:
+                return f"Error: Execution timed out after {job_timeout} seconds."
+            return res.stdout + res.stderr
+
         if not self.client:
             return "Error: Docker execution is not available (Docker client failed to initialize)."
 
@@ -1,16 +1,17 @@
 import os
 import logging
-import faiss
-import numpy as np
 from sentence_transformers import SentenceTransformer
 import threading
+import time
 from typing import Optional
 from pipecatapp.pmm_memory import PMMMemory
 import gc
-import json
 import subprocess
 import shutil
 from pipecatapp.utils.command_runner import CommandRunner
+from pipecatapp.utils.embedding_service import get_embedding_service
+from pipecatapp.utils.rag_hot_cache import RAGHotCache
+from pipecatapp.utils.rag_manifest import RAGManifest, ManifestEntry, hash_file
 import functools
 
 import os
@@ -25,6 +26,19 @@ def load_document_cached(file_path, encoding='utf-8'):
     mtime = os.path.getmtime(file_path)
     return _load_document_cached_internal(file_path, mtime, encoding=encoding)
 
+EXCLUDED_DIRS = {".git", "jules-scratch", ".venv", "ansible", "docker", "e2e", "debian_service"}
+EXCLUDED_EXTENSIONS = {
+    ".mp4", ".avi", ".mov", ".mkv", ".wmv", ".flv", ".webm", ".m4v", ".mpg", ".mpeg", ".3gp", ".mts",
+    ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".svg", ".ico", ".webp", ".heic", ".psd",
+    ".exe", ".dll", ".msi", ".bat", ".sh", ".app", ".dmg", ".so", ".jar",
+    ".zip", ".rar", ".7z", ".tar", ".gz", ".bz2", ".xz",
+    ".sim", ".dat",
+    ".tmp", ".temp", ".cache", ".log", ".swp", ".pyc", ".crdownload", ".partial",
+    ".bak", ".3dmbak", ".dwgbak", ".dxfbak", ".pdfbak", ".stlbak", ".old", ".bkp", ".original",
+    ".msg", ".pst", ".eml", ".oft",
+    ".csv", ".json"
+}
+
 class RAG_Tool:
     """A tool to retrieve information from a project-specific knowledge base.
 
@@ -33,7 +47,7 @@ class RAG_Tool:
     the agent to find relevant information to answer user queries about the
     project.
     """
-    def __init__(self, pmm_memory: Optional[PMMMemory] = None, base_dir=None, allowed_root: Optional[str] = None, model_name="all-MiniLM-L6-v2", allow_root_scan: bool = False, pruner=None, pruning_threshold: int = 4, keep_top_k: int = 3):
+    def __init__(self, pmm_memory: Optional[PMMMemory] = None, base_dir=None, allowed_root: Optional[str] = None, model_name="all-MiniLM-L6-v2", allow_root_scan: bool = False, pruner=None, pruning_threshold: int = 4, keep_top_k: int = 3, hot_cache_size: int = 10000, hot_cache_policy: str = "lru", watch: bool = False):
         """Initializes the RAG_Tool.
 
         Args:
@@ -47,6 +61,9 @@ class RAG_Tool:
             pruner (Optional[RAGPruner]): An instance of RAGPruner to prune retrieved context.
             pruning_threshold (int): The minimum grade (1-5) for a chunk to be kept.
             keep_top_k (int): Number of top reranked chunks to keep regardless of pruning grade.
+            hot_cache_size (int): Maximum number of chunks kept in the FAISS hot tier.
+            hot_cache_policy (str): Hot tier eviction policy, "lru" or "lfu".
+            watch (bool): Keep the index live by watching base_dir for file changes.
         """
         self.name = "rag"
         self.description = (
@@ -87,8 +104,9 @@ class RAG_Tool:
 
         self.model_name = model_name
         self.model = None
-        self.documents = []
-        self.index = None
+        self.hot_cache_size = hot_cache_size
+        self.hot_cache_policy = hot_cache_policy
+        self.hot_cache: Optional[RAGHotCache] = None
         self.is_ready = False
         self.initialization_error = None
 
@@ -100,8 +118,15 @@ class RAG_Tool:
         self.chroma_client = chromadb.PersistentClient(path=self.chromadb_dir)
         self.collection_name = "project_documents"
 
-        # Checkpoint file for tracking processed files
-        self.checkpoint_file = os.path.join(self.chromadb_dir, "rag_checkpoint.json")
+        # Manifest of indexed files (mtime, size, content hash, chunk ids)
+        self.manifest = RAGManifest(os.path.join(self.chromadb_dir, "rag_manifest.sqlite"))
+        # Serializes full builds with watch-mode updates
+        self._index_lock = threading.Lock()
+        self.watch = watch
+        self._observer = None
+        self._pending_lock = threading.Lock()
+        self._pending_changes = set()
+        self._flush_timer = None
 
         self.pruner = pruner
         self.pruning_threshold = pruning_threshold
@@ -125,7 +150,7 @@ class RAG_Tool:
                     "properties": {
                         "action": {
                             "type": "string",
-                            "description": "The action to perform. Available: set_scope, scan_directory, search, add_document, search_knowledge_base"
+                            "description": "The action to perform. Available: set_scope, scan_directory, search, add_document, search_knowledge_base, cache_stats"
                         },
                         "kwargs": {
                             "type": "object",
@@ -148,6 +173,8 @@ class RAG_Tool:
             return getattr(self, "add_document")(**kwargs.get("kwargs", kwargs))
         if action == "search_knowledge_base":
             return getattr(self, "search_knowledge_base")(**kwargs.get("kwargs", kwargs))
+        if action == "cache_stats":
+            return self.cache_stats()
         else:
             return f"Unknown action: {action}"
 
@@ -171,10 +198,10 @@ class RAG_Tool:
             return False
 
         logging.info(f"RAG tool changing scope from {self.base_dir} to {abs_path}")
+        self.stop_watching()
         self.base_dir = abs_path
         self.is_ready = False
-        self.index = None
-        self.documents = []
+        self.hot_cache = None
 
         if self.pmm_memory:
             threading.Thread(target=self._build_knowledge_base, daemon=True).start()
@@ -182,12 +209,14 @@ class RAG_Tool:
         return True
 
     def _build_knowledge_base(self):
-        """Scans for documents, chunks them, and builds the FAISS index."""
+        """Scans for documents and incrementally re-indexes the ones that changed."""
         # 1. Initialize Model Lazily
         if self.model is None:
             try:
                 logging.info(f"Loading RAG model: {self.model_name}")
-                self.model = SentenceTransformer(self.model_name)
+                self.model = get_embedding_service(self.model_name, loader=SentenceTransformer)
+                # Loads the shared model unless another component already has
+                self.model.get_sentence_embedding_dimension()
                 logging.info(f"Successfully loaded RAG model: {self.model_name}")
             except Exception as e:
                 self.initialization_error = f"Failed to load RAG model: {e}"
@@ -195,104 +224,108 @@ class RAG_Tool:
                 return
 
         logging.info(f"Building RAG knowledge base for {self.base_dir}...")
+        start = time.monotonic()
 
         # 2. Get or create ChromaDB collection
         collection = self.chroma_client.get_or_create_collection(name=self.collection_name)
 
-        # 3. Load checkpoint
-        processed_files = set()
-        if os.path.exists(self.checkpoint_file):
-            try:
-                with open(self.checkpoint_file, 'r') as f:
-                    processed_files = set(json.load(f))
-            except Exception as e:
-                logging.warning(f"Could not load RAG checkpoint: {e}")
-
-        # 4. First, let's load what is in PMM memory since the tests mock this.
+        # 3. Find candidate files.
+        # First, let's load what is in PMM memory since the tests mock this.
         # This keeps compatibility with the tests.
         all_docs = self.pmm_memory.get_events_sync(kind="rag_document", limit=10000)
-        files_to_process = []
+        files_to_process = set()
         for doc in all_docs:
             source = doc['meta'].get('source', '')
             try:
                 # Add check to ensure the file from memory is within base_dir scope
                 if source and os.path.commonpath([self.base_dir, source]) == self.base_dir:
-                    if source not in processed_files:
-                        files_to_process.append(source)
+                    files_to_process.add(source)
             except ValueError:
                 continue
 
-        # Remove duplicates from PMM memory processing
-        files_to_process = list(set(files_to_process))
-
         # Scan filesystem to find files not in memory
-        exclude_dirs = {".git", "jules-scratch", ".venv", "ansible", "docker", "e2e", "debian_service"}
-        excluded_extensions = {
-            ".mp4", ".avi", ".mov", ".mkv", ".wmv", ".flv", ".webm", ".m4v", ".mpg", ".mpeg", ".3gp", ".mts",
-            ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".svg", ".ico", ".webp", ".heic", ".psd",
-            ".exe", ".dll", ".msi", ".bat", ".sh", ".app", ".dmg", ".so", ".jar",
-            ".zip", ".rar", ".7z", ".tar", ".gz", ".bz2", ".xz",
-            ".sim", ".dat",
-            ".tmp", ".temp", ".cache", ".log", ".swp", ".pyc", ".crdownload", ".partial",
-            ".bak", ".3dmbak", ".dwgbak", ".dxfbak", ".pdfbak", ".stlbak", ".old", ".bkp", ".original",
-            ".msg", ".pst", ".eml", ".oft",
-            ".csv", ".json"
-        }
-
         git_files = self._list_files_git()
         if git_files is not None:
             for rel_path in git_files:
-                ext = os.path.splitext(rel_path)[1].lower()
-                if ext in excluded_extensions:
-                    continue
-                if rel_path.endswith((".md", ".txt")):
-                    file_path = os.path.join(self.base_dir, rel_path)
-                    if file_path in processed_files or file_path in files_to_process:
-                        continue
-
-                    if os.path.islink(file_path):
-                        try:
-                            real_path = os.path.realpath(file_path)
-                            if os.path.commonpath([self.allowed_root, real_path]) != self.allowed_root:
-                                continue
-                        except (ValueError, OSError):
-                            continue
-
-                    files_to_process.append(file_path)
+                file_path = os.path.join(self.base_dir, rel_path)
+                if self._is_indexable(file_path):
+                    files_to_process.add(file_path)
         else:
             for root, dirs, files in os.walk(self.base_dir):
-                dirs[:] = [d for d in dirs if d not in exclude_dirs]
+                dirs[:] = [d for d in dirs if d not in EXCLUDED_DIRS]
                 for file in files:
-                    ext = os.path.splitext(file)[1].lower()
-                    if ext in excluded_extensions:
-                        continue
-                    if file.endswith((".md", ".txt")):
-                        file_path = os.path.join(root, file)
-                        if file_path in processed_files or file_path in files_to_process:
-                            continue
-
-                        if os.path.islink(file_path):
-                            try:
-                                real_path = os.path.realpath(file_path)
-                                if os.path.commonpath([self.allowed_root, real_path]) != self.allowed_root:
-                                    continue
-                            except (ValueError, OSError):
-                                continue
-
-                        files_to_process.append(file_path)
-
-        # 5. Process files in batches using LangChain
+                    file_path = os.path.join(root, file)
+                    if self._is_indexable(file_path):
+                        files_to_process.add(file_path)
+
+        # 4. Re-index changed files and purge files that are gone or out of scope
+        known = self.manifest.entries_under(os.path.join(self.base_dir, ""))
+        removed = [path for path in known if path not in files_to_process]
+        with self._index_lock:
+            stats = self._sync_files(collection, sorted(files_to_process), removed, known)
+
+        # 5. Initialize FAISS cache (empty at startup)
+        embedding_dim = self.model.get_sentence_embedding_dimension()
+        if self.hot_cache is None:
+            self.hot_cache = RAGHotCache(embedding_dim, max_size=self.hot_cache_size, policy=self.hot_cache_policy)
+        self.is_ready = True
+
+        # Get count of documents in ChromaDB
+        doc_count = collection.count()
+        logging.info(
+            f"RAG knowledge base built/loaded successfully in {time.monotonic() - start:.1f}s "
+            f"({stats['indexed']} files re-indexed, {stats['unchanged']} unchanged, {stats['removed']} removed). "
+            f"Total documents in ChromaDB: {doc_count}."
+        )
+
+        if self.watch:
+            self.start_watching()
+
+    def _is_indexable(self, file_path: str) -> bool:
+        """Whether a file under base_dir belongs in the knowledge base."""
+        if os.path.splitext(file_path)[1].lower() in EXCLUDED_EXTENSIONS or not file_path.endswith((".md", ".txt")):
+            return False
+        if os.path.islink(file_path):
+            try:
+                real_path = os.path.realpath(file_path)
+                if os.path.commonpath([self.allowed_root, real_path]) != self.allowed_root:
+                    return False
+            except (ValueError, OSError):
+                return False
+        return True
+
+    def _sync_files(self, collection, file_paths, removed_paths=(), known=None) -> dict:
+        """Brings ChromaDB and the manifest in line with the given files.
+
+        Files whose mtime and size match the manifest are skipped without being
+        read; files whose content hash still matches only get their stat updated.
+        Everything else is re-chunked and re-embedded, and chunk ids it no longer
+        produces are deleted. Callers must hold `_index_lock`.
+
+        Args:
+            collection: The ChromaDB collection.
+            file_paths (list): Files that should be in the index.
+            removed_paths (list): Files whose chunks should be purged.
+            known (dict, optional): Manifest entries by path, to avoid a lookup per file.
+
+        Returns:
+            dict: Counts of indexed, unchanged and removed files.
+        """
         try:
-            from langchain_community.document_loaders import TextLoader
             from langchain_text_splitters import RecursiveCharacterTextSplitter
         except ImportError:
             logging.error("LangChain libraries not installed. Run: pip install langchain-community langchain-text-splitters")
-            return
+            return {"indexed": 0, "unchanged": 0, "removed": 0}
 
+        stats = {"indexed": 0, "unchanged": 0, "removed": 0}
+        removed_paths = list(removed_paths)
         batch_size = 150
         current_batch_docs = []
         current_batch_ids = []
         current_batch_metadatas = []
+        # (new manifest entry, chunk ids it previously had) for files in the current batch
+        current_batch_files = []
+        stat_updates = []
 
         text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=1000,
@@ -300,59 +333,185 @@ class RAG_Tool:
             length_function=len,
         )
 
-        for i, file_path in enumerate(files_to_process):
-            try:
-                docs = load_document_cached(file_path, encoding='utf-8')
-                split_docs = text_splitter.split_documents(docs)
-
-                for chunk_idx, doc in enumerate(split_docs):
-                    if doc.page_content.strip():
-                        doc_id = f"{file_path}_{chunk_idx}"
-                        current_batch_docs.append(doc.page_content)
-                        current_batch_ids.append(doc_id)
-                        current_batch_metadatas.append({"source": file_path})
-            except Exception as e:
-                logging.warning(f"Could not read or process file {file_path} via LangChain: {e}")
-
-            processed_files.add(file_path)
+        def lookup(path):
+            return known.get(path) if known is not None else self.manifest.get(path)
 
-            # When batch size is reached or it's the last file, process the batch
-            if len(current_batch_docs) >= batch_size or (i == len(files_to_process) - 1 and current_batch_docs):
-                try:
+        def flush():
+            nonlocal current_batch_docs, current_batch_ids, current_batch_metadatas, current_batch_files
+            try:
+                if current_batch_docs:
                     # Generate embeddings
                     embeddings = self.model.encode(current_batch_docs, show_progress_bar=False)
 
-                    # Store in ChromaDB
-                    collection.add(
+                    # Store in ChromaDB, overwriting chunks that kept their id
+                    collection.upsert(
                         documents=current_batch_docs,
                         embeddings=embeddings.tolist(),
                         metadatas=current_batch_metadatas,
                         ids=current_batch_ids
                     )
 
-                    # Update checkpoint
-                    with open(self.checkpoint_file, 'w') as f:
-                        json.dump(list(processed_files), f)
+                stale_ids = []
+                for entry, old_ids in current_batch_files:
+                    new_ids = set(entry.chunk_ids)
+                    stale_ids.extend(chunk_id for chunk_id in old_ids if chunk_id not in new_ids)
+                if stale_ids:
+                    collection.delete(ids=stale_ids)
+                if self.hot_cache is not None:
+                    self.hot_cache.discard([chunk_id for _, old_ids in current_batch_files for chunk_id in old_ids])
+
+                # Record the files only once their chunks are stored, so failures are retried
+                self.manifest.put_many(entry for entry, _ in current_batch_files)
+                stats["indexed"] += len(current_batch_files)
+            except Exception as e:
+                logging.error(f"Failed to process RAG batch: {e}")
+            finally:
+                # Clear memory and garbage collect
+                current_batch_docs = []
+                current_batch_ids = []
+                current_batch_metadatas = []
+                current_batch_files = []
+                gc.collect()
+
+        for file_path in file_paths:
+            try:
+                st = os.stat(file_path)
+            except OSError:
+                removed_paths.append(file_path)
+                continue
 
-                except Exception as e:
-                    logging.error(f"Failed to process RAG batch: {e}")
-                finally:
-                    # Clear memory and garbage collect
-                    current_batch_docs = []
-                    current_batch_ids = []
-                    current_batch_metadatas = []
-                    gc.collect()
+            entry = lookup(file_path)
+            if entry and entry.mtime == st.st_mtime and entry.size == st.st_size:
+                stats["unchanged"] += 1
+                continue
 
-        # 6. Initialize FAISS cache (empty at startup)
-        embedding_dim = self.model.get_sentence_embedding_dimension()
-        self.index = faiss.IndexFlatL2(embedding_dim)
-        self.documents = []  # Will store hot documents for FAISS
-        self.is_ready = True
+            try:
+                content_hash = hash_file(file_path)
+            except OSError as e:
+                logging.warning(f"Could not read {file_path} for RAG indexing: {e}")
+                continue
+            if entry and entry.content_hash == content_hash:
+                # Touched but not edited
+                stat_updates.append(entry._replace(mtime=st.st_mtime, size=st.st_size))
+                stats["unchanged"] += 1
+                continue
 
-        # Get count of documents in ChromaDB
-        doc_count = collection.count()
-        logging.info(f"RAG knowledge base built/loaded successfully. Total documents in ChromaDB: {doc_count}.")
+            try:
+                docs = load_document_cached(file_path, encoding='utf-8')
+                split_docs = text_splitter.split_documents(docs)
+            except Exception as e:
+                # Left out of the manifest so the next sync retries it
+                logging.warning(f"Could not read or process file {file_path} via LangChain: {e}")
+                continue
+
+            chunk_ids = []
+            for chunk_idx, doc in enumerate(split_docs):
+                if doc.page_content.strip():
+                    doc_id = f"{file_path}_{chunk_idx}"
+                    current_batch_docs.append(doc.page_content)
+                    current_batch_ids.append(doc_id)
+                    current_batch_metadatas.append({"source": file_path})
+                    chunk_ids.append(doc_id)
+
+            current_batch_files.append(
+                (ManifestEntry(file_path, st.st_mtime, st.st_size, content_hash, chunk_ids), entry.chunk_ids if entry else [])
+            )
+
+            # When batch size is reached, process the batch
+            if len(current_batch_docs) >= batch_size:
+                flush()
+
+        if current_batch_files:
+            flush()
+        self.manifest.put_many(stat_updates)
+
+        # Purge chunks of files that were deleted or left the scope
+        stale_entries = [entry for entry in (lookup(path) for path in removed_paths) if entry]
+        if stale_entries:
+            stale_ids = [chunk_id for entry in stale_entries for chunk_id in entry.chunk_ids]
+            try:
+                if stale_ids:
+                    collection.delete(ids=stale_ids)
+                if self.hot_cache is not None:
+                    self.hot_cache.discard(stale_ids)
+                self.manifest.delete_many(entry.path for entry in stale_entries)
+                stats["removed"] += len(stale_entries)
+            except Exception as e:
+                logging.error(f"Failed to purge stale RAG chunks: {e}")
 
+        return stats
+
+    def start_watching(self, debounce: float = 2.0) -> bool:
+        """Keeps the index live by re-syncing files as they change under base_dir.
+
+        Events are collected and applied together once no new change has arrived
+        for `debounce` seconds.
+        """
+        try:
+            from watchdog.observers import Observer
+            from watchdog.events import FileSystemEventHandler
+        except ImportError:
+            logging.error("watchdog is not installed; RAG watch mode is unavailable.")
+            return False
+
+        self.stop_watching()
+        tool = self
+
+        class _ChangeHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", None)):
+                    if path:
+                        tool._queue_change(os.fsdecode(path), debounce)
+
+        self._observer = Observer()
+        self._observer.schedule(_ChangeHandler(), self.base_dir, recursive=True)
+        self._observer.start()
+        logging.info(f"RAG tool watching {self.base_dir} for changes.")
+        return True
+
+    def stop_watching(self):
+        """Stops watch mode, if it is running."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        with self._pending_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._pending_changes.clear()
+
+    def _queue_change(self, path: str, debounce: float):
+        if any(part in EXCLUDED_DIRS for part in os.path.relpath(path, self.base_dir).split(os.sep)):
+            return
+        if not path.endswith((".md", ".txt")):
+            return
+        with self._pending_lock:
+            self._pending_changes.add(path)
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+            self._flush_timer = threading.Timer(debounce, self._flush_changes)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def _flush_changes(self):
+        with self._pending_lock:
+            paths = self._pending_changes
+            self._pending_changes = set()
+            self._flush_timer = None
+        if not paths or not self.is_ready:
+            return
+
+        present = sorted(p for p in paths if os.path.isfile(p) and self._is_indexable(p))
+        removed = [p for p in paths if p not in present]
+        try:
+            collection = self.chroma_client.get_or_create_collection(name=self.collection_name)
+            with self._index_lock:
+                stats = self._sync_files(collection, present, removed)
+            logging.info(f"RAG watch: {stats['indexed']} files re-indexed, {stats['removed']} removed.")
+        except Exception as e:
+            logging.error(f"RAG watch update failed: {e}")
 
     async def scan_directory(self, directory: str) -> str:
         """Scans a new directory and adds documents to the index."""
@@ -418,14 +577,13 @@ class RAG_Tool:
                 )
 
                 # Update FAISS cache if applicable
-                if self.index is not None:
-                    for i, (doc_text, metadata, doc_id) in enumerate(zip(current_batch_docs, current_batch_metadatas, current_batch_ids)):
-                        self.documents.append({
-                            "id": doc_id,
-                            "source": metadata['source'],
-                            "content": doc_text
-                        })
-                        self.index.add(np.array([embeddings[i]], dtype=np.float32))
+                if self.hot_cache is not None:
+                    self.hot_cache.add(
+                        current_batch_ids,
+                        [metadata['source'] for metadata in current_batch_metadatas],
+                        current_batch_docs,
+                        embeddings
+                    )
 
                 return f"Successfully added document: {filepath} ({len(current_batch_docs)} chunks)"
             return f"No valid chunks extracted from document: {filepath}"
@@ -450,6 +608,12 @@ class RAG_Tool:
         except Exception:
             return None
 
+    def cache_stats(self) -> dict:
+        """Returns the FAISS hot tier's hit/miss/eviction counters."""
+        if self.hot_cache is None:
+            return {}
+        return self.hot_cache.stats()
+
     async def search_knowledge_base(self, query: str, k: int = 5) -> str:
         """Searches the knowledge base for text relevant to the query.
 
@@ -471,8 +635,7 @@ class RAG_Tool:
             return f"Error connecting to ChromaDB: {e}"
 
         logging.info(f"RAG tool received query: {query}")
-        query_embedding = self.model.encode([query])
-        query_embedding_np = np.array(query_embedding, dtype=np.float32)
+        query_embedding = await self.model.aencode([query])
 
         results = []
         found_in_cache = False
@@ -481,26 +644,12 @@ class RAG_Tool:
         k_retrieval = max(k, 15) if self.pruner else k
 
         # 1. Search FAISS Cache first
-        if self.index is not None and self.index.ntotal > 0:
-            # We want to use FAISS if the results are very close
-            # We will fetch top k and check distances
-            distances, indices = self.index.search(query_embedding_np, k_retrieval)
-
-            # Simple threshold for FAISS L2 distance to consider it a "cache hit"
+        if self.hot_cache is not None:
+            # Only chunks within the cache's L2 threshold (1.0 by default) count as a hit.
             # SentenceTransformers often output normalized embeddings where max distance is ~2.0
-            # Let's use a threshold of 1.0
-            valid_cache_results = []
-            for i in range(len(indices[0])):
-                if indices[0][i] != -1 and distances[0][i] < 1.0:
-                    doc_index = indices[0][i]
-                    doc = self.documents[doc_index]
-                    # We store structured results for pruning
-                    valid_cache_results.append({
-                        "content": doc['content'],
-                        "source": doc['source'],
-                        "id": doc['id'],
-                        "is_cached": True
-                    })
+            valid_cache_results = [
+                {**doc, "is_cached": True} for doc in self.hot_cache.search(query_embedding, k_retrieval)
+            ]
 
             if valid_cache_results:
                 logging.info("RAG FAISS Cache HIT.")
@@ -519,14 +668,15 @@ class RAG_Tool:
                 chroma_results = collection.query(
                     query_embeddings=query_embedding.tolist(),
                     n_results=k_retrieval,
-                    where={"source": {"$contains": base_dir_prefix}}
+                    where={"source": {"$contains": base_dir_prefix}},
+                    # Reuse the stored embeddings for the hot tier instead of re-encoding each chunk
+                    include=["documents", "metadatas", "embeddings"]
                 )
 
                 if chroma_results and chroma_results['documents'] and chroma_results['documents'][0]:
                     docs = chroma_results['documents'][0]
                     metadatas = chroma_results['metadatas'][0]
                     ids = chroma_results['ids'][0]
-                    # distances in chroma might be available depending on metric, usually in chroma_results['distances'][0]
 
                     for doc_text, metadata, doc_id in zip(docs, metadatas, ids):
                         results.append({
@@ -536,17 +686,10 @@ class RAG_Tool:
                             "is_cached": False
                         })
 
-                        # Add to FAISS cache
-                        if self.index is not None:
-                            # Check if it's already in the cache first (naive check by ID could be added, but appending is fine for now)
-                            # We append the document to our list and add the embedding to FAISS
-                            doc_embedding = self.model.encode([doc_text], show_progress_bar=False)
-                            self.documents.append({
-                                "id": doc_id,
-                                "source": metadata['source'],
-                                "content": doc_text
-                            })
-                            self.index.add(np.array(doc_embedding, dtype=np.float32))
+                    # Add to FAISS cache; chunks already cached are deduplicated by id
+                    embeddings = chroma_results.get('embeddings')
+                    if self.hot_cache is not None and embeddings is not None and len(embeddings) > 0:
+                        self.hot_cache.add(ids, [metadata['source'] for metadata in metadatas], docs, embeddings[0])
 
             except Exception as e:
                 logging.error(f"Error querying ChromaDB: {e}")
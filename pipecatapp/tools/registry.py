@@ -0,0 +1,337 @@
+"""Lazy tool registry.
+
+Importing every tool module and constructing every tool at startup costs
+seconds and hundreds of megabytes (embedding models, Docker and database
+clients, optional SDKs), although a session usually calls only a handful of
+tools. A LazyTool stands in for a tool in the agent's tool dictionary. It
+knows the tool's name, description, public methods and function-calling
+schema, which are read from the tool module's source without importing it,
+so the system prompt can be built from it. The module is imported and the tool constructed the first time
+an attribute of the tool is used.
+
+`shared_resource` holds process-wide singletons (models, clients) that
+several tools, or several agents' copies of a tool, would otherwise each
+create.
+"""
+import ast
+import functools
+import importlib
+import importlib.util
+import inspect
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def _module_path(module: str) -> Optional[str]:
+    try:
+        spec = importlib.util.find_spec(module)
+    except (ImportError, ValueError):
+        return None
+    return spec.origin if spec and spec.origin and spec.origin.endswith(".py") else None
+
+
+@functools.lru_cache(maxsize=None)
+def _parse(path: str, mtime: float) -> ast.Module:
+    with open(path, "r", encoding="utf-8") as f:
+        return ast.parse(f.read(), filename=path)
+
+
+def _resolve_base(tree: ast.Module, module: str, base: str) -> Optional[Tuple[str, str]]:
+    """Finds the module defining base class `base`, as imported by `module`."""
+    for node in tree.body:
+        if isinstance(node, ast.ImportFrom) and any((a.asname or a.name) == base for a in node.names):
+            name = next(a.name for a in node.names if (a.asname or a.name) == base)
+            if node.level:
+                package = module.rsplit(".", node.level)[0]
+                source = f"{package}.{node.module}" if node.module else package
+            else:
+                source = node.module
+            return source, name
+    return None
+
+
+def read_class(module: str, class_name: str, _seen=None) -> Tuple[str, Dict[str, str]]:
+    """Reads a class's docstring and public methods from its module's source.
+
+    Base classes defined in the same module, or imported from another module
+    that can be found on the path, contribute their methods too. Nothing is
+    imported except the packages containing the module.
+
+    Returns:
+        tuple: The class docstring, and a dict of public method name to docstring.
+    """
+    path = _module_path(module)
+    if path is None:
+        return "", {}
+    tree = _parse(path, os.path.getmtime(path))
+    cls = next((n for n in tree.body if isinstance(n, ast.ClassDef) and n.name == class_name), None)
+    if cls is None:
+        return "", {}
+    seen = _seen or set()
+    seen.add((module, class_name))
+
+    methods: Dict[str, str] = {}
+    for base in cls.bases:
+        if not isinstance(base, ast.Name):
+            continue
+        if any(isinstance(n, ast.ClassDef) and n.name == base.id for n in tree.body):
+            location = (module, base.id)
+        else:
+            location = _resolve_base(tree, module, base.id)
+        if location and location not in seen:
+            methods.update(read_class(*location, _seen=seen)[1])
+
+    for node in cls.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) or node.name.startswith("_"):
+            continue
+        decorators = {d.id for d in node.decorator_list if isinstance(d, ast.Name)}
+        if decorators & {"staticmethod", "property"}:
+            methods.pop(node.name, None)
+            continue
+        methods[node.name] = ast.get_docstring(node)
+    return ast.get_docstring(cls) or "", dict(sorted(methods.items()))
+
+
+class _NotLiteral(Exception):
+    pass
+
+
+def _literal(node: ast.AST, attrs: Dict[str, Any]) -> Any:
+    """Evaluates an expression built from literals and `self` attributes known from `attrs`."""
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.Dict):
+        if any(key is None for key in node.keys):
+            raise _NotLiteral()
+        return {_literal(k, attrs): _literal(v, attrs) for k, v in zip(node.keys, node.values)}
+    if isinstance(node, (ast.List, ast.Tuple)):
+        return [_literal(element, attrs) for element in node.elts]
+    is_self = lambda n: isinstance(n, ast.Name) and n.id == "self"
+    if isinstance(node, ast.Attribute) and is_self(node.value) and node.attr in attrs:
+        return attrs[node.attr]
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "getattr"
+            and len(node.args) == 3 and is_self(node.args[0]) and isinstance(node.args[1], ast.Constant)):
+        name = node.args[1].value
+        return attrs[name] if name in attrs else _literal(node.args[2], attrs)
+    raise _NotLiteral()
+
+
+def read_schema(module: str, class_name: str) -> Optional[Dict[str, Any]]:
+    """Reads the dict a tool class's `get_schema` returns, from its module's source.
+
+    Only a `get_schema` that returns a literal is understood; it may use
+    `self` attributes that `__init__` sets to literals. Returns None otherwise.
+    """
+    path = _module_path(module)
+    if path is None:
+        return None
+    tree = _parse(path, os.path.getmtime(path))
+    cls = next((n for n in tree.body if isinstance(n, ast.ClassDef) and n.name == class_name), None)
+    if cls is None:
+        return None
+    methods = {n.name: n for n in cls.body if isinstance(n, ast.FunctionDef)}
+    get_schema = methods.get("get_schema")
+    if get_schema is None:
+        return None
+
+    attrs: Dict[str, Any] = {}
+    init = methods.get("__init__")
+    for node in ast.walk(init) if init else ():
+        if isinstance(node, ast.Assign) and len(node.targets) == 1:
+            target = node.targets[0]
+            if isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name) and target.value.id == "self":
+                try:
+                    attrs[target.attr] = _literal(node.value, {})
+                except _NotLiteral:
+                    attrs.pop(target.attr, None)
+
+    body = [n for n in get_schema.body if not (isinstance(n, ast.Expr) and isinstance(n.value, ast.Constant))]
+    if len(body) != 1 or not isinstance(body[0], ast.Return) or body[0].value is None:
+        return None
+    try:
+        schema = _literal(body[0].value, attrs)
+    except _NotLiteral:
+        return None
+    return schema if isinstance(schema, dict) else None
+
+
+class ToolSpec:
+    """What the agent needs to know about a tool before it is loaded.
+
+    Args:
+        name (str): The tool's key in the agent's tool dictionary.
+        module (str): Dotted path of the module defining the tool class.
+        class_name (str): The tool class.
+        description (str, optional): Overrides the class docstring's first paragraph.
+    """
+    def __init__(self, name: str, module: str, class_name: str, description: Optional[str] = None):
+        self.name = name
+        self.module = module
+        self.class_name = class_name
+        self._description = description
+        self._methods: Optional[Dict[str, str]] = None
+        self._schema: Optional[Dict[str, Any]] = None
+
+    def _read(self):
+        doc, self._methods = read_class(self.module, self.class_name)
+        if self._description is None:
+            self._description = doc.split("\n\n")[0].strip()
+
+    @property
+    def description(self) -> str:
+        if self._description is None:
+            self._read()
+        return self._description
+
+    @property
+    def methods(self) -> Dict[str, str]:
+        """Public method names of the tool, mapped to their docstrings."""
+        if self._methods is None:
+            self._read()
+        return self._methods
+
+    @property
+    def schema(self) -> Dict[str, Any]:
+        """The tool's function-calling schema.
+
+        Read from the class's `get_schema` when that returns a literal;
+        otherwise built from the description and public methods in the
+        action/kwargs form most tools use.
+        """
+        if self._schema is None:
+            schema = read_schema(self.module, self.class_name)
+            if schema is None:
+                actions = [name for name in self.methods if name not in ("get_schema", "execute")]
+                schema = {
+                    "type": "function",
+                    "function": {
+                        "name": self.name,
+                        "description": self.description,
+                        "parameters": {
+                            "type": "object",
+                            "properties": {
+                                "action": {
+                                    "type": "string",
+                                    "description": f"The action to perform. Available: {', '.join(actions)}"
+                                },
+                                "kwargs": {
+                                    "type": "object",
+                                    "description": "Additional arguments for the action."
+                                }
+                            },
+                            "required": ["action"]
+                        }
+                    }
+                }
+            self._schema = schema
+        return self._schema
+
+
+class LazyTool:
+    """Stands in for a tool, importing and constructing it on first use.
+
+    Any attribute lookup the proxy cannot answer itself loads the tool and is
+    forwarded to it, so callers use a LazyTool exactly like the tool. Attributes
+    set before the tool is loaded are applied to it once it is constructed.
+
+    Args:
+        name (str): The tool's key in the agent's tool dictionary.
+        module (str): Dotted path of the module defining the tool class.
+        class_name (str): The tool class.
+        factory (callable, optional): Called with the tool class to build the
+            tool, for tools that need more than constructor arguments.
+        description (str, optional): Overrides the class docstring.
+        **kwargs: Constructor arguments, used when no factory is given.
+    """
+    def __init__(self, name: str, module: str, class_name: str, factory: Optional[Callable[[type], Any]] = None,
+                 description: Optional[str] = None, **kwargs):
+        object.__setattr__(self, "tool_spec", ToolSpec(name, module, class_name, description))
+        object.__setattr__(self, "_factory", factory or (lambda cls: cls(**kwargs)))
+        object.__setattr__(self, "_instance", None)
+        object.__setattr__(self, "_pending_attrs", {})
+        object.__setattr__(self, "_lock", threading.Lock())
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def resolve(self):
+        """Returns the tool, importing and constructing it if this is its first use."""
+        instance = self._instance
+        if instance is not None:
+            return instance
+        with self._lock:
+            if self._instance is None:
+                spec = self.tool_spec
+                try:
+                    cls = getattr(importlib.import_module(spec.module), spec.class_name)
+                    instance = self._factory(cls)
+                except Exception as e:
+                    logging.error(f"Failed to load tool '{spec.name}' ({spec.module}.{spec.class_name}): {e}")
+                    raise
+                for attr, value in self._pending_attrs.items():
+                    setattr(instance, attr, value)
+                self._pending_attrs.clear()
+                object.__setattr__(self, "_instance", instance)
+                logging.info(f"Loaded tool '{spec.name}'")
+        return self._instance
+
+    def __getattr__(self, attr):
+        if attr.startswith("__") and attr.endswith("__"):
+            raise AttributeError(attr)
+        if attr in self._pending_attrs:
+            return self._pending_attrs[attr]
+        return getattr(self.resolve(), attr)
+
+    def __setattr__(self, attr, value):
+        with self._lock:
+            if self._instance is None:
+                self._pending_attrs[attr] = value
+                return
+        setattr(self._instance, attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyTool {self.tool_spec.name} ({self.tool_spec.module}.{self.tool_spec.class_name}, {state})>"
+
+
+def tool_methods(tool) -> List[Tuple[str, Optional[str]]]:
+    """Lists a tool's public methods and their docstrings without loading a lazy tool."""
+    if isinstance(tool, LazyTool):
+        if not tool.loaded:
+            return list(tool.tool_spec.methods.items())
+        tool = tool.resolve()
+    return [
+        (name, method.__doc__)
+        for name, method in inspect.getmembers(tool, predicate=inspect.ismethod)
+        if not name.startswith("_")
+    ]
+
+
+def tool_schema(tool) -> Optional[Dict[str, Any]]:
+    """Returns a tool's function-calling schema without loading a lazy tool, or None if it has none."""
+    if isinstance(tool, LazyTool):
+        if not tool.loaded:
+            return tool.tool_spec.schema
+        tool = tool.resolve()
+    get_schema = getattr(tool, "get_schema", None)
+    return get_schema() if callable(get_schema) else None
+
+
+_shared: Dict[Any, Any] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_resource(key, factory: Callable[[], Any]):
+    """Returns the process-wide object for `key`, calling `factory` to create it on first use.
+
+    Args:
+        key: Identifies the resource, e.g. ("sentence_transformer", model_name).
+        factory (callable): Builds the resource. Called at most once per key.
+    """
+    with _shared_lock:
+        if key not in _shared:
+            _shared[key] = factory()
+        return _shared[key]
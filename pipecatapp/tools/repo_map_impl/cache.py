@@ -1,41 +1,113 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
+import sqlite3
 from pathlib import Path
 
+# SQLite's default limit on host parameters per statement is 999 before 3.32.
+_BATCH = 500
+
+
+def _content_hash(file_path: Path) -> str | None:
+    try:
+        return hashlib.blake2b(file_path.read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return None
+
 
 class TagCache:
+    """Tags per source file in one SQLite database, valid while mtime and size match.
+
+    A file whose mtime changed but whose size and content hash did not (a
+    checkout, a touch) is still a hit, and its entry is refreshed.
+    """
+
     def __init__(self, cache_dir: Path):
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(parents=True, exist_ok=True)
-
-    def _key_path(self, file_path: Path) -> Path:
-        safe = str(file_path).replace("/", "_").replace(":", "_")
-        return self.cache_dir / f"{safe}.json"
+        self.conn = sqlite3.connect(self.cache_dir / "tags.sqlite")
+        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn.execute("PRAGMA synchronous=NORMAL;")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tags (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                hash TEXT,
+                payload TEXT NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
 
     def get(self, file_path: Path) -> dict | None:
-        path = self._key_path(file_path)
-        if not path.is_file():
-            return None
-        try:
-            data = json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError):
-            return None
-        try:
-            mtime = file_path.stat().st_mtime
-        except OSError:
-            return None
-        if data.get("mtime") != mtime:
-            return None
-        return data.get("payload")
+        return self.get_many([file_path]).get(file_path)
+
+    def get_many(self, file_paths: list[Path]) -> dict[Path, dict]:
+        """Return the cached payload of every file in `file_paths` whose entry is still valid."""
+        stats: dict[str, tuple[Path, os.stat_result]] = {}
+        for file_path in file_paths:
+            try:
+                stats[str(file_path)] = (file_path, file_path.stat())
+            except OSError:
+                continue
+
+        keys = list(stats)
+        found: dict[Path, dict] = {}
+        refreshed: list[tuple[int, str]] = []
+        for i in range(0, len(keys), _BATCH):
+            batch = keys[i : i + _BATCH]
+            rows = self.conn.execute(
+                f"SELECT path, mtime_ns, size, hash, payload FROM tags WHERE path IN ({','.join('?' * len(batch))})",
+                batch,
+            ).fetchall()
+            for key, mtime_ns, size, digest, payload in rows:
+                file_path, st = stats[key]
+                if st.st_size != size:
+                    continue
+                if st.st_mtime_ns != mtime_ns:
+                    if digest is None or _content_hash(file_path) != digest:
+                        continue
+                    refreshed.append((st.st_mtime_ns, key))
+                try:
+                    found[file_path] = json.loads(payload)
+                except json.JSONDecodeError:
+                    continue
+
+        if refreshed:
+            with self.conn:
+                self.conn.executemany("UPDATE tags SET mtime_ns = ? WHERE path = ?", refreshed)
+        return found
 
     def set(self, file_path: Path, payload: dict) -> None:
-        try:
-            mtime = file_path.stat().st_mtime
-        except OSError:
+        self.set_many([(file_path, payload)])
+
+    def set_many(self, entries: list[tuple[Path, dict]]) -> None:
+        rows = []
+        for file_path, payload in entries:
+            try:
+                st = file_path.stat()
+            except OSError:
+                continue
+            rows.append(
+                (
+                    str(file_path),
+                    st.st_mtime_ns,
+                    st.st_size,
+                    _content_hash(file_path),
+                    json.dumps(payload, ensure_ascii=False),
+                )
+            )
+        if not rows:
             return
-        path = self._key_path(file_path)
-        path.write_text(
-            json.dumps({"mtime": mtime, "payload": payload}, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO tags (path, mtime_ns, size, hash, payload) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def close(self) -> None:
+        self.conn.close()
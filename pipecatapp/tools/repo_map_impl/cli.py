@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import argparse
+import os
 import sys
 from pathlib import Path
 
@@ -56,6 +57,13 @@ def main(argv: list[str] | None = None) -> int:
         default=None,
         help="Cap number of source files processed",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        metavar="N",
+        help="Processes used to parse files (default: one per CPU)",
+    )
     parser.add_argument(
         "--no-cache",
         action="store_true",
@@ -96,6 +104,7 @@ def main(argv: list[str] | None = None) -> int:
             paths,
             use_cache=not args.no_cache,
             enrich_python_files=args.enrich_python,
+            workers=args.workers,
         )
         content = render_json(files)
     elif args.budget is not None:
@@ -105,6 +114,7 @@ def main(argv: list[str] | None = None) -> int:
             focus_files=args.focus or None,
             max_files=args.max_files,
             enrich_python_files=args.enrich_python,
+            workers=args.workers,
         )
     else:
         content = generate_full_map(
@@ -113,6 +123,7 @@ def main(argv: list[str] | None = None) -> int:
             enrich_python_files=args.enrich_python,
             config=config,
             tree_detail=args.tree_detail,
+            workers=args.workers,
         )
 
     if args.output:
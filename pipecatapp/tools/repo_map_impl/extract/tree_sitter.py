@@ -24,6 +24,7 @@ GRAMMAR_SPECS: dict[str, tuple[str, str]] = {
 
 _parser_cache: dict[str, Parser] = {}
 _language_cache: dict[str, Language] = {}
+_query_cache: dict[str, Query] = {}
 
 
 def _load_language(lang: str) -> Language | None:
@@ -59,6 +60,13 @@ def _query_path(lang: str) -> Path | None:
     return path if path.is_file() and path.stat().st_size > 20 else None
 
 
+def _get_query(lang: str, language: Language, query_path: Path) -> Query:
+    # Compiling a tags query costs several times more than parsing a typical file
+    if lang not in _query_cache:
+        _query_cache[lang] = Query(language, query_path.read_text(encoding="utf-8"))
+    return _query_cache[lang]
+
+
 def _kind_from_capture(capture: str) -> tuple[str, str]:
     if capture.startswith("name."):
         capture = capture[5:]
@@ -98,9 +106,10 @@ def extract_tags(file_path: Path, repo_root: Path) -> FileSymbols:
     except OSError as e:
         return FileSymbols(path=rel, language=lang, error=str(e))
 
+    source = code.encode("utf-8")
     try:
-        query = Query(language, query_path.read_text(encoding="utf-8"))
-        tree = parser.parse(code.encode("utf-8"))
+        query = _get_query(lang, language, query_path)
+        tree = parser.parse(source)
         root = tree.root_node
         captures = QueryCursor(query).captures(root)
     except Exception as e:
@@ -112,7 +121,7 @@ def extract_tags(file_path: Path, repo_root: Path) -> FileSymbols:
             continue
         role, kind = _kind_from_capture(capture_name)
         for node in nodes:
-            name = code.encode("utf-8")[node.start_byte : node.end_byte].decode("utf-8", errors="replace")
+            name = source[node.start_byte : node.end_byte].decode("utf-8", errors="replace")
             line = node.start_point[0] + 1
             symbols.append(Symbol(name=name, kind=kind, line=line, role=role))
 
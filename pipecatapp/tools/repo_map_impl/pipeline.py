@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
 from pathlib import Path
 
 from pipecatapp.tools.repo_map_impl.cache import TagCache
@@ -28,32 +33,85 @@ def _cache_dir(root: Path) -> Path:
     return root / ".repo-map-cache"
 
 
+# Below this many files to parse, starting worker processes costs more than it saves.
+PARALLEL_MIN_FILES = 64
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _extract_file(
+    root: Path, enrich_python_files: bool, path: Path, cached: dict | None
+) -> tuple[FileSymbols, dict | None]:
+    """Build one file's symbols; also return its tags to cache if it was parsed cleanly."""
+    payload = None
+    if cached:
+        fs = file_symbols_from_cache(cached)
+    else:
+        fs = extract_tags(path, root)
+        if not fs.error:
+            payload = file_symbols_to_cache_payload(fs)
+
+    if enrich_python_files and fs.language == "python":
+        fs = enrich_python(fs, path)
+    return fs, payload
+
+
 def extract_all(
     root: Path,
     file_paths: list[Path],
     *,
     use_cache: bool = True,
     enrich_python_files: bool = False,
+    workers: int | None = None,
 ) -> list[FileSymbols]:
+    """Extract symbols for `file_paths`, in order.
+
+    Cache entries are read in one batch. Files that need parsing are parsed
+    in this process unless `workers` > 1 asks for a pool of that many. Pool
+    workers start from a forkserver (spawn where that is unavailable), never
+    as forks of the caller, which may have threads running.
+    """
     cache = TagCache(_cache_dir(root)) if use_cache else None
-    results: list[FileSymbols] = []
-
-    for path in file_paths:
-        cached = None
-        if cache:
-            cached = cache.get(path)
-        if cached:
-            fs = file_symbols_from_cache(cached)
+    cached = cache.get_many(file_paths) if cache else {}
+    results: list[FileSymbols | None] = [None] * len(file_paths)
+
+    pending: list[int] = []
+    for i, path in enumerate(file_paths):
+        payload = cached.get(path)
+        if payload and not enrich_python_files:
+            results[i] = file_symbols_from_cache(payload)
         else:
-            fs = extract_tags(path, root)
-            if cache and not fs.error:
-                cache.set(path, file_symbols_to_cache_payload(fs))
-
-        if enrich_python_files and fs.language == "python":
-            fs = enrich_python(fs, path)
-
-        results.append(fs)
-
+            pending.append(i)
+
+    task = partial(_extract_file, root, enrich_python_files)
+    paths = [file_paths[i] for i in pending]
+    payloads = [cached.get(path) for path in paths]
+    workers = workers or 1
+    outputs = None
+    if workers > 1 and len(pending) >= PARALLEL_MIN_FILES:
+        chunksize = max(1, len(pending) // (workers * 4))
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+                outputs = list(pool.map(task, paths, payloads, chunksize=chunksize))
+        except (OSError, BrokenProcessPool) as e:
+            logger.warning("Parallel tag extraction failed (%s); extracting serially", e)
+    if outputs is None:
+        outputs = list(map(task, paths, payloads))
+
+    fresh: list[tuple[Path, dict]] = []
+    for i, (fs, payload) in zip(pending, outputs):
+        results[i] = fs
+        if payload is not None:
+            fresh.append((file_paths[i], payload))
+
+    if cache:
+        cache.set_many(fresh)
+        cache.close()
     return results
 
 
@@ -64,11 +122,12 @@ def generate_full_map(
     enrich_python_files: bool = False,
     config: RepoMapConfig | None = None,
     tree_detail: bool = False,
+    workers: int | None = None,
 ) -> str:
     root = root.resolve()
     config = config or load_config(root)
     paths = discover_files(root, max_files=max_files, extra_exclude_globs=config.exclude_globs)
-    files = extract_all(root, paths, enrich_python_files=enrich_python_files)
+    files = extract_all(root, paths, enrich_python_files=enrich_python_files, workers=workers)
 
     threshold = compact_tree_threshold(config)
     use_compact_tree = len(files) > threshold and not tree_detail
@@ -127,11 +186,12 @@ def generate_budget_map(
     max_files: int | None = None,
     enrich_python_files: bool = False,
     config: RepoMapConfig | None = None,
+    workers: int | None = None,
 ) -> str:
     root = root.resolve()
     config = config or load_config(root)
     paths = discover_files(root, max_files=max_files, extra_exclude_globs=config.exclude_globs)
-    files = extract_all(root, paths, enrich_python_files=enrich_python_files)
+    files = extract_all(root, paths, enrich_python_files=enrich_python_files, workers=workers)
 
     header = (
         "<!-- repo-map-format: 1 (focused) -->\n"
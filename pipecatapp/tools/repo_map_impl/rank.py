@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from collections import defaultdict
 
+import numpy as np
+
 from pipecatapp.tools.repo_map_impl.model import FileSymbols
 
 
@@ -35,32 +37,52 @@ def pagerank(
     *,
     nodes: list[str],
     personalization: dict[str, float] | None = None,
-    iterations: int = 20,
+    iterations: int = 100,
     damping: float = 0.85,
+    tol: float = 1e-6,
 ) -> dict[str, float]:
+    """Sparse power iteration, O(edges) per step; stops when the L1 change is below `tol`.
+
+    Random jumps and the rank of files with no references follow `personalization`
+    (uniform when empty).
+    """
     if not nodes:
         return {}
-    scores = {n: 1.0 / len(nodes) for n in nodes}
-    out_weight = {n: max(len(graph.get(n, ())), 1) for n in nodes}
-
-    pers = personalization
-    if pers:
-        total = sum(pers.values()) or 1.0
-        pers = {k: v / total for k, v in pers.items()}
-
+    n = len(nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    src: list[int] = []
+    dst: list[int] = []
+    for node, targets in graph.items():
+        i = index.get(node)
+        if i is None:
+            continue
+        for target in targets:
+            j = index.get(target)
+            if j is not None:
+                src.append(i)
+                dst.append(j)
+    src_idx = np.asarray(src, dtype=np.int64)
+    dst_idx = np.asarray(dst, dtype=np.int64)
+    out_degree = np.bincount(src_idx, minlength=n).astype(np.float64)
+    dangling = out_degree == 0
+    edge_weight = 1.0 / out_degree[src_idx]
+
+    teleport = np.zeros(n)
+    for node, weight in (personalization or {}).items():
+        if node in index and weight > 0:
+            teleport[index[node]] += weight
+    total = teleport.sum()
+    teleport = teleport / total if total > 0 else np.full(n, 1.0 / n)
+
+    scores = np.full(n, 1.0 / n)
     for _ in range(iterations):
-        new_scores: dict[str, float] = {}
-        for n in nodes:
-            rank = (1 - damping) / len(nodes)
-            if pers and n in pers:
-                rank = (1 - damping) * pers.get(n, 0)
-            incoming = 0.0
-            for src in nodes:
-                if n in graph.get(src, ()):
-                    incoming += scores[src] / out_weight[src]
-            new_scores[n] = rank + damping * incoming
+        incoming = np.bincount(dst_idx, weights=scores[src_idx] * edge_weight, minlength=n)
+        new_scores = damping * incoming + (damping * scores[dangling].sum() + 1 - damping) * teleport
+        delta = np.abs(new_scores - scores).sum()
         scores = new_scores
-    return scores
+        if delta < tol:
+            break
+    return dict(zip(nodes, scores.tolist()))
 
 
 def select_budget_map(
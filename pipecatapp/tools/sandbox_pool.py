@@ -0,0 +1,515 @@
+import abc
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+DEFAULT_WHEEL_CACHE = "~/.cache/pipecat/wheels"
+
+# Printed by the kernel-side install snippet, so pip's exit code can be told apart from its output
+_INSTALL_STATUS = "__sandbox_pip_exit__"
+
+# pip's report of each wheel `pip wheel` built or downloaded
+_SAVED_WHEEL = re.compile(r"^Saved (.+\.whl)\s*$", re.MULTILINE)
+
+
+def check_requirements(libraries: Optional[List[str]]) -> None:
+    """Raises ValueError for a library specifier that pip would read as an option."""
+    for lib in libraries or []:
+        if not isinstance(lib, str) or not lib.strip() or lib.lstrip().startswith("-"):
+            raise ValueError(f"Invalid library specifier: {lib!r}")
+
+
+def saved_wheels(pip_output: str) -> List[str]:
+    """File names of the wheels `pip wheel` reported saving."""
+    return [os.path.basename(path) for path in _SAVED_WHEEL.findall(pip_output)]
+
+
+class SandboxResult:
+    """The outcome of running code in a sandbox."""
+    def __init__(self, exit_code: int, stdout: str, stderr: str, timed_out: bool = False):
+        self.exit_code = exit_code
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+
+
+class Sandbox:
+    """A started sandbox handed out by a SandboxPool."""
+    def __init__(self, key: Tuple[str, Tuple[str, ...]], handle: Any):
+        self.key = key
+        self.handle = handle
+        self.uses = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+    @property
+    def image(self) -> str:
+        return self.key[0]
+
+    @property
+    def libraries(self) -> List[str]:
+        return list(self.key[1])
+
+
+class WheelCache:
+    """
+    Host directories of built wheels that sandboxes install from, one per library set, mounted read-only.
+
+    A library set is built once, by the backend, in an environment that may
+    reach the package index; sandboxes then install it with `--no-index`.
+    Each build gets a fresh scratch directory, and only the wheels pip
+    reports for it are copied into the set's own directory, so whatever a
+    package's build code writes cannot reach sandboxes for other sets.
+    """
+    def __init__(self, path: str = DEFAULT_WHEEL_CACHE):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.join(self.path, "sets"), exist_ok=True)
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    @staticmethod
+    def key(image: str, libraries: List[str]) -> str:
+        # Wheels are built per image, since images may differ in Python version
+        return hashlib.sha256(json.dumps([image, sorted(libraries)]).encode("utf-8")).hexdigest()
+
+    def set_path(self, image: str, libraries: List[str]) -> str:
+        return os.path.join(self.path, "sets", self.key(image, libraries))
+
+    def has(self, image: str, libraries: List[str]) -> bool:
+        return os.path.isdir(self.set_path(image, libraries))
+
+    def ensure(self, backend: "SandboxBackend", image: str, libraries: List[str]) -> str:
+        """Builds wheels for a library set unless an earlier build already covered it, and returns its directory."""
+        set_dir = self.set_path(image, libraries)
+        if self.has(image, libraries):
+            return set_dir
+        with self._lock:
+            key_lock = self._key_locks.setdefault(self.key(image, libraries), threading.Lock())
+        with key_lock:
+            if self.has(image, libraries):
+                return set_dir
+            build_dir = tempfile.mkdtemp(prefix=".build-", dir=self.path)
+            staging = tempfile.mkdtemp(prefix=".set-", dir=self.path)
+            try:
+                wheels = backend.build_wheels(image, libraries, build_dir) if libraries else []
+                for name in wheels:
+                    source = os.path.join(build_dir, name)
+                    if name.endswith(".whl") and os.path.isfile(source) and not os.path.islink(source):
+                        shutil.copyfile(source, os.path.join(staging, name))
+                os.chmod(staging, 0o755)
+                # Appears whole or not at all
+                os.rename(staging, set_dir)
+            finally:
+                shutil.rmtree(build_dir, ignore_errors=True)
+                shutil.rmtree(staging, ignore_errors=True)
+        return set_dir
+
+
+class SandboxBackend(abc.ABC):
+    """Starts, runs code in, resets and tears down sandboxes of one kind."""
+
+    @abc.abstractmethod
+    def build_wheels(self, image: str, libraries: List[str], wheel_dir: str) -> List[str]:
+        """Builds wheels for `libraries` and their dependencies into `wheel_dir` and returns their file names."""
+        pass
+
+    @abc.abstractmethod
+    def start(self, image: str, libraries: List[str], wheel_dir: str) -> Any:
+        """Starts a sandbox with `libraries` installed from `wheel_dir` and returns its handle."""
+        pass
+
+    @abc.abstractmethod
+    def run(self, handle: Any, code: str, timeout: int) -> SandboxResult:
+        pass
+
+    @abc.abstractmethod
+    def reset(self, handle: Any) -> bool:
+        """Wipes what a run left behind. Returns False if the sandbox could not be cleaned."""
+        pass
+
+    @abc.abstractmethod
+    def is_healthy(self, handle: Any) -> bool:
+        pass
+
+    @abc.abstractmethod
+    def destroy(self, handle: Any) -> None:
+        pass
+
+
+class DockerSandboxBackend(SandboxBackend):
+    """
+    Long-running, locked-down containers that execute code with `docker exec`.
+
+    Containers get no network, a read-only root filesystem, dropped
+    capabilities and CPU/PID limits like the one-shot sandbox's. Libraries
+    are installed as root into a tmpfs at /sandbox that code, run as the
+    unprivileged `user`, can read but not change; its only writable places
+    are /tmp and /dev/shm, both wiped between runs. A container with
+    processes left over from a run is retired.
+    """
+    def __init__(self, client, mem_limit: str = "256m", pids_limit: int = 20, user: str = "65534:65534"):
+        self.client = client
+        self.mem_limit = mem_limit
+        self.pids_limit = pids_limit
+        self.user = user
+
+    def build_wheels(self, image: str, libraries: List[str], wheel_dir: str) -> List[str]:
+        # Built in a throwaway container: building an sdist runs its setup code
+        output = self.client.containers.run(
+            image,
+            command=["pip", "wheel", "--wheel-dir", "/wheels", *libraries],
+            volumes={wheel_dir: {"bind": "/wheels", "mode": "rw"}},
+            environment={"HOME": "/tmp"},
+            cap_drop=["ALL"],
+            remove=True,
+        )
+        output = output.decode("utf-8", errors="replace") if isinstance(output, bytes) else output or ""
+        logging.debug(f"Built wheels for {libraries}: {output[-500:]}")
+        return saved_wheels(output)
+
+    def start(self, image: str, libraries: List[str], wheel_dir: str) -> Any:
+        container = self.client.containers.run(
+            image,
+            command=["sleep", "infinity"],
+            volumes={wheel_dir: {"bind": "/wheels", "mode": "ro"}},
+            environment={"PYTHONPATH": "/sandbox/site", "HOME": "/tmp", "PIP_NO_CACHE_DIR": "1"},
+            working_dir="/tmp",
+            network_mode="none",
+            mem_limit=self.mem_limit,
+            cpu_period=100000,
+            cpu_quota=50000,
+            pids_limit=self.pids_limit,
+            detach=True,
+            cap_drop=["ALL"],
+            read_only=True,
+            init=True,
+            tmpfs={"/tmp": "rw,size=100m,exec,nosuid,mode=1777", "/sandbox": "rw,size=512m,exec,nosuid,mode=755"},
+        )
+        if libraries:
+            result = container.exec_run(
+                ["pip", "install", "--no-index", "--find-links", "/wheels", "--target", "/sandbox/site", *libraries],
+                user="root",
+            )
+            if result.exit_code != 0:
+                container.remove(force=True)
+                raise RuntimeError(f"Failed to install {libraries} in sandbox: {result.output.decode('utf-8', errors='replace')[-500:]}")
+        return container
+
+    def run(self, handle: Any, code: str, timeout: int) -> SandboxResult:
+        started = time.monotonic()
+        result = handle.exec_run(
+            ["timeout", "-s", "KILL", str(timeout), "python", "-c", code], workdir="/tmp", user=self.user, demux=True
+        )
+        stdout, stderr = result.output or (None, None)
+        timed_out = result.exit_code == 137 and time.monotonic() - started >= timeout
+        return SandboxResult(
+            result.exit_code,
+            (stdout or b"").decode("utf-8", errors="replace"),
+            (stderr or b"").decode("utf-8", errors="replace"),
+            timed_out,
+        )
+
+    def reset(self, handle: Any) -> bool:
+        # As the run's user: root holds no capabilities here, so it cannot remove that user's directories
+        handle.exec_run(
+            ["sh", "-c", "rm -rf /tmp/* /tmp/.[!.]* /dev/shm/* /dev/shm/.[!.]* 2>/dev/null; true"], user=self.user
+        )
+        # Only tini and the keep-alive sleep should be left
+        return len(handle.top().get("Processes") or []) <= 2
+
+    def is_healthy(self, handle: Any) -> bool:
+        try:
+            handle.reload()
+            return handle.status == "running" and handle.exec_run(["true"]).exit_code == 0
+        except Exception:
+            return False
+
+    def destroy(self, handle: Any) -> None:
+        try:
+            handle.remove(force=True)
+        except Exception as e:
+            logging.warning(f"Failed to remove sandbox container: {e}")
+
+
+class SubprocessSandboxBackend(SandboxBackend):
+    """
+    Sandboxes that are a scratch directory plus a private library directory, run with the host interpreter.
+
+    This provides no isolation and must not run untrusted code; it exists so
+    the pool can be exercised without Docker. Code can write to the library
+    directory, so a reset restores it from a copy taken after installing.
+    """
+    def __init__(self, python: str = sys.executable):
+        self.python = python
+
+    def build_wheels(self, image: str, libraries: List[str], wheel_dir: str) -> List[str]:
+        result = subprocess.run(
+            [self.python, "-m", "pip", "wheel", "--wheel-dir", wheel_dir, *libraries], check=True, capture_output=True
+        )
+        return saved_wheels(result.stdout.decode("utf-8", errors="replace"))
+
+    def start(self, image: str, libraries: List[str], wheel_dir: str) -> Any:
+        root = tempfile.mkdtemp(prefix="sandbox-")
+        os.makedirs(os.path.join(root, "site"))
+        os.makedirs(os.path.join(root, "work"))
+        if libraries:
+            try:
+                subprocess.run(
+                    [self.python, "-m", "pip", "install", "--quiet", "--no-index", "--find-links", wheel_dir,
+                     "--target", os.path.join(root, "site"), *libraries],
+                    check=True, capture_output=True
+                )
+            except subprocess.CalledProcessError as e:
+                shutil.rmtree(root, ignore_errors=True)
+                raise RuntimeError(f"Failed to install {libraries} in sandbox: {e.stderr.decode('utf-8', errors='replace')[-500:]}")
+        shutil.copytree(os.path.join(root, "site"), os.path.join(root, "pristine"), symlinks=True)
+        return root
+
+    def run(self, handle: Any, code: str, timeout: int) -> SandboxResult:
+        work = os.path.join(handle, "work")
+        env = {"PATH": os.environ.get("PATH", ""), "HOME": work, "PYTHONPATH": os.path.join(handle, "site")}
+        process = subprocess.Popen(
+            [self.python, "-c", code], cwd=work, env=env,
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, start_new_session=True
+        )
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            stdout, stderr = process.communicate()
+            return SandboxResult(-signal.SIGKILL, stdout.decode("utf-8", errors="replace"), stderr.decode("utf-8", errors="replace"), True)
+        return SandboxResult(process.returncode, stdout.decode("utf-8", errors="replace"), stderr.decode("utf-8", errors="replace"))
+
+    def reset(self, handle: Any) -> bool:
+        work = os.path.join(handle, "work")
+        shutil.rmtree(work, ignore_errors=True)
+        os.makedirs(work)
+        site = os.path.join(handle, "site")
+        shutil.rmtree(site, ignore_errors=True)
+        shutil.copytree(os.path.join(handle, "pristine"), site, symlinks=True)
+        return True
+
+    def is_healthy(self, handle: Any) -> bool:
+        return all(os.path.isdir(os.path.join(handle, name)) for name in ("site", "pristine", "work"))
+
+    def destroy(self, handle: Any) -> None:
+        shutil.rmtree(handle, ignore_errors=True)
+
+
+class SandboxPool:
+    """
+    Pre-started sandboxes, reset between uses, kept per (image, library set).
+
+    `acquire` hands out an idle sandbox for the key after a health check, or
+    starts one (installing its libraries from the wheel cache) if none is
+    idle. `release` resets it and returns it to the idle list, unless it has
+    served `max_uses` runs, timed out or could not be cleaned, in which case
+    it is destroyed. Keys that have been used keep `min_idle` sandboxes warm,
+    started in the background; idle sandboxes beyond `max_idle` or older than
+    `idle_timeout` are destroyed.
+    """
+    def __init__(self, backend: SandboxBackend, wheel_cache: Optional[WheelCache] = None, max_uses: int = 50,
+                 min_idle: int = 1, max_idle: int = 2, idle_timeout: float = 600.0):
+        self.backend = backend
+        self.wheel_cache = wheel_cache or WheelCache()
+        self.max_uses = max_uses
+        self.min_idle = min_idle
+        self.max_idle = max(max_idle, min_idle)
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._idle: Dict[Tuple[str, Tuple[str, ...]], List[Sandbox]] = {}
+        self._starting: Dict[Tuple[str, Tuple[str, ...]], int] = {}
+        self._in_use = 0
+        self._closed = False
+
+    @staticmethod
+    def make_key(image: str, libraries: Optional[List[str]] = None) -> Tuple[str, Tuple[str, ...]]:
+        check_requirements(libraries)
+        return image, tuple(sorted(set(libraries or [])))
+
+    def acquire(self, image: str, libraries: Optional[List[str]] = None) -> Sandbox:
+        key = self.make_key(image, libraries)
+        self._expire_idle()
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                sandbox = idle.pop() if idle else None
+                if sandbox is not None:
+                    self._in_use += 1
+            if sandbox is None:
+                break
+            if self.backend.is_healthy(sandbox.handle):
+                self._replenish(key)
+                return sandbox
+            logging.warning(f"Discarding unhealthy sandbox for {key[0]} {list(key[1])}.")
+            with self._lock:
+                self._in_use -= 1
+            self.backend.destroy(sandbox.handle)
+
+        sandbox = self._start(key)
+        with self._lock:
+            self._in_use += 1
+        self._replenish(key)
+        return sandbox
+
+    def release(self, sandbox: Sandbox, reusable: bool = True):
+        sandbox.uses += 1
+        sandbox.last_used = time.monotonic()
+        with self._lock:
+            self._in_use -= 1
+        keep = reusable and not self._closed and sandbox.uses < self.max_uses
+        if keep:
+            try:
+                keep = self.backend.reset(sandbox.handle)
+            except Exception as e:
+                logging.warning(f"Failed to reset sandbox: {e}")
+                keep = False
+        if keep:
+            with self._lock:
+                idle = self._idle.setdefault(sandbox.key, [])
+                if len(idle) < self.max_idle:
+                    idle.append(sandbox)
+                    return
+        self.backend.destroy(sandbox.handle)
+
+    def run(self, image: str, code: str, libraries: Optional[List[str]] = None, timeout: int = 30) -> SandboxResult:
+        """Runs code in a pooled sandbox for the image and library set."""
+        sandbox = self.acquire(image, libraries)
+        result = None
+        try:
+            result = self.backend.run(sandbox.handle, code, timeout)
+            return result
+        finally:
+            # A timed-out run may have left processes behind
+            self.release(sandbox, reusable=result is not None and not result.timed_out)
+
+    def prewarm(self, image: str, libraries: Optional[List[str]] = None):
+        """Starts `min_idle` sandboxes for a key in the background."""
+        self._replenish(self.make_key(image, libraries))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_use": self._in_use,
+                "idle": {f"{image} {list(libraries)}": len(idle) for (image, libraries), idle in self._idle.items()},
+                "starting": sum(self._starting.values()),
+            }
+
+    def close(self):
+        self._closed = True
+        with self._lock:
+            sandboxes = [sandbox for idle in self._idle.values() for sandbox in idle]
+            self._idle.clear()
+        for sandbox in sandboxes:
+            self.backend.destroy(sandbox.handle)
+
+    def _start(self, key: Tuple[str, Tuple[str, ...]]) -> Sandbox:
+        image, libraries = key
+        wheel_dir = self.wheel_cache.ensure(self.backend, image, list(libraries))
+        return Sandbox(key, self.backend.start(image, list(libraries), wheel_dir))
+
+    def _replenish(self, key: Tuple[str, Tuple[str, ...]]):
+        with self._lock:
+            missing = self.min_idle - len(self._idle.get(key, [])) - self._starting.get(key, 0)
+            if self._closed or missing <= 0:
+                return
+            self._starting[key] = self._starting.get(key, 0) + missing
+        for _ in range(missing):
+            threading.Thread(target=self._warm_one, args=(key,), name="sandbox-prewarm", daemon=True).start()
+
+    def _warm_one(self, key: Tuple[str, Tuple[str, ...]]):
+        try:
+            sandbox = self._start(key)
+        except Exception as e:
+            logging.warning(f"Failed to pre-start a sandbox for {key[0]} {list(key[1])}: {e}")
+            return
+        finally:
+            with self._lock:
+                self._starting[key] -= 1
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if not self._closed and len(idle) < self.max_idle:
+                idle.append(sandbox)
+                return
+        self.backend.destroy(sandbox.handle)
+
+    def _expire_idle(self):
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = []
+        with self._lock:
+            for idle in self._idle.values():
+                keep = [sandbox for sandbox in idle if sandbox.last_used >= cutoff]
+                expired.extend(sandbox for sandbox in idle if sandbox.last_used < cutoff)
+                idle[:] = keep
+        for sandbox in expired:
+            self.backend.destroy(sandbox.handle)
+
+
+async def install_kernel_libraries(run_code: Callable[[str, int], Awaitable[str]], libraries: Optional[List[str]],
+                                   installed: Set[str], timeout: int = 30) -> Optional[str]:
+    """
+    Installs into a persistent Jupyter kernel the libraries it does not have yet.
+
+    `run_code(code, timeout)` executes code in the kernel and returns its
+    output. A library is only added to `installed` once pip succeeds, so a
+    failed install is retried on the next call. Returns an error message,
+    or None.
+    """
+    missing = [lib for lib in libraries or [] if lib not in installed]
+    if not missing:
+        return None
+    try:
+        check_requirements(missing)
+    except ValueError as e:
+        return f"Error: {e}"
+    output = await run_code(
+        "import subprocess, sys\n"
+        f"_pip = subprocess.run([sys.executable, '-m', 'pip', 'install', *{missing!r}], "
+        "capture_output=True, text=True)\n"
+        f"print({_INSTALL_STATUS!r}, _pip.returncode)\n"
+        "if _pip.returncode:\n"
+        "    print(_pip.stderr[-500:])\n",
+        timeout,
+    )
+    if f"{_INSTALL_STATUS} 0" in output:
+        installed.update(missing)
+        return None
+    details = output.replace(_INSTALL_STATUS, "pip exit code").strip()
+    return f"Error: Failed to install {missing}: {details[-500:]}"
+
+
+def create_sandbox_pool(docker_client=None) -> Optional[SandboxPool]:
+    """
+    Builds the pool selected by SANDBOX_POOL ('docker' or 'subprocess'), or returns None.
+
+    SANDBOX_POOL_MAX_USES, SANDBOX_POOL_MIN_IDLE, SANDBOX_POOL_MAX_IDLE and
+    SANDBOX_WHEEL_CACHE tune it.
+    """
+    kind = os.getenv("SANDBOX_POOL", "").lower()
+    if kind == "docker":
+        if docker_client is None:
+            logging.warning("SANDBOX_POOL=docker but no Docker client is available; sandboxes will not be pooled.")
+            return None
+        backend: SandboxBackend = DockerSandboxBackend(docker_client)
+    elif kind == "subprocess":
+        logging.warning("Using the subprocess sandbox pool: code runs on the host without isolation.")
+        backend = SubprocessSandboxBackend()
+    else:
+        return None
+    return SandboxPool(
+        backend,
+        wheel_cache=WheelCache(os.getenv("SANDBOX_WHEEL_CACHE", DEFAULT_WHEEL_CACHE)),
+        max_uses=int(os.getenv("SANDBOX_POOL_MAX_USES", "50")),
+        min_idle=int(os.getenv("SANDBOX_POOL_MIN_IDLE", "1")),
+        max_idle=int(os.getenv("SANDBOX_POOL_MAX_IDLE", "2")),
+    )
@@ -1,4 +1,10 @@
-from sentence_transformers import SentenceTransformer, util
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+from pipecatapp.utils.embedding_service import get_embedding_service
+
+# Same name and loader as the RAG tool, so both use one copy of the model
+MODEL_NAME = "all-MiniLM-L6-v2"
 
 class SummarizerTool:
     """A tool to provide extractive summaries of the conversation.
@@ -12,7 +18,7 @@ class SummarizerTool:
         twin_service: A reference to the main TwinService instance to access memory.
         name (str): The name of the tool.
         description (str): A brief description of the tool's purpose.
-        model: The SentenceTransformer model used for embeddings.
+        model: The shared EmbeddingService used for embeddings.
     """
     def __init__(self, twin_service=None):
         """Initializes the SummarizerTool.
@@ -25,7 +31,8 @@ class SummarizerTool:
         self.description = "A tool to provide summaries of the conversation."
         # Using a smaller, efficient model as requested.
         # Switched to all-MiniLM-L6-v2 to avoid Hugging Face gating/token requirements
-        self.model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        # One copy of the model serves every agent's summarizer and the other embedding users
+        self.model = get_embedding_service(MODEL_NAME, loader=SentenceTransformer)
 
 
     def get_schema(self) -> dict:
@@ -90,15 +97,16 @@ class SummarizerTool:
         history_with_prefix = ["title: none | text: " + turn for turn in conversation_history]
 
         # Embed the query and the conversation history
-        query_embedding = self.model.encode(query_with_prefix, convert_to_tensor=True)
-        history_embeddings = self.model.encode(history_with_prefix, convert_to_tensor=True)
+        query_embedding = self.model.encode([query_with_prefix])[0]
+        history_embeddings = self.model.encode(history_with_prefix)
 
         # Compute cosine similarities
-        similarities = util.cos_sim(query_embedding, history_embeddings)[0]
+        norms = np.linalg.norm(history_embeddings, axis=1) * np.linalg.norm(query_embedding)
+        similarities = history_embeddings @ query_embedding / np.maximum(norms, 1e-12)
 
         # Get the top 3 most similar turns
         top_k = min(3, len(conversation_history))
-        top_indices = similarities.topk(k=top_k).indices
+        top_indices = np.argsort(-similarities, kind="stable")[:top_k]
 
         # Return the most relevant turns as the summary
         summary_lines = [conversation_history[i] for i in top_indices]
@@ -6,16 +6,50 @@ import uuid
 import asyncio
 import time
 
+from pipecatapp.swarm_pool import WarmWorkerPool
+
+DEFAULT_WORKER_IMAGE = "pipecatapp:latest"
+
+_shared_pool = None
+
+
+def get_shared_worker_pool():
+    """Returns the process-wide warm worker pool, or None unless SWARM_WORKER_POOL is enabled."""
+    global _shared_pool
+    if os.getenv("SWARM_WORKER_POOL", "false").lower() not in ("1", "true", "yes"):
+        return None
+    # Pooled processes belong to the event loop that started them
+    loop = asyncio.get_running_loop()
+    if _shared_pool is None or _shared_pool[0] is not loop:
+        if _shared_pool is not None:
+            old_loop, old_pool = _shared_pool
+            # A closed loop cancelled the pool's runners, which stopped its processes
+            if not old_loop.is_closed():
+                asyncio.run_coroutine_threadsafe(old_pool.close(), old_loop)
+        _shared_pool = (loop, WarmWorkerPool.from_env())
+    return _shared_pool[1]
+
+
 class SwarmTool:
     """
     A tool that allows the agent to spawn multiple 'worker' agents to perform tasks in parallel.
     This enables the 'Frontier Agent' capability of scaling by spawning 10 versions of itself.
+
+    With a warm worker pool (passed in, or enabled for the process with
+    SWARM_WORKER_POOL=true), tasks for the default image go to already running
+    agent processes; tasks the pool cannot take right away overflow to Nomad
+    batch jobs.
     """
-    def __init__(self, nomad_url: str = f"http://{os.getenv("CLUSTER_IP", "127.0.0.1")}:4646", memory_client=None):
+    def __init__(self, nomad_url: str = f"http://{os.getenv("CLUSTER_IP", "127.0.0.1")}:4646", memory_client=None,
+                 worker_pool: WarmWorkerPool = None):
         self.nomad_url = nomad_url
         self.memory_client = memory_client
+        self.worker_pool = worker_pool
         self.logger = logging.getLogger(__name__)
 
+    def _get_worker_pool(self):
+        return self.worker_pool or get_shared_worker_pool()
+
 
     def get_schema(self) -> dict:
         return {
@@ -54,7 +88,7 @@ class SwarmTool:
         else:
             return f"Unknown action: {action}"
 
-    async def spawn_workers(self, tasks: list[dict], image: str = "pipecatapp:latest", agent_type: str = "worker") -> str:
+    async def spawn_workers(self, tasks: list[dict], image: str = DEFAULT_WORKER_IMAGE, agent_type: str = "worker") -> str:
         """
         Spawns a worker agent for each task in the list.
 
@@ -70,95 +104,118 @@ class SwarmTool:
             str: A JSON string summary of the dispatched jobs, including a list of 'task_ids'.
         """
         dispatched_ids = []
-        task_ids = []
+        task_ids = [task.get('id', 'unknown') for task in tasks]
         errors = []
-        
+
+        # The pool runs the local code, so only tasks for the default image can use it
+        pool = self._get_worker_pool() if image == DEFAULT_WORKER_IMAGE else None
+        overflow = []
+        for task in tasks:
+            job_id = pool.submit(task, agent_type) if pool is not None else None
+            if job_id is None:
+                overflow.append(task)
+            else:
+                dispatched_ids.append(job_id)
+                self.logger.info(f"Queued swarm task on the warm pool: {job_id}")
+
+        if overflow:
+            async with httpx.AsyncClient() as client:
+                outcomes = await asyncio.gather(
+                    *(self._submit_nomad_job(client, task, image, agent_type) for task in overflow)
+                )
+            for job_id, error_msg in outcomes:
+                if error_msg:
+                    errors.append(error_msg)
+                else:
+                    dispatched_ids.append(job_id)
+
+        result = {
+            "job_ids": dispatched_ids,
+            "task_ids": task_ids,
+            "message": f"Successfully dispatched {len(dispatched_ids)} workers.",
+            "errors": errors
+        }
+
+        return json.dumps(result)
+
+    async def _submit_nomad_job(self, client: httpx.AsyncClient, task: dict, image: str, agent_type: str):
+        """Submits one task as a Nomad batch job. Returns (job_id, error message or None)."""
         # Determine script based on agent_type
         script_path = "/opt/pipecatapp/worker_agent.py"
         if agent_type == "technician":
             script_path = "/opt/pipecatapp/technician_agent.py"
 
-        async with httpx.AsyncClient() as client:
-            for task in tasks:
-                t_id = task.get('id', 'unknown')
-                task_ids.append(t_id)
-
-                # Use UUID for collision-free IDs
-                unique_suffix = str(uuid.uuid4())[:8]
-                job_id = f"swarm-{agent_type}-{t_id}-{unique_suffix}"
-
-                # Construct a Nomad batch job payload
-                job_payload = {
-                    "Job": {
-                        "ID": job_id,
-                        "Name": job_id,
-                        "Type": "batch",
-                        "Datacenters": ["dc1"],
-                        "TaskGroups": [
+        t_id = task.get('id', 'unknown')
+        # Use UUID for collision-free IDs
+        unique_suffix = str(uuid.uuid4())[:8]
+        job_id = f"swarm-{agent_type}-{t_id}-{unique_suffix}"
+
+        # Construct a Nomad batch job payload
+        job_payload = {
+            "Job": {
+                "ID": job_id,
+                "Name": job_id,
+                "Type": "batch",
+                "Datacenters": ["dc1"],
+                "TaskGroups": [
+                    {
+                        "Name": "worker-group",
+                        "Tasks": [
                             {
-                                "Name": "worker-group",
-                                "Tasks": [
-                                    {
-                                        "Name": "worker-agent",
-                                        "Driver": "docker",
-                                        "Config": {
-                                            "image": image,
-                                            "command": "python",
-                                            "args": [script_path],
-                                            "mounts": [
-                                                {
-                                                    "type": "bind",
-                                                    "source": "/opt/pipecatapp",
-                                                    "target": "/opt/pipecatapp",
-                                                    "readonly": True
-                                                }
-                                            ]
-                                        },
-                                        "Env": {
-                                            "WORKER_PROMPT": task.get("prompt"),
-                                            "WORKER_CONTEXT": task.get("context", ""),
-                                            "WORKER_TASK_ID": t_id,
-                                            "NOMAD_JOB_ID": job_id,
-                                            "CONSUL_HTTP_ADDR": os.getenv("CONSUL_HTTP_ADDR", "http://10.0.0.1:8500")
-                                        },
-                                        "Resources": {
-                                            "CPU": 500,
-                                            "MemoryMB": 1024
+                                "Name": "worker-agent",
+                                "Driver": "docker",
+                                "Config": {
+                                    "image": image,
+                                    "command": "python",
+                                    "args": [script_path],
+                                    "mounts": [
+                                        {
+                                            "type": "bind",
+                                            "source": "/opt/pipecatapp",
+                                            "target": "/opt/pipecatapp",
+                                            "readonly": True
                                         }
-                                    }
-                                ]
+                                    ]
+                                },
+                                "Env": {
+                                    "WORKER_PROMPT": task.get("prompt"),
+                                    "WORKER_CONTEXT": task.get("context", ""),
+                                    "WORKER_TASK_ID": t_id,
+                                    "NOMAD_JOB_ID": job_id,
+                                    "CONSUL_HTTP_ADDR": os.getenv("CONSUL_HTTP_ADDR", "http://10.0.0.1:8500")
+                                },
+                                "Resources": {
+                                    "CPU": 500,
+                                    "MemoryMB": 1024
+                                }
                             }
                         ]
                     }
-                }
-
-                try:
-                    resp = await client.post(f"{self.nomad_url}/v1/job/{job_id}", json=job_payload)
-                    resp.raise_for_status()
-                    dispatched_ids.append(job_id)
-                    self.logger.info(f"Dispatched swarm worker: {job_id}")
-                except Exception as e:
-                    error_msg = f"Failed to dispatch {job_id}: {str(e)}"
-                    self.logger.error(error_msg)
-                    errors.append(error_msg)
-
-        result = {
-            "job_ids": dispatched_ids,
-            "task_ids": task_ids,
-            "message": f"Successfully dispatched {len(dispatched_ids)} workers.",
-            "errors": errors
+                ]
+            }
         }
 
-        return json.dumps(result)
+        try:
+            resp = await client.post(f"{self.nomad_url}/v1/job/{job_id}", json=job_payload)
+            resp.raise_for_status()
+            self.logger.info(f"Dispatched swarm worker: {job_id}")
+            return job_id, None
+        except Exception as e:
+            error_msg = f"Failed to dispatch {job_id}: {str(e)}"
+            self.logger.error(error_msg)
+            return job_id, error_msg
 
     async def wait_for_results(self, task_ids: list[str], timeout: int = 600, poll_interval: int = 5) -> str:
         """
         Waits for the specified tasks to complete and returns their results.
 
+        Results are pushed by the memory's event subscription as they are
+        committed; memory clients without one are polled instead.
+
         Args:
             task_ids (list[str]): List of task IDs to wait for.
             timeout (int): Max wait time in seconds (default: 600).
-            poll_interval (int): Seconds to wait between polls (default: 5).
+            poll_interval (int): Seconds to wait between polls, when polling (default: 5).
 
         Returns:
             str: JSON string containing a dictionary of task_id -> result content.
@@ -167,16 +224,49 @@ class SwarmTool:
             return json.dumps({"error": "Memory client not initialized in SwarmTool. Cannot wait for results."})
 
         results = {}
-        start_time = time.time()
+        deadline = time.time() + timeout
 
         self.logger.info(f"Waiting for results from tasks: {task_ids}")
 
-        while len(results) < len(task_ids):
-            if time.time() - start_time > timeout:
-                remaining = list(set(task_ids) - set(results.keys()))
-                self.logger.warning(f"Timeout waiting for tasks: {remaining}")
-                break
+        if task_ids and hasattr(self.memory_client, "subscribe"):
+            try:
+                await self._await_results(task_ids, results, deadline)
+            except Exception as e:
+                self.logger.error(f"Result subscription failed ({e}); falling back to polling.")
+                await self._poll_for_results(task_ids, results, deadline, poll_interval)
+        else:
+            await self._poll_for_results(task_ids, results, deadline, poll_interval)
+
+        if len(results) < len(task_ids):
+            remaining = list(set(task_ids) - set(results.keys()))
+            self.logger.warning(f"Timeout waiting for tasks: {remaining}")
 
+        return json.dumps({
+            "status": "complete" if len(results) == len(task_ids) else "partial",
+            "results": results,
+            "missing": list(set(task_ids) - set(results.keys()))
+        })
+
+    async def _await_results(self, task_ids: list[str], results: dict, deadline: float):
+        """Collects worker_result events for the tasks from a memory subscription until all arrive or the deadline passes."""
+        # include_existing also delivers results committed before we subscribed
+        subscription = await self.memory_client.subscribe(kind="worker_result", task_ids=task_ids, include_existing=True)
+        with subscription:
+            while len(results) < len(task_ids):
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return
+                try:
+                    event = await subscription.get(timeout=remaining)
+                except asyncio.TimeoutError:
+                    return
+                t_id = event.get("meta", {}).get("task_id")
+                if t_id in task_ids and t_id not in results:
+                    results[t_id] = event.get("content")
+                    self.logger.info(f"Received result for task {t_id}")
+
+    async def _poll_for_results(self, task_ids: list[str], results: dict, deadline: float, poll_interval: int):
+        while len(results) < len(task_ids) and time.time() < deadline:
             try:
                 # Poll memory for results
                 events = await self.memory_client.get_events(limit=100)
@@ -186,28 +276,24 @@ class SwarmTool:
                     meta = event.get("meta", {})
                     t_id = meta.get("task_id")
 
-                    if kind == "worker_result" and t_id in task_ids:
-                        if t_id not in results:
-                            results[t_id] = event.get("content")
-                            self.logger.info(f"Received result for task {t_id}")
+                    if kind == "worker_result" and t_id in task_ids and t_id not in results:
+                        results[t_id] = event.get("content")
+                        self.logger.info(f"Received result for task {t_id}")
 
             except Exception as e:
                 self.logger.error(f"Error polling memory: {e}")
-                await asyncio.sleep(poll_interval)
 
             if len(results) == len(task_ids):
                 break
 
             await asyncio.sleep(poll_interval)
 
-        return json.dumps({
-            "status": "complete" if len(results) == len(task_ids) else "partial",
-            "results": results,
-            "missing": list(set(task_ids) - set(results.keys()))
-        })
-
     async def kill_worker(self, job_id: str) -> str:
         """Kills a specific worker job."""
+        pool = self._get_worker_pool()
+        if pool is not None and pool.owns(job_id):
+            await pool.cancel(job_id)
+            return f"Successfully killed worker: {job_id}"
         async with httpx.AsyncClient() as client:
             try:
                 # Use query param purge=true to clean up immediately
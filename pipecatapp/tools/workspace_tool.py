@@ -14,6 +14,8 @@ import aiohttp
 
 import docker
 
+from pipecatapp.tools.registry import shared_resource
+
 # Import LiminalMesh
 # Assuming PYTHONPATH is configured correctly by the runner
 try:
@@ -55,7 +57,7 @@ class WorkspaceTool:
 
         # Initialize Docker client
         try:
-            self.docker_client = docker.from_env()
+            self.docker_client = shared_resource("docker_client", docker.from_env)
         except Exception as e:
             logging.getLogger(__name__).warning(f"Failed to initialize Docker client in WorkspaceTool: {e}")
             self.docker_client = None
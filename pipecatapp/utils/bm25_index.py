@@ -0,0 +1,133 @@
+import heapq
+import math
+import sqlite3
+import threading
+from collections import Counter
+from typing import Iterable, List, Tuple
+
+
+def tokenize(text: str) -> List[str]:
+    return text.lower().split()
+
+
+class BM25Index:
+    """
+    An incrementally updatable BM25 inverted index stored in SQLite.
+
+    Postings (term, doc, term frequency), document frequencies and document
+    lengths live in their own tables, so adding a document only touches the
+    rows for its own terms and a query only reads the postings of its terms.
+    Scores use the Okapi BM25 formula with the non-negative (Lucene) IDF,
+    log(1 + (N - df + 0.5) / (df + 0.5)).
+    """
+    def __init__(self, conn: sqlite3.Connection, k1: float = 1.5, b: float = 0.75):
+        self.conn = conn
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS bm25_docs (
+                    doc_id TEXT PRIMARY KEY,
+                    length INTEGER NOT NULL
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS bm25_terms (
+                    term TEXT PRIMARY KEY,
+                    df INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS bm25_postings (
+                    term TEXT NOT NULL,
+                    doc_id TEXT NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, doc_id)
+                ) WITHOUT ROWID
+            """)
+            # Running totals, so N and the average length never need a table scan
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS bm25_stats (
+                    id INTEGER PRIMARY KEY CHECK (id = 0),
+                    doc_count INTEGER NOT NULL,
+                    total_length INTEGER NOT NULL
+                )
+            """)
+            self.conn.execute("INSERT OR IGNORE INTO bm25_stats (id, doc_count, total_length) VALUES (0, 0, 0)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT doc_count FROM bm25_stats WHERE id = 0").fetchone()[0]
+
+    def add_document(self, doc_id: str, text: str):
+        """Indexes a document. Cost is proportional to its number of tokens."""
+        self.add_documents([(doc_id, text)])
+
+    def add_documents(self, documents: Iterable[Tuple[str, str]]):
+        """Indexes several documents in one transaction, replacing any already indexed under the same id."""
+        with self._lock, self.conn:
+            for doc_id, text in documents:
+                self._remove(doc_id)
+                tokens = tokenize(text)
+                counts = Counter(tokens)
+                self.conn.execute("INSERT INTO bm25_docs (doc_id, length) VALUES (?, ?)", (doc_id, len(tokens)))
+                self.conn.executemany(
+                    "INSERT INTO bm25_postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                    [(term, doc_id, tf) for term, tf in counts.items()]
+                )
+                self.conn.executemany(
+                    "INSERT INTO bm25_terms (term, df) VALUES (?, 1) ON CONFLICT(term) DO UPDATE SET df = df + 1",
+                    [(term,) for term in counts]
+                )
+                self.conn.execute(
+                    "UPDATE bm25_stats SET doc_count = doc_count + 1, total_length = total_length + ? WHERE id = 0",
+                    (len(tokens),)
+                )
+
+    def remove_document(self, doc_id: str):
+        with self._lock, self.conn:
+            self._remove(doc_id)
+
+    def search(self, query: str, k: int) -> List[Tuple[str, float]]:
+        """Returns up to `k` (doc_id, score) pairs with a positive score, best first."""
+        query_terms = Counter(tokenize(query))
+        if not query_terms or k <= 0:
+            return []
+        placeholders = ",".join("?" * len(query_terms))
+        with self._lock:
+            doc_count, total_length = self.conn.execute(
+                "SELECT doc_count, total_length FROM bm25_stats WHERE id = 0"
+            ).fetchone()
+            if not doc_count:
+                return []
+            rows = self.conn.execute(f"""
+                SELECT p.term, p.doc_id, p.tf, d.length, t.df
+                FROM bm25_postings p
+                JOIN bm25_terms t ON t.term = p.term
+                JOIN bm25_docs d ON d.doc_id = p.doc_id
+                WHERE p.term IN ({placeholders})
+            """, list(query_terms)).fetchall()
+
+        avgdl = total_length / doc_count or 1.0
+        scores: Counter = Counter()
+        for term, doc_id, tf, length, df in rows:
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            norm = tf + self.k1 * (1 - self.b + self.b * length / avgdl)
+            # Repeated query terms count once per occurrence
+            scores[doc_id] += query_terms[term] * idf * tf * (self.k1 + 1) / norm
+        return heapq.nlargest(k, ((doc_id, score) for doc_id, score in scores.items() if score > 0), key=lambda item: item[1])
+
+    def _remove(self, doc_id: str):
+        row = self.conn.execute("SELECT length FROM bm25_docs WHERE doc_id = ?", (doc_id,)).fetchone()
+        if row is None:
+            return
+        terms = [(r[0],) for r in self.conn.execute("SELECT term FROM bm25_postings WHERE doc_id = ?", (doc_id,))]
+        self.conn.executemany("UPDATE bm25_terms SET df = df - 1 WHERE term = ?", terms)
+        self.conn.executemany("DELETE FROM bm25_terms WHERE term = ? AND df <= 0", terms)
+        self.conn.execute("DELETE FROM bm25_postings WHERE doc_id = ?", (doc_id,))
+        self.conn.execute("DELETE FROM bm25_docs WHERE doc_id = ?", (doc_id,))
+        self.conn.execute(
+            "UPDATE bm25_stats SET doc_count = doc_count - 1, total_length = total_length - ? WHERE id = 0",
+            (row[0],)
+        )
@@ -0,0 +1,238 @@
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+
+def _load_sentence_transformer(model_name: str):
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+# SentenceTransformer.encode options that do not change the result
+_IGNORED_ENCODE_ARGS = {"show_progress_bar", "batch_size"}
+
+
+class _PendingBatch:
+    """Texts queued on one event loop, waiting to be encoded together."""
+    def __init__(self):
+        self.requests: List[Tuple[List[str], asyncio.Future]] = []
+        self.size = 0
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class EmbeddingService:
+    """
+    One embedding model shared by every component that needs vectors.
+
+    `aencode` is the asyncio front-end: concurrent requests on a loop are
+    micro-batched (up to `max_batch_size` texts or `max_wait` seconds, whichever
+    comes first) and encoded on a dedicated worker pool, so the event loop is
+    never blocked by the model. `encode` serves callers that already run in a
+    worker thread. Both consult an LRU cache keyed by (model, text hash), so a
+    text is only embedded once while it stays cached.
+
+    The model is loaded on first use. `encode` and `get_sentence_embedding_dimension`
+    mirror the SentenceTransformer API, so the service can stand in for a model.
+    """
+    def __init__(self, model_name: str, loader: Optional[Callable[[str], Any]] = None,
+                 max_batch_size: int = 64, max_wait: float = 0.01, cache_size: int = 10000, workers: int = 1):
+        """
+        Initializes the service.
+
+        Args:
+            model_name (str): Model name or path passed to the loader.
+            loader (callable, optional): Builds the model from `model_name`. Defaults to SentenceTransformer.
+            max_batch_size (int): Maximum number of texts per model call.
+            max_wait (float): Seconds to wait for more requests before encoding a partial batch.
+            cache_size (int): Number of embeddings kept in the LRU cache (0 disables it).
+            workers (int): Threads in the pool that runs the model.
+        """
+        self.model_name = model_name
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.cache_size = cache_size
+        self._loader = loader or _load_sentence_transformer
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="embedding")
+        self._cache: "OrderedDict[Tuple[str, bytes], np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _PendingBatch]" = weakref.WeakKeyDictionary()
+        self.hits = 0
+        self.misses = 0
+        self.batches = 0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    logging.info(f"Loading embedding model: {self.model_name}")
+                    self._model = self._loader(self.model_name)
+        return self._model
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: Union[str, Sequence[str]], normalize_embeddings: bool = False,
+               convert_to_numpy: bool = True, convert_to_tensor: bool = False, **kwargs):
+        """
+        Encodes texts in the calling thread, reusing cached embeddings.
+
+        Output options follow SentenceTransformer.encode: a single string gives
+        one vector, `normalize_embeddings` scales vectors to unit length,
+        `convert_to_tensor` returns a torch tensor and `convert_to_numpy=False`
+        a list of vectors. `show_progress_bar` and `batch_size` are accepted and
+        ignored (batches are sized by `max_batch_size`); any other keyword
+        argument raises TypeError rather than being silently dropped.
+        """
+        unsupported = sorted(set(kwargs) - _IGNORED_ENCODE_ARGS)
+        if unsupported:
+            raise TypeError(f"EmbeddingService.encode() got unsupported keyword arguments: {', '.join(unsupported)}")
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        vectors, missing = self._lookup(texts)
+        if missing:
+            unique = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = dict(zip(unique, self._encode_uncached(unique)))
+            for i in missing:
+                vectors[i] = encoded[texts[i]]
+        embeddings = self._stack(vectors)
+        if normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.where(norms == 0, 1, norms)
+        if single:
+            embeddings = embeddings[0]
+        if convert_to_tensor:
+            import torch
+            return torch.from_numpy(embeddings)
+        if not convert_to_numpy and not single:
+            return list(embeddings)
+        return embeddings
+
+    async def aencode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encodes texts without blocking the event loop, batched with concurrent requests."""
+        texts = list(texts)
+        vectors, missing = self._lookup(texts)
+        if missing:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._enqueue(loop, [texts[i] for i in missing], future)
+            for i, vector in zip(missing, await future):
+                vectors[i] = vector
+        return self._stack(vectors)
+
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters and the number of model calls made so far."""
+        lookups = self.hits + self.misses
+        return {
+            "model": self.model_name,
+            "cached": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "batches": self.batches,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    def _key(self, text: str) -> Tuple[str, bytes]:
+        return self.model_name, hashlib.sha1(text.encode("utf-8")).digest()
+
+    def _lookup(self, texts: List[str]) -> Tuple[List[Optional[np.ndarray]], List[int]]:
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        missing = []
+        with self._cache_lock:
+            for i, text in enumerate(texts):
+                vector = self._cache.get(self._key(text)) if self.cache_size else None
+                if vector is None:
+                    missing.append(i)
+                    continue
+                self._cache.move_to_end(self._key(text))
+                vectors[i] = vector
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return vectors, missing
+
+    def _encode_uncached(self, texts: List[str]) -> List[np.ndarray]:
+        """Runs the model over `texts` in chunks of `max_batch_size` and caches the results."""
+        vectors: List[np.ndarray] = []
+        for start in range(0, len(texts), self.max_batch_size):
+            batch = texts[start:start + self.max_batch_size]
+            encoded = self.model.encode(batch)
+            if len(encoded) != len(batch):
+                raise ValueError(f"Embedding model returned {len(encoded)} vectors for {len(batch)} texts.")
+            vectors.extend(np.asarray(vector, dtype=np.float32) for vector in encoded)
+            self.batches += 1
+        if self.cache_size:
+            with self._cache_lock:
+                for text, vector in zip(texts, vectors):
+                    self._cache[self._key(text)] = vector
+                    self._cache.move_to_end(self._key(text))
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return vectors
+
+    def _enqueue(self, loop: asyncio.AbstractEventLoop, texts: List[str], future: asyncio.Future):
+        pending = self._pending.get(loop)
+        if pending is None:
+            pending = self._pending[loop] = _PendingBatch()
+        pending.requests.append((texts, future))
+        pending.size += len(texts)
+        if pending.size >= self.max_batch_size:
+            self._flush(loop)
+        elif pending.flush_handle is None:
+            pending.flush_handle = loop.call_later(self.max_wait, self._flush, loop)
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        pending = self._pending.pop(loop, None)
+        if pending is None:
+            return
+        if pending.flush_handle is not None:
+            pending.flush_handle.cancel()
+        loop.create_task(self._run_batch(loop, pending.requests))
+
+    async def _run_batch(self, loop: asyncio.AbstractEventLoop, requests: List[Tuple[List[str], asyncio.Future]]):
+        # The same text may be requested by several callers in one window
+        unique = list(dict.fromkeys(text for texts, _ in requests for text in texts))
+        try:
+            encoded = dict(zip(unique, await loop.run_in_executor(self._executor, self._encode_uncached, unique)))
+        except Exception as e:
+            for _, future in requests:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for texts, future in requests:
+            if not future.done():
+                future.set_result([encoded[text] for text in texts])
+
+    def _stack(self, vectors: List[np.ndarray]) -> np.ndarray:
+        if not vectors:
+            return np.zeros((0, self.get_sentence_embedding_dimension()), dtype=np.float32)
+        return np.stack(vectors)
+
+
+_services: Dict[Tuple[str, Any], EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: str, loader: Optional[Callable[[str], Any]] = None, **options) -> EmbeddingService:
+    """
+    Returns the process-wide EmbeddingService for a model, creating it on first use.
+
+    `options` are passed to the constructor and only apply when the service is created.
+    """
+    key = (model_name, loader)
+    with _services_lock:
+        service = _services.get(key)
+        if service is None:
+            service = _services[key] = EmbeddingService(model_name, loader=loader, **options)
+        return service
@@ -0,0 +1,153 @@
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence
+
+import faiss
+import numpy as np
+
+
+class RAGHotCache:
+    """
+    A bounded FAISS "hot tier" in front of the ChromaDB knowledge base.
+
+    Chunks are keyed by their ChromaDB id, so a chunk returned by many queries
+    is stored once. Vectors live in an ID-mapped index, which lets entries be
+    evicted individually once `max_size` is reached. The policy is either "lru"
+    (least recently used) or "lfu" (least frequently used, ties broken by
+    recency). Embeddings are supplied by the caller, usually straight from
+    ChromaDB, so caching a chunk never re-runs the embedding model.
+    """
+    POLICIES = ("lru", "lfu")
+
+    def __init__(self, dimension: int, max_size: int = 10000, policy: str = "lru", max_distance: float = 1.0):
+        """
+        Initializes the cache.
+
+        Args:
+            dimension (int): Embedding dimension.
+            max_size (int): Maximum number of chunks held in the index.
+            policy (str): Eviction policy, "lru" or "lfu".
+            max_distance (float): L2 distance under which a cached chunk counts as a hit.
+        """
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown eviction policy '{policy}'. Use one of {self.POLICIES}.")
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        self.dimension = dimension
+        self.max_size = max_size
+        self.policy = policy
+        self.max_distance = max_distance
+        self.index = faiss.IndexIDMap2(faiss.IndexFlatL2(dimension))
+        # faiss id -> {"id", "source", "content", "uses"}; ordered from least to most recently used
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._faiss_ids: Dict[str, int] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, chunk_id: str) -> bool:
+        return chunk_id in self._faiss_ids
+
+    def add(self, chunk_ids: Sequence[str], sources: Sequence[str], contents: Sequence[str], embeddings) -> int:
+        """
+        Caches chunks with their precomputed embeddings.
+
+        Chunks already cached with the same content are only marked as used;
+        changed content replaces the old entry. Returns the number of entries added.
+        """
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(chunk_ids), self.dimension)
+        # Vectors for new entries are added in one call once the batch is processed
+        pending: Dict[int, np.ndarray] = {}
+        with self._lock:
+            for chunk_id, source, content, vector in zip(chunk_ids, sources, contents, vectors):
+                faiss_id = self._faiss_ids.get(chunk_id)
+                if faiss_id is not None:
+                    if self._entries[faiss_id]["content"] == content:
+                        self._touch(faiss_id)
+                        continue
+                    self._remove(faiss_id, pending)
+                # Make room first, so a new entry (with no uses yet) is never its own victim
+                while len(self._entries) >= self.max_size:
+                    self._remove(self._victim(), pending)
+                    self.evictions += 1
+                faiss_id = self._next_id
+                self._next_id += 1
+                self._entries[faiss_id] = {"id": chunk_id, "source": source, "content": content, "uses": 0}
+                self._faiss_ids[chunk_id] = faiss_id
+                pending[faiss_id] = vector
+
+            if pending:
+                self.index.add_with_ids(np.stack(list(pending.values())), np.fromiter(pending.keys(), dtype=np.int64))
+        return len(pending)
+
+    def search(self, query_embedding, k: int) -> List[Dict[str, Any]]:
+        """
+        Returns cached chunks within `max_distance` of the query, closest first.
+        An empty result counts as a miss.
+        """
+        query = np.asarray(query_embedding, dtype=np.float32).reshape(1, self.dimension)
+        with self._lock:
+            results = []
+            if self._entries:
+                distances, ids = self.index.search(query, min(k, len(self._entries)))
+                for distance, faiss_id in zip(distances[0], ids[0]):
+                    if faiss_id == -1 or distance >= self.max_distance:
+                        continue
+                    entry = self._entries.get(int(faiss_id))
+                    if entry is None:
+                        continue
+                    self._touch(int(faiss_id))
+                    results.append({"id": entry["id"], "source": entry["source"], "content": entry["content"]})
+            if results:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return results
+
+    def discard(self, chunk_ids: Sequence[str]):
+        """Drops chunks from the cache, e.g. when their source file changed."""
+        with self._lock:
+            for chunk_id in chunk_ids:
+                faiss_id = self._faiss_ids.get(chunk_id)
+                if faiss_id is not None:
+                    self._remove(faiss_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "policy": self.policy,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _touch(self, faiss_id: int):
+        self._entries[faiss_id]["uses"] += 1
+        self._entries.move_to_end(faiss_id)
+
+    def _victim(self) -> int:
+        if self.policy == "lfu":
+            # min() keeps the first of equal counts, i.e. the least recently used
+            return min(self._entries, key=lambda faiss_id: self._entries[faiss_id]["uses"])
+        return next(iter(self._entries))
+
+    def _remove(self, faiss_id: int, pending: Optional[Dict[int, np.ndarray]] = None):
+        entry = self._entries.pop(faiss_id)
+        self._faiss_ids.pop(entry["id"], None)
+        if pending is not None and faiss_id in pending:
+            # Not in the index yet
+            del pending[faiss_id]
+            return
+        removed = self.index.remove_ids(np.asarray([faiss_id], dtype=np.int64))
+        if removed != 1:
+            logging.warning(f"RAG hot cache: expected to remove 1 vector for {entry['id']}, removed {removed}")
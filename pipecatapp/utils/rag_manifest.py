@@ -0,0 +1,98 @@
+import json
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+
+class ManifestEntry(NamedTuple):
+    path: str
+    mtime: float
+    size: int
+    content_hash: str
+    chunk_ids: List[str]
+
+
+def hash_file(path: str, block_size: int = 1 << 20) -> str:
+    """Returns the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RAGManifest:
+    """
+    Tracks what the RAG index holds for each source file.
+
+    Each row records the file's mtime, size and content hash when it was last
+    indexed, plus the ids of the chunks stored for it in ChromaDB. A re-scan
+    compares files against it to find the ones that need re-embedding and the
+    chunks that have gone stale.
+    """
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS rag_files (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    chunk_ids TEXT NOT NULL
+                )
+            ''')
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT path, mtime, size, content_hash, chunk_ids FROM rag_files WHERE path = ?", (path,)
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def entries_under(self, directory: str) -> Dict[str, ManifestEntry]:
+        """All entries for files inside `directory` (which should end with a separator)."""
+        prefix = directory.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT path, mtime, size, content_hash, chunk_ids FROM rag_files WHERE path LIKE ? ESCAPE '\\'",
+                (prefix + "%",)
+            ).fetchall()
+        return {row[0]: self._entry(row) for row in rows}
+
+    def put_many(self, entries: Iterable[ManifestEntry]):
+        """Inserts or replaces entries in a single transaction."""
+        rows = [(e.path, e.mtime, e.size, e.content_hash, json.dumps(e.chunk_ids)) for e in entries]
+        if not rows:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany('''
+                INSERT INTO rag_files (path, mtime, size, content_hash, chunk_ids)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    mtime=excluded.mtime,
+                    size=excluded.size,
+                    content_hash=excluded.content_hash,
+                    chunk_ids=excluded.chunk_ids
+            ''', rows)
+
+    def delete_many(self, paths: Iterable[str]):
+        rows = [(path,) for path in paths]
+        if not rows:
+            return
+        with self._lock, self.conn:
+            self.conn.executemany("DELETE FROM rag_files WHERE path = ?", rows)
+
+    def close(self):
+        try:
+            self.conn.close()
+        except Exception as e:
+            logging.debug(f"Error closing RAG manifest: {e}")
+
+    @staticmethod
+    def _entry(row) -> ManifestEntry:
+        return ManifestEntry(row[0], row[1], row[2], row[3], json.loads(row[4]))
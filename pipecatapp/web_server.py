@@ -18,7 +18,9 @@ from typing import List, Dict, Optional
 from pipecatapp.workflow.runner import ActiveWorkflows, OpenGates
 from pipecatapp.workflow.history import WorkflowHistory
 from pipecatapp.api_keys import get_api_key
+from pipecatapp.pmm_memory import PMMMemory
 from pipecatapp.security import sanitize_data, escape_html_content
+from pipecatapp.ws_channels import ChannelHub
 if __package__:
     from .models import InternalChatRequest, SystemMessageRequest
     from .rate_limiter import RateLimiter
@@ -131,6 +133,8 @@ def is_origin_allowed(origin: str, allowed_origins: list) -> bool:
 strict_limiter = RateLimiter(limit=10, window=60)
 # Standard limiter for regular API calls (100 requests per minute)
 standard_limiter = RateLimiter(limit=100, window=60)
+# Shard-to-shard event batches from outboxes and the rebalancer (100 requests per second)
+shard_batch_limiter = RateLimiter(limit=6000, window=60)
 
 # Create queues to communicate between the web server and the TwinService
 approval_queue = asyncio.Queue()
@@ -168,20 +172,16 @@ service_discovery_client = httpx.AsyncClient(timeout=2.0)
 # Reusable HTTP client for metrics
 metrics_client = httpx.AsyncClient(timeout=2.0)
 
-class WebSocketManager:
+class WebSocketManager(ChannelHub):
     """Manages active WebSocket connections.
 
-    This class provides methods to connect, disconnect, and broadcast messages
-    to all connected clients. It is used to send real-time updates (like
-    logs and conversation transcripts) to the web UI.
+    Each connection gets its own bounded send queue (see `ws_channels`), so
+    broadcasting real-time updates (like logs and conversation transcripts)
+    to the web UI never waits on a slow client.
 
     Attributes:
-        active_connections (List[WebSocket]): A list of active WebSocket connections.
+        active_connections (List[WebSocket]): The active WebSocket connections.
     """
-    def __init__(self):
-        """Initializes the ConnectionManager."""
-        self.active_connections: List[WebSocket] = []
-
     async def connect(self, websocket: WebSocket):
         """Accepts and stores a new WebSocket connection.
 
@@ -189,33 +189,17 @@ class WebSocketManager:
             websocket (WebSocket): The WebSocket connection to add.
         """
         await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        """Removes a WebSocket connection from the active list.
-
-        Args:
-            websocket (WebSocket): The WebSocket connection to remove.
-        """
-        self.active_connections.remove(websocket)
+        self.add(websocket)
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        """Sends a message to all active WebSocket connections.
+        """Sends a message to a single WebSocket connection.
 
         Args:
-            message (str): The message to broadcast.
+            message (str): The message to send.
+            websocket (WebSocket): The connection to send it to.
         """
         await websocket.send_text(message)
 
-    async def broadcast(self, message: str):
-        """Sends a message to all active WebSocket connections.
-
-        Args:
-            message (str): The message to broadcast.
-        """
-        for connection in self.active_connections:
-            await connection.send_text(message)
-
 manager = WebSocketManager()
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -299,7 +283,11 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
-            if message.get("type") == "approval_response":
+            if message.get("type") == "subscribe":
+                topics = message.get("topics") or []
+                if isinstance(topics, list):
+                    manager.subscribe(websocket, [t for t in topics[:32] if isinstance(t, str)], bool(message.get("binary")))
+            elif message.get("type") == "approval_response":
                 await approval_queue.put(message)
             elif message.get("type") == "user_message":
                 # Security Fix: Sentinel - Prevent SSRF by stripping 'response_url'
@@ -329,6 +317,8 @@ async def internal_chat(payload: InternalChatRequest, api_key: str = Security(ge
     Handles a chat message from another internal service.
     The payload should contain the user's text, a unique request_id,
     and a response_url where the final agent message should be sent.
+    If `stream` is set, response deltas are posted to `stream_url` as they
+    are generated instead.
     """
     # Security Fix: Sentinel - Validate response_url to prevent SSRF
     try:
@@ -342,6 +332,11 @@ async def internal_chat(payload: InternalChatRequest, api_key: str = Security(ge
             safe_audio_url = await validate_url(str(payload.audio_url))
             payload.audio_url = safe_audio_url
 
+        # Validate the streaming callback if present
+        if payload.stream_url:
+            safe_stream_url = await validate_url(str(payload.stream_url))
+            payload.stream_url = safe_stream_url
+
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -1255,19 +1250,72 @@ async def add_sharded_event(payload: Dict = Body(...), api_key: str = Security(g
     raise HTTPException(status_code=503, detail="Memory store not initialized")
 
 
+@app.post("/api/memory/sharded/events:batch", summary="Add Sharded Events in Bulk", tags=["Memory"])
+async def add_sharded_events_batch(payload: Dict = Body(...), api_key: str = Security(get_api_key), rate_limit: None = Depends(shard_batch_limiter)):
+    """Adds a batch of conversational events to the local node's PMMMemory shard in one transaction.
+
+    Each event is validated on its own: invalid ones are skipped and reported
+    in `results` (one entry per submitted event, in order) while the rest are
+    stored.
+    """
+    events = payload.get("events")
+    if not isinstance(events, list) or not events:
+        raise HTTPException(status_code=400, detail="Missing required parameter: events")
+    batch = []
+    results = []
+    for event in events:
+        if not isinstance(event, dict):
+            results.append({"status": "error", "detail": "Event must be an object"})
+            continue
+        session_id = event.get("session_id")
+        kind = event.get("kind")
+        content = event.get("content")
+        if not session_id or not kind or not content:
+            results.append({"status": "error", "detail": "Event requires session_id, kind and content"})
+            continue
+        meta = dict(event.get("meta") or {})
+        meta.setdefault("session_id", session_id)
+        # Rebalanced events keep their original timestamp
+        batch.append({"kind": kind, "content": content, "meta": meta, "timestamp": event.get("timestamp")})
+        results.append({"status": "ok"})
+
+    router = getattr(app.state, "memory_router", None)
+    if router:
+        node_id = router.local_node_id
+        if node_id in router.local_memories:
+            if batch:
+                await router.local_memories[node_id].add_events_bulk(batch)
+            return {"status": "success", "node": node_id, "count": len(batch), "results": results}
+
+    # Fallback to monolithic memory
+    twin = getattr(app.state, "twin_service_instance", None)
+    if twin and hasattr(twin, "long_term_memory"):
+        if isinstance(twin.long_term_memory, PMMMemory):
+            if batch:
+                await twin.long_term_memory.add_events_bulk(batch)
+        else:
+            for event in batch:
+                await twin.long_term_memory.add_event(event["kind"], event["content"], event["meta"])
+        return {"status": "success", "node": "default", "count": len(batch), "results": results}
+
+    raise HTTPException(status_code=503, detail="Memory store not initialized")
+
+
 @app.get("/api/memory/sharded/events", summary="Get Sharded Events", tags=["Memory"])
 async def get_sharded_events(session_id: str, kind: Optional[str] = None, limit: int = 10, api_key: str = Security(get_api_key), rate_limit: None = Depends(standard_limiter)):
-    """Retrieves and filters sharded events for a specific session ID from the local database shard."""
+    """Retrieves the most recent events of a session ID from the local database shard."""
     router = getattr(app.state, "memory_router", None)
     if router:
         node_id = router.local_node_id
         if node_id in router.local_memories:
-            events = await router.local_memories[node_id].get_events(kind=kind, limit=limit)
-            return [e for e in events if e.get("meta", {}).get("session_id") == session_id]
+            return await router.local_memories[node_id].get_events(kind=kind, limit=limit, session_id=session_id)
 
     # Fallback to monolithic memory
     twin = getattr(app.state, "twin_service_instance", None)
     if twin and hasattr(twin, "long_term_memory"):
+        if isinstance(twin.long_term_memory, PMMMemory):
+            return await twin.long_term_memory.get_events(kind=kind, limit=limit, session_id=session_id)
+        # Remote ledgers cannot filter by session, so filter what they return
         events = await twin.long_term_memory.get_events(kind=kind, limit=limit)
         return [e for e in events if e.get("meta", {}).get("session_id") == session_id]
 
@@ -1438,8 +1486,12 @@ async def get_sharding_status(api_key: str = Security(get_api_key), rate_limit:
         "local_node_id": router.local_node_id,
         "coordinator_node_id": router.coordinator_node_id,
         "replica_count": router.replica_count,
+        "algorithm": router.algorithm,
+        "hash_function": router.hash_function,
         "shards": list(router.nodes_config.keys()),
-        "local_databases": list(router.local_memories.keys())
+        "weights": router.hash_ring.weights,
+        "local_databases": list(router.local_memories.keys()),
+        "rebalance": router.rebalance_status()
     }
 
 
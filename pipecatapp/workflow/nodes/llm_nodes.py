@@ -5,12 +5,15 @@ import logging
 import os
 import httpx
 import asyncio
+import json
 import re
 
 try:
     from ...secret_manager import secret_manager
+    from ...service_discovery import get_service_discovery
 except ImportError:
     from pipecatapp.secret_manager import secret_manager
+    from pipecatapp.service_discovery import get_service_discovery
 
 def build_extensible_payload(base_payload: dict, context: WorkflowContext, node_config: dict = None) -> dict:
     """
@@ -31,6 +34,31 @@ def build_extensible_payload(base_payload: dict, context: WorkflowContext, node_
     payload["pipecat_extensions"] = extensions
     return payload
 
+async def stream_chat_completion(client: httpx.AsyncClient, chat_url: str, payload: dict, response_stream, timeout: float = 120) -> str:
+    """
+    Calls an OpenAI-compatible endpoint with `stream: true`, feeding each content
+    delta to `response_stream` (a ResponseStreamer) and returning the full text.
+    """
+    payload = dict(payload, stream=True)
+    response_stream.begin()
+    parts = []
+    async with client.stream("POST", chat_url, json=payload, timeout=timeout) as llm_res:
+        llm_res.raise_for_status()
+        async for line in llm_res.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            except (json.JSONDecodeError, KeyError, IndexError):
+                continue
+            if delta:
+                parts.append(delta)
+                await response_stream.feed(delta)
+    return "".join(parts)
+
 # This is a simplified version for now. We will need to make this more robust.
 async def discover_main_llm_service():
     # In a real scenario, this would involve Consul discovery.
@@ -144,19 +172,11 @@ class SimpleLLMNode(Node):
         # 3. Call Service
         if consul_http_addr:
             try:
-                token = secret_manager.get_secret("CONSUL_HTTP_TOKEN")
-                headers = {"X-Consul-Token": token} if token else {}
-                async with httpx.AsyncClient(headers=headers) as client:
-                    # Discovery
-                    response = await client.get(f"{consul_http_addr}/v1/health/service/{target_service}?passing")
-                    response.raise_for_status()
-                    services = response.json()
-
-                    if services:
-                        address = services[0]['Service']['Address']
-                        port = services[0]['Service']['Port']
-                        base_url = f"http://{address}:{port}/v1"
-                        chat_url = f"{base_url}/chat/completions"
+                # Discovery (cached) and a pooled connection to the least-loaded instance
+                async with get_service_discovery(consul_http_addr).lease(target_service) as upstream:
+                    if upstream:
+                        client = upstream.client
+                        chat_url = f"{upstream.base_url}/v1/chat/completions"
 
                         # CHECK FOR ENSEMBLING
                         ensemble_size = self.config.get("ensemble_size", 1)
@@ -183,7 +203,11 @@ class SimpleLLMNode(Node):
 
                         payload = build_extensible_payload(payload, context, self.config)
 
-                        if ensemble_size <= 1:
+                        response_stream = context.global_inputs.get("response_stream")
+                        if ensemble_size <= 1 and response_stream and self.config.get("stream"):
+                            # Streaming Single Execution: forward tokens as they arrive
+                            response_text = await stream_chat_completion(client, chat_url, payload, response_stream)
+                        elif ensemble_size <= 1:
                             # Standard Single Execution
                             llm_res = await client.post(chat_url, json=payload, timeout=120)
                             llm_res.raise_for_status()
@@ -276,18 +300,9 @@ class ExpertRouterNode(Node):
         expert_response = f"Could not find or contact expert service: {expert_name}"
 
         try:
-            token = secret_manager.get_secret("CONSUL_HTTP_TOKEN")
-            headers = {"X-Consul-Token": token} if token else {}
-            async with httpx.AsyncClient(headers=headers) as client:
-                response = await client.get(f"{consul_http_addr}/v1/health/service/{service_name}?passing")
-                response.raise_for_status()
-                services = response.json()
-
-                if services:
-                    address = services[0]['Service']['Address']
-                    port = services[0]['Service']['Port']
-                    base_url = f"http://{address}:{port}/v1"
-
+            discovery = get_service_discovery(consul_http_addr)
+            async with discovery.lease(service_name) as upstream:
+                if upstream:
                     # We need a way to get the system prompt for the expert
                     # For now, we'll just send the query.
                     payload = {"model": expert_name, "messages": [{"role": "user", "content": query}]}
@@ -299,9 +314,9 @@ class ExpertRouterNode(Node):
 
                     payload = build_extensible_payload(payload, context, self.config)
 
-                    chat_url = f"{base_url}/chat/completions"
+                    chat_url = f"{upstream.base_url}/v1/chat/completions"
 
-                    expert_res = await client.post(chat_url, json=payload, timeout=120)
+                    expert_res = await upstream.client.post(chat_url, json=payload, timeout=120)
                     expert_res.raise_for_status()
                     expert_data = expert_res.json()
                     expert_response = expert_data["choices"][0]["message"]["content"]
@@ -310,33 +325,27 @@ class ExpertRouterNode(Node):
                                         expert_data["choices"][0]["message"].get("reasoning")
                     if reasoning_details:
                         self.set_output(context, "reasoning_details", reasoning_details)
-                else:
-                    # CAR: Service is cold. Track request.
-                    now = time.time()
-                    _cold_request_counts[service_name].append(now)
-                    # Clean up old requests (e.g., older than 5 minutes)
-                    _cold_request_counts[service_name] = [t for t in _cold_request_counts[service_name] if now - t < 300]
-
-                    request_count = len(_cold_request_counts[service_name])
-                    logging.info(f"ExpertRouterNode: {service_name} is cold. Request count in last 5m: {request_count}")
-
-                    # Backfill (Wakeup) logic if threshold met
-                    if request_count >= 2:
-                        logging.info(f"ExpertRouterNode: Threshold met for {service_name}. Triggering background wakeup.")
-                        asyncio.create_task(self._trigger_wakeup(client, consul_http_addr, service_name))
-
-                    # Substitute logic: Route to rpc-main instead
-                    logging.info(f"ExpertRouterNode: Falling back to substitute service 'rpc-main' for '{expert_name}'.")
-                    sub_service_name = "rpc-main"
-                    sub_response = await client.get(f"{consul_http_addr}/v1/health/service/{sub_service_name}?passing")
-                    sub_response.raise_for_status()
-                    sub_services = sub_response.json()
-
-                    if sub_services:
-                        address = sub_services[0]['Service']['Address']
-                        port = sub_services[0]['Service']['Port']
-                        base_url = f"http://{address}:{port}/v1"
 
+            if not upstream:
+                # CAR: Service is cold. Track request.
+                now = time.time()
+                _cold_request_counts[service_name].append(now)
+                # Clean up old requests (e.g., older than 5 minutes)
+                _cold_request_counts[service_name] = [t for t in _cold_request_counts[service_name] if now - t < 300]
+
+                request_count = len(_cold_request_counts[service_name])
+                logging.info(f"ExpertRouterNode: {service_name} is cold. Request count in last 5m: {request_count}")
+
+                # Backfill (Wakeup) logic if threshold met
+                if request_count >= 2:
+                    logging.info(f"ExpertRouterNode: Threshold met for {service_name}. Triggering background wakeup.")
+                    asyncio.create_task(self._trigger_wakeup(await discovery.consul_client(), consul_http_addr, service_name))
+
+                # Substitute logic: Route to rpc-main instead
+                logging.info(f"ExpertRouterNode: Falling back to substitute service 'rpc-main' for '{expert_name}'.")
+                sub_service_name = "rpc-main"
+                async with discovery.lease(sub_service_name) as sub_upstream:
+                    if sub_upstream:
                         payload = {
                             "model": "rpc-main",
                             "messages": [{"role": "system", "content": f"You are acting as a substitute for the {expert_name} expert. Answer the following query as best you can."}, {"role": "user", "content": query}]
@@ -348,9 +357,9 @@ class ExpertRouterNode(Node):
 
                         payload = build_extensible_payload(payload, context, self.config)
 
-                        chat_url = f"{base_url}/chat/completions"
+                        chat_url = f"{sub_upstream.base_url}/v1/chat/completions"
 
-                        expert_res = await client.post(chat_url, json=payload, timeout=120)
+                        expert_res = await sub_upstream.client.post(chat_url, json=payload, timeout=120)
                         expert_res.raise_for_status()
                         expert_data = expert_res.json()
                         expert_response = f"[Substitute response from {sub_service_name}]: " + expert_data["choices"][0]["message"]["content"]
@@ -439,25 +448,16 @@ class EvaluatorNode(Node):
 
         if consul_http_addr:
             try:
-                token = secret_manager.get_secret("CONSUL_HTTP_TOKEN")
-                headers = {"X-Consul-Token": token} if token else {}
-
-                async with httpx.AsyncClient(headers=headers) as client:
-                    resp = await client.get(f"{consul_http_addr}/v1/health/service/{judge_service}?passing")
-                    resp.raise_for_status()
-                    services = resp.json()
-
-                    if services:
-                        address = services[0]['Service']['Address']
-                        port = services[0]['Service']['Port']
-                        base_url = f"http://{address}:{port}/v1"
+                async with get_service_discovery(consul_http_addr).lease(judge_service) as upstream:
+                    if upstream:
+                        client = upstream.client
+                        base_url = f"{upstream.base_url}/v1"
                         chat_url = f"{base_url}/chat/completions"
 
                         judge_res = await client.post(chat_url, json=payload, timeout=120)
                         judge_res.raise_for_status()
                         judge_response_text = judge_res.json()["choices"][0]["message"]["content"]
 
-                        import json
                         try:
                             start_idx_json = judge_response_text.find('{')
                             end_idx_json = judge_response_text.rfind('}')
@@ -606,18 +606,10 @@ class DynamicRouterNode(Node):
 
         if consul_http_addr:
             try:
-                token = secret_manager.get_secret("CONSUL_HTTP_TOKEN")
-                headers = {"X-Consul-Token": token} if token else {}
-
-                async with httpx.AsyncClient(headers=headers) as client:
-                    response = await client.get(f"{consul_http_addr}/v1/health/service/{target_service}?passing")
-                    response.raise_for_status()
-                    services = response.json()
-
-                    if services:
-                        address = services[0]['Service']['Address']
-                        port = services[0]['Service']['Port']
-                        base_url = f"http://{address}:{port}/v1"
+                async with get_service_discovery(consul_http_addr).lease(target_service) as upstream:
+                    if upstream:
+                        client = upstream.client
+                        base_url = f"{upstream.base_url}/v1"
                         chat_url = f"{base_url}/chat/completions"
 
                         messages = [
@@ -725,17 +717,10 @@ class LLMRouterNode(Node):
             response_text = f"Error: Could not reach {service_name}."
 
             if consul_http_addr:
-                token = secret_manager.get_secret("CONSUL_HTTP_TOKEN")
-                headers = {"X-Consul-Token": token} if token else {}
-                async with httpx.AsyncClient(headers=headers) as client:
-                    response = await client.get(f"{consul_http_addr}/v1/health/service/{service_name}?passing")
-                    response.raise_for_status()
-                    services = response.json()
-
-                    if services:
-                        address = services[0]['Service']['Address']
-                        port = services[0]['Service']['Port']
-                        base_url = f"http://{address}:{port}/v1"
+                async with get_service_discovery(consul_http_addr).lease(service_name) as upstream:
+                    if upstream:
+                        client = upstream.client
+                        base_url = f"{upstream.base_url}/v1"
 
                         payload = {
                             "model": service_name,
@@ -796,31 +781,19 @@ class LoopedReasoningNode(Node):
 
         if consul_http_addr:
             try:
-                token = secret_manager.get_secret("CONSUL_HTTP_TOKEN")
-                headers = {"X-Consul-Token": token} if token else {}
-
-                async def get_chat_url(service_name):
-                    async with httpx.AsyncClient(headers=headers) as discovery_client:
-                        resp = await discovery_client.get(f"{consul_http_addr}/v1/health/service/{service_name}?passing")
-                        resp.raise_for_status()
-                        services = resp.json()
-                        if not services:
-                            return None
-                        address = services[0]['Service']['Address']
-                        port = services[0]['Service']['Port']
-                        return f"http://{address}:{port}/v1/chat/completions"
-
-                async with httpx.AsyncClient(headers=headers) as client:
-                    chat_url = await get_chat_url(target_service)
-                    judge_chat_url = await get_chat_url(judge_service)
-
-                    if not chat_url:
+                discovery = get_service_discovery(consul_http_addr)
+                async with discovery.lease(target_service) as upstream, discovery.lease(judge_service) as judge_upstream:
+                    if not upstream:
                         self.set_output(context, "response", f"Error: Service {target_service} not found.")
                         return
-                    if not judge_chat_url:
+                    if not judge_upstream:
                         self.set_output(context, "response", f"Error: Judge service {judge_service} not found.")
                         return
 
+                    client = upstream.client
+                    chat_url = f"{upstream.base_url}/v1/chat/completions"
+                    judge_chat_url = f"{judge_upstream.base_url}/v1/chat/completions"
+
                     initial_system_prompt = "You are a helpful AI assistant. Provide a comprehensive answer to the user's request."
                     messages = [
                         {"role": "system", "content": initial_system_prompt},
@@ -875,11 +848,10 @@ class LoopedReasoningNode(Node):
                         }
                         judge_payload = build_extensible_payload(judge_payload, context, self.config)
 
-                        judge_res = await client.post(judge_chat_url, json=judge_payload, timeout=120)
+                        judge_res = await judge_upstream.client.post(judge_chat_url, json=judge_payload, timeout=120)
                         judge_res.raise_for_status()
                         judge_response_text = judge_res.json()["choices"][0]["message"]["content"]
 
-                        import json
                         try:
                             start_idx_json = judge_response_text.find('{')
                             end_idx_json = judge_response_text.rfind('}')
@@ -996,19 +968,10 @@ class DynamicSupervisorNode(Node):
 
         if consul_http_addr:
             try:
-                # Use secret_manager if available, otherwise just no token
-                token = secret_manager.get_secret("CONSUL_HTTP_TOKEN") if 'secret_manager' in globals() else None
-                headers = {"X-Consul-Token": token} if token else {}
-
-                async with httpx.AsyncClient(headers=headers) as client:
-                    resp = await client.get(f"{consul_http_addr}/v1/health/service/{judge_service}?passing")
-                    resp.raise_for_status()
-                    services = resp.json()
-
-                    if services:
-                        address = services[0]['Service']['Address']
-                        port = services[0]['Service']['Port']
-                        base_url = f"http://{address}:{port}/v1"
+                async with get_service_discovery(consul_http_addr).lease(judge_service) as upstream:
+                    if upstream:
+                        client = upstream.client
+                        base_url = f"{upstream.base_url}/v1"
                         chat_url = f"{base_url}/chat/completions"
 
                         if 'build_extensible_payload' in globals():
@@ -1018,7 +981,6 @@ class DynamicSupervisorNode(Node):
                         judge_res.raise_for_status()
                         judge_response_text = judge_res.json()["choices"][0]["message"]["content"]
 
-                        import json
                         try:
                             start_idx = judge_response_text.find('{')
                             end_idx = judge_response_text.rfind('}')
@@ -2,6 +2,7 @@ from .registry import registry
 from ..node import Node
 from ..context import WorkflowContext
 from ..crypto_receipts import ToolExecutionSigner
+from pipecatapp.tools.registry import tool_methods
 import json
 import inspect
 from pydantic import create_model, ValidationError
@@ -37,9 +38,9 @@ class SystemPromptNode(Node):
             if tool_name == "vision":
                 tools_prompt += '- {"tool": "vision.get_observation"}: Get a real-time description of what is visible in the webcam.\\n'
             else:
-                for method_name, method in inspect.getmembers(tool, predicate=inspect.ismethod):
-                    if not method_name.startswith('_'):
-                        tools_prompt += f'- {{"tool": "{tool_name}.{method_name}", "args": {{...}}}}: {method.__doc__}\\n'
+                # Lazy tools are described from their source, without being loaded
+                for method_name, doc in tool_methods(tool):
+                    tools_prompt += f'- {{"tool": "{tool_name}.{method_name}", "args": {{...}}}}: {doc}\\n'
 
         # Dynamically add available expert services to the prompt
         for service_name in available_services:
@@ -5,7 +5,10 @@ import os
 import uuid
 import copy
 import json
-from typing import Dict, Any, List, Optional
+import heapq
+import re
+from collections import deque
+from typing import Dict, Any, List, Optional, Set
 from .context import WorkflowContext
 from .nodes.registry import registry
 from .history import WorkflowHistory
@@ -133,22 +136,280 @@ class OpenGates:
             return True
         return False
 
+HIGH_RISK_TOOLS = {"shell", "ansible", "desktop_control", "autoresearch"}
+VAR_PATTERN = re.compile(r"\{\{\s*\$vars\.([a-zA-Z0-9_]+)\s*\}\}")
+
+
+def _topological_order(nodes: List[Dict[str, Any]]) -> List[str]:
+    """Determine the execution order of nodes using Kahn's algorithm for topological sorting."""
+
+    # 1. Initialize graph and in-degrees
+    graph: Dict[str, List[str]] = {node["id"]: [] for node in nodes}
+    in_degree: Dict[str, int] = {node["id"]: 0 for node in nodes}
+
+    # 2. Build graph and in-degrees from connections
+    for node in nodes:
+        node_id = node["id"]
+        for input_config in node.get("inputs", []):
+            if "connection" in input_config:
+                from_node_id = input_config["connection"]["from_node"]
+                # Add edge from the dependency to the current node
+                if from_node_id in graph:
+                    graph[from_node_id].append(node_id)
+                # Increment in-degree of the current node
+                in_degree[node_id] += 1
+
+    # 3. Initialize the queue with all nodes having an in-degree of 0
+    queue = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
+
+    # 4. Process the queue
+    sorted_order = []
+    while queue:
+        current_node_id = queue.popleft()
+        sorted_order.append(current_node_id)
+
+        # Decrement the in-degree of each neighbor
+        for neighbor_id in graph[current_node_id]:
+            in_degree[neighbor_id] -= 1
+            # If in-degree becomes 0, add it to the queue
+            if in_degree[neighbor_id] == 0:
+                queue.append(neighbor_id)
+
+    # 5. Check for cycles
+    if len(sorted_order) != len(nodes):
+        raise ValueError("Workflow contains a cycle and cannot be executed.")
+
+    return sorted_order
+
+
+def _dependencies(nodes: List[Dict[str, Any]], execution_order: List[str]) -> Dict[str, Set[str]]:
+    """Map each node to the nodes that must finish before it can start.
+
+    Besides direct input connections, this includes connections nested inside
+    literal `value` inputs. Those are optional (they resolve to None if missing),
+    so they only count when the source comes earlier in `execution_order`, which
+    is what a sequential run would have guaranteed.
+    """
+    position = {node_id: i for i, node_id in enumerate(execution_order)}
+
+    def nested_sources(value, found):
+        if isinstance(value, dict):
+            if "connection" in value:
+                found.add(value["connection"]["from_node"])
+            else:
+                for item in value.values():
+                    nested_sources(item, found)
+        elif isinstance(value, list):
+            for item in value:
+                nested_sources(item, found)
+        return found
+
+    dependencies = {}
+    for node in nodes:
+        node_id = node["id"]
+        deps = set()
+        for input_config in node.get("inputs", []):
+            if "connection" in input_config:
+                deps.add(input_config["connection"]["from_node"])
+            elif "value" in input_config:
+                deps |= {
+                    source for source in nested_sources(input_config["value"], set())
+                    if source in position and position[source] < position[node_id]
+                }
+        dependencies[node_id] = {dep for dep in deps if dep in position}
+    return dependencies
+
+
+def _uses_high_risk_tools_without_approval(definition: Dict[str, Any]) -> bool:
+    """HITL check: True if the workflow uses a high-risk tool but has no HumanApprovalNode."""
+    uses_high_risk = False
+    has_approval_node = False
+
+    for node_def in definition.get("nodes", []):
+        node_type = node_def.get("type", "")
+        if node_type == "HumanApprovalNode":
+            has_approval_node = True
+
+        # Check for high-risk tools in configuration
+        config = node_def.get("config", {})
+
+        # Check if it's a ToolNode using a high-risk tool directly
+        if node_type == "ToolNode" and config.get("tool_name") in HIGH_RISK_TOOLS:
+            uses_high_risk = True
+
+        # Check if it's an Agent node that is configured with high-risk tools
+        agent_tools = config.get("tools", [])
+        if isinstance(agent_tools, list):
+            for tool in agent_tools:
+                tool_name = tool if isinstance(tool, str) else tool.get("name", "")
+                if tool_name in HIGH_RISK_TOOLS:
+                    uses_high_risk = True
+                    break
+
+        # Fallback heuristic: check if any high-risk tool name is literally anywhere in the config values
+        for val in config.values():
+            if isinstance(val, str) and val in HIGH_RISK_TOOLS:
+                uses_high_risk = True
+            elif isinstance(val, list):
+                for item in val:
+                    if isinstance(item, str) and item in HIGH_RISK_TOOLS:
+                        uses_high_risk = True
+
+    return uses_high_risk and not has_approval_node
+
+
+def _copy_config(value):
+    """Copies parsed YAML (dicts, lists and scalars); several times cheaper than deepcopy."""
+    if isinstance(value, dict):
+        return {k: _copy_config(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_config(v) for v in value]
+    return value
+
+
+class WorkflowPlan:
+    """A workflow definition compiled once and shared by every run of that file.
+
+    Everything that does not depend on the run's global inputs is computed here:
+    the topological order and dependency tables, the locations of `{{ $vars.KEY }}`
+    templates (pre-split into literal and variable parts), the resolved node
+    classes, and the HITL verdict when no template can change it. A run then only
+    renders the templates and binds fresh node instances to a new context.
+
+    The definition is shared between runs. `bind()` copies only the containers
+    along templated paths, and each run's nodes get their own copy of their
+    config, so a node changing its config cannot affect another run.
+    """
+
+    def __init__(self, definition: Dict[str, Any]):
+        self.definition = definition
+        nodes = definition["nodes"]
+        self.templates = self._compile_templates(definition)
+
+        try:
+            self.execution_order: Optional[List[str]] = _topological_order(nodes)
+        except ValueError:
+            self.execution_order = None
+
+        self.dependencies: Dict[str, Set[str]] = {}
+        self.dependents: Dict[str, List[str]] = {}
+        if self.execution_order is not None:
+            self.dependencies = _dependencies(nodes, self.execution_order)
+            self.dependents = {node_id: [] for node_id in self.execution_order}
+            for node_id, deps in self.dependencies.items():
+                for dep in deps:
+                    self.dependents[dep].append(node_id)
+
+        # Templates could inject tool names, so the verdict is only static without them
+        self._hitl_violation = None if self.templates else _uses_high_risk_tools_without_approval(definition)
+        self._node_classes: Optional[Dict[str, type]] = None
+
+    @staticmethod
+    def _compile_templates(definition: Dict[str, Any]) -> List[tuple]:
+        """Find every string containing a variable, as (path, parts) pairs.
+
+        `parts` alternates literal text with (var_name, original_text) tuples, so
+        rendering is a join instead of a regex substitution.
+        """
+        templates = []
+
+        def walk(value, path):
+            if isinstance(value, str):
+                parts, last = [], 0
+                for match in VAR_PATTERN.finditer(value):
+                    parts.append(value[last:match.start()])
+                    parts.append((match.group(1), match.group(0)))
+                    last = match.end()
+                if parts:
+                    parts.append(value[last:])
+                    templates.append((path, parts))
+            elif isinstance(value, dict):
+                for k, v in value.items():
+                    walk(v, path + (k,))
+            elif isinstance(value, list):
+                for i, v in enumerate(value):
+                    walk(v, path + (i,))
+
+        walk(definition, ())
+        return templates
+
+    @staticmethod
+    def _render(parts: list, global_inputs: Dict[str, Any]) -> str:
+        rendered = []
+        for part in parts:
+            if isinstance(part, str):
+                rendered.append(part)
+            else:
+                var_name, original = part
+                # Leave unchanged if not found
+                rendered.append(str(global_inputs[var_name]) if var_name in global_inputs else original)
+        return "".join(rendered)
+
+    def bind(self, global_inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Returns the definition with `{{ $vars.KEY }}` templates filled in from `global_inputs`."""
+        if not self.templates:
+            return self.definition
+
+        bound = copy.copy(self.definition)
+        copied = {(): bound}
+        for path, parts in self.templates:
+            container = bound
+            for depth in range(1, len(path)):
+                prefix = path[:depth]
+                if prefix not in copied:
+                    container[path[depth - 1]] = copied[prefix] = copy.copy(container[path[depth - 1]])
+                container = copied[prefix]
+            container[path[-1]] = self._render(parts, global_inputs)
+        return bound
+
+    def hitl_violation(self, definition: Dict[str, Any]) -> bool:
+        """HITL verdict for a bound definition, cached when templates cannot affect it."""
+        if self._hitl_violation is not None:
+            return self._hitl_violation
+        return _uses_high_risk_tools_without_approval(definition)
+
+    def node_classes(self) -> Dict[str, type]:
+        """Resolves and validates each node's class on first use."""
+        if self._node_classes is None:
+            node_classes = {}
+            for node_config in self.definition["nodes"]:
+                node_class = registry.get_node_class(node_config["type"])
+                if not node_class:
+                    raise ValueError(f"Unknown node type: {node_config['type']}")
+
+                # Haystack Idea: Pre-runtime component I/O validation
+                validation_errors = node_class(node_config).validate_io()
+                if validation_errors:
+                    print(f"Warning: Workflow validation failed for node {node_config['id']}:")
+                    for err in validation_errors:
+                        print(f"  - {err}")
+
+                node_classes[node_config["id"]] = node_class
+            self._node_classes = node_classes
+        return self._node_classes
+
+
 class WorkflowRunner:
     """Loads and executes a workflow defined in a YAML file."""
 
-    # Bolt ⚡ Optimization: Cache loaded workflow definitions to avoid repeated file I/O and parsing
-    # Key: path, Value: (mtime, parsed_definition)
+    # Bolt ⚡ Optimization: Cache compiled workflow plans to avoid repeated file I/O, parsing
+    # and per-run graph analysis.
+    # Key: path, Value: (mtime, WorkflowPlan)
     _workflow_cache = {}
 
+    # Upper bound on nodes executing at once; a workflow can override it with `max_concurrency`.
+    DEFAULT_MAX_CONCURRENCY = 8
+
     def __init__(self, workflow_path: str, runner_id: Optional[str] = None):
-        self.workflow_definition = self._load_workflow_definition(workflow_path)
+        self.plan = self._load_plan(workflow_path)
+        self.workflow_definition = self.plan.definition
         self.nodes = {}
         self.workflow_name = os.path.basename(workflow_path)
         self.runner_id = runner_id if runner_id else str(uuid.uuid4())
         self.global_mission = self.workflow_definition.get("global_mission") or self.workflow_definition.get("workflow_goal")
 
-    def _load_workflow_definition(self, path: str) -> Dict[str, Any]:
-        """Loads workflow definition from cache or file if updated."""
+    def _load_plan(self, path: str) -> WorkflowPlan:
+        """Loads the compiled plan from cache, or from the file if it was updated."""
         try:
             current_mtime = os.path.getmtime(path)
         except OSError:
@@ -158,110 +419,31 @@ class WorkflowRunner:
         cached_entry = self._workflow_cache.get(path)
 
         if cached_entry:
-            cached_mtime, definition = cached_entry
+            cached_mtime, plan = cached_entry
             if current_mtime == cached_mtime:
-                # Return a deep copy to prevent state pollution if nodes modify the config
-                return copy.deepcopy(definition)
+                return plan
 
         # Not in cache or file modified
         with open(path, 'r') as f:
             definition = yaml.safe_load(f)
 
-        self._workflow_cache[path] = (current_mtime, definition)
-        # Return a deep copy
-        return copy.deepcopy(definition)
+        plan = WorkflowPlan(definition)
+        self._workflow_cache[path] = (current_mtime, plan)
+        return plan
 
     def _instantiate_nodes(self):
         """Instantiate all nodes defined in the workflow."""
-        self.nodes = {}
-        for node_config in self.workflow_definition["nodes"]:
-            node_class = registry.get_node_class(node_config["type"])
-            if not node_class:
-                raise ValueError(f"Unknown node type: {node_config['type']}")
-
-            node_instance = node_class(node_config)
-
-            # Haystack Idea: Pre-runtime component I/O validation
-            validation_errors = node_instance.validate_io()
-            if validation_errors:
-                print(f"Warning: Workflow validation failed for node {node_config['id']}:")
-                for err in validation_errors:
-                    print(f"  - {err}")
-
-            self.nodes[node_config["id"]] = node_instance
+        node_classes = self.plan.node_classes()
+        self.nodes = {
+            node_config["id"]: node_classes[node_config["id"]](_copy_config(node_config))
+            for node_config in self.workflow_definition["nodes"]
+        }
 
     def _get_execution_order(self) -> List[str]:
-        """Determine the execution order of nodes using Kahn's algorithm for topological sorting."""
-
-        # 1. Initialize graph and in-degrees
-        # Use a safe get for in-degree initialization to avoid KeyErrors if graph construction fails
-        graph: Dict[str, List[str]] = {node["id"]: [] for node in self.workflow_definition["nodes"]}
-        in_degree: Dict[str, int] = {node["id"]: 0 for node in self.workflow_definition["nodes"]}
-
-        # 2. Build graph and in-degrees from connections
-        for node in self.workflow_definition["nodes"]:
-            node_id = node["id"]
-            for input_config in node.get("inputs", []):
-                if "connection" in input_config:
-                    from_node_id = input_config["connection"]["from_node"]
-                    # Add edge from the dependency to the current node
-                    if from_node_id in graph:
-                        graph[from_node_id].append(node_id)
-                    # Increment in-degree of the current node
-                    if node_id in in_degree:
-                        in_degree[node_id] += 1
-
-        # 3. Initialize the queue with all nodes having an in-degree of 0
-        queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
-
-        # 4. Process the queue
-        sorted_order = []
-        while queue:
-            current_node_id = queue.pop(0)
-            sorted_order.append(current_node_id)
-
-            # Decrement the in-degree of each neighbor
-            if current_node_id in graph:
-                for neighbor_id in graph[current_node_id]:
-                    if neighbor_id in in_degree:
-                        in_degree[neighbor_id] -= 1
-                        # If in-degree becomes 0, add it to the queue
-                        if in_degree[neighbor_id] == 0:
-                            queue.append(neighbor_id)
-
-        # 5. Check for cycles
-        if len(sorted_order) != len(self.workflow_definition["nodes"]):
+        """Returns the plan's topological order, raising ValueError if the workflow has a cycle."""
+        if self.plan.execution_order is None:
             raise ValueError("Workflow contains a cycle and cannot be executed.")
-
-        return sorted_order
-
-
-    def _interpolate_variables(self, obj: Any, global_inputs: Dict[str, Any]) -> Any:
-        import re
-        if isinstance(obj, dict):
-            return {k: self._interpolate_variables(v, global_inputs) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [self._interpolate_variables(item, global_inputs) for item in obj]
-        elif isinstance(obj, str):
-            pattern = r'\{\{\s*\$vars\.([a-zA-Z0-9_]+)\s*\}\}'
-            exact_match = re.fullmatch(pattern, obj.strip())
-            if exact_match:
-                var_name = exact_match.group(1)
-                if var_name in global_inputs:
-                    return global_inputs[var_name]
-                return obj
-
-            def replace_func(match):
-                var_name = match.group(1)
-                return str(global_inputs.get(var_name, match.group(0)))
-
-
-            def replace_func(match):
-                var_name = match.group(1)
-                return str(global_inputs.get(var_name, match.group(0)))
-
-            return re.sub(pattern, replace_func, obj)
-        return obj
+        return list(self.plan.execution_order)
 
     def context_to_dict(self, sanitize=False) -> Dict[str, Any]:
 
@@ -270,25 +452,6 @@ class WorkflowRunner:
         context = getattr(self, 'context', None)
         return _safe_context_to_dict(context, sanitize=sanitize)
 
-    def _interpolate_variables(self, value: Any, global_inputs: Dict[str, Any], var_pattern=None) -> Any:
-        """Recursively search for and interpolate {{ $vars.KEY }} variables in strings."""
-        if var_pattern is None:
-            import re
-            var_pattern = re.compile(r"\{\{\s*\$vars\.([a-zA-Z0-9_]+)\s*\}\}")
-
-        if isinstance(value, str):
-            def replace_match(match):
-                var_name = match.group(1).strip()
-                if var_name in global_inputs:
-                    return str(global_inputs[var_name])
-                return match.group(0) # Leave unchanged if not found
-            return var_pattern.sub(replace_match, value)
-        elif isinstance(value, dict):
-            return {k: self._interpolate_variables(v, global_inputs, var_pattern) for k, v in value.items()}
-        elif isinstance(value, list):
-            return [self._interpolate_variables(v, global_inputs, var_pattern) for v in value]
-        return value
-
     async def run(self, global_inputs: Dict[str, Any]) -> Dict[str, Any]:
         """Execute the workflow.
 
@@ -304,7 +467,7 @@ class WorkflowRunner:
 
         try:
             original_def = self.workflow_definition
-            self.workflow_definition = self._interpolate_variables(copy.deepcopy(self.workflow_definition), global_inputs)
+            self.workflow_definition = self.plan.bind(global_inputs)
 
             try:
                 self._instantiate_nodes()
@@ -313,45 +476,8 @@ class WorkflowRunner:
                     self.context.set_global_input(name, value)
 
                 # HITL Enforcement Check
-                enforce_hitl = global_inputs.get("enforce_hitl", False)
-                if enforce_hitl:
-                    high_risk_tools = {"shell", "ansible", "desktop_control", "autoresearch"}
-                    uses_high_risk = False
-                    has_approval_node = False
-
-                    if "nodes" in self.workflow_definition:
-                        for node_def in self.workflow_definition["nodes"]:
-                            node_type = node_def.get("type", "")
-                            if node_type == "HumanApprovalNode":
-                                has_approval_node = True
-
-                            # Check for high-risk tools in configuration
-                            config = node_def.get("config", {})
-
-                            # Check if it's a ToolNode using a high-risk tool directly
-                            if node_type == "ToolNode" and config.get("tool_name") in high_risk_tools:
-                                uses_high_risk = True
-
-                            # Check if it's an Agent node that is configured with high-risk tools
-                            agent_tools = config.get("tools", [])
-                            if isinstance(agent_tools, list):
-                                for tool in agent_tools:
-                                    tool_name = tool if isinstance(tool, str) else tool.get("name", "")
-                                    if tool_name in high_risk_tools:
-                                        uses_high_risk = True
-                                        break
-
-                            # Fallback heuristic: check if any high-risk tool name is literally anywhere in the config values
-                            for val in config.values():
-                                if isinstance(val, str) and val in high_risk_tools:
-                                    uses_high_risk = True
-                                elif isinstance(val, list):
-                                    for item in val:
-                                        if isinstance(item, str) and item in high_risk_tools:
-                                            uses_high_risk = True
-
-                    if uses_high_risk and not has_approval_node:
-                        raise ValueError("HITL Enforcement: HumanApprovalNode is required for workflows utilizing shell, ansible, desktop_control, or autoresearch when enforce_hitl is enabled.")
+                if global_inputs.get("enforce_hitl", False) and self.plan.hitl_violation(self.workflow_definition):
+                    raise ValueError("HITL Enforcement: HumanApprovalNode is required for workflows utilizing shell, ansible, desktop_control, or autoresearch when enforce_hitl is enabled.")
 
                 # Use iterative execution if a cycle is detected or explicitly requested
                 has_cycle = False
@@ -366,9 +492,7 @@ class WorkflowRunner:
                 if has_cycle:
                     await self._execute_cyclic_graph()
                 else:
-                    for node_id in execution_order:
-                        node = self.nodes[node_id]
-                        await node.execute(self.context)
+                    await self._execute_dag(execution_order)
 
                 return self.context.final_output
             finally:
@@ -405,6 +529,46 @@ class WorkflowRunner:
                 # Should rarely happen (scheduling error)
                 print(f"Failed to schedule workflow history saving: {h_e}")
 
+    async def _execute_dag(self, execution_order: List[str]):
+        """Execute an acyclic graph, starting each node as soon as its inputs are ready.
+
+        Independent branches run concurrently, with at most `max_concurrency` nodes
+        in flight. Ready nodes start in topological order, so `max_concurrency: 1`
+        reproduces the sequential order exactly. If a node fails, the nodes still
+        running are cancelled and the error is raised.
+        """
+        dependents = self.plan.dependents
+        position = {node_id: i for i, node_id in enumerate(execution_order)}
+        waiting_on = {node_id: len(deps) for node_id, deps in self.plan.dependencies.items()}
+
+        max_concurrency = max(1, int(self.workflow_definition.get("max_concurrency") or self.DEFAULT_MAX_CONCURRENCY))
+        ready = [position[node_id] for node_id in execution_order if waiting_on[node_id] == 0]
+        heapq.heapify(ready)
+        running: Dict[asyncio.Task, str] = {}
+
+        try:
+            while ready or running:
+                while ready and len(running) < max_concurrency:
+                    node_id = execution_order[heapq.heappop(ready)]
+                    task = asyncio.create_task(self.nodes[node_id].execute(self.context))
+                    running[task] = node_id
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: position[running[t]]):
+                    node_id = running.pop(task)
+                    # Re-raises the node's exception, if any
+                    task.result()
+                    for child_id in dependents[node_id]:
+                        waiting_on[child_id] -= 1
+                        if waiting_on[child_id] == 0:
+                            heapq.heappush(ready, position[child_id])
+        finally:
+            # On failure or cancellation, don't leave sibling branches running
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
     async def _execute_cyclic_graph(self):
         """Execute a graph with cycles iteratively until OutputNode is hit or max loops reached."""
         # Start with all nodes that don't depend on another node OR depend on a node that is "optional" (we won't check optional here but rely on inputs)
@@ -0,0 +1,241 @@
+"""Per-client channels for the web UI WebSocket.
+
+Every connected client gets a ClientChannel with its own bounded send queue
+and sender task. Publishing only enqueues, so a slow client can no longer
+hold up the pipeline that produced the message, or the other clients.
+When a client falls behind, its queue sheds load: video frames are
+coalesced to the latest one, and the oldest audio or log message is dropped
+to make room. A client whose queue is full of messages that cannot be
+dropped is disconnected.
+
+Clients choose a wire format and topics by sending
+`{"type": "subscribe", "topics": [...], "binary": true}`. Topics in
+OPT_IN_TOPICS (logs and media) are only delivered to clients that asked for
+them; everything else goes to every client. Binary clients receive each
+message as one binary frame: an 8 byte little-endian header (kind, reserved,
+channels, sample rate) followed by raw PCM, JPEG bytes, or UTF-8 JSON for
+text and log messages. Other clients get the JSON text messages the UI has
+always used, with media base64-encoded once per message on demand.
+"""
+import asyncio
+import base64
+import json
+import logging
+import struct
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Optional
+
+KIND_AUDIO = 1
+KIND_VIDEO = 2
+KIND_LOG = 3
+KIND_TEXT = 4
+
+TOPIC_KINDS = {"audio": KIND_AUDIO, "vision_debug": KIND_VIDEO, "log": KIND_LOG}
+OPT_IN_TOPICS = frozenset(TOPIC_KINDS)
+# Kinds a lagging client can lose without breaking the conversation
+DROPPABLE_KINDS = frozenset({KIND_AUDIO, KIND_VIDEO, KIND_LOG})
+
+FRAME_HEADER = struct.Struct("<BBHI")
+DEFAULT_QUEUE_SIZE = 64
+
+# Records from this module are not streamed to clients: they describe the channels themselves.
+logger = logging.getLogger(__name__)
+
+
+def wav_bytes(pcm: bytes, sample_rate: int, channels: int = 1) -> bytes:
+    """Wraps 16-bit PCM in a WAV container."""
+    length = len(pcm)
+    header = struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + length, b'WAVE', b'fmt ', 16,
+        1,  # PCM
+        channels,
+        sample_rate,
+        sample_rate * channels * 2,  # ByteRate
+        channels * 2,  # BlockAlign
+        16,  # BitsPerSample
+        b'data', length
+    )
+    return header + pcm
+
+
+class ChannelMessage:
+    """One published message, encoded lazily and at most once per wire format."""
+    __slots__ = ("topic", "kind", "text", "payload", "sample_rate", "channels", "_binary", "_text")
+
+    def __init__(self, topic: Optional[str], text: Optional[str] = None, payload: Optional[bytes] = None,
+                 sample_rate: int = 0, channels: int = 0):
+        self.topic = topic
+        self.kind = TOPIC_KINDS.get(topic, KIND_TEXT)
+        self.text = text
+        self.payload = payload
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self._binary: Optional[bytes] = None
+        self._text: Optional[str] = text
+
+    def binary(self) -> bytes:
+        if self._binary is None:
+            body = self.payload if self.payload is not None else self.text.encode("utf-8")
+            self._binary = FRAME_HEADER.pack(self.kind, 0, self.channels, self.sample_rate) + body
+        return self._binary
+
+    def legacy_text(self) -> str:
+        if self._text is None:
+            media = self.payload
+            if self.kind == KIND_AUDIO:
+                media = wav_bytes(self.payload, self.sample_rate, self.channels or 1)
+            self._text = json.dumps({"type": self.topic, "data": base64.b64encode(media).decode("ascii")})
+        return self._text
+
+
+class ClientChannel:
+    """The send queue and sender task for one WebSocket client.
+
+    Args:
+        websocket: Anything with async `send_text`, `send_bytes` and `close`.
+        max_queue: Messages held for the client before load shedding starts.
+        on_close: Called with the websocket once the channel has shut down.
+    """
+    def __init__(self, websocket, max_queue: int = DEFAULT_QUEUE_SIZE,
+                 on_close: Optional[Callable[[object], None]] = None):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.on_close = on_close
+        self.topics = frozenset()
+        self.binary = False
+        self.queue: deque = deque()
+        self.dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._send_loop())
+
+    def subscribe(self, topics: Iterable[str], binary: bool = False):
+        self.topics = frozenset(topics)
+        self.binary = binary
+
+    def wants(self, topic: Optional[str]) -> bool:
+        return topic not in OPT_IN_TOPICS or topic in self.topics
+
+    def offer(self, message: ChannelMessage):
+        """Queues a message for the client, shedding load if it has fallen behind. Never blocks."""
+        if self.closed or not self.wants(message.topic):
+            return
+        if message.kind == KIND_VIDEO:
+            # Only the newest frame of a video feed is worth sending
+            for i, queued in enumerate(self.queue):
+                if queued.topic == message.topic:
+                    self.queue[i] = message
+                    self.dropped += 1
+                    return
+        if len(self.queue) >= self.max_queue and not self._drop_oldest():
+            # Closed before logging, so a log record published back to this client is ignored
+            self.close()
+            logger.warning("Disconnecting WebSocket client that stopped reading messages.")
+            return
+        self.queue.append(message)
+        self._ready.set()
+
+    def _drop_oldest(self) -> bool:
+        for i, queued in enumerate(self.queue):
+            if queued.kind in DROPPABLE_KINDS:
+                del self.queue[i]
+                self.dropped += 1
+                return True
+        return False
+
+    async def _send_loop(self):
+        try:
+            while True:
+                while not self.queue:
+                    self._ready.clear()
+                    await self._ready.wait()
+                message = self.queue.popleft()
+                if self.binary:
+                    await self.websocket.send_bytes(message.binary())
+                else:
+                    await self.websocket.send_text(message.legacy_text())
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"WebSocket send failed, closing channel: {e}")
+        finally:
+            self._shutdown()
+
+    def close(self):
+        """Stops sending and closes the connection."""
+        if self.closed:
+            return
+        self._task.cancel()
+        self._shutdown()
+        asyncio.ensure_future(self._close_websocket())
+
+    async def _close_websocket(self):
+        try:
+            await self.websocket.close()
+        except Exception:
+            pass
+
+    def _shutdown(self):
+        if self.closed:
+            return
+        self.closed = True
+        self.queue.clear()
+        if self.on_close:
+            self.on_close(self.websocket)
+
+
+class ChannelHub:
+    """Fans published messages out to every client's channel."""
+    def __init__(self, max_queue: int = DEFAULT_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self.channels: Dict[object, ClientChannel] = {}
+
+    @property
+    def active_connections(self) -> List[object]:
+        return list(self.channels)
+
+    def add(self, websocket) -> ClientChannel:
+        channel = ClientChannel(websocket, self.max_queue, on_close=self.disconnect)
+        self.channels[websocket] = channel
+        return channel
+
+    def disconnect(self, websocket):
+        channel = self.channels.pop(websocket, None)
+        if channel is not None:
+            channel.close()
+
+    def subscribe(self, websocket, topics: Iterable[str], binary: bool = False):
+        channel = self.channels.get(websocket)
+        if channel is not None:
+            channel.subscribe(topics, binary)
+
+    def has_subscribers(self, topic: str) -> bool:
+        return any(channel.wants(topic) for channel in self.channels.values())
+
+    def publish(self, message: ChannelMessage):
+        for channel in list(self.channels.values()):
+            channel.offer(message)
+
+    def publish_text(self, message: str, topic: Optional[str] = None):
+        """Queues a JSON text message for every client subscribed to its topic.
+
+        Args:
+            message (str): The JSON message to send.
+            topic (str, optional): The message's "type"; parsed from the message if omitted.
+        """
+        if topic is None:
+            try:
+                topic = json.loads(message).get("type")
+            except (ValueError, AttributeError):
+                topic = None
+        self.publish(ChannelMessage(topic, text=message))
+
+    async def broadcast(self, message: str, topic: Optional[str] = None):
+        """Awaitable form of `publish_text`; it only queues, so it returns without waiting on clients."""
+        self.publish_text(message, topic)
+
+    def broadcast_media(self, topic: str, payload: bytes, sample_rate: int = 0, channels: int = 0):
+        """Queues raw media (16-bit PCM for audio, JPEG for video) for clients subscribed to `topic`."""
+        if self.has_subscribers(topic):
+            self.publish(ChannelMessage(topic, payload=payload, sample_rate=sample_rate, channels=channels))
@@ -5,11 +5,12 @@ import asyncio
 import json
 import random
 import glob
-import difflib
 try:
     from . import promote_agent
+    from . import novelty_index
 except ImportError:
     import promote_agent
+    import novelty_index
 
 def load_archive_metadata():
     """Loads metadata for all agents in the archive.
@@ -45,6 +46,7 @@ def select_parent(archive, selection_method="weighted", tournament_size=3, novel
         archive (list): List of agent metadata dicts.
         selection_method (str): 'weighted', 'tournament', or 'random'.
         tournament_size (int): 'k' parameter for tournament selection.
+        novelty_k (int): Nearest neighbors averaged for novelty selection.
 
     Returns:
         dict: The selected parent metadata.
@@ -150,51 +152,17 @@ def select_parent(archive, selection_method="weighted", tournament_size=3, novel
         if len(archive) <= 1:
             return random.choice(archive)
 
-        # Memoize file reads to avoid redundant I/O
-        memoized_code = {}
-        def get_agent_code(agent):
-            path = agent.get('path')
-            if not path or path not in memoized_code:
-                try:
-                    with open(path, 'r') as f:
-                        memoized_code[path] = f.read()
-                except (FileNotFoundError, TypeError):
-                    memoized_code[path] = "" # Agent might not have a path yet
-            return memoized_code[path]
-
-        novelty_scores = []
-        for i, agent_i in enumerate(archive):
-            code_i = get_agent_code(agent_i)
-            distances = []
-            for j, agent_j in enumerate(archive):
-                if i == j:
-                    continue
-                code_j = get_agent_code(agent_j)
-
-                # Behavioral distance is 1 minus the similarity ratio from difflib
-                distance = 1.0 - difflib.SequenceMatcher(a=code_i, b=code_j).ratio()
-                distances.append(distance)
-
-            # Sort distances to find the nearest neighbors
-            distances.sort()
-
-            # The number of neighbors to consider (k) cannot be larger than the number of other agents
-            k = min(novelty_k, len(distances))
-
-            # Novelty is the average distance to the k-nearest neighbors
-            if k > 0:
-                novelty_score = sum(distances[:k]) / k
-            else:
-                novelty_score = 0.0 # Should not happen if len(archive) > 1
-
-            novelty_scores.append((agent_i, novelty_score))
+        # Behavioral distance is estimated from MinHash signatures of each agent's
+        # code, which the index keeps next to the archive and updates incrementally
+        index = novelty_index.NoveltyIndex.for_archive(archive)
+        try:
+            novelty_scores = index.novelty_scores(archive, novelty_k)
+        finally:
+            index.close()
 
         # Select the agent with the highest novelty score
-        if not novelty_scores:
-            return random.choice(archive) # Fallback
-
-        best_agent = max(novelty_scores, key=lambda item: item[1])[0]
-        return best_agent
+        best = max(range(len(archive)), key=lambda i: novelty_scores[i])
+        return archive[best]
 
     # Default fallback
     return random.choice(archive)
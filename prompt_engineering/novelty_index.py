@@ -0,0 +1,207 @@
+"""
+MinHash/LSH similarity index over archived agent code, used by novelty search.
+
+Each agent's code is tokenized, split into overlapping token shingles and
+summarized by a MinHash signature; the fraction of equal signature slots
+estimates the Jaccard similarity of two agents' shingle sets. Signatures
+are stored in a SQLite file next to the archive and only recomputed for
+agents whose code file changed, so adding an agent costs one signature.
+Locality-sensitive hashing over signature bands turns "who is near this
+agent" into a few dictionary lookups instead of a scan of the archive.
+"""
+import os
+import re
+import sqlite3
+import zlib
+
+import numpy as np
+
+INDEX_FILENAME = "novelty_index.sqlite"
+NUM_PERM = 128
+BANDS = 32
+SHINGLE_SIZE = 5
+# Below this many agents every pair is compared, so small archives are exact
+EXACT_LIMIT = 200
+
+_PRIME = 4294967311  # smallest prime above 2**32, the range of crc32
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+
+def _permutations(num_perm):
+    # Fixed seed: signatures are persisted and must stay comparable across runs
+    rng = np.random.RandomState(1)
+    a = rng.randint(1, 2**31, size=num_perm).astype(np.uint64)
+    b = rng.randint(0, 2**31, size=num_perm).astype(np.uint64)
+    return a, b
+
+
+def shingles(code, size=SHINGLE_SIZE):
+    """Returns the set of `size`-token shingles in `code` (one shingle for shorter code)."""
+    tokens = _TOKEN_RE.findall(code)
+    if len(tokens) <= size:
+        return {" ".join(tokens)} if tokens else set()
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+class NoveltyIndex:
+    """
+    Persistent MinHash signatures for an agent archive, keyed by code path.
+
+    Args:
+        db_path (str): SQLite file holding the signatures, or ":memory:".
+        num_perm (int): Signature length; the Jaccard estimate's error shrinks with its square root.
+        bands (int): LSH bands; must divide `num_perm`. More bands find less similar neighbors.
+    """
+    def __init__(self, db_path=":memory:", num_perm=NUM_PERM, bands=BANDS, shingle_size=SHINGLE_SIZE):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self._a, self._b = _permutations(num_perm)
+        self.conn = sqlite3.connect(db_path)
+        self._init_db()
+        # path -> (mtime, size, signature)
+        self.entries = {}
+        for path, mtime, size, signature in self.conn.execute("SELECT path, mtime, size, signature FROM signatures"):
+            self.entries[path] = (mtime, size, np.frombuffer(signature, dtype=np.uint64))
+
+    @classmethod
+    def for_archive(cls, archive):
+        """Opens the index stored next to the archive's code files (in memory if they have no paths)."""
+        paths = [agent['path'] for agent in archive if agent.get('path')]
+        if not paths:
+            return cls()
+        return cls(os.path.join(os.path.dirname(paths[0]), INDEX_FILENAME))
+
+    def close(self):
+        self.conn.close()
+
+    def _init_db(self):
+        params = f"{self.num_perm}:{self.shingle_size}"
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS signatures (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL,
+                    size INTEGER,
+                    signature BLOB NOT NULL
+                )
+            """)
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'params'").fetchone()
+            if row is None or row[0] != params:
+                # Signatures built with other parameters are not comparable
+                self.conn.execute("DELETE FROM signatures")
+                self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('params', ?)", (params,))
+
+    def signature(self, code):
+        """Returns the MinHash signature of `code`."""
+        grams = shingles(code, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+    def add(self, path, code, mtime=None, size=None):
+        """Stores the signature for the agent whose code lives at `path`."""
+        return self._store([(path, code, mtime, size)])[0]
+
+    def _store(self, items):
+        signatures = []
+        rows = []
+        for path, code, mtime, size in items:
+            signature = self.signature(code)
+            self.entries[path] = (mtime, size, signature)
+            signatures.append(signature)
+            rows.append((path, mtime, size, signature.tobytes()))
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO signatures (path, mtime, size, signature) VALUES (?, ?, ?, ?)", rows
+            )
+        return signatures
+
+    def sync(self, archive):
+        """Indexes agents that are new or whose code changed since they were indexed."""
+        pending = []
+        for agent in archive:
+            path = agent.get('path')
+            if not path:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                if path not in self.entries:
+                    pending.append((path, "", None, None))
+                continue
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == stat.st_mtime and entry[1] == stat.st_size:
+                continue
+            try:
+                with open(path, 'r') as f:
+                    code = f.read()
+            except (OSError, UnicodeDecodeError):
+                code = ""
+            pending.append((path, code, stat.st_mtime, stat.st_size))
+        if pending:
+            # One transaction for the whole batch, which matters on a first build
+            self._store(pending)
+
+    def novelty_scores(self, archive, k=10):
+        """
+        Scores each agent by its mean MinHash distance to its `k` nearest neighbors.
+
+        Neighbors come from LSH buckets; agents that share no bucket with an
+        agent are treated as entirely dissimilar (distance 1.0). Archives
+        with at most EXACT_LIMIT distinct agents compare every pair.
+
+        Returns:
+            list: Novelty scores, in the order of `archive`.
+        """
+        self.sync(archive)
+        empty = self.signature("")
+        signatures = np.stack([
+            self.entries[agent['path']][2] if agent.get('path') else empty for agent in archive
+        ])
+        n = len(archive)
+        k = min(k, n - 1)
+        if k <= 0:
+            return [0.0] * n
+
+        # Evolution produces many identical agents; score each distinct signature once
+        unique, inverse, counts = np.unique(signatures, axis=0, return_inverse=True, return_counts=True)
+        inverse = inverse.reshape(-1)
+        m = len(unique)
+        if m <= EXACT_LIMIT:
+            candidates = [np.array([j for j in range(m) if j != u], dtype=np.intp) for u in range(m)]
+        else:
+            candidates = self._lsh_candidates(unique)
+
+        unique_scores = []
+        for u, neighbors in enumerate(candidates):
+            # Copies of this agent are its nearest neighbors, at distance 0
+            distances = [np.zeros(min(counts[u] - 1, k))]
+            if len(neighbors):
+                found = 1.0 - (unique[neighbors] == unique[u]).mean(axis=1)
+                order = np.argsort(found, kind="stable")
+                weights = np.minimum(counts[neighbors][order], k)
+                needed = np.searchsorted(np.cumsum(weights), k) + 1
+                distances.append(np.repeat(found[order][:needed], weights[:needed]))
+            nearest = np.concatenate(distances)[:k]
+            # Agents outside every shared bucket count as entirely dissimilar
+            unique_scores.append(float((nearest.sum() + (k - len(nearest))) / k))
+        return [unique_scores[u] for u in inverse]
+
+    def _lsh_candidates(self, signatures):
+        buckets = {}
+        for i, signature in enumerate(signatures):
+            for band in range(self.bands):
+                key = (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+                buckets.setdefault(key, []).append(i)
+        candidates = [set() for _ in range(len(signatures))]
+        for members in buckets.values():
+            if len(members) > 1:
+                for i in members:
+                    candidates[i].update(members)
+        return [np.array(sorted(c - {i}), dtype=np.intp) for i, c in enumerate(candidates)]
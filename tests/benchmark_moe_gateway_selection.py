@@ -0,0 +1,64 @@
+"""
+Benchmark for MoE gateway expert selection.
+
+Compares the legacy full-table scan (`get_expert_scores`) against the
+in-memory `ExpertStats` aggregate used by `select_best_expert` as the
+number of logged requests grows from 10k to 1M.
+"""
+import os
+import sys
+import random
+import sqlite3
+import tempfile
+import time
+
+DB_DIR = tempfile.mkdtemp(prefix="gateway_bench_")
+os.environ["GATEWAY_DB_DIR"] = DB_DIR
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "ansible", "roles", "moe_gateway", "files")))
+
+import gateway
+
+SIZES = [10_000, 100_000, 1_000_000]
+SELECTIONS = 1000
+
+def fill_requests(db_path, start, count):
+    experts = list(gateway.EXTERNAL_EXPERTS)
+    now = time.time()
+    rows = []
+    for i in range(start, start + count):
+        ts = now - random.uniform(0, 6 * 24 * 3600)
+        status = 200 if random.random() < 0.9 else 500
+        rows.append((f"req-{i}", ts, "hi", "response", status, random.uniform(0.1, 3.0), random.choice(experts), ts + 1.0))
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany('''
+            INSERT INTO requests (request_id, timestamp, user_input, response, status_code, latency, expert_name, completed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+    conn.close()
+
+def run_benchmark():
+    print(f"{'requests':>10} | {'scan (ms/select)':>16} | {'in-memory (ms/select)':>21} | {'rebuild (s)':>11}")
+    logged = 0
+    for size in SIZES:
+        fill_requests(gateway.DB_PATH, logged, size - logged)
+        logged = size
+
+        start = time.perf_counter()
+        gateway.get_expert_scores(gateway.DB_PATH, gateway.EXTERNAL_EXPERTS)
+        scan_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        gateway.expert_stats.restore(gateway.DB_PATH)
+        rebuild_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(SELECTIONS):
+            gateway.select_best_expert(tier_filter="complex")
+        select_ms = (time.perf_counter() - start) * 1000 / SELECTIONS
+
+        print(f"{size:>10} | {scan_ms:>16.3f} | {select_ms:>21.4f} | {rebuild_s:>11.2f}")
+
+if __name__ == "__main__":
+    gateway.logger.setLevel("WARNING")
+    run_benchmark()
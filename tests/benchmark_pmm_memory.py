@@ -1,3 +1,4 @@
+import asyncio
 import os
 import time
 import random
@@ -70,5 +71,43 @@ def run_benchmark():
     if os.path.exists(db_path):
         os.remove(db_path)
 
+def run_event_benchmark():
+    db_path = "benchmark_pmm_events.db"
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+    memory = PMMMemory(db_path=db_path)
+    num_events = 5000
+
+    print(f"--- Running event append benchmark with {num_events} events per mode ---")
+
+    start = time.time()
+    for i in range(num_events):
+        memory.add_event_sync("bench_sequential", f"event {i}", {"i": i})
+    duration = time.time() - start
+    print(f"Sequential add_event_sync: {num_events / duration:,.0f} events/s")
+
+    async def concurrent_appends():
+        await asyncio.gather(*[memory.add_event("bench_concurrent", f"event {i}", {"i": i}) for i in range(num_events)])
+
+    start = time.time()
+    asyncio.run(concurrent_appends())
+    duration = time.time() - start
+    print(f"Concurrent add_event: {num_events / duration:,.0f} events/s")
+
+    if hasattr(memory, "add_events_bulk_sync"):
+        events = [{"kind": "bench_bulk", "content": f"event {i}", "meta": {"i": i}} for i in range(num_events * 10)]
+        start = time.time()
+        memory.add_events_bulk_sync(events)
+        duration = time.time() - start
+        print(f"add_events_bulk_sync: {len(events) / duration:,.0f} events/s")
+
+    memory.close()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
 if __name__ == "__main__":
     run_benchmark()
+    run_event_benchmark()
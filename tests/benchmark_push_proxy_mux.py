@@ -0,0 +1,83 @@
+"""
+Benchmark for aggregate throughput through the push proxy tunnel.
+
+Starts a PushProxyServer, a PushProxyClient and a local service that sends
+a fixed payload on every connection, all on localhost. Then downloads the
+same total amount of data through the tunnel port with 1, 16 and 128
+concurrent connections, which all share the worker's single multiplexed
+tunnel. A direct connection to the service is measured for reference.
+"""
+import asyncio
+import logging
+import os
+import socket
+import sys
+import time
+
+# The service package pulls in the voice pipeline; load the scripts the way they run on a jump host
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "pipecatapp", "services", "push_proxy")))
+
+from client import PushProxyClient
+from server import PushProxyServer
+
+TOTAL_BYTES = 256 * 1024 * 1024
+CONCURRENCY = [1, 16, 128]
+CHUNK = b"x" * (1024 * 1024)
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def download(port, size):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(size.to_bytes(8, "big"))
+    await writer.drain()
+    received = 0
+    while data := await reader.read(256 * 1024):
+        received += len(data)
+    writer.close()
+    assert received == size, f"expected {size} bytes, got {received}"
+
+async def serve_payload(reader, writer):
+    remaining = int.from_bytes(await reader.readexactly(8), "big")
+    while remaining:
+        chunk = CHUNK[:min(remaining, len(CHUNK))]
+        writer.write(chunk)
+        await writer.drain()
+        remaining -= len(chunk)
+    writer.close()
+
+async def measure(port, streams):
+    per_stream = TOTAL_BYTES // streams
+    started = time.perf_counter()
+    await asyncio.gather(*(download(port, per_stream) for _ in range(streams)))
+    elapsed = time.perf_counter() - started
+    return per_stream * streams / elapsed / (1024 * 1024)
+
+async def run_benchmark():
+    logging.getLogger().setLevel(logging.WARNING)
+    service = await asyncio.start_server(serve_payload, "127.0.0.1", 0)
+    service_port = service.sockets[0].getsockname()[1]
+    proxy = PushProxyServer(bind_host="127.0.0.1", bind_port=free_port(), tunnel_port_start=free_port())
+    client = PushProxyClient("127.0.0.1", proxy.bind_port, "bench-worker", local_service_port=service_port)
+    tasks = [asyncio.create_task(proxy.start())]
+    await asyncio.sleep(0.2)
+    tasks.append(asyncio.create_task(client.connect_and_serve()))
+    while "server" not in proxy.active_workers.get("bench-worker", {}):
+        await asyncio.sleep(0.05)
+    tunnel_port = proxy.active_workers["bench-worker"]["tunnel_port"]
+
+    print(f"--- Push proxy throughput, {TOTAL_BYTES // (1024 * 1024)} MiB per run ---")
+    for streams in CONCURRENCY:
+        direct = await measure(service_port, streams)
+        tunneled = await measure(tunnel_port, streams)
+        print(f"{streams:>4} streams: tunnel {tunneled:8.1f} MiB/s   direct {direct:8.1f} MiB/s")
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    service.close()
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,213 @@
+"""
+Benchmark for repo-map on a synthetic 20k-file Python tree.
+
+Three stages are measured against the implementations they replace:
+  - ranking: the previous pure-Python PageRank (every node scans every
+    other node each iteration) against the sparse power iteration. The old
+    one is timed on subsets of the graph and extrapolated quadratically,
+    since a 20k-node run takes too long to be worth waiting for.
+  - tag cache: one JSON file per source file against the SQLite cache,
+    writing every entry then reading them all back.
+  - extraction: the previous serial loop, which compiled the tags query
+    for every file, against `extract_all` in this process and in a process
+    pool. Skipped when the tree-sitter Python grammar is not installed.
+Each synthetic module defines a function and a class and calls functions
+from a few other modules, mostly its neighbours.
+"""
+import importlib.util
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipecatapp.tools.repo_map_impl.cache import TagCache
+from pipecatapp.tools.repo_map_impl.model import FileSymbols, Symbol
+from pipecatapp.tools.repo_map_impl.rank import build_reference_graph, pagerank
+
+FILES = 20000
+FILES_PER_DIR = 100
+REFERENCES = 4
+OLD_PAGERANK_SIZES = [500, 1000, 2000]
+OLD_EXTRACTION_SAMPLE = 2000
+
+
+def write_tree(root: Path) -> list[Path]:
+    rng = random.Random(0)
+    paths = []
+    for i in range(FILES):
+        refs = {min(FILES - 1, max(0, i + int(rng.gauss(0, 50)))) for _ in range(REFERENCES)} - {i}
+        if rng.random() < 0.1:
+            refs.add(rng.randrange(20))  # a few widely used utility modules
+        path = root / f"pkg{i // FILES_PER_DIR:03d}" / f"mod{i:05d}.py"
+        path.parent.mkdir(exist_ok=True)
+        body = "\n".join(f"    func{r}()" for r in sorted(refs)) or "    pass"
+        path.write_text(f"class Model{i}:\n    pass\n\n\ndef func{i}():\n{body}\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def synthetic_symbols(paths: list[Path], root: Path) -> list[FileSymbols]:
+    """What extraction yields for `write_tree`, built without parsing."""
+    files = []
+    for i, path in enumerate(paths):
+        text = path.read_text(encoding="utf-8")
+        symbols = [Symbol(f"Model{i}", "class", 1), Symbol(f"func{i}", "function", 5)]
+        for line_no, line in enumerate(text.splitlines()[5:], start=6):
+            symbols.append(Symbol(line.strip()[:-2], "call", line_no, role="reference"))
+        files.append(FileSymbols(path=str(path.relative_to(root)), language="python", symbols=symbols,
+                                 exports=[f"Model{i}", f"func{i}"]))
+    return files
+
+
+def old_pagerank(graph, *, nodes, iterations=20, damping=0.85):
+    """The previous implementation, kept here for comparison."""
+    scores = {n: 1.0 / len(nodes) for n in nodes}
+    out_weight = {n: max(len(graph.get(n, ())), 1) for n in nodes}
+    for _ in range(iterations):
+        new_scores = {}
+        for n in nodes:
+            rank = (1 - damping) / len(nodes)
+            incoming = 0.0
+            for src in nodes:
+                if n in graph.get(src, ()):
+                    incoming += scores[src] / out_weight[src]
+            new_scores[n] = rank + damping * incoming
+        scores = new_scores
+    return scores
+
+
+class OldTagCache:
+    """The previous cache: one JSON file per source file."""
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _key_path(self, file_path: Path) -> Path:
+        return self.cache_dir / (str(file_path).replace("/", "_").replace(":", "_") + ".json")
+
+    def get(self, file_path: Path):
+        path = self._key_path(file_path)
+        if not path.is_file():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data["payload"] if data.get("mtime") == file_path.stat().st_mtime else None
+
+    def set(self, file_path: Path, payload: dict):
+        self._key_path(file_path).write_text(
+            json.dumps({"mtime": file_path.stat().st_mtime, "payload": payload}), encoding="utf-8"
+        )
+
+
+def dir_usage(path: Path) -> tuple[int, int]:
+    entries = list(path.iterdir())
+    return len(entries), sum(p.stat().st_size for p in entries)
+
+
+def bench_ranking(files: list[FileSymbols]):
+    print("--- Ranking ---")
+    graph = build_reference_graph(files)
+    nodes = [f.path for f in files]
+    edges = sum(len(t) for t in graph.values())
+
+    per_node_sq = []
+    for size in OLD_PAGERANK_SIZES:
+        subset = set(nodes[:size])
+        sub_graph = {n: t & subset for n, t in graph.items() if n in subset}
+        started = time.perf_counter()
+        old_pagerank(sub_graph, nodes=nodes[:size])
+        elapsed = time.perf_counter() - started
+        per_node_sq.append(elapsed / size ** 2)
+        print(f"old pure-Python PageRank, {size:>5} files: {elapsed:8.3f} s")
+    print(f"old pure-Python PageRank, {len(nodes)} files: ~{max(per_node_sq) * len(nodes) ** 2:6.0f} s (extrapolated)")
+
+    started = time.perf_counter()
+    ranks = pagerank(graph, nodes=nodes)
+    print(f"sparse PageRank,          {len(nodes)} files: {time.perf_counter() - started:8.3f} s   ({edges} edges)")
+    started = time.perf_counter()
+    pagerank(graph, nodes=nodes, personalization={nodes[0]: 2.0, nodes[-1]: 2.0})
+    print(f"sparse PageRank, focused  {len(nodes)} files: {time.perf_counter() - started:8.3f} s")
+    top = sorted(ranks, key=lambda n: -ranks[n])[:3]
+    print(f"top files: {', '.join(top)}")
+
+
+def bench_cache(root: Path, paths: list[Path], files: list[FileSymbols]):
+    print("--- Tag cache ---")
+    payloads = [
+        {"path": fs.path, "language": fs.language, "symbols": [vars(s) for s in fs.symbols],
+         "exports": fs.exports, "error": fs.error}
+        for fs in files
+    ]
+
+    old = OldTagCache(root / "old-cache")
+    started = time.perf_counter()
+    for path, payload in zip(paths, payloads):
+        old.set(path, payload)
+    write = time.perf_counter() - started
+    started = time.perf_counter()
+    hits = sum(1 for path in paths if old.get(path) is not None)
+    read = time.perf_counter() - started
+    count, size = dir_usage(root / "old-cache")
+    print(f"JSON per file: write {write:6.2f} s   read {read:6.2f} s   hits {hits}   {count} files, {size / 1e6:5.1f} MB")
+
+    new = TagCache(root / "new-cache")
+    started = time.perf_counter()
+    new.set_many(list(zip(paths, payloads)))
+    write = time.perf_counter() - started
+    started = time.perf_counter()
+    hits = len(new.get_many(paths))
+    read = time.perf_counter() - started
+    new.close()
+    count, size = dir_usage(root / "new-cache")
+    print(f"SQLite:        write {write:6.2f} s   read {read:6.2f} s   hits {hits}   {count} files, {size / 1e6:5.1f} MB")
+
+
+def bench_extraction(root: Path, paths: list[Path]):
+    print("--- Extraction (no cache) ---")
+    if importlib.util.find_spec("tree_sitter_python") is None:
+        print("skipped: tree-sitter Python grammar not installed")
+        return
+    try:
+        from pipecatapp.tools.repo_map_impl.extract import tree_sitter as ts
+        from pipecatapp.tools.repo_map_impl.pipeline import extract_all
+    except ImportError as e:
+        print(f"skipped: {e}")
+        return
+
+    sample = paths[:OLD_EXTRACTION_SAMPLE]
+    started = time.perf_counter()
+    for path in sample:
+        ts._query_cache.clear()  # the previous extractor compiled the tags query for every file
+        ts.extract_tags(path, root)
+    elapsed = (time.perf_counter() - started) * len(paths) / len(sample)
+    print(f"previous serial loop:      ~{elapsed:7.2f} s   (extrapolated from {len(sample)} files)")
+
+    cpus = os.cpu_count() or 1
+    for workers in sorted({1, max(2, cpus)}):
+        started = time.perf_counter()
+        files = extract_all(root, paths, use_cache=False, workers=workers)
+        elapsed = time.perf_counter() - started
+        errors = sum(1 for fs in files if fs.error)
+        print(f"{workers:>2} worker(s) on {cpus} CPU(s): {elapsed:7.2f} s   ({len(files)} files, {errors} errors)")
+
+
+def run_benchmark():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "repo"
+        root.mkdir()
+        started = time.perf_counter()
+        paths = write_tree(root)
+        print(f"Wrote {len(paths)} files in {time.perf_counter() - started:.1f} s")
+        files = synthetic_symbols(paths, root)
+
+        bench_ranking(files)
+        bench_cache(Path(tmp), paths, files)
+        bench_extraction(root, paths)
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,117 @@
+"""
+Benchmark for remote shard writes through ShardOutbox.
+
+A stand-in shard (stdlib HTTP/1.1 keep-alive server on loopback, backed by
+a real PMMMemory) serves the per-event endpoint the router used before the
+outbox and the `events:batch` endpoint it uses now. Writers on several
+threads each append events synchronously, as `add_event_sync` callers do.
+Measured:
+  - local: the same writers appending straight to a PMMMemory file
+  - per-event POST: one request per event, the previous remote path
+  - outbox: writes coalesced into batches, with all writers on one
+    session (one batch in flight) and on a session each (parallel batches)
+"""
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipecatapp.pmm_memory import PMMMemory
+from pipecatapp.shard_outbox import EventSpool, ShardOutbox
+
+WRITERS = 16
+EVENTS_PER_WRITER = 300
+
+
+def make_server(memory: PMMMemory) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; without this each response waits on a delayed ACK
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            if self.path.endswith("/events:batch"):
+                memory.add_events_bulk_sync([
+                    {"kind": e["kind"], "content": e["content"], "meta": e.get("meta") or {}} for e in payload["events"]
+                ])
+            else:
+                memory.add_event_sync(payload["kind"], payload["content"], payload.get("meta") or {})
+            body = b'{"status": "success"}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_writers(write) -> float:
+    """Runs WRITERS threads that each write EVENTS_PER_WRITER events, and returns events per second."""
+    def writer(n):
+        for i in range(EVENTS_PER_WRITER):
+            write(n, i)
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(WRITERS)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return WRITERS * EVENTS_PER_WRITER / (time.perf_counter() - started)
+
+
+def event(n, i, session):
+    return {"session_id": session, "kind": "msg", "content": f"writer {n} event {i}", "meta": {"session_id": session}}
+
+
+def run_benchmark():
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"--- {WRITERS} writers x {EVENTS_PER_WRITER} synchronous appends ---")
+
+        local = PMMMemory(db_path=os.path.join(tmp, "local.db"))
+        rate = run_writers(lambda n, i: local.add_event_sync("msg", f"writer {n} event {i}", {"session_id": f"s{n}"}))
+        print(f"local PMMMemory:             {rate:8,.0f} events/s")
+
+        shard = PMMMemory(db_path=os.path.join(tmp, "shard.db"))
+        server = make_server(shard)
+        api_url = f"http://127.0.0.1:{server.server_address[1]}"
+        limits = httpx.Limits(max_connections=WRITERS, max_keepalive_connections=WRITERS)
+        client = httpx.Client(timeout=30.0, limits=limits)
+
+        def post_one(n, i):
+            client.post(f"{api_url}/api/memory/sharded/events", json=event(n, i, f"s{n}")).raise_for_status()
+
+        rate = run_writers(post_one)
+        print(f"remote, one POST per event:  {rate:8,.0f} events/s")
+
+        spool = EventSpool(os.path.join(tmp, "spool.db"))
+        for label, session_of in (("one session", lambda n: "s"), ("session per writer", lambda n: f"s{n}")):
+            outbox = ShardOutbox("node_1", api_url, spool, client)
+            rate = run_writers(lambda n, i: outbox.submit([event(n, i, session_of(n))]).result())
+            outbox.close()
+            print(f"remote, outbox, {label + ':':<19}{rate:8,.0f} events/s")
+
+        expected = WRITERS * EVENTS_PER_WRITER * 3
+        print(f"events on the shard: {len(shard.get_events_sync(limit=expected + 1))} (expected {expected})")
+        spool.close()
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,104 @@
+"""
+Replay harness for streaming transcription latency.
+
+Replays utterances as 20 ms PCM frames at real-time pace, the way the
+audio transport delivers them, and measures how long the final transcript
+takes after the equivalent of UserStoppedSpeakingFrame. Two paths are
+compared. The full-utterance path decodes the whole buffer at end of
+speech, as FasterWhisperSTTService does by default. The streaming path
+feeds a StreamingTranscriber while the user talks and only decodes the
+uncommitted tail at the end.
+
+The model is a CPU stub. Each word of the script is "recorded" as a run of
+a constant sample value, and the stub recognizes those runs (a word cut
+off at the end of the window comes out truncated, as a real model would
+mishear it). It costs 50 ms per call plus 50 ms per second of audio,
+roughly faster-whisper tiny.en on a few CPU cores.
+"""
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipecatapp.streaming_stt import StreamingTranscriber
+
+SAMPLE_RATE = 16000
+WORD_SECONDS = 0.4
+GAP_SECONDS = 0.1
+FRAME_BYTES = SAMPLE_RATE // 50 * 2  # 20 ms
+DECODE_BASE = 0.05
+DECODE_PER_SECOND = 0.05
+
+SCRIPT = ("please check whether the nomad cluster has enough free memory on every node "
+          "before you schedule the new llama router job and then tell me which workers "
+          "are still running the old model version so that we can drain them tonight").split()
+UTTERANCE_WORDS = [4, 12, 36]
+
+def record(words):
+    """Builds the PCM for the first `words` words of the script."""
+    samples = []
+    for i in range(words):
+        samples.append(np.full(int(WORD_SECONDS * SAMPLE_RATE), 100 * (i + 1), dtype=np.int16))
+        samples.append(np.zeros(int(GAP_SECONDS * SAMPLE_RATE), dtype=np.int16))
+    return np.concatenate(samples).tobytes()
+
+def stub_transcribe(pcm, prompt=""):
+    audio = np.frombuffer(pcm, dtype=np.int16)
+    time.sleep(DECODE_BASE + DECODE_PER_SECOND * len(audio) / SAMPLE_RATE)
+    words = []
+    edges = np.flatnonzero(np.diff(audio)) + 1
+    for start, end in zip(np.concatenate(([0], edges)), np.concatenate((edges, [len(audio)]))):
+        value = int(audio[start])
+        if value == 0 or end - start < SAMPLE_RATE // 50:
+            continue
+        text = SCRIPT[value // 100 - 1]
+        heard = (end - start) / (WORD_SECONDS * SAMPLE_RATE)
+        if heard < 0.99:
+            # Cut off by the end of the window
+            text = text[:max(1, int(len(text) * heard))]
+        words.append((start / SAMPLE_RATE, end / SAMPLE_RATE, text))
+    return words
+
+async def replay(pcm, on_frame):
+    started = time.perf_counter()
+    for i, offset in enumerate(range(0, len(pcm), FRAME_BYTES)):
+        on_frame(pcm[offset:offset + FRAME_BYTES])
+        await asyncio.sleep(max(0.0, started + (i + 1) * 0.02 - time.perf_counter()))
+
+async def full_utterance(pcm):
+    buffer = bytearray()
+    await replay(pcm, buffer.extend)
+    stopped = time.perf_counter()
+    text = " ".join(w[2] for w in await asyncio.get_running_loop().run_in_executor(None, stub_transcribe, bytes(buffer), ""))
+    return text, time.perf_counter() - stopped, 0
+
+async def streaming(pcm):
+    interims = []
+
+    async def on_interim(text):
+        interims.append(text)
+
+    transcriber = StreamingTranscriber(stub_transcribe, on_interim, sample_rate=SAMPLE_RATE)
+    await replay(pcm, transcriber.feed)
+    stopped = time.perf_counter()
+    text = await transcriber.finish()
+    return text, time.perf_counter() - stopped, len(interims)
+
+async def run_benchmark():
+    print("--- Final transcript latency after end of speech (stub model, real-time replay) ---")
+    for words in UTTERANCE_WORDS:
+        pcm = record(words)
+        expected = " ".join(SCRIPT[:words])
+        full_text, full_latency, _ = await full_utterance(pcm)
+        stream_text, stream_latency, interims = await streaming(pcm)
+        assert full_text == expected, full_text
+        assert stream_text == expected, stream_text
+        print(f"{words:>3} words ({len(pcm) / 2 / SAMPLE_RATE:5.1f} s): full utterance {full_latency:6.3f} s   "
+              f"streaming {stream_latency:6.3f} s   interim transcripts {interims}")
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
@@ -0,0 +1,71 @@
+"""
+Benchmark for TTS time to first audio with sentence-level streaming synthesis.
+
+A fake synthesizer sleeps 2 ms per character plus 20 ms per call, roughly
+the speed of a CPU voice model, and returns silence. Responses of 1, 4 and
+12 sentences are synthesized two ways. The legacy path synthesizes the
+whole response and pushes one audio frame, as KokoroTTSService and
+PiperTTSService used to. The streaming path feeds the response to an
+IncrementalSynthesizer. Both report the time from receiving the text to
+the first audio chunk (TTFA) and to the last one, the same two figures
+BenchmarkCollector logs.
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipecatapp.streaming_tts import IncrementalSynthesizer
+
+SENTENCE = "The cluster finished rebalancing and every node reports a healthy state. "
+SENTENCE_COUNTS = [1, 4, 12]
+RUNS = 3
+
+def fake_synthesize(text):
+    time.sleep(0.02 + 0.002 * len(text))
+    return b"\x00\x00" * (len(text) * 100)
+
+class Timings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first = None
+        self.last = None
+
+    async def on_audio(self, pcm):
+        now = time.perf_counter() - self.started
+        if self.first is None:
+            self.first = now
+        self.last = now
+
+async def legacy(text):
+    timings = Timings()
+    audio = await asyncio.get_running_loop().run_in_executor(None, fake_synthesize, text)
+    await timings.on_audio(audio)
+    return timings
+
+async def streaming(text):
+    timings = Timings()
+    synth = IncrementalSynthesizer(fake_synthesize, timings.on_audio, max_workers=2)
+    synth.feed(text)
+    await synth.finish()
+    synth.close()
+    return timings
+
+async def best_of(run, text):
+    results = [await run(text) for _ in range(RUNS)]
+    return min(r.first for r in results), min(r.last for r in results)
+
+async def run_benchmark():
+    print(f"--- Fake synthesizer, best of {RUNS} runs ---")
+    for count in SENTENCE_COUNTS:
+        text = SENTENCE * count
+        legacy_first, legacy_last = await best_of(legacy, text)
+        stream_first, stream_last = await best_of(streaming, text)
+        print(f"{count:>3} sentences ({len(text):>4} chars): "
+              f"TTFA legacy {legacy_first:6.3f} s  streaming {stream_first:6.3f} s   "
+              f"full response legacy {legacy_last:6.3f} s  streaming {stream_last:6.3f} s")
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
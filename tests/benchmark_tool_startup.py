@@ -0,0 +1,102 @@
+"""
+Benchmark for agent startup with the lazy tool registry.
+
+Each mode runs in a fresh interpreter, so module import caches are cold.
+The eager mode reproduces the previous startup: every tool module is
+imported and every tool constructed before the agent can answer. The lazy
+mode builds the registry from `create_tools` and loads only the tool the
+first request calls.
+
+Reported per mode:
+  - import: time to import the agent factory and build the tool dictionary
+  - first frame: time until the system prompt listing every tool is built
+    and the first tool call has returned
+  - RSS before (bare interpreter) and after, from /proc/self/status
+Tools that fail to construct here (missing SDKs, no Docker daemon) are
+counted and skipped in the eager mode, which only understates its cost.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CHILD_TIMEOUT = 300
+CONFIG = {"tool_execution_mode": "local"}
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def child(mode):
+    rss_before = rss_mb()
+    started = time.perf_counter()
+
+    from pipecatapp.agent_factory import create_tools
+    from pipecatapp.tools.registry import tool_methods
+    tools = {name: tool for name, tool in create_tools(CONFIG).items() if tool is not None}
+
+    failed = 0
+    if mode == "eager":
+        for tool in tools.values():
+            try:
+                tool.resolve()
+            except Exception:
+                failed += 1
+    imported = time.perf_counter() - started
+
+    prompt = "".join(
+        f'- {{"tool": "{name}.{method}"}}: {doc}\n'
+        for name, tool in tools.items()
+        for method, doc in tool_methods(tool)
+    )
+    tools["final_answer"].submit_task(summary="done")
+    first_frame = time.perf_counter() - started
+
+    print(json.dumps({
+        "tools": len(tools),
+        "loaded": sum(1 for tool in tools.values() if tool.loaded),
+        "failed": failed,
+        "prompt_chars": len(prompt),
+        "import": imported,
+        "first_frame": first_frame,
+        "rss_before": rss_before,
+        "rss_after": rss_mb(),
+    }))
+
+
+def run(mode):
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", mode],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=CHILD_TIMEOUT,
+    )
+    # Tools may log or print while loading; the result is the last line
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(f"{mode} run failed:\n{result.stderr[-2000:]}")
+    return json.loads(lines[-1])
+
+
+def run_benchmark():
+    print("--- Agent startup: eager tool construction vs lazy registry (fresh interpreter each) ---")
+    for mode in ("eager", "lazy"):
+        r = run(mode)
+        print(f"{mode:>5}: {r['tools']} tools, {r['loaded']} loaded ({r['failed']} failed to load)   "
+              f"import {r['import']:6.3f} s   first frame {r['first_frame']:6.3f} s   "
+              f"RSS {r['rss_before']:6.1f} -> {r['rss_after']:6.1f} MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == "--child":
+        child(sys.argv[2])
+    else:
+        run_benchmark()
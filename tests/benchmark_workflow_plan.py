@@ -0,0 +1,87 @@
+"""
+Benchmark for per-step workflow setup overhead.
+
+`TwinService.process_frame` runs the same workflow up to 10 times per user
+turn. This compares the setup each step used to repeat (deep copy, regex
+`$vars` interpolation, node class lookup and `validate_io`, HITL scan and
+topological sort) with binding the cached `WorkflowPlan` to a fresh context.
+Node execution is excluded; only the runner's own overhead is measured.
+"""
+import contextlib
+import copy
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pipecatapp.workflow.nodes  # noqa: F401 - registers node classes
+from pipecatapp.workflow.context import WorkflowContext
+from pipecatapp.workflow.nodes.registry import registry
+from pipecatapp.workflow.runner import (
+    VAR_PATTERN,
+    WorkflowRunner,
+    _topological_order,
+    _uses_high_risk_tools_without_approval,
+)
+
+WORKFLOW_PATH = os.path.join(os.path.dirname(__file__), "..", "pipecatapp", "workflows", "default_agent_loop.yaml")
+STEPS = 2000
+GLOBAL_INPUTS = {"user_text": "What is the weather like?", "tool_result": None, "enforce_hitl": True}
+
+def interpolate(value, global_inputs):
+    if isinstance(value, str):
+        return VAR_PATTERN.sub(lambda m: str(global_inputs[m.group(1)]) if m.group(1) in global_inputs else m.group(0), value)
+    if isinstance(value, dict):
+        return {k: interpolate(v, global_inputs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [interpolate(v, global_inputs) for v in value]
+    return value
+
+def legacy_step(definition):
+    """The setup WorkflowRunner.run() used to repeat on every call."""
+    bound = interpolate(copy.deepcopy(definition), GLOBAL_INPUTS)
+    nodes = {}
+    for node_config in bound["nodes"]:
+        node = registry.get_node_class(node_config["type"])(node_config)
+        node.validate_io()
+        nodes[node_config["id"]] = node
+    context = WorkflowContext(bound)
+    for name, value in GLOBAL_INPUTS.items():
+        context.set_global_input(name, value)
+    _uses_high_risk_tools_without_approval(bound)
+    _topological_order(bound["nodes"])
+
+def compiled_step(runner):
+    """The setup WorkflowRunner.run() performs now."""
+    runner.workflow_definition = runner.plan.bind(GLOBAL_INPUTS)
+    runner._instantiate_nodes()
+    runner.context = WorkflowContext(runner.workflow_definition)
+    for name, value in GLOBAL_INPUTS.items():
+        runner.context.set_global_input(name, value)
+    runner.plan.hitl_violation(runner.workflow_definition)
+    runner._get_execution_order()
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        fn(*args)
+    return (time.perf_counter() - start) * 1e6 / STEPS
+
+def run_benchmark():
+    runner = WorkflowRunner(WORKFLOW_PATH)
+    # Resolve node classes once up front, as the first real run would
+    with contextlib.redirect_stdout(io.StringIO()):
+        runner._instantiate_nodes()
+        legacy_us = timed(legacy_step, runner.plan.definition)
+    compiled_us = timed(compiled_step, runner)
+
+    print(f"workflow: {os.path.basename(WORKFLOW_PATH)} ({len(runner.plan.definition['nodes'])} nodes)")
+    print(f"{'per-step setup':<16} | {'us/step':>9}")
+    print(f"{'before':<16} | {legacy_us:>9.1f}")
+    print(f"{'after':<16} | {compiled_us:>9.1f}")
+    print(f"speedup: {legacy_us / compiled_us:.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,94 @@
+"""
+Benchmark for pipeline stall time when broadcasting to slow WebSocket clients.
+
+A fake pipeline emits 20 ms PCM frames (16 kHz mono) at real-time pace and
+broadcasts each one to N slow clients plus one fast client. Each slow client
+takes 30 ms to accept a message. Two broadcasts are compared. The legacy one
+builds a WAV, base64-encodes it into JSON and awaits every client in turn,
+as WebsocketAudioStreamer and WebSocketManager.broadcast used to. The
+channel hub sends raw binary frames through per-client bounded queues.
+Stall time is the total time the pipeline spent blocked inside broadcast.
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pipecatapp.ws_channels import ChannelHub, wav_bytes
+
+SAMPLE_RATE = 16000
+FRAME_PCM = b"\x01\x02" * (SAMPLE_RATE // 50)  # 20 ms
+FRAMES = 40
+SLOW_SEND = 0.03
+CLIENT_COUNTS = [1, 4, 16]
+
+class FakeClient:
+    def __init__(self, delay):
+        self.delay = delay
+        self.bytes_received = 0
+        self.messages = 0
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.delay)
+        self.bytes_received += len(text)
+        self.messages += 1
+
+    async def send_bytes(self, data):
+        await asyncio.sleep(self.delay)
+        self.bytes_received += len(data)
+        self.messages += 1
+
+    async def close(self):
+        pass
+
+async def legacy_broadcast(clients, pcm):
+    """What WebsocketAudioStreamer + WebSocketManager.broadcast did per frame."""
+    message = json.dumps({"type": "audio", "data": base64.b64encode(wav_bytes(pcm, SAMPLE_RATE)).decode("utf-8")})
+    for client in clients:
+        await client.send_text(message)
+
+async def run_pipeline(broadcast):
+    """Emits FRAMES frames at real-time pace; returns the time spent blocked in broadcast."""
+    stalled = 0.0
+    started = time.perf_counter()
+    for i in range(FRAMES):
+        before = time.perf_counter()
+        await broadcast(FRAME_PCM)
+        stalled += time.perf_counter() - before
+        # Sleep until the next frame is due (no sleep if the broadcast already overran)
+        await asyncio.sleep(max(0.0, started + (i + 1) * 0.02 - time.perf_counter()))
+    return stalled
+
+async def run_benchmark():
+    print(f"--- {FRAMES} x 20 ms audio frames ({FRAMES * 0.02:.0f} s of audio), slow clients take {SLOW_SEND * 1000:.0f} ms per message ---")
+    for slow_count in CLIENT_COUNTS:
+        clients = [FakeClient(SLOW_SEND) for _ in range(slow_count)] + [FakeClient(0.0)]
+        legacy_stall = await run_pipeline(lambda pcm: legacy_broadcast(clients, pcm))
+        legacy_fast = clients[-1]
+
+        hub = ChannelHub()
+        clients = [FakeClient(SLOW_SEND) for _ in range(slow_count)] + [FakeClient(0.0)]
+        for client in clients:
+            hub.add(client)
+            hub.subscribe(client, ["audio"], binary=True)
+
+        async def channel_broadcast(pcm):
+            hub.broadcast_media("audio", pcm, sample_rate=SAMPLE_RATE, channels=1)
+
+        channel_stall = await run_pipeline(channel_broadcast)
+        await asyncio.sleep(0.1)
+        fast = clients[-1]
+        dropped = sum(channel.dropped for channel in hub.channels.values())
+        for client in clients:
+            hub.disconnect(client)
+
+        print(f"{slow_count:>3} slow clients: stall legacy {legacy_stall:7.3f} s   channels {channel_stall:7.4f} s   "
+              f"fast client bytes/frame legacy {legacy_fast.bytes_received // FRAMES}  channels {fast.bytes_received // max(fast.messages, 1)}   "
+              f"frames shed by slow clients {dropped}")
+
+if __name__ == "__main__":
+    asyncio.run(run_benchmark())
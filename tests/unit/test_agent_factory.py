@@ -30,44 +30,10 @@ sys.modules["pipecat.services.openai"] = mock_pipecat.services.openai
 sys.modules["pipecat.services.openai.llm"] = mock_pipecat.services.openai.llm
 
 from pipecatapp.agent_factory import create_tools
+from pipecatapp.tools.registry import LazyTool, tool_methods
 
-@patch('pipecatapp.agent_factory.WOLTool')
-@patch('pipecatapp.agent_factory.SaveSkillTool')
-@patch('pipecatapp.agent_factory.SearchSkillsTool')
-@patch('pipecatapp.agent_factory.Last30DaysTool')
-@patch('pipecatapp.agent_factory.SSH_Tool')
-@patch('pipecatapp.agent_factory.DesktopControlTool')
-@patch('pipecatapp.agent_factory.CodeRunnerTool')
-@patch('pipecatapp.agent_factory.WebBrowserTool')
-@patch('pipecatapp.agent_factory.Ansible_Tool')
-@patch('pipecatapp.agent_factory.Power_Tool')
-@patch('pipecatapp.agent_factory.TermEverythingTool')
-@patch('pipecatapp.agent_factory.RAG_Tool')
-@patch('pipecatapp.agent_factory.HA_Tool')
-@patch('pipecatapp.agent_factory.Git_Tool')
-@patch('pipecatapp.agent_factory.OrchestratorTool')
-@patch('pipecatapp.agent_factory.OpenClawTool')
-@patch('pipecatapp.agent_factory.ATProtoTool')
-@patch('pipecatapp.agent_factory.WasmTool')
-@patch('pipecatapp.agent_factory.HereticTool')
-@patch('pipecatapp.agent_factory.JulesTool')
-@patch('pipecatapp.agent_factory.OCRTool')
-@patch('pipecatapp.agent_factory.OpenWorkersTool')
-@patch('pipecatapp.agent_factory.P2PSyncTool')
-@patch('pipecatapp.agent_factory.SpecLoaderTool')
-@patch('pipecatapp.agent_factory.SkillBuilderTool')
-@patch('pipecatapp.agent_factory.FrugalSandboxTool')
-@patch('pipecatapp.agent_factory.SchedulerTool')
-@patch('pipecatapp.agent_factory.FieldGuideTool')
-@patch('pipecatapp.agent_factory.DesignDocsTool')
-def test_create_tools_instantiates_last30days(
-        mock_design_docs, mock_field_guide, mock_scheduler,
-    mock_frugal_sandbox, mock_skill_builder, mock_spec, mock_sync, mock_openworkers,
-    mock_ocr, mock_jules, mock_heretic, mock_wasm, mock_atproto, mock_openclaw,
-    mock_orchestrator, mock_git, mock_ha, mock_rag, mock_term, mock_power, mock_ansible,
-    mock_web, mock_code, mock_desktop, mock_ssh, mock_last30days, mock_search,
-    mock_save, mock_wol
-):
+@patch('pipecatapp.tools.last30days_tool.Last30DaysTool')
+def test_create_tools_instantiates_last30days(mock_last30days):
     config = {
         "tool_execution_mode": "local",
         "last30days_service_url": "http://last30days-service.service.consul:8008",
@@ -78,7 +44,23 @@ def test_create_tools_instantiates_last30days(
     tools = create_tools(config)
 
     assert "last30days" in tools
+    assert isinstance(tools["last30days"], LazyTool)
+    # Tools are only constructed on first use
+    mock_last30days.assert_not_called()
+
+    tools["last30days"].execute
     mock_last30days.assert_called_once_with(
         service_url="http://last30days-service.service.consul:8008",
         api_key="some-key"
     )
+
+def test_create_tools_describes_tools_without_importing_them():
+    sys.modules.pop("pipecatapp.tools.wol_tool", None)
+    tools = create_tools({"tool_server_url": "http://tools:8000"})
+
+    assert "execute" in dict(tool_methods(tools["wol"]))
+    assert "pipecatapp.tools.wol_tool" not in sys.modules
+    assert not tools["wol"].loaded
+    # Offloaded heavy tools are described by the local tool they proxy
+    assert tools["rag"].tool_spec.class_name == "RAG_Tool"
+    assert tool_methods(tools["rag"])
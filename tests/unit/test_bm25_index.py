@@ -0,0 +1,69 @@
+import sys
+import os
+import math
+import sqlite3
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.utils.bm25_index import BM25Index
+
+
+@pytest.fixture
+def index():
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    yield BM25Index(conn)
+    conn.close()
+
+
+def test_search_ranks_by_bm25(index):
+    index.add_document("1", "the deploy failed with a timeout")
+    index.add_document("2", "the cat sat on the mat")
+    index.add_document("3", "timeout timeout while waiting for the deploy")
+
+    results = index.search("deploy timeout", k=5)
+
+    assert [doc_id for doc_id, _ in results] == ["3", "1"]
+    assert results[0][1] > results[1][1] > 0
+    assert index.search("nothing matches", k=5) == []
+
+
+def test_score_matches_okapi_formula(index):
+    index.add_document("a", "alpha beta")
+    index.add_document("b", "gamma")
+
+    [(doc_id, score)] = index.search("alpha", k=1)
+
+    idf = math.log(1 + (2 - 1 + 0.5) / (1 + 0.5))
+    avgdl = 3 / 2
+    expected = idf * 1 * (1.5 + 1) / (1 + 1.5 * (1 - 0.75 + 0.75 * 2 / avgdl))
+    assert doc_id == "a"
+    assert math.isclose(score, expected)
+
+
+def test_replacing_and_removing_documents_updates_statistics(index):
+    index.add_document("1", "apple banana")
+    index.add_document("2", "banana cherry")
+    index.add_document("1", "cherry")
+
+    assert len(index) == 2
+    assert index.search("apple", k=5) == []
+    assert {doc_id for doc_id, _ in index.search("cherry", k=5)} == {"1", "2"}
+
+    index.remove_document("2")
+    assert len(index) == 1
+    assert index.search("banana", k=5) == []
+    df = index.conn.execute("SELECT COUNT(*) FROM bm25_terms").fetchone()[0]
+    assert df == 1
+
+
+def test_index_persists_in_the_database(tmp_path):
+    path = str(tmp_path / "pages.db")
+    conn = sqlite3.connect(path)
+    BM25Index(conn).add_documents([("1", "persistent postings"), ("2", "other words")])
+    conn.close()
+
+    reopened = BM25Index(sqlite3.connect(path))
+    assert len(reopened) == 2
+    assert reopened.search("postings", k=1)[0][0] == "1"
@@ -0,0 +1,109 @@
+import sys
+import os
+import asyncio
+import pytest
+import numpy as np
+from unittest.mock import MagicMock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.utils.embedding_service import EmbeddingService, get_embedding_service
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def model():
+    return FakeModel()
+
+
+def test_encode_reuses_cached_embeddings(model):
+    service = EmbeddingService("fake", loader=lambda name: model)
+
+    first = service.encode(["a", "bb"])
+    second = service.encode(["bb", "ccc", "ccc"])
+
+    assert model.calls == [["a", "bb"], ["ccc"]]
+    assert first.tolist() == [[1.0, 1.0], [2.0, 1.0]]
+    assert second.tolist() == [[2.0, 1.0], [3.0, 1.0], [3.0, 1.0]]
+    assert service.stats()["hits"] == 1
+    assert service.encode([]).shape == (0, 2)
+
+
+@pytest.mark.asyncio
+async def test_aencode_micro_batches_concurrent_requests(model):
+    service = EmbeddingService("fake", loader=lambda name: model, max_wait=0.05)
+
+    results = await asyncio.gather(*[service.aencode(["x" * n]) for n in range(1, 11)])
+
+    assert len(model.calls) == 1
+    assert sorted(model.calls[0]) == sorted("x" * n for n in range(1, 11))
+    assert [r.tolist() for r in results] == [[[float(n), 1.0]] for n in range(1, 11)]
+
+
+@pytest.mark.asyncio
+async def test_aencode_flushes_full_batches_without_waiting(model):
+    service = EmbeddingService("fake", loader=lambda name: model, max_batch_size=4, max_wait=10)
+
+    await asyncio.wait_for(asyncio.gather(*[service.aencode([str(n)]) for n in range(8)]), timeout=5)
+
+    assert [len(call) for call in model.calls] == [4, 4]
+
+
+@pytest.mark.asyncio
+async def test_aencode_propagates_model_errors():
+    broken = MagicMock()
+    broken.encode.side_effect = RuntimeError("out of memory")
+    service = EmbeddingService("broken", loader=lambda name: broken, max_wait=0)
+
+    with pytest.raises(RuntimeError, match="out of memory"):
+        await service.aencode(["text"])
+
+
+def test_get_embedding_service_shares_one_model():
+    loader = MagicMock(return_value=FakeModel())
+
+    first = get_embedding_service("shared-model", loader=loader)
+    second = get_embedding_service("shared-model", loader=loader)
+    first.encode(["a"])
+    second.encode(["b"])
+
+    assert first is second
+    loader.assert_called_once_with("shared-model")
+
+
+def test_encode_honors_sentence_transformer_options(model):
+    service = EmbeddingService("fake", loader=lambda name: model)
+
+    normalized = service.encode(["aaa", ""], normalize_embeddings=True, show_progress_bar=False)
+    single = service.encode("aaa")
+    as_list = service.encode(["a", "bb"], convert_to_numpy=False)
+
+    assert np.allclose(np.linalg.norm(normalized, axis=1), 1.0)
+    assert single.tolist() == [3.0, 1.0]
+    assert isinstance(as_list, list) and as_list[1].tolist() == [2.0, 1.0]
+    # Normalizing the output must not change what is cached
+    assert service.encode(["aaa"]).tolist() == [[3.0, 1.0]]
+    with pytest.raises(TypeError, match="precision"):
+        service.encode(["a"], precision="int8")
+
+
+def test_encode_converts_to_tensor(model, monkeypatch):
+    torch = MagicMock()
+    monkeypatch.setitem(sys.modules, "torch", torch)
+    service = EmbeddingService("fake", loader=lambda name: model)
+
+    tensor = service.encode(["a", "bb"], convert_to_tensor=True)
+
+    assert tensor is torch.from_numpy.return_value
+    assert torch.from_numpy.call_args.args[0].tolist() == [[1.0, 1.0], [2.0, 1.0]]
@@ -0,0 +1,140 @@
+import asyncio
+import importlib.util
+import json
+import os
+
+import httpx
+import pytest
+
+PROXY_MAIN = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..',
+                                          'pipecatapp', 'services', 'ipfs_pypi_proxy', 'main.py'))
+WHEEL = b"wheel-bytes-" * 20000
+
+
+class Upstream:
+    """Stands in for PyPI, files.pythonhosted.org and the IPFS API."""
+    def __init__(self):
+        self.downloads = 0
+        self.index_requests = []
+        self.index_paths = []
+        self.ipfs_adds = 0
+        self.ipfs_body = b""
+        self.release = asyncio.Event()
+
+    async def handler(self, request):
+        if request.url.host == "files.test":
+            self.downloads += 1
+
+            async def body():
+                yield WHEEL[:1000]
+                await self.release.wait()
+                for start in range(1000, len(WHEEL), 65536):
+                    yield WHEEL[start:start + 65536]
+            return httpx.Response(200, content=body(), headers={"content-length": str(len(WHEEL))})
+        if request.url.host == "missing.test":
+            return httpx.Response(404)
+        if request.url.path == "/api/v0/add":
+            self.ipfs_adds += 1
+            self.ipfs_body = await request.aread()
+            return httpx.Response(200, json={"Hash": "QmWheel"})
+        self.index_requests.append(request.headers.get("if-none-match"))
+        self.index_paths.append(request.url.path)
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        files = [{"filename": "demo-1.0-py3-none-any.whl", "url": "https://files.test/demo-1.0-py3-none-any.whl"}]
+        return httpx.Response(200, json={"name": "demo", "files": files}, headers={"etag": '"v1"'})
+
+
+@pytest.fixture
+def proxy(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_PATH", str(tmp_path / "cache.db"))
+    monkeypatch.setenv("CACHE_DIR", str(tmp_path / "files"))
+    monkeypatch.setenv("PROXY_BASE_URL", "http://proxy.test")
+    spec = importlib.util.spec_from_file_location("ipfs_pypi_proxy_main", PROXY_MAIN)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    upstream = Upstream()
+    module._client = httpx.AsyncClient(transport=httpx.MockTransport(upstream.handler))
+    return module, upstream
+
+
+def client_for(module):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=module.app), base_url="http://proxy.test")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_upstream_download(proxy):
+    module, upstream = proxy
+    multipart_file = module._multipart_file
+    upload_chunks = []
+
+    async def recording_multipart_file(*args):
+        async for chunk in multipart_file(*args):
+            upload_chunks.append(chunk)
+            yield chunk
+    module._multipart_file = recording_multipart_file
+    url = "/download/demo-1.0-py3-none-any.whl?source=https://files.test/demo-1.0-py3-none-any.whl"
+    async with client_for(module) as client:
+        requests = [asyncio.create_task(client.get(url)) for _ in range(5)]
+        while not module._downloads or module._downloads["demo-1.0-py3-none-any.whl"].size == 0:
+            await asyncio.sleep(0.01)
+        upstream.release.set()
+        responses = await asyncio.gather(*requests)
+
+        assert [r.status_code for r in responses] == [200] * 5
+        assert all(r.content == WHEEL for r in responses)
+        assert upstream.downloads == 1
+
+        await asyncio.gather(*module._background_tasks)
+        assert upstream.ipfs_adds == 1
+        # The wheel went to IPFS in pieces, not read into memory whole
+        assert WHEEL in upstream.ipfs_body and b'filename="demo-1.0-py3-none-any.whl"' in upstream.ipfs_body
+        assert b"".join(upload_chunks) == upstream.ipfs_body
+        assert max(len(chunk) for chunk in upload_chunks) <= module.CHUNK_SIZE
+        assert module.get_cid_for_filename("demo-1.0-py3-none-any.whl") == "QmWheel"
+        assert os.listdir(module.CACHE_DIR) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_download_is_not_cached(proxy):
+    module, upstream = proxy
+    async with client_for(module) as client:
+        response = await client.get("/download/missing.whl?source=https://missing.test/missing.whl")
+        assert response.status_code == 500
+        assert module._downloads == {}
+        assert os.listdir(module.CACHE_DIR) == []
+
+
+@pytest.mark.asyncio
+async def test_package_index_is_cached_and_revalidated_with_etag(proxy, monkeypatch):
+    module, upstream = proxy
+    async with client_for(module) as client:
+        first, second = await asyncio.gather(client.get("/simple/demo/"), client.get("/simple/demo/"))
+        assert upstream.index_requests == [None]
+        assert first.content == second.content
+        files = json.loads(first.content)["files"]
+        assert files[0]["url"] == ("http://proxy.test/download/demo-1.0-py3-none-any.whl"
+                                   "?source=https://files.test/demo-1.0-py3-none-any.whl")
+
+        not_modified = await client.get("/simple/demo/", headers={"If-None-Match": '"v1"'})
+        assert not_modified.status_code == 304
+
+        # Once the TTL expires the cached index is revalidated rather than refetched
+        monkeypatch.setattr(module, "INDEX_TTL", 0)
+        third = await client.get("/simple/demo/")
+        assert third.content == first.content
+        assert upstream.index_requests == [None, '"v1"']
+
+
+@pytest.mark.asyncio
+async def test_package_index_cache_is_keyed_by_normalized_name_and_bounded(proxy, monkeypatch):
+    module, upstream = proxy
+    monkeypatch.setattr(module, "INDEX_CACHE_SIZE", 2)
+    async with client_for(module) as client:
+        for name in ("Demo_Pkg", "demo.pkg", "DEMO-pkg"):
+            assert (await client.get(f"/simple/{name}/")).status_code == 200
+        assert upstream.index_paths == ["/simple/demo-pkg/"]
+
+        for name in ("other", "third"):
+            await client.get(f"/simple/{name}/")
+        assert list(module._index_cache) == ["other", "third"]
@@ -0,0 +1,31 @@
+import sys
+import os
+import asyncio
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.pmm_memory import PMMMemory
+
+
+@pytest.mark.asyncio
+async def test_backlog_and_live_events_are_delivered_once(tmp_path):
+    memory = PMMMemory(db_path=str(tmp_path / "ledger.db"))
+    await memory.add_event("worker_result", "early", {"task_id": "t1"})
+
+    subscription = await memory.subscribe(kind="worker_result", task_ids=["t1"], include_existing=True)
+    backlog = await subscription.get(timeout=1)
+    # A live notification for an event the backlog already delivered
+    subscription._put([backlog])
+    for n in range(3):
+        await memory.add_event("worker_result", f"live {n}", {"task_id": "t1"})
+
+    received = [(await subscription.get(timeout=1))["content"] for _ in range(3)]
+    assert backlog["content"] == "early"
+    assert received == ["live 0", "live 1", "live 2"]
+    with pytest.raises(asyncio.TimeoutError):
+        await subscription.get(timeout=0.05)
+    # Nothing is remembered per event once the backlog has been replayed
+    assert subscription._seen_ids is None
+    subscription.close()
+    memory.close()
@@ -10,6 +10,7 @@ from unittest.mock import MagicMock, patch, mock_open, AsyncMock, call
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../prompt_engineering')))
 
 import evolve
+import novelty_index
 import run_campaign
 import promote_agent
 import visualize_archive
@@ -70,6 +71,52 @@ class TestEvolve:
 
                             mock_openevolve.run.assert_called_once()
 
+    @staticmethod
+    def write_agents(archive_dir, codes):
+        archive = []
+        for agent_id, code in codes.items():
+            path = archive_dir / f"{agent_id}.py"
+            path.write_text(code)
+            archive.append({"id": agent_id, "path": str(path), "fitness": 0.5})
+        return archive
+
+    def test_novelty_selects_the_outlier_and_reuses_signatures(self, mock_archive):
+        base = "\n".join(f"def step_{i}(x):\n    return x + {i}" for i in range(20))
+        archive = self.write_agents(mock_archive, {
+            "a": base,
+            "b": base + "\nprint('b')",
+            "c": base.replace("step_3", "stage_3"),
+            "outlier": "class Planner:\n    async def plan(self, goal):\n        return [goal.upper()] * 3",
+        })
+
+        assert evolve.select_parent(archive, "novelty", novelty_k=2)["id"] == "outlier"
+        assert (mock_archive / novelty_index.INDEX_FILENAME).exists()
+
+        # Unchanged agents are not re-hashed; a new one is hashed once
+        archive += self.write_agents(mock_archive, {"d": base + "\n# d"})
+        with patch.object(novelty_index.NoveltyIndex, "signature", autospec=True,
+                          side_effect=novelty_index.NoveltyIndex.signature) as signature:
+            assert evolve.select_parent(archive, "novelty", novelty_k=2)["id"] == "outlier"
+        hashed = [call_args.args[1] for call_args in signature.call_args_list if call_args.args[1]]
+        assert hashed == [base + "\n# d"]
+
+    def test_novelty_lsh_matches_exact_scores_on_clustered_archive(self, mock_archive, monkeypatch):
+        codes = {}
+        for family in range(6):
+            body = "\n".join(f"def f{family}_{i}(v):\n    return v * {family} - {i}" for i in range(15))
+            for variant in range(5):
+                codes[f"agent_{family}_{variant}"] = body + f"\nVARIANT = {variant}"
+        codes["loner"] = "import json\nprint(json.dumps({'unique': True}))"
+        archive = self.write_agents(mock_archive, codes)
+
+        index = novelty_index.NoveltyIndex()
+        exact = index.novelty_scores(archive, k=4)
+        monkeypatch.setattr(novelty_index, "EXACT_LIMIT", 0)
+        approximate = index.novelty_scores(archive, k=4)
+
+        assert approximate == pytest.approx(exact, abs=0.05)
+        assert max(range(len(archive)), key=lambda i: approximate[i]) == len(archive) - 1
+
 class TestRunCampaign:
     def test_run_campaign_args(self):
         """Verifies that subprocess.Popen is called with the correct arguments to launch evolve.py."""
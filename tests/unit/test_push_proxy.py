@@ -0,0 +1,98 @@
+import asyncio
+import os
+import socket
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.services.push_proxy import mux
+from pipecatapp.services.push_proxy.client import PushProxyClient
+from pipecatapp.services.push_proxy.server import PushProxyServer
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def echo(reader, writer):
+    while data := await reader.read(65536):
+        writer.write(data)
+        await writer.drain()
+    writer.close()
+
+
+@pytest.fixture
+async def tunnel():
+    service = await asyncio.start_server(echo, "127.0.0.1", 0)
+    service_port = service.sockets[0].getsockname()[1]
+    proxy = PushProxyServer(bind_host="127.0.0.1", bind_port=free_port(), tunnel_port_start=free_port())
+    client = PushProxyClient("127.0.0.1", proxy.bind_port, "worker-1", local_service_port=service_port)
+    tasks = [asyncio.create_task(proxy.start())]
+    await asyncio.sleep(0.1)
+    tasks.append(asyncio.create_task(client.connect_and_serve()))
+    for _ in range(100):
+        if "server" in proxy.active_workers.get("worker-1", {}):
+            break
+        await asyncio.sleep(0.05)
+    yield proxy, service
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    service.close()
+
+
+async def round_trip(port, payload):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(payload)
+    await writer.drain()
+    writer.write_eof()
+    data = await reader.read(-1)
+    writer.close()
+    return data
+
+
+@pytest.mark.asyncio
+async def test_concurrent_connections_share_the_tunnel_without_crosstalk(tunnel):
+    proxy, _ = tunnel
+    port = proxy.active_workers["worker-1"]["tunnel_port"]
+    # Larger than a stream window, so every stream has to wait for window updates
+    payloads = [bytes([i]) * 300_000 + f"end-{i}".encode() for i in range(20)]
+
+    results = await asyncio.wait_for(asyncio.gather(*(round_trip(port, p) for p in payloads)), timeout=30)
+
+    assert results == payloads
+    assert proxy.active_workers["worker-1"]["session"].streams == {}
+
+
+@pytest.mark.asyncio
+async def test_stream_is_reset_when_the_local_service_is_down(tunnel):
+    proxy, service = tunnel
+    port = proxy.active_workers["worker-1"]["tunnel_port"]
+    service.close()
+    await service.wait_closed()
+
+    assert await asyncio.wait_for(round_trip(port, b"hello"), timeout=10) == b""
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("window, length", [(mux.DEFAULT_WINDOW, 2 ** 31), (1024, 2048)])
+async def test_oversized_data_frame_closes_the_tunnel_without_reading_it(window, length):
+    ours, theirs = socket.socketpair()
+    reader, writer = await asyncio.open_connection(sock=ours)
+    peer_reader, peer_writer = await asyncio.open_connection(sock=theirs)
+    session = mux.MuxSession(reader, writer, client=False, on_stream=lambda stream: asyncio.sleep(0), window_size=window)
+    runner = asyncio.create_task(session.run())
+
+    # Opens stream 1, then announces a frame past the frame or window limit and sends none of it
+    peer_writer.write(mux.HEADER.pack(mux.VERSION, mux.TYPE_WINDOW_UPDATE, mux.FLAG_SYN, 1, 0))
+    peer_writer.write(mux.HEADER.pack(mux.VERSION, mux.TYPE_DATA, 0, 1, length))
+    await peer_writer.drain()
+
+    await asyncio.wait_for(runner, timeout=5)
+    assert session.closed and session.streams == {}
+    assert await asyncio.wait_for(peer_reader.read(), timeout=5) == b""
+    peer_writer.close()
@@ -0,0 +1,115 @@
+import sys
+import os
+import types
+import pytest
+import numpy as np
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+faiss = pytest.importorskip("faiss")
+if not isinstance(faiss, types.ModuleType):
+    pytest.skip("faiss is not installed (mocked by conftest)", allow_module_level=True)
+
+from pipecatapp.utils.embedding_service import EmbeddingService
+from pipecatapp.utils.rag_hot_cache import RAGHotCache
+
+
+def _vec(*values):
+    return np.array([values], dtype=np.float32)
+
+
+def test_hot_cache_dedupes_by_chunk_id():
+    cache = RAGHotCache(dimension=2, max_size=10)
+
+    assert cache.add(["a", "b"], ["s", "s"], ["A", "B"], [[0, 0], [1, 1]]) == 2
+    assert cache.add(["a"], ["s"], ["A"], [[0, 0]]) == 0
+    assert len(cache) == 2
+    assert cache.index.ntotal == 2
+
+    # Changed content replaces the entry instead of adding a duplicate
+    assert cache.add(["a"], ["s"], ["A2"], [[0, 0]]) == 1
+    assert cache.index.ntotal == 2
+    assert cache.search(_vec(0, 0), k=1)[0]["content"] == "A2"
+
+
+def test_hot_cache_lru_eviction_and_counters():
+    cache = RAGHotCache(dimension=2, max_size=2, policy="lru")
+    cache.add(["a", "b"], ["s", "s"], ["A", "B"], [[0, 0], [10, 10]])
+
+    assert [r["id"] for r in cache.search(_vec(0, 0), k=1)] == ["a"]
+    cache.add(["c"], ["s"], ["C"], [[20, 20]])
+
+    # "b" was the least recently used
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    assert cache.index.ntotal == 2
+    assert cache.search(_vec(10, 10), k=2) == []
+    assert cache.stats() == {
+        "size": 2, "max_size": 2, "policy": "lru",
+        "hits": 1, "misses": 1, "evictions": 1, "hit_rate": 0.5,
+    }
+
+
+def test_hot_cache_lfu_evicts_least_used():
+    cache = RAGHotCache(dimension=2, max_size=2, policy="lfu")
+    cache.add(["a", "b"], ["s", "s"], ["A", "B"], [[0, 0], [10, 10]])
+    cache.search(_vec(0, 0), k=1)
+    cache.search(_vec(0, 0), k=1)
+    cache.search(_vec(10, 10), k=1)
+    # "a" is now the least recently used but the most frequently used
+    cache.search(_vec(10, 10), k=1)
+    cache.search(_vec(10, 10), k=1)
+    cache.search(_vec(0, 0), k=1)
+    cache.search(_vec(0, 0), k=1)
+
+    cache.add(["c"], ["s"], ["C"], [[20, 20]])
+
+    assert "a" in cache and "b" not in cache and "c" in cache
+
+
+@pytest.mark.asyncio
+async def test_rag_tool_caches_chroma_embeddings_without_reencoding():
+    for name in ("sentence_transformers", "chromadb"):
+        if name not in sys.modules:
+            sys.modules[name] = MagicMock()
+    from pipecatapp.tools import rag_tool
+
+    with patch("threading.Thread"), patch.object(rag_tool, "SentenceTransformer"):
+        tool = rag_tool.RAG_Tool(pmm_memory=MagicMock(), base_dir="/tmp")
+    model = MagicMock()
+    model.encode.return_value = np.array([[0.0, 0.0]], dtype=np.float32)
+    tool.model = EmbeddingService("test-model", loader=lambda name: model, cache_size=0)
+    tool.hot_cache = RAGHotCache(dimension=2, max_size=10)
+    tool.is_ready = True
+
+    collection = tool.chroma_client.get_collection.return_value
+    collection.query.return_value = {
+        "documents": [["doc1", "doc2"]],
+        "metadatas": [[{"source": "/tmp/a.md"}, {"source": "/tmp/b.md"}]],
+        "ids": [["id1", "id2"]],
+        "embeddings": [np.array([[0.1, 0.0], [5.0, 5.0]], dtype=np.float32)],
+    }
+
+    first = await tool.search_knowledge_base("query", k=2)
+    second = await tool.search_knowledge_base("query", k=2)
+
+    assert "embeddings" in collection.query.call_args.kwargs["include"]
+    # Only the two query encodings ran; cached chunks reused Chroma's embeddings
+    assert model.encode.call_count == 2
+    assert collection.query.call_count == 1
+    assert "(Cached)" not in first
+    assert "From /tmp/a.md (Cached)" in second
+    assert tool.cache_stats()["hits"] == 1
+    assert tool.cache_stats()["misses"] == 1
+
+
+def test_hot_cache_batch_larger_than_max_size():
+    cache = RAGHotCache(dimension=2, max_size=2)
+
+    added = cache.add(["a", "b", "c"], ["s"] * 3, ["A", "B", "C"], [[0, 0], [1, 1], [2, 2]])
+
+    assert added == 2
+    assert "a" not in cache and "b" in cache and "c" in cache
+    assert cache.index.ntotal == 2
+    assert cache.stats()["evictions"] == 1
@@ -0,0 +1,133 @@
+import sys
+import os
+import pytest
+import numpy as np
+from unittest.mock import MagicMock, patch
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.utils.rag_manifest import RAGManifest, ManifestEntry
+
+
+def test_manifest_roundtrip_and_scope(tmp_path):
+    manifest = RAGManifest(str(tmp_path / "manifest.sqlite"))
+    manifest.put_many([
+        ManifestEntry("/docs/a.md", 1.0, 10, "h1", ["/docs/a.md_0"]),
+        ManifestEntry("/docs_other/b.md", 2.0, 20, "h2", []),
+        ManifestEntry("/docs/sub/c_1%.md", 3.0, 30, "h3", ["x", "y"]),
+    ])
+    manifest.put_many([ManifestEntry("/docs/a.md", 5.0, 11, "h4", ["/docs/a.md_0", "/docs/a.md_1"])])
+
+    assert manifest.get("/docs/a.md") == ManifestEntry("/docs/a.md", 5.0, 11, "h4", ["/docs/a.md_0", "/docs/a.md_1"])
+    assert set(manifest.entries_under("/docs/")) == {"/docs/a.md", "/docs/sub/c_1%.md"}
+
+    manifest.delete_many(["/docs/a.md"])
+    assert manifest.get("/docs/a.md") is None
+    manifest.close()
+
+
+@pytest.fixture
+def rag_tool(tmp_path):
+    pytest.importorskip("langchain_text_splitters")
+    pytest.importorskip("langchain_community.document_loaders")
+    for name in ("sentence_transformers", "chromadb", "faiss"):
+        if name not in sys.modules:
+            sys.modules[name] = MagicMock()
+    from pipecatapp.tools import rag_tool as rag_tool_module
+
+    with patch("threading.Thread"), patch.object(rag_tool_module, "SentenceTransformer"):
+        tool = rag_tool_module.RAG_Tool(pmm_memory=MagicMock(), base_dir=str(tmp_path))
+    tool.manifest = RAGManifest(str(tmp_path / "manifest.sqlite"))
+    tool.model = MagicMock()
+    tool.model.encode.side_effect = lambda docs, **kwargs: np.zeros((len(docs), 3), dtype=np.float32)
+    return tool
+
+
+def _upserted_ids(collection):
+    return [chunk_id for call in collection.upsert.call_args_list for chunk_id in call.kwargs["ids"]]
+
+
+def test_sync_only_reindexes_changed_files(rag_tool, tmp_path):
+    a, b = tmp_path / "a.md", tmp_path / "b.md"
+    a.write_text("alpha " * 300)
+    b.write_text("beta")
+    collection = MagicMock()
+
+    stats = rag_tool._sync_files(collection, [str(a), str(b)])
+    assert stats == {"indexed": 2, "unchanged": 0, "removed": 0}
+    a_chunks = rag_tool.manifest.get(str(a)).chunk_ids
+    assert len(a_chunks) > 1
+    assert set(_upserted_ids(collection)) == set(a_chunks) | {f"{b}_0"}
+
+    # Nothing changed: no file is read or embedded
+    collection.reset_mock()
+    rag_tool.model.encode.reset_mock()
+    stats = rag_tool._sync_files(collection, [str(a), str(b)])
+    assert stats == {"indexed": 0, "unchanged": 2, "removed": 0}
+    rag_tool.model.encode.assert_not_called()
+
+    # Touched but identical: only the stat is refreshed
+    os.utime(b, (1, 1))
+    stats = rag_tool._sync_files(collection, [str(a), str(b)])
+    assert stats["indexed"] == 0
+    assert rag_tool.manifest.get(str(b)).mtime == 1
+    rag_tool.model.encode.assert_not_called()
+
+    # Edited to fewer chunks: re-embedded, and the leftover chunk ids are deleted
+    a.write_text("alpha")
+    stats = rag_tool._sync_files(collection, [str(a), str(b)])
+    assert stats == {"indexed": 1, "unchanged": 1, "removed": 0}
+    assert _upserted_ids(collection) == [f"{a}_0"]
+    deleted = [chunk_id for call in collection.delete.call_args_list for chunk_id in call.kwargs["ids"]]
+    assert set(deleted) == set(a_chunks) - {f"{a}_0"}
+
+
+def test_sync_purges_removed_files(rag_tool, tmp_path):
+    a = tmp_path / "a.md"
+    a.write_text("alpha")
+    collection = MagicMock()
+    rag_tool._sync_files(collection, [str(a)])
+
+    a.unlink()
+    stats = rag_tool._sync_files(collection, [], [str(a)])
+
+    assert stats["removed"] == 1
+    collection.delete.assert_called_once_with(ids=[f"{a}_0"])
+    assert rag_tool.manifest.get(str(a)) is None
+
+
+def test_sync_retries_files_that_failed_to_load(rag_tool, tmp_path):
+    from pipecatapp.tools import rag_tool as rag_tool_module
+
+    a = tmp_path / "a.md"
+    a.write_text("alpha")
+    collection = MagicMock()
+
+    with patch.object(rag_tool_module, "load_document_cached", side_effect=OSError("busy")):
+        stats = rag_tool._sync_files(collection, [str(a)])
+    assert stats["indexed"] == 0
+    assert rag_tool.manifest.get(str(a)) is None
+
+    stats = rag_tool._sync_files(collection, [str(a)])
+    assert stats == {"indexed": 1, "unchanged": 0, "removed": 0}
+    assert rag_tool.manifest.get(str(a)).chunk_ids == [f"{a}_0"]
+
+
+def test_watch_flush_syncs_changed_and_deleted_files(rag_tool, tmp_path):
+    a, gone = tmp_path / "a.md", tmp_path / "gone.md"
+    gone.write_text("old")
+    collection = rag_tool.chroma_client.get_or_create_collection.return_value
+    rag_tool._sync_files(collection, [str(gone)])
+    gone.unlink()
+    a.write_text("new")
+    rag_tool.is_ready = True
+
+    with patch("threading.Timer"):
+        rag_tool._queue_change(str(a), debounce=0)
+        rag_tool._queue_change(str(gone), debounce=0)
+        rag_tool._queue_change(str(tmp_path / "image.png"), debounce=0)
+    rag_tool._flush_changes()
+
+    assert rag_tool.manifest.get(str(a)) is not None
+    assert rag_tool.manifest.get(str(gone)) is None
+    assert rag_tool._pending_changes == set()
@@ -0,0 +1,91 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.tools.repo_map_impl.cache import TagCache
+from pipecatapp.tools.repo_map_impl.rank import pagerank
+
+
+def dense_pagerank(graph, nodes, teleport, damping=0.85):
+    # Solves r = d * (M r + dangling mass * t) + (1 - d) * t exactly
+    n = len(nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    m = np.zeros((n, n))
+    for src, targets in graph.items():
+        for target in targets:
+            m[index[target], index[src]] = 1.0 / len(targets)
+    dangling = np.array([0.0 if graph.get(node) else 1.0 for node in nodes])
+    t = np.array([teleport.get(node, 0.0) for node in nodes])
+    t = t / t.sum()
+    a = np.eye(n) - damping * (m + np.outer(t, dangling))
+    return dict(zip(nodes, np.linalg.solve(a, (1 - damping) * t)))
+
+
+def test_pagerank_matches_dense_solution_with_personalization():
+    nodes = ["a.py", "b.py", "c.py", "d.py", "e.py"]
+    graph = {"a.py": {"b.py", "c.py"}, "b.py": {"c.py"}, "c.py": {"a.py"}, "e.py": {"c.py", "a.py"}}
+
+    uniform = pagerank(graph, nodes=nodes, tol=1e-12)
+    expected = dense_pagerank(graph, nodes, {node: 1.0 for node in nodes})
+    assert sum(uniform.values()) == pytest.approx(1.0)
+    for node in nodes:
+        assert uniform[node] == pytest.approx(expected[node], abs=1e-9)
+
+    focused = pagerank(graph, nodes=nodes, personalization={"e.py": 2.0, "unknown.py": 5.0}, tol=1e-12)
+    expected = dense_pagerank(graph, nodes, {"e.py": 1.0})
+    for node in nodes:
+        assert focused[node] == pytest.approx(expected[node], abs=1e-9)
+    assert focused["d.py"] == pytest.approx(0.0)
+
+
+def test_tag_cache_validates_by_size_mtime_and_hash(tmp_path):
+    files = [tmp_path / f"mod{i}.py" for i in range(3)]
+    for i, path in enumerate(files):
+        path.write_text(f"def f{i}(): pass\n")
+
+    cache = TagCache(tmp_path / ".repo-map-cache")
+    cache.set_many([(path, {"path": path.name}) for path in files])
+    assert cache.get_many(files) == {path: {"path": path.name} for path in files}
+
+    # Touched without a content change: still valid
+    st = files[0].stat()
+    os.utime(files[0], ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    # Same size, different content
+    files[1].write_text("def g1(): pass\n")
+    # Different size
+    files[2].write_text("def f2(x): return x\n")
+
+    assert cache.get_many(files) == {files[0]: {"path": "mod0.py"}}
+    cache.close()
+
+    reopened = TagCache(tmp_path / ".repo-map-cache")
+    assert reopened.get(files[0]) == {"path": "mod0.py"}
+    reopened.close()
+    # One database, not a file per source file
+    assert all(name.startswith("tags.sqlite") for name in os.listdir(tmp_path / ".repo-map-cache"))
+
+
+def test_extract_all_in_worker_processes_matches_serial(tmp_path):
+    pytest.importorskip("tree_sitter_python")
+    from pipecatapp.tools.repo_map_impl.pipeline import extract_all
+
+    paths = []
+    for i in range(70):
+        path = tmp_path / f"mod{i}.py"
+        path.write_text(f"from mod{max(i - 1, 0)} import helper{max(i - 1, 0)}\n\ndef helper{i}():\n    return {i}\n")
+        paths.append(path)
+
+    def key(fs):
+        return fs.path, sorted((s.name, s.line, s.role, s.kind) for s in fs.symbols), fs.exports
+
+    serial = extract_all(tmp_path, paths, use_cache=False, workers=1)
+    parallel = extract_all(tmp_path, paths, workers=2)
+    assert [key(fs) for fs in parallel] == [key(fs) for fs in serial]
+    assert [fs.path for fs in parallel] == [p.name for p in paths]
+
+    cached = extract_all(tmp_path, paths, workers=2)
+    assert [key(fs) for fs in cached] == [key(fs) for fs in serial]
@@ -0,0 +1,222 @@
+import os
+import sys
+import zipfile
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.tools.sandbox_pool import (
+    DockerSandboxBackend, SandboxPool, SubprocessSandboxBackend, WheelCache, install_kernel_libraries
+)
+
+IMAGE = "python:3.9-slim"
+
+
+class LocalWheelBackend(SubprocessSandboxBackend):
+    """Builds a tiny local wheel instead of downloading one."""
+    def __init__(self):
+        super().__init__()
+        self.builds = []
+
+    def build_wheels(self, image, libraries, wheel_dir):
+        self.builds.append(list(libraries))
+        with zipfile.ZipFile(os.path.join(wheel_dir, "pooltestlib-1.0-py3-none-any.whl"), "w") as whl:
+            whl.writestr("pooltestlib.py", "VALUE = 42\n")
+            whl.writestr("pooltestlib-1.0.dist-info/METADATA", "Metadata-Version: 2.1\nName: pooltestlib\nVersion: 1.0\n")
+            whl.writestr("pooltestlib-1.0.dist-info/WHEEL", "Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n")
+            whl.writestr("pooltestlib-1.0.dist-info/RECORD", "pooltestlib.py,,\npooltestlib-1.0.dist-info/METADATA,,\npooltestlib-1.0.dist-info/WHEEL,,\npooltestlib-1.0.dist-info/RECORD,,\n")
+        return ["pooltestlib-1.0-py3-none-any.whl"]
+
+
+@pytest.fixture
+def backend():
+    return LocalWheelBackend()
+
+
+@pytest.fixture
+def pool(backend, tmp_path):
+    pool = SandboxPool(backend, wheel_cache=WheelCache(str(tmp_path / "wheels")), max_uses=3, min_idle=0)
+    yield pool
+    pool.close()
+
+
+def test_sandboxes_are_reused_and_reset_between_runs(pool):
+    first = pool.run(IMAGE, "open('scratch.txt', 'w').write('x'); print('one')")
+    second = pool.run(IMAGE, "import os; print(os.path.exists('scratch.txt'))")
+
+    assert (first.exit_code, first.stdout) == (0, "one\n")
+    assert second.stdout == "False\n"
+    assert pool.stats() == {"in_use": 0, "idle": {f"{IMAGE} []": 1}, "starting": 0}
+
+    failed = pool.run(IMAGE, "raise SystemExit(3)")
+    assert failed.exit_code == 3
+
+
+def test_sandboxes_are_recycled_after_max_uses_and_when_unhealthy(pool, backend):
+    handles = []
+    for _ in range(4):
+        sandbox = pool.acquire(IMAGE)
+        handles.append(sandbox.handle)
+        pool.release(sandbox)
+    # Three uses, then a fresh sandbox
+    assert handles[0] == handles[1] == handles[2] != handles[3]
+    assert not os.path.exists(handles[0])
+
+    backend.destroy(handles[3])
+    sandbox = pool.acquire(IMAGE)
+    assert sandbox.handle != handles[3]
+    pool.release(sandbox)
+
+
+def test_timed_out_sandbox_is_destroyed(pool):
+    sandbox = pool.acquire(IMAGE)
+    handle = sandbox.handle
+    pool.release(sandbox)
+
+    result = pool.run(IMAGE, "import time; time.sleep(30)", timeout=1)
+
+    assert result.timed_out
+    assert not os.path.exists(handle)
+    assert pool.stats()["idle"][f"{IMAGE} []"] == 0
+
+
+def test_library_sets_are_built_once_and_kept_warm(backend, tmp_path):
+    pool = SandboxPool(backend, wheel_cache=WheelCache(str(tmp_path / "wheels")), min_idle=1)
+    try:
+        result = pool.run(IMAGE, "import pooltestlib; print(pooltestlib.VALUE)", libraries=["pooltestlib"])
+        assert result.stdout == "42\n"
+        assert pool.run(IMAGE, "import pooltestlib", libraries=["pooltestlib"]).exit_code == 0
+        # Sandboxes for another library set do not see it
+        assert pool.run(IMAGE, "import pooltestlib").exit_code != 0
+        assert backend.builds == [["pooltestlib"]]
+
+        # Restarting with the same cache needs no new build
+        other = SandboxPool(backend, wheel_cache=WheelCache(str(tmp_path / "wheels")), min_idle=0)
+        assert other.run(IMAGE, "import pooltestlib", libraries=["pooltestlib"]).exit_code == 0
+        other.close()
+        assert len(backend.builds) == 1
+    finally:
+        pool.close()
+
+
+def test_library_directory_is_restored_between_runs(pool):
+    tamper = (
+        "import os; site = os.environ['PYTHONPATH']\n"
+        "open(os.path.join(site, 'planted.py'), 'w').write('X = 1')\n"
+        "open(os.path.join(site, 'pooltestlib.py'), 'w').write('VALUE = 0')\n"
+    )
+    assert pool.run(IMAGE, tamper, libraries=["pooltestlib"]).exit_code == 0
+
+    check = pool.run(IMAGE, "import importlib.util, pooltestlib; print(pooltestlib.VALUE, importlib.util.find_spec('planted'))",
+                     libraries=["pooltestlib"])
+    assert check.stdout == "42 None\n"
+    assert pool.stats()["idle"][f"{IMAGE} ['pooltestlib']"] == 1
+
+
+def test_a_build_only_contributes_its_reported_wheels_to_its_own_set(backend, tmp_path):
+    class PlantingBackend(LocalWheelBackend):
+        def build_wheels(self, image, libraries, wheel_dir):
+            wheels = super().build_wheels(image, libraries, wheel_dir)
+            # What a malicious sdist's build code might leave behind
+            open(os.path.join(wheel_dir, "numpy-99.0-py3-none-any.whl"), "w").write("not a wheel")
+            return wheels
+
+    cache = WheelCache(str(tmp_path / "wheels"))
+    planted = cache.ensure(PlantingBackend(), IMAGE, ["pooltestlib"])
+    other = cache.ensure(backend, IMAGE, ["pooltestlib", "numpy"])
+
+    assert os.listdir(planted) == ["pooltestlib-1.0-py3-none-any.whl"]
+    assert planted != other and not os.path.exists(os.path.join(other, "numpy-99.0-py3-none-any.whl"))
+    # Nothing is left at the top of the cache for an install to pick up
+    assert sorted(os.listdir(cache.path)) == ["sets"]
+
+
+@pytest.mark.asyncio
+async def test_library_specifiers_cannot_inject_pip_options(pool):
+    with pytest.raises(ValueError):
+        pool.run(IMAGE, "print(1)", libraries=["--index-url=http://evil.example/simple", "requests"])
+
+    async def run_code(code, timeout):
+        raise AssertionError("pip must not run")
+
+    error = await install_kernel_libraries(run_code, ["-e/tmp/pkg"], set())
+    assert error.startswith("Error: Invalid library specifier")
+
+
+class FakeContainer:
+    def __init__(self):
+        self.execs = []
+        self.status = "running"
+
+    def exec_run(self, cmd, **kwargs):
+        self.execs.append((cmd, kwargs))
+        return SimpleNamespace(exit_code=0, output=(b"", b"") if kwargs.get("demux") else b"")
+
+    def top(self):
+        return {"Processes": [["1", "tini"], ["7", "sleep"]]}
+
+
+def test_docker_runs_code_as_a_user_that_cannot_change_installed_libraries():
+    container = FakeContainer()
+    started = {}
+    client = SimpleNamespace(containers=SimpleNamespace(run=lambda image, **kwargs: started.update(kwargs) or container))
+    backend = DockerSandboxBackend(client)
+
+    handle = backend.start(IMAGE, ["pooltestlib"], "/wheels")
+    backend.run(handle, "print(1)", 5)
+    assert backend.reset(handle)
+
+    # Root-owned, not world-writable: only the installer can write the libraries
+    assert "mode=755" in started["tmpfs"]["/sandbox"]
+    install, run, reset = container.execs
+    assert install[1]["user"] == "root"
+    assert run[1]["user"] == reset[1]["user"] == "65534:65534"
+    assert "/dev/shm/*" in reset[0][-1] and "/tmp/*" in reset[0][-1]
+
+
+@pytest.mark.asyncio
+async def test_kernel_libraries_are_recorded_only_when_pip_succeeds():
+    exit_codes = [1, 0]
+    ran = []
+
+    async def run_code(code, timeout):
+        ran.append(code)
+        status = exit_codes.pop(0)
+        return f"__sandbox_pip_exit__ {status}\n" + ("ERROR: No matching distribution\n" if status else "")
+
+    installed = {"numpy"}
+    error = await install_kernel_libraries(run_code, ["numpy", "pandas"], installed)
+    assert "Failed to install ['pandas']" in error and "No matching distribution" in error
+    assert installed == {"numpy"}
+
+    assert await install_kernel_libraries(run_code, ["numpy", "pandas"], installed) is None
+    assert installed == {"numpy", "pandas"}
+    assert await install_kernel_libraries(run_code, ["pandas"], installed) is None
+    assert len(ran) == 2
+
+
+@pytest.mark.asyncio
+async def test_code_runner_checks_history_before_acquiring_a_sandbox(tmp_path, monkeypatch):
+    monkeypatch.setenv("SANDBOX_POOL", "subprocess")
+    monkeypatch.setenv("SANDBOX_WHEEL_CACHE", str(tmp_path / "wheels"))
+    monkeypatch.setenv("SANDBOX_EXECUTOR", "docker")
+    from pipecatapp.tools.code_runner_tool import CodeRunnerTool
+
+    runner = CodeRunnerTool()
+    runner.history.db_path = str(tmp_path / "history.db")
+    runner.history._init_db()
+    pool = runner.executor.pool
+    acquired = []
+    original_acquire = pool.acquire
+    monkeypatch.setattr(pool, "acquire", lambda *args, **kwargs: acquired.append(args) or original_acquire(*args, **kwargs))
+    try:
+        assert await runner.run_python_code("print(6 * 7)") == "42\n"
+        assert await runner.run_python_code("print(6 * 7)") == "42\n"
+        assert len(acquired) == 1
+
+        assert await runner.run_code_in_sandbox("print('sandboxed')") == "sandboxed\n"
+        assert "timed out" in await runner.run_code_in_sandbox("while True: pass", timeout=1)
+    finally:
+        pool.close()
@@ -0,0 +1,156 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from pipecatapp.service_discovery import ServiceDiscovery, get_service_discovery
+
+
+def _consul_response(instances, index=None):
+    resp = MagicMock()
+    resp.raise_for_status.return_value = None
+    resp.json.return_value = [{"Service": {"Address": address, "Port": port}} for address, port in instances]
+    resp.headers = {"X-Consul-Index": str(index)} if index is not None else {}
+    return resp
+
+
+@pytest.fixture
+def mock_http():
+    with patch("pipecatapp.service_discovery.httpx.AsyncClient") as mock_client_cls, \
+         patch("pipecatapp.service_discovery.secret_manager") as mock_secrets:
+        mock_secrets.get_secret.return_value = None
+        client = AsyncMock()
+        mock_client_cls.return_value.__aenter__.return_value = client
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_resolve_caches_within_ttl(mock_http):
+    mock_http.get.return_value = _consul_response([("10.0.0.1", 8080)])
+    discovery = ServiceDiscovery("http://consul:8500", ttl=60)
+
+    first = await discovery.resolve("rpc-main")
+    second = await discovery.resolve("rpc-main")
+
+    assert [i.key for i in first] == ["10.0.0.1:8080"]
+    assert second is first
+    mock_http.get.assert_awaited_once_with("http://consul:8500/v1/health/service/rpc-main?passing")
+
+
+@pytest.mark.asyncio
+async def test_resolve_refreshes_after_ttl(mock_http):
+    mock_http.get.side_effect = [
+        _consul_response([("10.0.0.1", 8080)]),
+        _consul_response([("10.0.0.2", 8080)]),
+    ]
+    discovery = ServiceDiscovery("http://consul:8500", ttl=0)
+
+    await discovery.resolve("rpc-main")
+    refreshed = await discovery.resolve("rpc-main")
+
+    assert [i.key for i in refreshed] == ["10.0.0.2:8080"]
+    assert mock_http.get.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_lease_balances_by_outstanding_requests(mock_http):
+    mock_http.get.return_value = _consul_response([("10.0.0.1", 8080), ("10.0.0.2", 8080)])
+    discovery = ServiceDiscovery("http://consul:8500", ttl=60)
+
+    async with discovery.lease("rpc-main") as first:
+        async with discovery.lease("rpc-main") as second:
+            assert first.instance.key != second.instance.key
+            assert first.instance.outstanding == 1
+            assert second.instance.outstanding == 1
+    assert first.instance.outstanding == 0
+    assert second.instance.outstanding == 0
+
+
+@pytest.mark.asyncio
+async def test_lease_yields_none_without_passing_instances(mock_http):
+    mock_http.get.return_value = _consul_response([])
+    discovery = ServiceDiscovery("http://consul:8500", ttl=60)
+
+    async with discovery.lease("rpc-missing") as upstream:
+        assert upstream is None
+
+
+@pytest.mark.asyncio
+async def test_blocking_query_keeps_cache_current(mock_http):
+    changed = asyncio.Event()
+
+    async def blocking_get(url, **kwargs):
+        if "params" not in kwargs:
+            return _consul_response([("10.0.0.1", 8080)], index=5)
+        if kwargs["params"]["index"] == 5:
+            return _consul_response([("10.0.0.3", 8080)], index=6)
+        changed.set()
+        await asyncio.sleep(3600)
+
+    mock_http.get.side_effect = blocking_get
+    discovery = ServiceDiscovery("http://consul:8500", ttl=0)
+
+    await discovery.resolve("rpc-main")
+    await asyncio.wait_for(changed.wait(), timeout=1)
+
+    # The cache was updated by the watch, so no synchronous lookup is needed
+    instances = await discovery.resolve("rpc-main")
+    assert [i.key for i in instances] == ["10.0.0.3:8080"]
+    await discovery.aclose()
+
+
+@pytest.mark.asyncio
+async def test_blocking_query_keeps_its_index_when_the_wait_times_out(mock_http):
+    indexes = []
+    done = asyncio.Event()
+
+    async def blocking_get(url, **kwargs):
+        if "params" not in kwargs:
+            return _consul_response([("10.0.0.1", 8080)], index=5)
+        indexes.append(kwargs["params"]["index"])
+        if len(indexes) == 3:
+            done.set()
+            await asyncio.sleep(3600)
+        # Nothing changed before the wait ran out
+        return _consul_response([("10.0.0.1", 8080)], index=5)
+
+    mock_http.get.side_effect = blocking_get
+    discovery = ServiceDiscovery("http://consul:8500", ttl=60)
+
+    await discovery.resolve("rpc-main")
+    await asyncio.wait_for(done.wait(), timeout=1)
+
+    assert indexes == [5, 5, 5]
+    await discovery.aclose()
+
+
+@pytest.mark.asyncio
+async def test_cache_expires_while_the_blocking_query_is_failing(mock_http):
+    watch_failed = asyncio.Event()
+    lookups = []
+
+    async def get(url, **kwargs):
+        if "params" in kwargs:
+            watch_failed.set()
+            raise httpx.ConnectError("connection refused")
+        lookups.append(url)
+        return _consul_response([("10.0.0.1", 8080)], index=5)
+
+    mock_http.get.side_effect = get
+    discovery = ServiceDiscovery("http://consul:8500", ttl=0)
+
+    await discovery.resolve("rpc-main")
+    await asyncio.wait_for(watch_failed.wait(), timeout=1)
+    await asyncio.sleep(0)
+
+    # The watch is backing off, so the entry is only trusted for the TTL
+    await discovery.resolve("rpc-main")
+    assert len(lookups) == 2
+    await discovery.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_service_discovery_is_shared_per_address():
+    assert get_service_discovery("http://consul:8500") is get_service_discovery("http://consul:8500")
+    assert get_service_discovery("http://consul:8500") is not get_service_discovery("http://other:8500")
@@ -0,0 +1,202 @@
+import sys
+import json
+import os
+import time
+import threading
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.shard_outbox import EventSpool, ShardOutbox, ShardRejectedError
+from pipecatapp.sharded_router import ShardedPMMMemoryRouter
+
+
+class FakeShard:
+    """An httpx transport handler standing in for a remote node's batch endpoint."""
+    def __init__(self):
+        self.batches = []
+        self.status = 200
+        self.down = False
+        self.delay = 0.002
+        self.lock = threading.Lock()
+        self.in_flight = []
+        self.overlapping_sessions = set()
+        self.max_parallel = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        if self.down:
+            raise httpx.ConnectError("connection refused", request=request)
+        if self.status != 200:
+            return httpx.Response(self.status, request=request)
+        events = json.loads(request.content)["events"]
+        sessions = {event["session_id"] for event in events}
+        with self.lock:
+            for other in self.in_flight:
+                self.overlapping_sessions |= sessions & other
+            self.in_flight.append(sessions)
+            self.max_parallel = max(self.max_parallel, len(self.in_flight))
+        time.sleep(self.delay)
+        results = [{"status": "ok"} if event["content"] else {"status": "error", "detail": "empty content"}
+                   for event in events]
+        with self.lock:
+            self.in_flight.remove(sessions)
+            self.batches.append([event for event in events if event["content"]])
+        return httpx.Response(200, json={"status": "success", "count": len(self.batches[-1]), "results": results})
+
+    @property
+    def delivered(self):
+        return [event["content"] for batch in self.batches for event in batch]
+
+
+@pytest.fixture
+def shard_and_outbox(tmp_path):
+    shard = FakeShard()
+    client = httpx.Client(transport=httpx.MockTransport(shard))
+    spool = EventSpool(str(tmp_path / "spool.db"))
+    outbox = ShardOutbox("node_1", "http://node-1", spool, client, batch_size=64,
+                         max_retries=1, retry_backoff=0.001, replay_interval=0.05)
+    yield shard, outbox, spool
+    outbox.close()
+    spool.close()
+    client.close()
+
+
+def _event(i, session="s"):
+    return {"session_id": session, "kind": "msg", "content": f"event {i}", "meta": {"session_id": session}}
+
+
+def test_concurrent_writes_are_coalesced(shard_and_outbox):
+    shard, outbox, _ = shard_and_outbox
+
+    def writer(start):
+        for i in range(start, start + 50):
+            outbox.submit([_event(i)]).result()
+
+    threads = [threading.Thread(target=writer, args=(n * 50,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(shard.delivered) == sorted(f"event {i}" for i in range(400))
+    assert len(shard.batches) < 400
+    assert max(len(batch) for batch in shard.batches) <= 64
+
+
+def test_a_session_has_one_batch_in_flight(shard_and_outbox):
+    shard, outbox, _ = shard_and_outbox
+    shard.delay = 0.01
+    sessions = [f"s{n}" for n in range(4)]
+
+    futures = []
+    for i in range(200):
+        # Keep the queue busy so batches pile up behind sessions in flight
+        futures.append(outbox.submit([_event(i, sessions[i % 4])]))
+        if i % 10 == 0:
+            time.sleep(0.002)
+    for future in futures:
+        future.result(timeout=10)
+
+    assert shard.overlapping_sessions == set()
+    assert shard.max_parallel > 1
+    for n, session in enumerate(sessions):
+        delivered = [event["content"] for batch in shard.batches for event in batch if event["session_id"] == session]
+        assert delivered == [f"event {i}" for i in range(n, 200, 4)]
+
+
+def test_unreachable_shard_spools_and_replays_in_order(shard_and_outbox):
+    shard, outbox, spool = shard_and_outbox
+    shard.down = True
+
+    for i in range(5):
+        outbox.submit([_event(i)]).result(timeout=5)
+    assert outbox.spooling
+    assert spool.count("node_1") == 5
+
+    shard.down = False
+    outbox.submit([_event(5)]).result(timeout=5)
+    deadline = time.time() + 5
+    while (outbox.spooling or spool.count("node_1")) and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert spool.count("node_1") == 0
+    assert shard.delivered == [f"event {i}" for i in range(6)]
+
+
+def test_rejected_batch_raises(shard_and_outbox):
+    shard, outbox, spool = shard_and_outbox
+    shard.status = 400
+
+    with pytest.raises(httpx.HTTPStatusError):
+        outbox.submit([_event(0)]).result(timeout=5)
+    assert spool.count() == 0
+
+
+def test_throttled_shard_keeps_events_in_the_spool(shard_and_outbox):
+    shard, outbox, spool = shard_and_outbox
+    shard.status = 429
+
+    outbox.submit([_event(0)]).result(timeout=5)
+    outbox.submit([_event(1)]).result(timeout=5)
+    assert outbox.spooling
+    time.sleep(0.15)  # replays while throttled must not discard anything
+    assert spool.count("node_1") == 2
+
+    shard.status = 200
+    deadline = time.time() + 5
+    while (outbox.spooling or spool.count("node_1")) and time.time() < deadline:
+        time.sleep(0.01)
+    assert shard.delivered == ["event 0", "event 1"]
+
+
+def test_invalid_event_fails_only_its_own_submission(shard_and_outbox):
+    shard, outbox, spool = shard_and_outbox
+    shard.delay = 0.02
+
+    first = outbox.submit([_event(0, "a")])
+    # Queued behind the first batch, so these three go out together
+    good = outbox.submit([_event(1, "b")])
+    bad = outbox.submit([_event(2, "c"), {**_event(3, "c"), "content": ""}])
+    other = outbox.submit([_event(4, "d")])
+
+    for future in (first, good, other):
+        future.result(timeout=5)
+    with pytest.raises(ShardRejectedError) as excinfo:
+        bad.result(timeout=5)
+    assert [event["session_id"] for event, _ in excinfo.value.rejected] == ["c"]
+    assert sorted(shard.delivered) == ["event 0", "event 1", "event 2", "event 4"]
+
+    # A spooled invalid event is dropped on replay without taking its batch with it
+    shard.down = True
+    outbox.submit([{**_event(5), "content": ""}, _event(6)]).result(timeout=5)
+    shard.down = False
+    deadline = time.time() + 5
+    while (outbox.spooling or spool.count("node_1")) and time.time() < deadline:
+        time.sleep(0.01)
+    assert spool.count("node_1") == 0
+    assert shard.delivered[-1] == "event 6"
+
+
+def test_router_spools_instead_of_writing_to_coordinator(tmp_path):
+    config = {
+        "sharding": {
+            "coordinator_node": "node_0",
+            "spool_path": str(tmp_path / "spool.db"),
+            "max_retries": 0,
+            "nodes": {
+                "node_0": {"sqlite_path": str(tmp_path / "node_0.db")},
+                # Nothing listens on the discard port, so the node is unreachable
+                "node_1": {"api_url": "http://127.0.0.1:9"},
+            }
+        }
+    }
+    router = ShardedPMMMemoryRouter(config=config, local_node_id="node_0")
+    try:
+        session = next(f"session_{i}" for i in range(1000) if router.get_shard_for_session(f"session_{i}") == "node_1")
+
+        assert router.add_event_sync(session_id=session, kind="user_message", content="hello") == "node_1"
+        assert router.local_memories["node_0"].get_events_sync(limit=10) == []
+        assert router._get_spool().count("node_1") == 1
+    finally:
+        router.close()
@@ -1,6 +1,7 @@
 import pytest
 import os
 import asyncio
+import time
 import tempfile
 import httpx
 from typing import Dict, Any
@@ -405,3 +406,102 @@ async def test_http_mesh_routing_and_endpoints(mock_httpx_mesh, monkeypatch):
         app.state.memory_router = None
         router.close()
         temp_dir.cleanup()
+
+
+def test_session_events_are_filtered_in_sql(temp_sharded_router_and_files):
+    """A session's history is returned in full even when its shard is busy with other sessions."""
+    router, _, _, _ = temp_sharded_router_and_files
+    node = router.add_event_sync(session_id="quiet_session", kind="user_message", content="only message")
+    busy = [f"busy_{i}" for i in range(200) if router.get_shard_for_session(f"busy_{i}") == node]
+    for sess in busy[:20]:
+        for n in range(5):
+            router.add_event_sync(session_id=sess, kind="user_message", content=f"{sess} {n}")
+
+    retrieved = router.get_events_sync(session_id="quiet_session", limit=5)
+    assert [e["content"] for e in retrieved] == ["only message"]
+    assert len(router.get_events_sync(session_id=busy[0], limit=3)) == 3
+
+
+def test_weighted_ring_and_pluggable_placement():
+    """Weights scale a node's share of keys, and each algorithm is stable under lookups."""
+    from collections import Counter
+    from pipecatapp.sharded_router import JumpHash, create_hash_ring
+
+    ring = HashRing(shards=["big", "small"], replica_count=64, hash_function="blake2b", weights={"big": 3})
+    shares = Counter(ring.get_shard(f"session_{i}") for i in range(4000))
+    assert shares["big"] > 2 * shares["small"]
+
+    jump = create_hash_ring("jump_hash", shards=["a", "b", "c"])
+    assert isinstance(jump, JumpHash)
+    before = {f"k{i}": jump.get_shard(f"k{i}") for i in range(3000)}
+    jump.add_shard("d")
+    after = {key: jump.get_shard(key) for key in before}
+    # Only keys taken over by the new shard move
+    assert all(after[key] in (before[key], "d") for key in before)
+    assert 0 < sum(1 for key in before if after[key] == "d") < 1500
+
+    with pytest.raises(ValueError):
+        create_hash_ring("round_robin", shards=["a"])
+
+
+def _wait_for_rebalance(router, timeout=10):
+    deadline = time.time() + timeout
+    while router.rebalancer.running and time.time() < deadline:
+        time.sleep(0.01)
+    return router.rebalance_status()
+
+
+def _single_node_config(temp_dir):
+    return {
+        "sharding": {
+            "replica_count": 32,
+            "coordinator_node": "node_0",
+            "rebalance_rate": 0,
+            "nodes": {"node_0": {"sqlite_path": os.path.join(temp_dir, "node_0.db")}}
+        }
+    }
+
+
+def test_add_node_moves_only_reowned_sessions(tmp_path):
+    router = ShardedPMMMemoryRouter(config=_single_node_config(str(tmp_path)), local_node_id="node_0")
+    try:
+        sessions = [f"sess_{i}" for i in range(20)]
+        for sess in sessions:
+            for n in range(3):
+                router.add_event_sync(session_id=sess, kind="user_message", content=f"{sess} #{n}")
+        originals = {sess: router.get_events_sync(session_id=sess, limit=10) for sess in sessions}
+
+        router.add_node("node_1", {"sqlite_path": str(tmp_path / "node_1.db")})
+        status = _wait_for_rebalance(router)
+
+        moved = [sess for sess in sessions if router.get_shard_for_session(sess) == "node_1"]
+        assert moved and status["state"] == "done"
+        assert status["sessions_moved"] == len(moved)
+        assert status["events_moved"] == 3 * len(moved)
+        for sess in sessions:
+            events = router.get_events_sync(session_id=sess, limit=10)
+            assert [e["content"] for e in events] == [e["content"] for e in originals[sess]]
+            assert [e["timestamp"] for e in events] == [e["timestamp"] for e in originals[sess]]
+
+        # A second pass over the same topology has nothing left to move
+        router.rebalancer.start(router.topology_fingerprint())
+        assert _wait_for_rebalance(router)["events_moved"] == 0
+    finally:
+        router.close()
+
+
+def test_topology_change_across_restart_triggers_rebalance(tmp_path):
+    config = _single_node_config(str(tmp_path))
+    router = ShardedPMMMemoryRouter(config=config, local_node_id="node_0")
+    for i in range(20):
+        router.add_event_sync(session_id=f"sess_{i}", kind="user_message", content=f"hello {i}")
+    router.close()
+
+    config["sharding"]["nodes"]["node_1"] = {"sqlite_path": str(tmp_path / "node_1.db")}
+    router = ShardedPMMMemoryRouter(config=config, local_node_id="node_0")
+    try:
+        status = _wait_for_rebalance(router)
+        assert status["state"] == "done" and status["sessions_moved"] > 0
+        assert router.local_memories["node_1"].get_events_sync(limit=50)
+    finally:
+        router.close()
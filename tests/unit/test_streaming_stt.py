@@ -0,0 +1,87 @@
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.streaming_stt import StreamingTranscriber, agreed_prefix
+
+SAMPLE_RATE = 16000
+WORDS = "turn on the lights in the kitchen and set the oven to two hundred degrees".split()
+
+
+def record(words):
+    # Each word is 0.4 s of a constant sample value, followed by 0.1 s of silence
+    samples = []
+    for i in range(words):
+        samples.append(np.full(6400, 100 * (i + 1), dtype=np.int16))
+        samples.append(np.zeros(1600, dtype=np.int16))
+    return np.concatenate(samples).tobytes()
+
+
+class StubModel:
+    """Recognizes the runs written by `record`; a run cut off by the window end is misheard."""
+    def __init__(self):
+        self.windows = []
+
+    def __call__(self, pcm, prompt):
+        audio = np.frombuffer(pcm, dtype=np.int16)
+        self.windows.append(len(audio) / SAMPLE_RATE)
+        edges = np.flatnonzero(np.diff(audio)) + 1
+        words = []
+        for start, end in zip(np.concatenate(([0], edges)), np.concatenate((edges, [len(audio)]))):
+            if audio[start] == 0 or end - start < 320:
+                continue
+            text = WORDS[audio[start] // 100 - 1]
+            if end - start < 6400:
+                text = text[:1] + "?"
+            words.append((start / SAMPLE_RATE, end / SAMPLE_RATE, text))
+        return words
+
+
+async def feed_all(transcriber, pcm):
+    for offset in range(0, len(pcm), 640):
+        transcriber.feed(pcm[offset:offset + 640])
+        # Let any decode step run to completion before more audio arrives
+        while transcriber._decode_task is not None:
+            await asyncio.sleep(0.001)
+
+
+def test_agreed_prefix_ignores_case_and_punctuation():
+    previous = [(0, 1, "Turn"), (1, 2, "on"), (2, 3, "th?")]
+    current = [(0, 1, "turn"), (1, 2, "on,"), (2, 3, "the")]
+    assert agreed_prefix(previous, current) == 2
+
+
+@pytest.mark.asyncio
+async def test_streaming_commits_agreed_words_and_decodes_only_the_tail():
+    model = StubModel()
+    interims = []
+
+    async def on_interim(text):
+        interims.append(text)
+
+    transcriber = StreamingTranscriber(model, on_interim, sample_rate=SAMPLE_RATE, step_seconds=1.0)
+    await feed_all(transcriber, record(len(WORDS)))
+
+    assert len(transcriber.committed) > len(WORDS) // 2
+    # Interim transcripts grow as the user speaks
+    assert interims[0].startswith("turn") and len(interims) >= 5
+
+    final = await transcriber.finish()
+    assert final == " ".join(WORDS)
+    # No window, including the final one, covered the whole 7.5 s utterance
+    assert max(model.windows) < 3.0
+    assert transcriber.committed == [] and not transcriber.pcm
+
+
+@pytest.mark.asyncio
+async def test_short_utterance_is_decoded_at_end_of_speech():
+    model = StubModel()
+    transcriber = StreamingTranscriber(model, sample_rate=SAMPLE_RATE, step_seconds=1.0)
+    transcriber.feed(record(1))
+    assert await transcriber.finish() == "turn"
+    assert model.windows == [0.5]
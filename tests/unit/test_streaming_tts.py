@@ -0,0 +1,72 @@
+import asyncio
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.streaming_tts import IncrementalSynthesizer, split_chunks
+
+
+def test_split_chunks_waits_for_sentence_boundaries():
+    chunks, rest = split_chunks("Hello there, how are you doing today? I am fine. The value is 3.", first=False)
+    assert chunks == ["Hello there, how are you doing today?"]
+    # "I am fine." is too short to stand alone, and the last sentence may continue ("3.14")
+    assert rest == "I am fine. The value is 3."
+
+    # The first chunk of a response is cut early at a clause boundary
+    chunks, rest = split_chunks("Well, after thinking about it for a while, the answer is", first=True)
+    assert chunks == ["Well, after thinking about it for a while,"]
+    assert rest == "the answer is"
+
+    chunks, rest = split_chunks("word " * 100)
+    assert all(len(chunk) <= 240 for chunk in chunks) and len(chunks) == 2
+
+
+@pytest.mark.asyncio
+async def test_chunks_are_emitted_in_order_as_soon_as_ready():
+    emitted = []
+
+    def synthesize(text):
+        # Later chunks finish first; they must still be played in order
+        time.sleep(0.1 if text.startswith("First") else 0.01)
+        return text.encode()
+
+    async def on_audio(pcm):
+        emitted.append((pcm.decode(), time.perf_counter()))
+
+    synth = IncrementalSynthesizer(synthesize, on_audio, max_workers=2)
+    started = time.perf_counter()
+    for token in "First sentence is here. Second sentence follows. Third one".split(" "):
+        synth.feed(token + " ")
+    await synth.finish()
+    synth.close()
+
+    assert [text for text, _ in emitted] == ["First sentence is here.", "Second sentence follows.", "Third one"]
+    # The second chunk was synthesized while the first one still was
+    assert emitted[-1][1] - started < 0.2
+
+
+@pytest.mark.asyncio
+async def test_cancel_drops_unspoken_audio():
+    emitted = []
+
+    def synthesize(text):
+        time.sleep(0.05)
+        return text.encode()
+
+    async def on_audio(pcm):
+        emitted.append(pcm.decode())
+
+    synth = IncrementalSynthesizer(synthesize, on_audio, max_workers=1)
+    synth.feed("This is the first sentence. This is the second sentence. This is the third sentence. ")
+    finishing = asyncio.create_task(synth.finish())
+    await asyncio.sleep(0.07)
+    synth.cancel()
+    await asyncio.wait_for(finishing, 1)
+    await asyncio.sleep(0.15)
+    synth.close()
+
+    assert emitted == ["This is the first sentence."]
@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import sys
+import textwrap
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.swarm_pool import WarmWorkerPool
+from pipecatapp.tools import swarm_tool
+from pipecatapp.tools.swarm_tool import SwarmTool
+
+AGENTS = textwrap.dedent("""
+    import asyncio
+    import os
+    import sys
+
+    class EchoAgent:
+        kind = "echo"
+
+        def __init__(self):
+            self.task_id = os.environ["WORKER_TASK_ID"]
+            self.prompt = os.environ["WORKER_PROMPT"]
+
+        async def run(self):
+            if self.prompt == "sleep":
+                await asyncio.sleep(60)
+            with open(os.path.join(os.environ["POOL_TEST_DIR"], self.task_id), "w") as f:
+                f.write(f"{self.kind} {os.getpid()} {self.prompt} {os.environ.get('WORK_ITEM_ID')}")
+            if self.prompt == "fail":
+                sys.exit(1)
+            if self.prompt == "flood":
+                # One line longer than the pool's stream limit
+                print("x" * 200_000, flush=True)
+
+    class ShoutAgent(EchoAgent):
+        kind = "shout"
+""")
+
+
+@pytest.fixture
+def pool_env(tmp_path):
+    (tmp_path / "pool_test_agents.py").write_text(AGENTS)
+    out = tmp_path / "out"
+    out.mkdir()
+    env = {"PYTHONPATH": str(tmp_path), "POOL_TEST_DIR": str(out)}
+    classes = {"worker": "pool_test_agents:EchoAgent", "technician": "pool_test_agents:ShoutAgent"}
+    return env, classes, out
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_warm_processes_by_agent_type(pool_env):
+    env, classes, out = pool_env
+    pool = WarmWorkerPool(min_size=1, max_size=2, agent_classes=classes, env=env)
+    try:
+        first = pool.submit({"id": "a", "prompt": "hi", "work_item_id": "w1"})
+        assert await pool.wait(first, timeout=30) == "success"
+
+        started = time.monotonic()
+        second = pool.submit({"id": "b", "prompt": "fail"})
+        assert await pool.wait(second, timeout=30) == "failed"
+        assert time.monotonic() - started < 1.0
+
+        tech = pool.submit({"id": "c", "prompt": "plan"}, agent_type="technician")
+        assert await pool.wait(tech, timeout=30) == "success"
+
+        kind_a, pid_a, _, item_a = (out / "a").read_text().split()
+        kind_b, pid_b, _, item_b = (out / "b").read_text().split()
+        kind_c, pid_c, _, _ = (out / "c").read_text().split()
+        # The second task ran on the same warm process, without the first task's work item
+        assert (kind_a, kind_b, kind_c) == ("echo", "echo", "shout")
+        assert pid_a == pid_b != pid_c
+        assert (item_a, item_b) == ("w1", "None")
+        assert pool.submit({"id": "x"}, agent_type="unknown") is None
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_pool_scales_out_and_kills_cancelled_tasks(pool_env):
+    env, classes, out = pool_env
+    pool = WarmWorkerPool(min_size=1, max_size=2, max_queue=0, agent_classes=classes, env=env)
+    try:
+        sleeper = pool.submit({"id": "s", "prompt": "sleep"})
+        other = pool.submit({"id": "o", "prompt": "hi"})
+        assert await pool.wait(other, timeout=30) == "success"
+        assert pool.stats()["worker"]["processes"] == 2
+
+        await pool.cancel(sleeper)
+        assert await pool.wait(sleeper, timeout=30) == "cancelled"
+        assert not (out / "s").exists()
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_finished_tasks_are_forgotten(pool_env):
+    env, classes, out = pool_env
+    pool = WarmWorkerPool(min_size=1, max_size=1, agent_classes=classes, env=env, finished_ttl=0.1)
+    try:
+        collected = pool.submit({"id": "a", "prompt": "hi"})
+        assert await pool.wait(collected, timeout=30) == "success"
+        assert not pool.owns(collected)
+
+        # Nobody waits for this one; it is dropped once the TTL passes
+        unclaimed = pool.submit({"id": "b", "prompt": "hi"})
+        deadline = time.monotonic() + 30
+        while pool.owns(unclaimed) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        assert not pool.owns(unclaimed)
+        assert (out / "b").exists()
+    finally:
+        await pool.close()
+
+
+def test_shared_pool_is_closed_when_the_loop_changes(monkeypatch):
+    monkeypatch.setenv("SWARM_WORKER_POOL", "true")
+    monkeypatch.setattr(swarm_tool, "_shared_pool", None)
+
+    async def shared_pool():
+        return swarm_tool.get_shared_worker_pool()
+
+    first_loop = asyncio.new_event_loop()
+    try:
+        first = first_loop.run_until_complete(shared_pool())
+        second = asyncio.run(shared_pool())
+        # The old pool is closed on its own loop
+        first_loop.run_until_complete(asyncio.sleep(0.01))
+        assert second is not first
+        assert first._closed and not second._closed
+    finally:
+        first_loop.close()
+
+
+@pytest.mark.asyncio
+async def test_oversized_output_line_fails_the_task_and_recycles_the_process(pool_env):
+    env, classes, out = pool_env
+    pool = WarmWorkerPool(min_size=1, max_size=1, agent_classes=classes, env=env)
+    try:
+        flood = pool.submit({"id": "f", "prompt": "flood"})
+        assert await pool.wait(flood, timeout=30) == "failed"
+
+        after = pool.submit({"id": "a", "prompt": "hi"})
+        assert await pool.wait(after, timeout=30) == "success"
+        _, pid_flood, _, _ = (out / "f").read_text().split()
+        _, pid_after, _, _ = (out / "a").read_text().split()
+        assert pid_flood != pid_after
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_spawn_workers_overflows_to_nomad_when_pool_is_saturated(pool_env):
+    env, classes, out = pool_env
+    pool = WarmWorkerPool(min_size=1, max_size=1, max_queue=0, agent_classes=classes, env=env)
+    tool = SwarmTool(nomad_url="http://nomad.test:4646", worker_pool=pool)
+    mock_response = MagicMock()
+    mock_response.raise_for_status.return_value = None
+    try:
+        with patch('httpx.AsyncClient') as MockClient:
+            client = MockClient.return_value
+            client.__aenter__.return_value = client
+            client.__aexit__.return_value = None
+            client.post = AsyncMock(return_value=mock_response)
+
+            tasks = [{"id": "1", "prompt": "sleep"}, {"id": "2", "prompt": "hi"}, {"id": "3", "prompt": "hi"}]
+            result = json.loads(await tool.spawn_workers(tasks))
+
+            assert result["message"] == "Successfully dispatched 3 workers."
+            assert result["task_ids"] == ["1", "2", "3"]
+            pooled = [job_id for job_id in result["job_ids"] if job_id.startswith("pool-worker-")]
+            assert len(pooled) == 1
+            assert client.post.call_count == 2
+
+            # Tasks for another image never use the pool
+            await tool.spawn_workers([{"id": "4", "prompt": "hi"}], image="custom:latest")
+            assert client.post.call_count == 3
+
+        assert await tool.kill_worker(pooled[0]) == f"Successfully killed worker: {pooled[0]}"
+        assert await pool.wait(pooled[0], timeout=30) == "cancelled"
+    finally:
+        await pool.close()
@@ -149,6 +149,7 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 from pipecatapp.tools.swarm_tool import SwarmTool
 import json
 import base64
+import time
 
 @pytest.mark.asyncio
 @patch('pipecatapp.tools.swarm_tool.httpx.AsyncClient.put')
@@ -178,3 +179,51 @@ async def test_swarm_receive_messages(mock_delete, mock_get):
     assert msgs[0] == "msg1 content"
     assert msgs[1] == "msg2 content"
     assert mock_delete.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_wait_for_results_is_pushed_by_the_memory_subscription(tmp_path):
+    from pipecatapp.pmm_memory import PMMMemory
+
+    memory = PMMMemory(db_path=str(tmp_path / "ledger.db"))
+    # A result that is long out of the most recent 100 events
+    memory.add_event_sync("worker_result", "Result 1", {"task_id": "task-1"})
+    memory.add_events_bulk_sync([{"kind": "noise", "content": str(i), "meta": {}} for i in range(150)])
+    tool = SwarmTool(memory_client=memory)
+
+    async def finish_later():
+        await asyncio.sleep(0.1)
+        await memory.add_event("worker_result", "Result 2", {"task_id": "task-2"})
+
+    try:
+        started = time.monotonic()
+        results_json, _ = await asyncio.gather(tool.wait_for_results(["task-1", "task-2"], timeout=10), finish_later())
+        results = json.loads(results_json)
+        assert results["status"] == "complete"
+        assert results["results"] == {"task-1": "Result 1", "task-2": "Result 2"}
+        # No poll interval to wait out
+        assert time.monotonic() - started < 2
+    finally:
+        memory.close()
+
+
+@pytest.mark.asyncio
+async def test_remote_subscription_reads_server_sent_events():
+    import httpx
+    from pipecatapp.pmm_memory_client import RemoteEventSubscription
+
+    def handler(request):
+        assert request.url.params.get_list("task_id") == ["a", "b"]
+        body = (
+            ": subscribed\n\n"
+            'id: 1\ndata: {"id": 1, "kind": "worker_result", "content": "A", "meta": {"task_id": "a"}}\n\n'
+            ": keepalive\n\n"
+            'id: 2\ndata: {"id": 2, "kind": "worker_result", "content": "B", "meta": {"task_id": "b"}}\n\n'
+        )
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    subscription = await RemoteEventSubscription(
+        "http://memory.test/events/stream", {"task_id": ["a", "b"]}, transport=httpx.MockTransport(handler)
+    ).open()
+    with subscription:
+        assert [event["content"] async for event in subscription] == ["A", "B"]
@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.tools.registry import LazyTool, read_class, shared_resource, tool_schema
+
+
+def test_read_class_includes_inherited_methods():
+    _, archivist = read_class("pipecatapp.tools.archivist_tool", "ArchivistTool")
+    _, mcp = read_class("pipecatapp.tools.mcp_tool", "MCP_Tool")
+
+    # ArchivistTool subclasses MCP_Tool, which is imported from another module
+    assert set(mcp) <= set(archivist)
+    assert all(not name.startswith("_") for name in archivist)
+
+
+def test_lazy_tool_constructs_once_and_applies_pending_attributes():
+    built = []
+
+    def factory(cls):
+        built.append(cls)
+        return cls(strict=False)
+
+    tool = LazyTool("decoder", "json", "JSONDecoder", factory=factory)
+    tool.memory_client = "memory"
+    assert not tool.loaded and built == []
+    assert tool.memory_client == "memory"
+
+    assert tool.decode('{"a": 1}') == {"a": 1}
+    assert tool.strict is False
+    assert tool.resolve().memory_client == "memory"
+    tool.decode("[]")
+    assert len(built) == 1
+
+
+def test_schemas_are_read_without_importing_the_tool(tmp_path, monkeypatch):
+    (tmp_path / "schema_probe_tool.py").write_text(
+        "import not_installed_anywhere\n\n"
+        "class ProbeTool:\n"
+        "    \"\"\"Probes things.\"\"\"\n"
+        "    def __init__(self):\n"
+        "        self.name = 'probe'\n\n"
+        "    def get_schema(self) -> dict:\n"
+        "        return {'type': 'function', 'function': {'name': self.name,\n"
+        "                'description': getattr(self, 'description', 'Probe tool'), 'parameters': {'required': ['action']}}}\n\n"
+        "class DynamicTool:\n"
+        "    \"\"\"Builds its schema at runtime.\"\"\"\n"
+        "    def get_schema(self) -> dict:\n"
+        "        return dict(type='function')\n\n"
+        "    def ping(self):\n"
+        "        pass\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    probe = LazyTool("probe", "schema_probe_tool", "ProbeTool")
+    assert tool_schema(probe) == {
+        "type": "function",
+        "function": {"name": "probe", "description": "Probe tool", "parameters": {"required": ["action"]}},
+    }
+    # Not a literal: described from the registry entry instead
+    dynamic = tool_schema(LazyTool("dynamic", "schema_probe_tool", "DynamicTool"))
+    assert dynamic["function"]["name"] == "dynamic"
+    assert dynamic["function"]["parameters"]["properties"]["action"]["description"] == "The action to perform. Available: ping"
+    assert not probe.loaded and "schema_probe_tool" not in sys.modules
+
+
+def test_shared_resource_is_created_once_per_key():
+    calls = []
+
+    def make():
+        calls.append(1)
+        return object()
+
+    first = shared_resource(("test", "a"), make)
+    assert shared_resource(("test", "a"), make) is first
+    assert shared_resource(("test", "b"), make) is not first
+    assert len(calls) == 2
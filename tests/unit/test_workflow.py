@@ -1,4 +1,6 @@
 import pytest
+import asyncio
+import time
 import os
 import sys
 from unittest.mock import MagicMock, AsyncMock
@@ -7,7 +9,7 @@ from unittest.mock import MagicMock, AsyncMock
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'pipecatapp')))
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'ansible', 'roles', 'pipecatapp', 'files')))
 
-from workflow.runner import WorkflowRunner
+from workflow.runner import WorkflowRunner, WorkflowPlan
 from workflow.context import WorkflowContext
 from workflow.nodes.base_nodes import InputNode, OutputNode
 from workflow.nodes.tool_nodes import ToolParserNode
@@ -267,3 +269,191 @@ async def test_nested_output_resolution(mock_registry, mocker):
     result = await runner.run(global_inputs={"out1": "hello", "out2": "world"})
 
     assert result == {"final_output": {"key1": "hello", "key2": "world"}}
+
+
+class SleepNode(Node):
+    """Test node that sleeps, records its activity and forwards its input."""
+    events = []
+    active = 0
+    peak = 0
+
+    async def execute(self, context: WorkflowContext):
+        SleepNode.active += 1
+        SleepNode.peak = max(SleepNode.peak, SleepNode.active)
+        SleepNode.events.append(("start", self.id))
+        try:
+            await asyncio.sleep(self.config.get("delay", 0.1))
+            if self.config.get("fail"):
+                raise RuntimeError(f"{self.id} failed")
+            self.set_output(context, "out", self.id)
+        finally:
+            SleepNode.active -= 1
+            SleepNode.events.append(("end", self.id))
+
+
+def _fan_out_workflow(branches, **extra):
+    nodes = [{"id": "start", "type": "SleepNode", "delay": 0}]
+    for branch in branches:
+        nodes.append({"id": branch["id"], "type": "SleepNode",
+                      "inputs": [{"name": "in", "connection": {"from_node": "start", "from_output": "out"}}], **branch})
+    nodes.append({"id": "output", "type": "OutputNode", "inputs": [
+        {"name": b["id"], "connection": {"from_node": b["id"], "from_output": "out"}} for b in branches
+    ]})
+    return {"nodes": nodes, **extra}
+
+
+@pytest.fixture
+def sleep_workflow(mock_registry, mocker):
+    SleepNode.events, SleepNode.active, SleepNode.peak = [], 0, 0
+    mock_registry.get_node_class.side_effect = lambda type: {"SleepNode": SleepNode, "OutputNode": OutputNode}.get(type)
+    mocker.patch('workflow.runner._save_run_background')
+
+    def load(workflow_def):
+        mocker.patch('builtins.open', mocker.mock_open(read_data=str(workflow_def)))
+        mocker.patch('yaml.safe_load', return_value=workflow_def)
+        return WorkflowRunner("dummy/path.yaml")
+    return load
+
+
+@pytest.mark.asyncio
+async def test_independent_branches_run_concurrently(sleep_workflow):
+    """Independent branches take about as long as the slowest one, and the merge waits for all of them."""
+    runner = sleep_workflow(_fan_out_workflow([{"id": f"branch{i}", "delay": 0.2} for i in range(4)]))
+
+    start = time.monotonic()
+    result = await runner.run(global_inputs={})
+    elapsed = time.monotonic() - start
+
+    assert elapsed < 0.5
+    assert SleepNode.peak == 4
+    assert result == {f"branch{i}": f"branch{i}" for i in range(4)}
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_caps_parallel_nodes(sleep_workflow):
+    runner = sleep_workflow(_fan_out_workflow([{"id": f"branch{i}", "delay": 0.05} for i in range(5)], max_concurrency=2))
+
+    await runner.run(global_inputs={})
+
+    assert SleepNode.peak == 2
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_one_preserves_topological_order(sleep_workflow):
+    runner = sleep_workflow(_fan_out_workflow([{"id": f"branch{i}", "delay": 0.01} for i in range(3)], max_concurrency=1))
+
+    await runner.run(global_inputs={})
+
+    starts = [node_id for kind, node_id in SleepNode.events if kind == "start"]
+    assert starts == runner._get_execution_order()[:len(starts)]
+
+
+@pytest.mark.asyncio
+async def test_failing_node_cancels_running_siblings(sleep_workflow):
+    runner = sleep_workflow(_fan_out_workflow([
+        {"id": "fails", "delay": 0.05, "fail": True},
+        {"id": "slow", "delay": 5},
+    ]))
+
+    with pytest.raises(RuntimeError, match="fails failed"):
+        await runner.run(global_inputs={})
+
+    # The slow branch was cancelled rather than left running, and the merge never ran
+    assert SleepNode.active == 0
+    assert ("end", "slow") in SleepNode.events
+    assert runner.context.final_output is None
+
+
+@pytest.mark.asyncio
+async def test_cancelling_run_cancels_running_nodes(sleep_workflow):
+    runner = sleep_workflow(_fan_out_workflow([{"id": f"branch{i}", "delay": 5} for i in range(2)]))
+
+    task = asyncio.create_task(runner.run(global_inputs={}))
+    await asyncio.sleep(0.05)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert SleepNode.active == 0
+
+
+def test_workflow_plan_bind_renders_templates_without_mutating_plan():
+    definition = {
+        "nodes": [
+            {"id": "llm", "type": "SimpleLLMNode", "config": {"prompt": "Hi {{ $vars.name }}, {{$vars.missing}}", "model": "fixed"}},
+            {"id": "out", "type": "OutputNode", "inputs": [{"name": "final_output", "connection": {"from_node": "llm", "from_output": "response"}}]},
+        ]
+    }
+    plan = WorkflowPlan(definition)
+
+    bound = plan.bind({"name": "Ada"})
+
+    assert bound["nodes"][0]["config"]["prompt"] == "Hi Ada, {{$vars.missing}}"
+    assert definition["nodes"][0]["config"]["prompt"] == "Hi {{ $vars.name }}, {{$vars.missing}}"
+    # Untemplated subtrees are shared, not copied
+    assert bound["nodes"][1] is definition["nodes"][1]
+    assert plan.execution_order == ["llm", "out"]
+
+
+@pytest.mark.asyncio
+async def test_workflow_plan_is_compiled_once_per_file(mock_registry, mocker):
+    workflow_def = {
+        "nodes": [
+            {"id": "start", "type": "InputNode", "config": {"outputs": ["initial_data"]}},
+            {"id": "end", "type": "OutputNode", "inputs": [{"name": "final_output", "connection": {"from_node": "start", "from_output": "initial_data"}}]}
+        ]
+    }
+    mock_registry.get_node_class.side_effect = lambda type: {"InputNode": InputNode, "OutputNode": OutputNode}.get(type)
+    mocker.patch('builtins.open', mocker.mock_open(read_data=str(workflow_def)))
+    mocker.patch('yaml.safe_load', return_value=workflow_def)
+    mocker.patch('workflow.runner._save_run_background')
+
+    runner = WorkflowRunner("dummy/path.yaml")
+    first = await runner.run(global_inputs={"initial_data": "one"})
+    second = await WorkflowRunner("dummy/path.yaml").run(global_inputs={"initial_data": "two"})
+
+    assert (first, second) == ({"final_output": "one"}, {"final_output": "two"})
+    assert WorkflowRunner("dummy/path.yaml").plan is runner.plan
+    # Node classes were looked up (and validated) on the first run only
+    assert mock_registry.get_node_class.call_count == 2
+
+
+class CountingNode(Node):
+    """Appends to its own config each time it runs."""
+    async def execute(self, context: WorkflowContext):
+        self.config.setdefault("seen", []).append(context.global_inputs.get("initial_data"))
+        self.config["settings"]["runs"] += 1
+        self.set_output(context, "initial_data", (list(self.config["seen"]), self.config["settings"]["runs"]))
+
+
+@pytest.mark.asyncio
+async def test_node_config_changes_do_not_leak_between_runs(mock_registry, mocker):
+    workflow_def = {
+        "nodes": [
+            {"id": "start", "type": "CountingNode", "settings": {"runs": 0}},
+            {"id": "end", "type": "OutputNode", "inputs": [{"name": "final_output", "connection": {"from_node": "start", "from_output": "initial_data"}}]}
+        ]
+    }
+    mock_registry.get_node_class.side_effect = lambda type: {"CountingNode": CountingNode, "OutputNode": OutputNode}.get(type)
+    mocker.patch('builtins.open', mocker.mock_open(read_data=str(workflow_def)))
+    mocker.patch('yaml.safe_load', return_value=workflow_def)
+    mocker.patch('workflow.runner._save_run_background')
+
+    first = await WorkflowRunner("dummy/path.yaml").run(global_inputs={"initial_data": "one"})
+    second = await WorkflowRunner("dummy/path.yaml").run(global_inputs={"initial_data": "two"})
+
+    assert first == {"final_output": (["one"], 1)}
+    assert second == {"final_output": (["two"], 1)}
+    assert workflow_def["nodes"][0] == {"id": "start", "type": "CountingNode", "settings": {"runs": 0}}
+
+
+def test_workflow_plan_hitl_verdict():
+    risky = {"nodes": [{"id": "t", "type": "ToolNode", "config": {"tool_name": "shell"}}]}
+    approved = {"nodes": risky["nodes"] + [{"id": "gate", "type": "HumanApprovalNode"}]}
+    templated = {"nodes": [{"id": "t", "type": "ToolNode", "config": {"tool_name": "{{ $vars.tool }}"}}]}
+
+    assert WorkflowPlan(risky).hitl_violation(risky) is True
+    assert WorkflowPlan(approved).hitl_violation(approved) is False
+    plan = WorkflowPlan(templated)
+    assert plan.hitl_violation(plan.bind({"tool": "shell"})) is True
+    assert plan.hitl_violation(plan.bind({"tool": "web_browser"})) is False
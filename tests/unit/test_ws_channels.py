@@ -0,0 +1,139 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from pipecatapp.ws_channels import FRAME_HEADER, KIND_AUDIO, KIND_LOG, ChannelHub
+
+
+class FakeWebSocket:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed = False
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+    async def send_text(self, text):
+        await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def send_bytes(self, data):
+        await self.gate.wait()
+        await asyncio.sleep(self.delay)
+        self.sent.append(data)
+
+    async def close(self):
+        self.closed = True
+
+
+async def settle(hub):
+    for _ in range(50):
+        if not any(channel.queue for channel in hub.channels.values()):
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_topics_and_wire_formats():
+    hub = ChannelHub()
+    plain, viewer = FakeWebSocket(), FakeWebSocket()
+    hub.add(plain)
+    hub.add(viewer)
+    hub.subscribe(viewer, ["log", "audio"], binary=True)
+
+    assert not hub.has_subscribers("vision_debug")
+    await hub.broadcast(json.dumps({"type": "agent", "data": "hi"}))
+    hub.publish_text(json.dumps({"type": "log", "data": "debug line"}), topic="log")
+    hub.broadcast_media("audio", b"\x01\x00" * 160, sample_rate=16000, channels=1)
+    await settle(hub)
+
+    # Clients that did not subscribe get no logs or media, in the JSON protocol
+    assert [json.loads(m)["type"] for m in plain.sent] == ["agent"]
+
+    kinds = [FRAME_HEADER.unpack_from(frame) for frame in viewer.sent]
+    assert [k[0] for k in kinds] == [4, KIND_LOG, KIND_AUDIO]
+    assert kinds[2][2:] == (1, 16000)
+    assert viewer.sent[2][FRAME_HEADER.size:] == b"\x01\x00" * 160
+    assert json.loads(viewer.sent[1][FRAME_HEADER.size:])["data"] == "debug line"
+
+
+@pytest.mark.asyncio
+async def test_slow_client_sheds_media_without_stalling_others():
+    hub = ChannelHub(max_queue=8)
+    fast, slow = FakeWebSocket(), FakeWebSocket()
+    for ws in (fast, slow):
+        hub.add(ws)
+        hub.subscribe(ws, ["audio", "vision_debug"], binary=True)
+    slow.gate.clear()
+
+    for i in range(20):
+        hub.broadcast_media("audio", bytes([i]) * 4, sample_rate=16000, channels=1)
+        hub.broadcast_media("vision_debug", b"\xff\xd8frame%d" % i)
+        await asyncio.sleep(0)
+    await settle(hub)
+
+    # The fast client keeps up with every audio frame and ends on the newest video frame
+    fast_kinds = [frame[0] for frame in fast.sent]
+    assert fast_kinds.count(KIND_AUDIO) == 20
+    assert [frame for frame in fast.sent if frame[0] == 2][-1].endswith(b"frame19")
+    slow_channel = hub.channels[slow]
+    # One video frame (the newest) survives; the rest of the queue is the newest audio
+    queued = list(slow_channel.queue)
+    assert len(queued) <= 8
+    assert [m.payload for m in queued if m.topic == "vision_debug"] == [b"\xff\xd8frame19"]
+    assert queued[-1].payload == bytes([19]) * 4
+    assert slow_channel.dropped > 0
+
+    slow.gate.set()
+    await settle(hub)
+    assert not slow.closed
+
+
+@pytest.mark.asyncio
+async def test_client_is_dropped_when_undroppable_messages_back_up():
+    hub = ChannelHub(max_queue=4)
+    stuck = FakeWebSocket()
+    stuck.gate.clear()
+    hub.add(stuck)
+
+    for i in range(10):
+        await hub.broadcast(json.dumps({"type": "agent", "data": i}))
+    await asyncio.sleep(0.01)
+
+    assert stuck.closed
+    assert hub.active_connections == []
+
+
+@pytest.mark.asyncio
+async def test_full_log_subscriber_is_dropped_without_recursing():
+    hub = ChannelHub(max_queue=4)
+    stuck = FakeWebSocket()
+    stuck.gate.clear()
+    hub.add(stuck)
+    hub.subscribe(stuck, ["log"])
+
+    class Forward(logging.Handler):
+        # Streams every record back to clients, as the app's log handler does
+        def emit(self, record):
+            hub.publish_text(json.dumps({"type": "log", "data": record.getMessage()}), topic="log")
+
+    handler = Forward()
+    root = logging.getLogger()
+    root.addHandler(handler)
+    try:
+        for i in range(10):
+            await hub.broadcast(json.dumps({"type": "agent", "data": i}))
+    finally:
+        root.removeHandler(handler)
+    await asyncio.sleep(0.01)
+
+    assert stuck.closed
+    assert hub.active_connections == []
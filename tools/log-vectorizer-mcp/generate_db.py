@@ -7,7 +7,7 @@ import os
 # Import the tool from the server module
 import server
 
-def mock_get_local_embedding(text: str):
+def mock_get_local_embedding(text: str, client=None):
     """Returns a dummy embedding to bypass network calls."""
     return [0.0] * 768
 
@@ -47,6 +47,7 @@ async def main():
     if args.mock_embeddings:
         print("Mocking embeddings (bypassing network requests)...")
         server.get_local_embedding = mock_get_local_embedding
+        server.LOCAL_EMBED_BATCH_URL = ""
     else:
         print(f"Using embedding server at: {server.LOCAL_EMBED_URL}")
 
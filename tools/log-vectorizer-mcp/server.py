@@ -1,9 +1,13 @@
+import asyncio
+import hashlib
 import json
 import math
 import os
 import re
+import threading
 import httpx
-from typing import List
+from collections import OrderedDict
+from typing import List, Optional
 from mcp.server.fastmcp import FastMCP
 
 # Initialize the MCP Server using FastMCP
@@ -29,16 +33,91 @@ TIMESTAMP_PATTERN = re.compile(
 # Maximum lines allowed in a single chunk before forcing a split to avoid massive embeddings
 MAX_LINES_PER_CHUNK = 200
 
-def get_local_embedding(text: str) -> List[float]:
+# Chunks are embedded in batches of this size, over one keep-alive connection
+EMBED_BATCH_SIZE = int(os.environ.get("EMBED_BATCH_SIZE", 64))
+# Embeddings kept in memory, keyed by (model, text hash)
+EMBED_CACHE_SIZE = int(os.environ.get("EMBED_CACHE_SIZE", 4096))
+
+# Endpoint taking a list of inputs per request, like Ollama's /api/embed. Derived from
+# LOCAL_EMBED_URL when it is Ollama's single-text endpoint; set to "" to disable batching.
+LOCAL_EMBED_BATCH_URL = os.environ.get("LOCAL_EMBED_BATCH_URL")
+
+_embedding_cache: "OrderedDict[tuple, List[float]]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+_batch_unsupported = False
+
+def _batch_url() -> str:
+    if LOCAL_EMBED_BATCH_URL is not None:
+        return LOCAL_EMBED_BATCH_URL
+    if LOCAL_EMBED_URL.endswith("/api/embeddings"):
+        return LOCAL_EMBED_URL[:-len("/api/embeddings")] + "/api/embed"
+    return ""
+
+def get_local_embedding(text: str, client: Optional[httpx.Client] = None) -> List[float]:
     """Generates embeddings using a local HTTP endpoint."""
     payload = {
         "model": EMBEDDING_MODEL,
         "prompt": text
     }
-    with httpx.Client() as client:
-        response = client.post(LOCAL_EMBED_URL, json=payload, timeout=60.0)
+    if client is None:
+        with httpx.Client() as client:
+            return get_local_embedding(text, client)
+    response = client.post(LOCAL_EMBED_URL, json=payload, timeout=60.0)
+    response.raise_for_status()
+    return response.json().get("embedding", [])
+
+def get_local_embedding_batch(texts: List[str], client: httpx.Client) -> Optional[List[List[float]]]:
+    """Embeds texts in a single request, or returns None if the server cannot batch."""
+    global _batch_unsupported
+    url = _batch_url()
+    if not url or _batch_unsupported:
+        return None
+    try:
+        response = client.post(url, json={"model": EMBEDDING_MODEL, "input": texts}, timeout=120.0)
         response.raise_for_status()
-        return response.json().get("embedding", [])
+        vectors = response.json().get("embeddings")
+    except httpx.HTTPStatusError as e:
+        # Servers without a batch endpoint are not asked again
+        if e.response.status_code in (404, 405):
+            _batch_unsupported = True
+        return None
+    except (httpx.HTTPError, ValueError):
+        return None
+    if not isinstance(vectors, list) or len(vectors) != len(texts):
+        return None
+    return vectors
+
+def get_local_embeddings(texts: List[str]) -> List[List[float]]:
+    """Embeds texts in batches of EMBED_BATCH_SIZE, reusing cached vectors and a single HTTP connection.
+
+    Falls back to one request per text when the server has no batch endpoint.
+    """
+    keys = [(EMBEDDING_MODEL, hashlib.sha1(text.encode("utf-8")).digest()) for text in texts]
+    vectors = [None] * len(texts)
+    with _embedding_cache_lock:
+        for i, key in enumerate(keys):
+            if key in _embedding_cache:
+                _embedding_cache.move_to_end(key)
+                vectors[i] = _embedding_cache[key]
+
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if missing:
+        with httpx.Client() as client:
+            for start in range(0, len(missing), EMBED_BATCH_SIZE):
+                group = missing[start:start + EMBED_BATCH_SIZE]
+                batch = get_local_embedding_batch([texts[i] for i in group], client)
+                for j, i in enumerate(group):
+                    vectors[i] = batch[j] if batch is not None else get_local_embedding(texts[i], client)
+        with _embedding_cache_lock:
+            for i in missing:
+                _embedding_cache[keys[i]] = vectors[i]
+            while len(_embedding_cache) > EMBED_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+    return vectors
+
+async def embed_texts(texts: List[str]) -> List[List[float]]:
+    """Embeds texts in a worker thread so the MCP event loop is never blocked."""
+    return await asyncio.to_thread(get_local_embeddings, texts)
 
 def cosine_similarity(v1: List[float], v2: List[float]) -> float:
     """Basic dot product for vector comparison."""
@@ -56,10 +135,22 @@ async def ingest_log_file(filepath: str) -> str:
     vectorizes it, and saves it to a text-based JSONL database.
     """
     buffer = []
+    pending_chunks = []
     chunk_count = 0
 
     try:
         with open(filepath, 'r', encoding='utf-8', errors='replace') as file, open(DATABASE_FILE, 'a', encoding='utf-8') as db:
+            async def flush_chunks():
+                vectors = await embed_texts(pending_chunks)
+                for chunk_text, vector in zip(pending_chunks, vectors):
+                    db_entry = {
+                        "source": filepath,
+                        "text": chunk_text,
+                        "vector": vector
+                    }
+                    db.write(json.dumps(db_entry) + "\n")
+                pending_chunks.clear()
+
             for line in file:
                 # If we hit a new timestamp or the buffer exceeds the maximum allowed lines
                 hit_boundary = TIMESTAMP_PATTERN.match(line) is not None
@@ -68,15 +159,10 @@ async def ingest_log_file(filepath: str) -> str:
                 if (hit_boundary or hit_max_lines) and buffer:
                     chunk_text = "".join(buffer).strip()
                     if chunk_text:
-                        vector = get_local_embedding(chunk_text)
-
-                        db_entry = {
-                            "source": filepath,
-                            "text": chunk_text,
-                            "vector": vector
-                        }
-                        db.write(json.dumps(db_entry) + "\n")
+                        pending_chunks.append(chunk_text)
                         chunk_count += 1
+                        if len(pending_chunks) >= EMBED_BATCH_SIZE:
+                            await flush_chunks()
 
                     # Reset buffer
                     buffer = [line]
@@ -88,10 +174,10 @@ async def ingest_log_file(filepath: str) -> str:
             if buffer:
                 chunk_text = "".join(buffer).strip()
                 if chunk_text:
-                    vector = get_local_embedding(chunk_text)
-                    db_entry = {"source": filepath, "text": chunk_text, "vector": vector}
-                    db.write(json.dumps(db_entry) + "\n")
+                    pending_chunks.append(chunk_text)
                     chunk_count += 1
+            if pending_chunks:
+                await flush_chunks()
 
         return f"Successfully ingested {filepath}. Created {chunk_count} vectorized text chunks in {DATABASE_FILE}."
     except Exception as e:
@@ -104,7 +190,7 @@ async def search_logs(query: str, top_k: int = 3) -> str:
     Agents should use this to find historical errors, stack traces, or context.
     """
     try:
-        query_vector = get_local_embedding(query)
+        query_vector = (await embed_texts([query]))[0]
     except Exception as e:
         return f"Error generating embedding for query: {str(e)}"
 
@@ -13,7 +13,7 @@ temp_db = tempfile.NamedTemporaryFile(delete=False)
 os.environ["DATABASE_FILE"] = temp_db.name
 temp_db.close()
 
-from server import ingest_log_file, search_logs, cosine_similarity
+from server import ingest_log_file, search_logs, cosine_similarity, get_local_embeddings
 
 @pytest.fixture(autouse=True)
 def setup_teardown():
@@ -125,3 +125,21 @@ async def test_search_logs_no_db(mock_client_class):
 
     result = await search_logs("find error")
     assert "Log database not found" in result
+
+@patch('server.httpx.Client')
+def test_embeddings_are_requested_in_batches(mock_client_class):
+    mock_instance = mock_client_class.return_value.__enter__.return_value
+
+    def post(url, json, timeout):
+        response = MagicMock()
+        response.json.return_value = {"embeddings": [[float(len(text))] for text in json["input"]]}
+        return response
+    mock_instance.post.side_effect = post
+
+    with patch('server.LOCAL_EMBED_BATCH_URL', "http://fake-url/api/embed"), patch('server.EMBED_BATCH_SIZE', 2):
+        vectors = get_local_embeddings(["batch a", "batch bb", "batch ccc"])
+
+    assert vectors == [[7.0], [8.0], [9.0]]
+    assert [call.kwargs["json"]["input"] for call in mock_instance.post.call_args_list] == [
+        ["batch a", "batch bb"], ["batch ccc"]
+    ]